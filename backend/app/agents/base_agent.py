@@ -13,7 +13,9 @@ from langchain.agents import AgentExecutor
 from langchain.schema import BaseMessage, HumanMessage, AIMessage
 from langsmith import traceable
 
-from app.services.llm_service import llm_service
+from app.services.llm_service import LLMProvider, llm_service
+from app.services.llm_providers.base import TokenUsage
+from app.services.llm_response_cache import get_llm_response_cache, make_cache_key
 from app.services.mitre_service import mitre_service
 from app.models.schemas import AgentTask, AgentResponse, SharedContext
 
@@ -73,11 +75,16 @@ class BaseAgent(ABC):
         self.agent_type = agent_type
         self.description = description
         self.context_manager: Optional[SharedContextManager] = None
+        self.preferred_provider: Optional[str] = None
     
     def set_context_manager(self, context_manager: SharedContextManager):
         """Set the shared context manager"""
         self.context_manager = context_manager
     
+    def set_preferred_provider(self, provider: Optional[str]):
+        """Set the LLM provider used when a call does not name one"""
+        self.preferred_provider = provider
+    
     @abstractmethod
     def get_system_prompt(self) -> str:
         """Get the agent's system prompt"""
@@ -100,6 +107,56 @@ class BaseAgent(ABC):
             raise ValueError("Context manager not set")
         self.context_manager.update_context(updates)
     
+    def prompt_with_context(self, prompt: str) -> str:
+        """Prefix a task prompt with the shared context summary"""
+        context_summary = self.context_manager.get_context_summary() if self.context_manager else ""
+        if context_summary:
+            prompt = f"Current Context:\\n{context_summary}\\n\\nTask:\\n{prompt}"
+        return prompt
+    
+    def _response_cache_key(self, system_prompt: str, prompt: str, temperature: float, provider: str) -> str:
+        """Response cache key for an agent call served by ``provider``"""
+        return make_cache_key({
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "temperature": temperature,
+            "provider": provider,
+            "model": llm_service.providers[provider].model_name
+        })
+    
+    def _resolve_llm_provider(self, preferred_provider: Optional[str] = None) -> str:
+        """Provider llm_service would serve an agent call with now"""
+        return llm_service.select_provider(preferred_provider or self.preferred_provider)
+    
+    def _llm_provider(self, provider: str) -> LLMProvider:
+        return llm_service.providers[provider]
+    
+    def _should_cache_llm_response(self, temperature: float) -> bool:
+        return get_llm_response_cache().should_cache(temperature)
+    
+    async def _get_cached_llm_response(
+        self, system_prompt: str, prompt: str, temperature: float, provider: str
+    ) -> Optional[Dict[str, Any]]:
+        """Cached agent response served by ``provider``, counting the cost it saved"""
+        response_cache = get_llm_response_cache()
+        cached = await response_cache.get(
+            self._response_cache_key(system_prompt, prompt, temperature, provider)
+        )
+        if cached is None:
+            return None
+        if cached.get("token_usage"):
+            response_cache.record_saving(TokenUsage(**cached["token_usage"]))
+        return {**cached, "cache_hit": True}
+    
+    async def _cache_llm_response(
+        self, system_prompt: str, prompt: str, temperature: float, provider: str, response: Dict[str, Any]
+    ) -> None:
+        """Store a successful agent response under the provider that answered it"""
+        await get_llm_response_cache().set(
+            self._response_cache_key(system_prompt, prompt, temperature, provider),
+            response
+        )
+    
     @traceable
     async def generate_llm_response(
         self, 
@@ -109,18 +166,32 @@ class BaseAgent(ABC):
     ) -> Dict[str, Any]:
         """Generate LLM response using the agent's system prompt"""
         system_prompt = self.get_system_prompt()
+        preferred_provider = preferred_provider or self.preferred_provider
+        prompt = self.prompt_with_context(prompt)
         
-        # Add context information to the prompt
-        context_summary = self.context_manager.get_context_summary() if self.context_manager else ""
-        if context_summary:
-            prompt = f"Current Context:\\n{context_summary}\\n\\nTask:\\n{prompt}"
+        use_cache = self._should_cache_llm_response(temperature)
+        if use_cache:
+            # Key on the provider and model that would serve the call now, so a
+            # config change or an earlier fallback never replays another model
+            provider = self._resolve_llm_provider(preferred_provider)
+            cached = await self._get_cached_llm_response(system_prompt, prompt, temperature, provider)
+            if cached is not None:
+                return cached
         
-        return await llm_service.generate_response(
+        response = await llm_service.generate_response(
             prompt=prompt,
             system_prompt=system_prompt,
             temperature=temperature,
             preferred_provider=preferred_provider
         )
+        
+        # Only successful responses are worth replaying, under the provider that answered
+        if use_cache and response.get("success"):
+            await self._cache_llm_response(
+                system_prompt, prompt, temperature, response.get("provider", provider), response
+            )
+        
+        return response
     
     def parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """Parse JSON from LLM response, handling potential formatting issues"""
@@ -3,19 +3,33 @@ Report Generation Agent
 Generates comprehensive threat modeling reports with executive summaries and technical details
 """
 
+import dataclasses
 import json
 import logging
 import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 from langsmith import traceable
 
 from app.agents.base_agent import BaseAgent
+from app.services.enhanced_llm_service import get_enhanced_llm_service
 from app.services.enhanced_mitre_service import get_enhanced_mitre_service
+from app.services.incremental_json import IncrementalJSONParser
+from app.services.llm_providers.base import LLMModel
 from app.models.schemas import AgentTask, AgentResponse
 
 logger = logging.getLogger(__name__)
 
+# Report sections handed to the section listener as soon as they are streamed
+REPORT_SECTIONS = (
+    "executive_summary", "technical_analysis", "control_assessment", "recommendations", "metrics"
+)
+
+# Sampling temperature of report completions
+REPORT_TEMPERATURE = 0.4
+
+SectionListener = Callable[[str, Any], Awaitable[None]]
+
 
 class ReportGenerationAgent(BaseAgent):
     """Agent responsible for generating comprehensive threat modeling reports"""
@@ -25,6 +39,11 @@ class ReportGenerationAgent(BaseAgent):
             agent_type="report_generator",
             description="Generates comprehensive threat modeling reports with executive summaries and technical details"
         )
+        self.section_listener: Optional[SectionListener] = None
+    
+    def set_section_listener(self, listener: Optional[SectionListener]):
+        """Receive each report section (name, content) as soon as it has been generated"""
+        self.section_listener = listener
     
     def get_system_prompt(self) -> str:
         return '''You are a cybersecurity report writer specializing in threat modeling documentation. Your role is to:
@@ -161,7 +180,7 @@ Focus on actionable insights and clear communication for both technical and busi
             # Generate report content
             prompt = self._create_report_prompt(report_context)
             
-            llm_response = await self.generate_llm_response(prompt, temperature=0.4)
+            llm_response = await self._generate_report_response(prompt)
             
             if not llm_response['success']:
                 return self.create_response(
@@ -221,6 +240,104 @@ Focus on actionable insights and clear communication for both technical and busi
                 errors=[str(e)]
             )
     
+    async def _generate_report_response(self, prompt: str) -> Dict[str, Any]:
+        """
+        Generate the report, streamed when the agent's provider can stream it
+        
+        Reports are long, so each section goes to the section listener as soon
+        as it is complete instead of after the whole completion. The report is
+        streamed only when the streaming service serves the provider and model
+        llm_service resolves for the agent; otherwise, or when the stream
+        breaks, it is generated in one call and its remaining sections are
+        handed over at the end. Both paths share the agent response cache.
+        """
+        sent_sections: Set[str] = set()
+        try:
+            provider = self._resolve_llm_provider()
+        except ValueError:
+            provider = None
+        model = self._streaming_model(provider) if provider else None
+        if model is None:
+            return await self._generate_report_in_one_call(prompt, sent_sections)
+        
+        system_prompt = self.get_system_prompt()
+        full_prompt = self.prompt_with_context(prompt)
+        use_cache = self._should_cache_llm_response(REPORT_TEMPERATURE)
+        if use_cache:
+            cached = await self._get_cached_llm_response(system_prompt, full_prompt, REPORT_TEMPERATURE, provider)
+            if cached is not None:
+                await self._publish_sections(cached["response"], sent_sections)
+                return cached
+        
+        parser = IncrementalJSONParser()
+        content_parts = []
+        final_chunk = None
+        try:
+            async for chunk in get_enhanced_llm_service().generate_stream(
+                prompt=full_prompt,
+                model=model,
+                provider=provider,
+                system_prompt=system_prompt,
+                temperature=REPORT_TEMPERATURE,
+                max_tokens=4000,
+                use_cache=False  # stored in the agent response cache below
+            ):
+                if chunk.done:
+                    final_chunk = chunk
+                    continue
+                
+                content_parts.append(chunk.delta)
+                for key, value in parser.feed(chunk.delta):
+                    if key in REPORT_SECTIONS:
+                        await self._publish_section(key, value, sent_sections)
+            if final_chunk is None:
+                raise ValueError("stream ended without a final chunk")
+        except Exception as e:
+            logger.warning(f"Report stream failed, generating in one call: {e}")
+            return await self._generate_report_in_one_call(prompt, sent_sections)
+        
+        content = "".join(content_parts)
+        token_usage = final_chunk.token_usage or self._llm_provider(provider).estimate_usage(
+            f"{system_prompt}{full_prompt}", content
+        )
+        response = {
+            "response": content,
+            "provider": provider,
+            "model": model.value,
+            "token_usage": dataclasses.asdict(token_usage),
+            "success": True
+        }
+        if use_cache:
+            await self._cache_llm_response(system_prompt, full_prompt, REPORT_TEMPERATURE, provider, response)
+        return response
+    
+    def _streaming_model(self, provider: str) -> Optional[LLMModel]:
+        """Model to stream with when the streaming service serves exactly the provider's model"""
+        if provider not in get_enhanced_llm_service().get_available_providers():
+            return None
+        model_name = self._llm_provider(provider).model_name
+        return next((model for model in LLMModel if model.value == model_name), None)
+    
+    async def _generate_report_in_one_call(self, prompt: str, sent_sections: Set[str]) -> Dict[str, Any]:
+        response = await self.generate_llm_response(prompt, temperature=REPORT_TEMPERATURE)
+        if response.get("success"):
+            await self._publish_sections(response["response"], sent_sections)
+        return response
+    
+    async def _publish_sections(self, response_text: str, sent_sections: Set[str]):
+        """Hand the listener every section of a complete report it has not received yet"""
+        if not self.section_listener:
+            return
+        report = self.parse_json_response(response_text)
+        for key in REPORT_SECTIONS:
+            if key in report:
+                await self._publish_section(key, report[key], sent_sections)
+    
+    async def _publish_section(self, name: str, content: Any, sent_sections: Set[str]):
+        if self.section_listener and name not in sent_sections:
+            sent_sections.add(name)
+            await self.section_listener(name, content)
+    
     def _create_report_prompt(self, context: Dict[str, Any]) -> str:
         """Create comprehensive report generation prompt"""
         system_info = context.get('system_overview', {})
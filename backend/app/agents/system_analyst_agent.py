@@ -5,16 +5,24 @@ Analyzes system descriptions to identify critical security components
 
 import json
 import logging
+import time
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 from ..services.enhanced_llm_service import get_enhanced_llm_service
-from ..services.llm_providers import LLMError, LLMModel
+from ..services.incremental_json import IncrementalJSONParser
+from ..services.llm_providers import LLMError, LLMModel, LLMResponse
 from ..core.prompts import get_system_analyst_prompt, AgentType
 from .shared_context import SharedContext
 
 logger = logging.getLogger(__name__)
 
+# Sections published to the shared context as soon as they are streamed
+STREAMED_SECTIONS = (
+    "critical_assets", "system_components", "data_flows",
+    "trust_boundaries", "entry_points", "user_roles"
+)
+
 
 @dataclass
 class SystemAnalysisResult:
@@ -115,9 +123,9 @@ class SystemAnalystAgent:
                     "Calling LLM for analysis"
                 )
                 
-                # Perform analysis with retries
+                # Perform analysis with retries, streaming sections into the context
                 analysis_response = await self._perform_analysis_with_retry(
-                    system_prompt, user_prompt, response_schema, preferred_model
+                    system_prompt, user_prompt, response_schema, preferred_model, ctx
                 )
                 
                 await ctx.update_agent_status(
@@ -214,9 +222,14 @@ class SystemAnalystAgent:
         system_prompt: str,
         user_prompt: str, 
         response_schema: Dict[str, Any],
-        preferred_model: Optional[LLMModel] = None
+        preferred_model: Optional[LLMModel] = None,
+        ctx=None
     ):
-        """Perform analysis with model fallback on failure"""
+        """Perform analysis with model fallback on failure
+        
+        With a context, the completion is streamed and each section is published
+        as soon as it is complete.
+        """
         models_to_try = [preferred_model] if preferred_model else []
         models_to_try.extend([m for m in self.preferred_models if m != preferred_model])
         
@@ -226,14 +239,19 @@ class SystemAnalystAgent:
             try:
                 logger.info(f"Attempting system analysis with model: {model.value if model else 'auto'}")
                 
-                response = await self.llm_service.generate_structured_completion(
-                    prompt=user_prompt,
-                    response_schema=response_schema,
-                    system_prompt=system_prompt,
-                    model=model,
-                    temperature=0.1,
-                    max_tokens=4000
-                )
+                if ctx is not None:
+                    response = await self._stream_analysis(
+                        ctx, system_prompt, user_prompt, response_schema, model
+                    )
+                else:
+                    response = await self.llm_service.generate_structured_completion(
+                        prompt=user_prompt,
+                        response_schema=response_schema,
+                        system_prompt=system_prompt,
+                        model=model,
+                        temperature=0.1,
+                        max_tokens=4000
+                    )
                 
                 logger.info(f"System analysis successful with model: {response.model}")
                 return response
@@ -250,6 +268,57 @@ class SystemAnalystAgent:
         # If all models failed
         raise LLMError(f"System analysis failed with all available models. Last error: {last_error}")
     
+    async def _stream_analysis(
+        self,
+        ctx,
+        system_prompt: str,
+        user_prompt: str,
+        response_schema: Dict[str, Any],
+        model: Optional[LLMModel]
+    ) -> LLMResponse:
+        """Stream the analysis, publishing sections to the shared context as they complete"""
+        start_time = time.time()
+        parser = IncrementalJSONParser()
+        content_parts = []
+        final_chunk = None
+        received = 0
+        
+        async for chunk in self.llm_service.generate_structured_stream(
+            prompt=user_prompt,
+            response_schema=response_schema,
+            system_prompt=system_prompt,
+            model=model,
+            temperature=0.1,
+            max_tokens=4000
+        ):
+            if chunk.done:
+                final_chunk = chunk
+                continue
+            
+            content_parts.append(chunk.delta)
+            for key, value in parser.feed(chunk.delta):
+                if key not in STREAMED_SECTIONS:
+                    continue
+                
+                # Provisional; replaced by the validated result once the stream ends
+                await ctx.set_data(key, value, self.agent_id)
+                received += 1
+                await ctx.update_agent_status(
+                    self.agent_id,
+                    "running",
+                    0.3 + 0.4 * received / len(STREAMED_SECTIONS),
+                    f"Received {key.replace('_', ' ')}"
+                )
+        
+        return LLMResponse(
+            content="".join(content_parts),
+            model=final_chunk.model if final_chunk and final_chunk.model else (model.value if model else ""),
+            finish_reason=final_chunk.finish_reason if final_chunk else None,
+            token_usage=final_chunk.token_usage if final_chunk else None,
+            response_time=time.time() - start_time,
+            provider=final_chunk.provider if final_chunk else ""
+        )
+    
     def _parse_and_validate_response(self, response, original_input: str) -> Dict[str, Any]:
         """Parse and validate the LLM response"""
         try:
@@ -6,14 +6,14 @@ token management, and user profile operations.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Form
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import HTTPAuthorizationCredentials, OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from typing import Dict, Any, List, Optional
 import logging
 
 from app.core.database import get_db
-from app.core.auth import AuthService, get_auth_service, get_current_user_id, get_password_requirements
+from app.core.auth import AuthService, get_auth_service, get_authenticated_user, get_password_requirements, security
 from app.services.user_service import UserService
 from app.models.user import UserCreate, UserUpdate, User
 
@@ -62,11 +62,10 @@ async def get_user_service(
 # Dependency to get current user
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
-    user_service: UserService = Depends(get_user_service),
-    current_user_id: str = Depends(get_current_user_id)
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> User:
     """Dependency to get current authenticated user."""
-    user = await user_service.get_user_by_id(db, current_user_id)
+    user = await get_authenticated_user(credentials, db)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -456,6 +456,7 @@ async def get_activity_feed(
     activity_types: Optional[List[ActivityType]] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     collab_service: CollaborationService = Depends(get_collaboration_service)
@@ -488,7 +489,8 @@ async def get_activity_feed(
             team_id=team_id,
             activity_types=activity_types,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         feed = await collab_service.get_activity_feed(db, request)
@@ -496,6 +498,11 @@ async def get_activity_feed(
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error fetching activity feed: {e}")
         raise HTTPException(
@@ -510,6 +517,7 @@ async def get_project_activity(
     activity_types: Optional[List[ActivityType]] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     collab_service: CollaborationService = Depends(get_collaboration_service)
@@ -530,7 +538,8 @@ async def get_project_activity(
             project_id=project_id,
             activity_types=activity_types,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         feed = await collab_service.get_activity_feed(db, request)
@@ -538,6 +547,11 @@ async def get_project_activity(
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error fetching project activity: {e}")
         raise HTTPException(
@@ -552,6 +566,7 @@ async def get_team_activity(
     activity_types: Optional[List[ActivityType]] = Query(None),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     collab_service: CollaborationService = Depends(get_collaboration_service)
@@ -571,7 +586,8 @@ async def get_team_activity(
             team_id=team_id,
             activity_types=activity_types,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         feed = await collab_service.get_activity_feed(db, request)
@@ -579,6 +595,11 @@ async def get_team_activity(
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error fetching team activity: {e}")
         raise HTTPException(
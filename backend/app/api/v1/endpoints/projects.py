@@ -2,30 +2,43 @@
 Projects API endpoints with authentication
 """
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import logging
 
 from app.core.database import get_db, Project, SystemInput, AnalysisState, AnalysisResults
 from app.api.endpoints.auth import get_current_active_user
+from app.core.auth import get_authenticated_user
 from app.models.user import User
 from app.core.permissions import (
     require_permission, Permission, require_project_access, 
     require_project_modification, require_project_deletion,
     can_access_project, can_modify_project, can_delete_project, Role
 )
+from app.core.project_access import get_project_access_resolver
 from app.models.schemas import (
     ProjectCreate, ProjectResponse, ProjectUpdate, SystemInputCreate,
     AnalysisStartRequest, AnalysisStartResponse, AnalysisStatusResponse,
-    AnalysisResultsResponse, AnalysisProgress
+    AnalysisResultsResponse, AnalysisProgress,
+    BatchAnalysisRequest, BatchAnalysisResponse, BatchAnalysisProgress
+)
+from app.services.analysis_queue import get_analysis_job_queue
+from app.services.analysis_events import AnalysisEvent, get_analysis_event_bus
+from app.services.analysis_state import (
+    mark_analysis_completed, mark_analysis_failed, report_section_publisher, update_analysis_progress
 )
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# WebSocket subprotocol that carries the access token in the handshake
+WEBSOCKET_AUTH_SUBPROTOCOL = "bearer"
+
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
@@ -623,6 +636,7 @@ async def delete_project(
         
         # Delete the project
         await db.delete(project)
+        get_project_access_resolver().invalidate(db, project_id=project_id)
         await db.commit()
         
         logger.info(
@@ -945,6 +959,118 @@ import json
 import asyncio
 
 
+def _can_manage_batch(user: User, progress: dict) -> bool:
+    """Batches are visible to their submitter and to admins"""
+    return progress.get("submitted_by") == user.id or user.role in [Role.ADMIN.value, Role.SUPER_ADMIN.value]
+
+
+@router.post("/analysis/batch", response_model=BatchAnalysisResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_analysis(
+    request: BatchAnalysisRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Queue threat analyses for many projects at once.
+    
+    Jobs are admitted by the analysis job queue under its global and
+    per-provider concurrency limits; poll the returned batch for progress.
+    The user must be able to modify every project in the batch.
+    """
+    project_ids = list(dict.fromkeys(request.project_ids))
+    
+    result = await db.execute(select(Project).where(Project.id.in_(project_ids)))
+    projects = {project.id: project for project in result.scalars().all()}
+    
+    missing = [pid for pid in project_ids if pid not in projects]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Projects not found: {missing}",
+            headers={"X-Error-Code": "PROJECT_NOT_FOUND"}
+        )
+    
+    forbidden = [pid for pid in project_ids if not can_modify_project(current_user, projects[pid])]
+    if forbidden:
+        logger.warning(
+            "Permission denied for batch analysis",
+            extra={
+                "user_id": current_user.id,
+                "project_ids": forbidden,
+                "operation": "submit_batch_analysis"
+            }
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permission denied: insufficient privileges to modify some projects",
+            headers={"X-Error-Code": "INSUFFICIENT_PERMISSIONS"}
+        )
+    
+    try:
+        batch_id = await get_analysis_job_queue().submit_batch(
+            project_ids,
+            analysis_config=request.config,
+            priority=request.priority,
+            provider=request.provider,
+            submitted_by=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    logger.info(
+        "Batch analysis queued",
+        extra={
+            "user_id": current_user.id,
+            "batch_id": batch_id,
+            "project_count": len(project_ids),
+            "operation": "submit_batch_analysis"
+        }
+    )
+    
+    return BatchAnalysisResponse(
+        batch_id=batch_id,
+        queued=len(project_ids),
+        message="Batch analysis queued. Poll the batch for progress."
+    )
+
+
+@router.get("/analysis/batch/{batch_id}", response_model=BatchAnalysisProgress)
+async def get_batch_analysis_progress(
+    batch_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get aggregate progress for a queued analysis batch"""
+    queue = get_analysis_job_queue()
+    progress = await queue.get_batch_progress(batch_id)
+    
+    if not progress or not _can_manage_batch(current_user, progress):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    return BatchAnalysisProgress(**progress)
+
+
+@router.delete("/analysis/batch/{batch_id}")
+async def cancel_batch_analysis(
+    batch_id: str,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Cancel the queued (not yet running) jobs of an analysis batch"""
+    queue = get_analysis_job_queue()
+    progress = await queue.get_batch_progress(batch_id)
+    
+    if not progress or not _can_manage_batch(current_user, progress):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    cancelled = await queue.cancel_batch(batch_id)
+    return {"batch_id": batch_id, "cancelled": cancelled}
+
+
 @router.post("/{project_id}/analysis/start", response_model=AnalysisStartResponse)
 async def start_analysis(
     project_id: int,
@@ -1250,7 +1376,8 @@ async def get_analysis_status(
             progress=progress,
             started_at=analysis_state.started_at,
             completed_at=analysis_state.completed_at,
-            error_message=analysis_state.error_message
+            error_message=analysis_state.error_message,
+            stage_timings=json.loads(analysis_state.stage_timings) if analysis_state.stage_timings else None
         )
         
     except HTTPException:
@@ -1275,6 +1402,177 @@ async def get_analysis_status(
         )
 
 
+async def _start_analysis_stream(
+    db: AsyncSession,
+    current_user: User,
+    project_id: int,
+    resume_after: Optional[int]
+) -> Tuple[Optional[AnalysisEvent], int]:
+    """
+    Check access and work out where a progress stream starts.
+    
+    A resumed stream continues after its last event. A client that already
+    has the final completed or failed event (EventSource reconnects after
+    every stream end) gets that event again, so the stream closes at once.
+    Otherwise (or if the bus no longer knows that sequence) the stream opens
+    with a snapshot of the stored state, numbered with the latest sequence so
+    nothing published while it was read is lost.
+    """
+    access = await get_project_access_resolver().resolve(db, current_user.id, project_id)
+    if not access or not can_access_project(current_user, access):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found",
+            headers={"X-Error-Code": "PROJECT_NOT_FOUND"}
+        )
+    
+    bus = get_analysis_event_bus()
+    last_sequence = await bus.last_sequence(project_id)
+    if resume_after is not None and resume_after < last_sequence:
+        return None, resume_after
+    if resume_after is not None and resume_after == last_sequence > 0:
+        latest = await bus.history(project_id, last_sequence - 1)
+        if latest and latest[-1].is_terminal:
+            return latest[-1], last_sequence
+        if latest:
+            return None, resume_after
+        # Latest event no longer retained; the stored state decides
+    
+    state_result = await db.execute(
+        select(AnalysisState).where(AnalysisState.project_id == project_id)
+    )
+    state = state_result.scalar_one_or_none()
+    snapshot = AnalysisEvent(
+        project_id=project_id,
+        sequence=last_sequence,
+        status=state.status if state else "idle",
+        phase=state.current_phase if state else None,
+        percentage=(state.progress_percentage or 0.0) if state else 0.0,
+        message=state.progress_message if state else None,
+        error_message=state.error_message if state else None,
+        timestamp=state.updated_at.isoformat() if state and state.updated_at else None
+    )
+    return snapshot, last_sequence
+
+
+async def _analysis_event_stream(
+    project_id: int,
+    snapshot: Optional[AnalysisEvent],
+    after: int
+) -> AsyncIterator[Optional[AnalysisEvent]]:
+    """Snapshot, then live events until the analysis ends; None marks a keepalive"""
+    if snapshot is not None:
+        yield snapshot
+        if snapshot.status != "running":
+            return
+    
+    async with get_analysis_event_bus().subscribe(project_id) as subscription:
+        async for event in subscription.events(after):
+            yield event
+
+
+@router.get("/{project_id}/analysis/events")
+async def stream_analysis_events(
+    project_id: int,
+    after: Optional[int] = Query(default=None, ge=0, description="Resume after this event sequence"),
+    last_event_id: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream analysis progress as server-sent events.
+    
+    Replaces polling the status endpoint: the current state is sent first,
+    then every change as it is written, until the analysis completes or fails.
+    While the report is generated, each section arrives in its own event
+    (``report_section``) as soon as the model has written it. Each event's id is its sequence; reconnecting clients resume with the
+    Last-Event-ID header (or the ``after`` query parameter). Idle periods
+    carry keepalive comments.
+    """
+    resume_after = int(last_event_id) if last_event_id and last_event_id.isdigit() else after
+    snapshot, start = await _start_analysis_stream(db, current_user, project_id, resume_after)
+    # Release the connection; the stream may stay open for the whole analysis
+    await db.commit()
+    
+    async def frames():
+        async for event in _analysis_event_stream(project_id, snapshot, start):
+            yield event.to_sse() if event else ": keepalive\n\n"
+    
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _websocket_token(websocket: WebSocket, authorization: Optional[str]) -> Optional[str]:
+    """
+    Access token of a WebSocket handshake.
+    
+    Browsers cannot set headers on a WebSocket, so they offer the token as the
+    subprotocol pair ("bearer", <token>), which keeps it out of URLs and access
+    logs; other clients may send a normal Authorization header.
+    """
+    protocols = websocket.scope.get("subprotocols", [])
+    if WEBSOCKET_AUTH_SUBPROTOCOL in protocols:
+        index = protocols.index(WEBSOCKET_AUTH_SUBPROTOCOL)
+        if index + 1 < len(protocols):
+            return protocols[index + 1]
+    if authorization:
+        scheme, _, credentials = authorization.partition(" ")
+        if scheme.lower() == "bearer" and credentials:
+            return credentials
+    return None
+
+
+@router.websocket("/{project_id}/analysis/ws")
+async def analysis_events_websocket(
+    websocket: WebSocket,
+    project_id: int,
+    after: Optional[int] = Query(default=None, ge=0, description="Resume after this event sequence"),
+    authorization: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream analysis progress over a WebSocket.
+    
+    Authenticate by offering the subprotocols ["bearer", <access token>], or
+    with an Authorization header. Sends the same events as the SSE stream as
+    JSON messages of type "progress" (or "keepalive"), and closes once the
+    analysis completes or fails.
+    """
+    token = _websocket_token(websocket, authorization)
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        current_user = await get_authenticated_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db
+        )
+        if not current_user or not current_user.is_active:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+        snapshot, start = await _start_analysis_stream(db, current_user, project_id, after)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await db.commit()
+    
+    # Only echo the subprotocol when the client offered it
+    subprotocol = (
+        WEBSOCKET_AUTH_SUBPROTOCOL
+        if WEBSOCKET_AUTH_SUBPROTOCOL in websocket.scope.get("subprotocols", []) else None
+    )
+    await websocket.accept(subprotocol=subprotocol)
+    try:
+        async for event in _analysis_event_stream(project_id, snapshot, start):
+            if event is None:
+                await websocket.send_json({"type": "keepalive"})
+            else:
+                await websocket.send_json({"type": "progress", **event.to_dict()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.get("/{project_id}/analysis/results", response_model=AnalysisResultsResponse)
 async def get_analysis_results(
     project_id: int,
@@ -1437,7 +1735,7 @@ async def run_analysis_workflow(project_id: int, input_ids: List[int], config: d
     from app.core.database import async_session
     from app.agents.system_analyst_agent import SystemAnalystAgent
     from app.agents.attack_mapper_agent import AttackMapperAgent, ControlEvaluationAgent
-    from app.agents.report_generation_agent import ReportGenerationAgent
+    from app.agents.report_generation_agent import REPORT_SECTIONS, ReportGenerationAgent
     from app.models.schemas import AgentTask
     import uuid
     
@@ -1518,6 +1816,8 @@ async def run_analysis_workflow(project_id: int, input_ids: List[int], config: d
             )
             
             report_agent = ReportGenerationAgent()
+            # Report sections reach progress streams as soon as they are generated
+            report_agent.set_section_listener(report_section_publisher(project_id, len(REPORT_SECTIONS)))
             report_task = AgentTask(
                 task_id=str(uuid.uuid4()),
                 agent_type="report_generator",
@@ -1557,63 +1857,6 @@ async def run_analysis_workflow(project_id: int, input_ids: List[int], config: d
             logging.error(f"Analysis workflow failed for project {project_id}: {str(e)}", exc_info=True)
 
 
-async def update_analysis_progress(db: AsyncSession, project_id: int, phase: str, percentage: float, message: str):
-    """Update analysis progress in database"""
-    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
-    state = result.scalar_one_or_none()
-    
-    if state:
-        state.current_phase = phase
-        state.progress_percentage = percentage
-        state.progress_message = message
-        state.updated_at = datetime.utcnow()
-        await db.commit()
-
-
-async def mark_analysis_failed(db: AsyncSession, project_id: int, error_message: str):
-    """Mark analysis as failed"""
-    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
-    state = result.scalar_one_or_none()
-    
-    if state:
-        state.status = "failed"
-        state.error_message = error_message
-        state.completed_at = datetime.utcnow()
-        state.updated_at = datetime.utcnow()
-        
-    # Update project status
-    project_result = await db.execute(select(Project).where(Project.id == project_id))
-    project = project_result.scalar_one_or_none()
-    if project:
-        project.status = "failed"
-        project.updated_at = datetime.utcnow()
-    
-    await db.commit()
-
-
-async def mark_analysis_completed(db: AsyncSession, project_id: int):
-    """Mark analysis as completed"""
-    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
-    state = result.scalar_one_or_none()
-    
-    if state:
-        state.status = "completed"
-        state.current_phase = "completed"
-        state.progress_percentage = 100.0
-        state.progress_message = "Analysis completed successfully"
-        state.completed_at = datetime.utcnow()
-        state.updated_at = datetime.utcnow()
-        
-    # Update project status
-    project_result = await db.execute(select(Project).where(Project.id == project_id))
-    project = project_result.scalar_one_or_none()
-    if project:
-        project.status = "completed"
-        project.updated_at = datetime.utcnow()
-    
-    await db.commit()
-
-
 async def store_analysis_results(db: AsyncSession, project_id: int, system_data: dict, 
                                 attack_data: dict, control_data: dict, report_data: dict):
     """Store comprehensive analysis results"""
@@ -37,6 +37,13 @@ class BulkUpdateResponse(BaseModel):
     failed_ids: List[str]
 
 
+class BulkCreateResponse(BaseModel):
+    """Response model for bulk issue creation."""
+    created_count: int
+    duplicate_count: int
+    escalated_count: int
+
+
 def get_issue_tracker() -> QualityIssueTracker:
     """Dependency to get QualityIssueTracker instance."""
     return QualityIssueTracker()
@@ -176,6 +183,24 @@ async def delete_quality_issue(
         raise HTTPException(status_code=500, detail=f"Failed to delete issue: {str(e)}")
 
 
+@router.post("/issues/bulk", response_model=BulkCreateResponse)
+async def bulk_create_issues(
+    issues: List[QualityIssueCreate],
+    tracker: QualityIssueTracker = Depends(get_issue_tracker),
+    current_user = Depends(get_current_user)
+):
+    """Create many issues at once, skipping ones that are already open."""
+    try:
+        result = await tracker.create_issues_bulk(issues)
+        return BulkCreateResponse(
+            created_count=len(result.created),
+            duplicate_count=result.duplicates,
+            escalated_count=result.escalated
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create issues: {str(e)}")
+
+
 @router.post("/issues/bulk-update", response_model=BulkUpdateResponse)
 async def bulk_update_issues(
     request: BulkUpdateRequest,
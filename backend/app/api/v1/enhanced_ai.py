@@ -2,8 +2,10 @@
 Enhanced AI API endpoints for advanced threat analysis
 """
 
+import json
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -225,6 +227,31 @@ async def natural_language_query(
             detail=f"Query processing failed: {str(e)}"
         )
 
+@router.post("/query/natural-language/stream")
+async def stream_natural_language_query(
+    request: NaturalLanguageQueryRequest,
+    _: str = Depends(require_permission("ai_query"))
+):
+    """
+    Stream the answer to a natural language security question as server-sent events
+    
+    Emits ``delta`` events with text fragments as they are generated, ``section``
+    events when a field of the JSON answer is complete, and a final ``done``
+    (or ``error``) event with the assembled result and token usage.
+    """
+    async def event_stream():
+        async for event, data in enhanced_ai_service.stream_natural_language_query(
+            query=request.query,
+            context=request.context
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/predict/risk", response_model=RiskPredictionResponse)
 async def predict_risk_evolution(
     request: RiskPredictionRequest,
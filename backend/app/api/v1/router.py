@@ -2,12 +2,15 @@
 API v1 router
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
 from app.api.v1.endpoints import projects, threat_modeling, quality_issues, quality_monitoring, quality_reports
 from app.api.v1 import analytics, enhanced_ai
 from app.api.endpoints import reports, predictions, auth, collaboration
 from app.core.config import get_settings
+from app.core.permissions import Permission, require_permission
+from app.core.sql_metrics import get_sql_metrics
+from app.models.user import User
 
 settings = get_settings()
 api_router = APIRouter()
@@ -23,6 +26,15 @@ async def health_check():
         "api_version": "v1"
     }
 
+# SQL statement timings, slow-query log and N+1 findings
+@api_router.get("/metrics/sql")
+async def sql_metrics(
+    top: int = 20,
+    current_user: User = Depends(require_permission(Permission.VIEW_LOGS))
+):
+    """SQL instrumentation summary (bind parameters redacted)"""
+    return get_sql_metrics().get_stats(top)
+
 # Include endpoint routers
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
@@ -15,6 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import secrets
 import logging
 
+from app.core.principal_cache import get_principal_cache
+
 logger = logging.getLogger(__name__)
 
 def get_db_dependency():
@@ -377,26 +379,29 @@ class AuthService:
         # Create new access token
         return self.create_access_token(subject)
     
+    def verify_access_token(self, token: str) -> Dict[str, Any]:
+        """Verify an access token and return its payload."""
+        payload = self.verify_token(token)
+        
+        if payload.get("sub") is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials"
+            )
+        
+        # Verify it's an access token
+        if payload.get("type") != "access":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type"
+            )
+        
+        return payload
+    
     def get_current_user_from_token(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
         """Extract current user ID from JWT token."""
         try:
-            payload = self.verify_token(credentials.credentials)
-            user_id = payload.get("sub")
-            
-            if user_id is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials"
-                )
-            
-            # Verify it's an access token
-            if payload.get("type") != "access":
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token type"
-                )
-            
-            return user_id
+            return self.verify_access_token(credentials.credentials)["sub"]
             
         except HTTPException:
             raise
@@ -417,18 +422,38 @@ def get_auth_service() -> AuthService:
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     """FastAPI dependency to get current user ID from token."""
+    user = get_principal_cache().get(credentials.credentials)
+    if user is not None:
+        return user.id
     return auth_service.get_current_user_from_token(credentials)
 
+async def get_authenticated_user(credentials: HTTPAuthorizationCredentials, db: AsyncSession):
+    """
+    Resolve a bearer token to its user, or None if the user no longer exists.
+    
+    Repeat requests with the same token are served from the principal cache,
+    skipping both the token decode and the user lookup.
+    """
+    from app.services.user_service import UserService
+    
+    cache = get_principal_cache()
+    user = cache.get(credentials.credentials)
+    if user is not None:
+        return user
+    
+    payload = auth_service.verify_access_token(credentials.credentials)
+    generation = cache.generation()
+    user = await UserService(auth_service).get_user_by_id(db, payload["sub"])
+    if user is not None:
+        cache.put(credentials.credentials, user, payload["exp"], generation, db)
+    return user
+
 async def get_current_user(
-    user_id: str = Depends(get_current_user_id),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db_dependency())
 ):
     """FastAPI dependency to get current user object from token."""
-    from app.services.user_service import UserService
-    from app.models.user import User
-    
-    user_service = UserService(auth_service)
-    user = await user_service.get_user_by_id(db, user_id)
+    user = await get_authenticated_user(credentials, db)
     
     if not user:
         raise HTTPException(
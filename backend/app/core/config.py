@@ -4,7 +4,7 @@ Configuration settings for AITM application
 
 import os
 from functools import lru_cache
-from typing import List, Optional, Union, Annotated
+from typing import Dict, List, Optional, Union, Annotated
 
 from pydantic import field_validator, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +20,15 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "sqlite:///./aitm.db"
+    database_echo: bool = False  # print every statement; slow, for debugging only
+    
+    # SQL Instrumentation
+    sql_metrics_enabled: bool = True
+    sql_slow_query_threshold: float = 0.2  # seconds
+    sql_slow_query_log_size: int = 200  # slow queries kept for /api/v1/metrics/sql
+    sql_n_plus_one_threshold: int = 10  # identical SELECTs in one request
+    sql_metrics_max_statements: int = 500  # distinct statements tracked before grouping as <other>
+    metrics_scrape_token: Optional[str] = None  # static bearer token Prometheus may use for /metrics
     
     # Ports
     backend_port: int = 38527
@@ -46,6 +55,22 @@ class Settings(BaseSettings):
     litellm_api_key: Optional[str] = None
     default_llm_provider: str = "google"
     
+    # LLM Response Cache
+    llm_cache_enabled: bool = True
+    llm_cache_backend: str = "memory"  # memory, sqlite or redis
+    llm_cache_ttl: int = 86400  # seconds
+    llm_cache_max_entries: int = 1000
+    llm_cache_sqlite_path: str = "./data/llm_response_cache.db"
+    llm_cache_bypass_nonzero_temperature: bool = False
+    llm_coalesce_requests: bool = True  # share one provider call across identical concurrent requests
+    
+    # LLM Adaptive Concurrency (per provider/model)
+    llm_concurrency_initial: int = 4
+    llm_concurrency_min: int = 1
+    llm_concurrency_max: int = 32
+    llm_latency_target: Optional[float] = 30.0  # seconds; slower responses shrink the limit
+    llm_latency_reference_tokens: int = 256  # longer responses are timed per this many output tokens
+    
     # Monitoring
     langsmith_api_key: Optional[str] = None
     langsmith_project: str = "aitm-development"
@@ -55,6 +80,46 @@ class Settings(BaseSettings):
     mitre_attack_version: str = "14.1"
     mitre_attack_data_url: str = "https://raw.githubusercontent.com/mitre/cti/master/enterprise-attack/enterprise-attack.json"
     
+    # Analysis Job Queue
+    analysis_queue_enabled: bool = True
+    analysis_queue_max_concurrency: int = 4
+    analysis_queue_provider_limits: Dict[str, int] = {}  # provider -> max running jobs
+    analysis_queue_max_attempts: int = 3
+    analysis_queue_poll_interval: float = 2.0
+    analysis_queue_lease_seconds: float = 60.0  # running jobs not renewed for this long are re-queued
+    
+    # Analysis Progress Events (SSE/WebSocket)
+    analysis_events_backend: str = "memory"  # memory, or redis to share events across workers
+    analysis_events_history: int = 100  # events kept per project for resuming streams
+    analysis_events_keepalive: float = 15.0  # seconds between keepalives on idle streams
+    
+    # Code Analysis Result Cache (persistent, used for incremental rescans)
+    analysis_cache_enabled: bool = True
+    analysis_cache_path: str = "./data/analysis_cache.db"
+    analysis_cache_max_entries: int = 50000
+    analysis_cache_memory_entries: int = 1000  # per-analyzer in-process LRU
+    
+    # Cross-file clone index (winnowed token fingerprints). Opt-in: when enabled,
+    # duplicate_code_ratio becomes the share of fingerprints repeated anywhere in
+    # the project instead of the share of exactly repeated functions and classes,
+    # so values are not comparable with snapshots collected without it
+    clone_index_enabled: bool = False
+    clone_index_path: str = "./data/clone_index.db"
+    clone_index_kgram_size: int = 20  # tokens per hashed k-gram
+    clone_index_window_size: int = 10  # k-grams per winnowing window
+    
+    # Quality services SQLite access (pooled, run off the event loop)
+    quality_db_pool_size: int = 4  # reader connections per database file
+    quality_db_busy_timeout: float = 30.0  # seconds to wait on a locked database
+    
+    # Authenticated principal (verified token -> user) cache
+    principal_cache_ttl: float = 60.0  # seconds, never past the token's expiry; 0 disables
+    principal_cache_size: int = 10000  # tokens kept
+    
+    # Effective project access (owner, direct and team shares) cache
+    project_access_cache_ttl: float = 30.0  # seconds; share changes invalidate sooner
+    project_access_cache_size: int = 10000  # (user, project) entries kept
+    
     # Redis Configuration
     redis_url: str = "redis://localhost:6379/0"
     redis_max_connections: int = 20
@@ -66,6 +131,8 @@ class Settings(BaseSettings):
     threat_alert_threshold: float = 0.8
     threat_data_retention_days: int = 90
     max_indicators_per_feed: int = 100000
+    threat_bulk_ingestion_threshold: int = 1000  # use bulk ingestion at or above this many indicators
+    threat_bulk_batch_size: int = 1000
     
     # Threat Feed API Keys (optional)
     misp_url: Optional[str] = None
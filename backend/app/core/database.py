@@ -10,6 +10,7 @@ from datetime import datetime
 import json
 
 from app.core.config import get_settings
+from app.core.sql_metrics import instrument_engine
 
 settings = get_settings()
 
@@ -20,7 +21,9 @@ if settings.database_url.startswith("sqlite"):
 else:
     async_database_url = settings.database_url
 
-engine = create_async_engine(async_database_url, echo=True)
+engine = create_async_engine(async_database_url, echo=settings.database_echo)
+if settings.sql_metrics_enabled:
+    instrument_engine(engine)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
@@ -126,6 +129,7 @@ class AnalysisState(Base):
     completed_at = Column(DateTime)
     error_message = Column(Text)
     configuration = Column(Text)  # JSON string of analysis configuration
+    stage_timings = Column(Text)  # JSON string of per-stage wall-clock seconds
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -133,6 +137,27 @@ class AnalysisState(Base):
     project = relationship("Project", back_populates="analysis_state")
 
 
+class AnalysisJob(Base):
+    """Queued threat modeling analysis job"""
+    __tablename__ = "analysis_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(String(36), index=True, nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    status = Column(String(50), default="queued", index=True)  # queued, running, completed, failed, cancelled
+    priority = Column(Integer, default=1)  # higher runs first: 0=low, 1=normal, 2=high
+    provider = Column(String(50))  # LLM provider the job is throttled against
+    configuration = Column(Text)  # JSON string of analysis configuration
+    attempts = Column(Integer, default=0)
+    error_message = Column(Text)
+    submitted_by = Column(String)  # References users.id
+    claimed_by = Column(String(100))  # worker running the job
+    heartbeat_at = Column(DateTime)  # last lease renewal by claimed_by
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+
+
 class AnalysisResults(Base):
     """Analysis results for threat modeling projects"""
     __tablename__ = "analysis_results"
@@ -13,6 +13,7 @@ from fastapi import HTTPException, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.project_access import get_project_access_resolver
 from app.models.user import User
 
 logger = logging.getLogger(__name__)
@@ -487,9 +488,6 @@ def require_project_access(project_id: int):
         current_user: User = Depends(get_current_user_dependency()),
         db: AsyncSession = Depends(get_db)
     ) -> User:
-        from sqlalchemy import select
-        from app.core.database import Project
-        
         logger.info(
             "Validating project access",
             extra={
@@ -500,10 +498,9 @@ def require_project_access(project_id: int):
             }
         )
         
-        # Get the project from database
+        # Resolve the user's access to the project (memoized for the request)
         try:
-            result = await db.execute(select(Project).where(Project.id == project_id))
-            project = result.scalar_one_or_none()
+            project = await get_project_access_resolver().resolve(db, current_user.id, project_id)
         except Exception as e:
             logger.error(f"Database error while fetching project {project_id}: {e}")
             raise HTTPException(
@@ -607,9 +604,6 @@ def require_project_modification(project_id: int):
         current_user: User = Depends(get_current_user_dependency()),
         db: AsyncSession = Depends(get_db)
     ) -> User:
-        from sqlalchemy import select
-        from app.core.database import Project
-        
         logger.info(
             "Validating project modification access",
             extra={
@@ -620,10 +614,9 @@ def require_project_modification(project_id: int):
             }
         )
         
-        # Get the project from database
+        # Resolve the user's access to the project (memoized for the request)
         try:
-            result = await db.execute(select(Project).where(Project.id == project_id))
-            project = result.scalar_one_or_none()
+            project = await get_project_access_resolver().resolve(db, current_user.id, project_id)
         except Exception as e:
             logger.error(f"Database error while fetching project {project_id}: {e}")
             raise HTTPException(
@@ -727,9 +720,6 @@ def require_project_deletion(project_id: int):
         current_user: User = Depends(get_current_user_dependency()),
         db: AsyncSession = Depends(get_db)
     ) -> User:
-        from sqlalchemy import select
-        from app.core.database import Project
-        
         logger.info(
             "Validating project deletion access",
             extra={
@@ -740,10 +730,9 @@ def require_project_deletion(project_id: int):
             }
         )
         
-        # Get the project from database
+        # Resolve the user's access to the project (memoized for the request)
         try:
-            result = await db.execute(select(Project).where(Project.id == project_id))
-            project = result.scalar_one_or_none()
+            project = await get_project_access_resolver().resolve(db, current_user.id, project_id)
         except Exception as e:
             logger.error(f"Database error while fetching project {project_id}: {e}")
             raise HTTPException(
@@ -0,0 +1,170 @@
+"""
+Authenticated principal cache.
+
+Maps a verified access token to a snapshot of its user so repeat requests
+skip both the JWT decode and the user lookup. Entries live for a short TTL,
+never past the token's own expiry, and are dropped when the user is updated,
+deactivated or changes password.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+settings = get_settings()
+
+# Key in AsyncSession.info for users changed by the session but not yet committed
+_PENDING_INVALIDATIONS = "principal_invalidations"
+
+
+class PrincipalCache:
+    """Size-bounded, short-TTL cache of token -> user snapshot"""
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, User]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[bytes]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Raw tokens are credentials; keep only their digest
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional["User"]:
+        """The cached user for a token, or None on a miss or expiry"""
+        if not self.enabled:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        # A copy, so a request changing its user object cannot change the cache
+        return user.model_copy()
+
+    def generation(self) -> int:
+        """Take before loading a user; put() skips the entry if an invalidation happened since"""
+        return self._generation
+
+    def put(
+        self,
+        token: str,
+        user: "User",
+        token_expires_at: float,
+        generation: int,
+        db: Optional[AsyncSession] = None
+    ) -> None:
+        """Cache a user for a verified token.
+
+        Args:
+            token: The access token as presented
+            user: Snapshot of the token's user
+            token_expires_at: The token's exp claim (seconds since the epoch)
+            generation: generation() from before the user was loaded
+            db: Session the user was loaded with; nothing is cached while it
+                holds uncommitted user changes
+        """
+        if not self.enabled or (db is not None and db.info.get(_PENDING_INVALIDATIONS)):
+            return
+        lifetime = min(self.ttl, token_expires_at - time.time())
+        if lifetime <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + lifetime, user.model_copy())
+            self._tokens_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry[1].id)
+            if tokens is not None:
+                tokens.discard(key)
+                if not tokens:
+                    del self._tokens_by_user[entry[1].id]
+
+    def invalidate_user(self, user_id: str, db: Optional[AsyncSession] = None) -> None:
+        """Drop every cached token of a user.
+
+        Given the session making the change, the user is dropped again once
+        that session commits, so a concurrent request cannot re-cache the
+        state from before the change.
+        """
+        self._evict(user_id)
+        if db is not None:
+            db.info.setdefault(_PENDING_INVALIDATIONS, set()).add(user_id)
+
+    def _evict(self, user_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += 1
+            for key in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self._entries), "ttl": self.ttl, **self.stats}
+
+
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Get the shared principal cache"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            ttl=settings.principal_cache_ttl,
+            max_entries=settings.principal_cache_size
+        )
+    return _principal_cache
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if pending and _principal_cache is not None:
+        for user_id in pending:
+            _principal_cache._evict(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
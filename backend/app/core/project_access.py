@@ -0,0 +1,247 @@
+"""
+Effective project access resolution.
+
+Works out a user's role on projects (owner, direct share or team share) with
+one joined query, memoized for the rest of the request and held briefly in a
+process-wide cache. Sharing and team membership changes invalidate it.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, event, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.database import Project
+from app.models.collaboration import ProjectRole, ProjectShareTable, TeamMembership
+
+settings = get_settings()
+
+# Keys in AsyncSession.info, which lives as long as the request's session
+_REQUEST_MEMO = "project_access"
+_PENDING_INVALIDATIONS = "project_access_invalidations"
+
+# Strongest first, for users reached through more than one team share
+_ROLE_STRENGTH = [ProjectRole.OWNER, ProjectRole.ADMIN, ProjectRole.EDITOR, ProjectRole.VIEWER]
+
+
+@dataclass(frozen=True)
+class ProjectAccess:
+    """A user's standing on one project.
+
+    Carries owner_user_id so it can stand in for the project in the
+    can_*_project checks.
+    """
+    project_id: int
+    owner_user_id: Optional[str]
+    user_id: str
+    share_role: Optional[ProjectRole] = None  # from a direct share, else the best team share
+
+    @property
+    def role(self) -> Optional[ProjectRole]:
+        """Effective collaboration role, or None if the user has no access"""
+        if self.owner_user_id == self.user_id:
+            return ProjectRole.OWNER
+        return self.share_role
+
+
+class ProjectAccessResolver:
+    """Resolves and caches (user, project) access"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, ProjectAccess]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.stats = {"request_hits": 0, "cache_hits": 0, "queries": 0, "invalidations": 0}
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        project_id: int
+    ) -> Optional[ProjectAccess]:
+        """Access for one project; None if the project does not exist"""
+        return (await self.resolve_many(db, user_id, [project_id])).get(project_id)
+
+    async def resolve_many(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        project_ids: Iterable[int]
+    ) -> Dict[int, ProjectAccess]:
+        """Access for several projects at once; projects that do not exist are left out"""
+        memo = db.info.setdefault(_REQUEST_MEMO, {})
+        resolved: Dict[int, ProjectAccess] = {}
+        missing = []
+
+        now = time.monotonic()
+        for project_id in dict.fromkeys(project_ids):
+            key = (user_id, project_id)
+            if key in memo:
+                self.stats["request_hits"] += 1
+                access = memo[key]
+            else:
+                access = self._cached(key, now)
+                if access is None:
+                    missing.append(project_id)
+                    continue
+                self.stats["cache_hits"] += 1
+                memo[key] = access
+            if access is not None:
+                resolved[project_id] = access
+
+        if missing:
+            generation = self._generation
+            loaded = await self._load(db, user_id, missing)
+            with self._lock:
+                # Nothing read before an invalidation, or by a session with
+                # uncommitted access changes, goes into the shared cache
+                shareable = generation == self._generation and not db.info.get(_PENDING_INVALIDATIONS)
+                for project_id in missing:
+                    access = loaded.get(project_id)
+                    memo[(user_id, project_id)] = access
+                    if access is not None:
+                        resolved[project_id] = access
+                        if shareable:
+                            self._store((user_id, project_id), access, now)
+
+        return resolved
+
+    async def _load(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        project_ids: list
+    ) -> Dict[int, ProjectAccess]:
+        """Owner plus every direct or team share reaching the user, in one query"""
+        user_teams = select(TeamMembership.team_id).where(TeamMembership.user_id == user_id)
+        query = (
+            select(
+                Project.id, Project.owner_user_id,
+                ProjectShareTable.shared_with_user_id, ProjectShareTable.role
+            )
+            .outerjoin(ProjectShareTable, and_(
+                ProjectShareTable.project_id == Project.id,
+                or_(
+                    ProjectShareTable.shared_with_user_id == user_id,
+                    ProjectShareTable.shared_with_team_id.in_(user_teams)
+                )
+            ))
+            .where(Project.id.in_(project_ids))
+        )
+        self.stats["queries"] += 1
+        result = await db.execute(query)
+
+        owners: Dict[int, Optional[str]] = {}
+        direct_roles: Dict[int, ProjectRole] = {}
+        team_roles: Dict[int, ProjectRole] = {}
+        for project_id, owner_user_id, shared_with_user_id, role in result.all():
+            owners[project_id] = owner_user_id
+            if role is None:
+                continue
+            role = ProjectRole(role)
+            if shared_with_user_id == user_id:
+                direct_roles.setdefault(project_id, role)
+            elif (project_id not in team_roles
+                  or _ROLE_STRENGTH.index(role) < _ROLE_STRENGTH.index(team_roles[project_id])):
+                team_roles[project_id] = role
+
+        return {
+            project_id: ProjectAccess(
+                project_id=project_id,
+                owner_user_id=owner_user_id,
+                user_id=user_id,
+                share_role=direct_roles.get(project_id, team_roles.get(project_id))
+            )
+            for project_id, owner_user_id in owners.items()
+        }
+
+    def _cached(self, key: Tuple[str, int], now: float) -> Optional[ProjectAccess]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires_at, access = entry
+            if expires_at <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return access
+
+    def _store(self, key: Tuple[str, int], access: ProjectAccess, now: float) -> None:
+        self._cache[key] = (now + self.ttl, access)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def invalidate(
+        self,
+        db: Optional[AsyncSession] = None,
+        project_id: Optional[int] = None,
+        user_id: Optional[str] = None
+    ) -> None:
+        """Forget access for a project, a user, or (with neither) everything.
+
+        Given the session making the change, the request's memo is cleared too,
+        and the shared cache is cleared again once that session commits, so a
+        concurrent request cannot re-cache the state from before the change.
+        """
+        self._evict(project_id, user_id)
+        if db is not None:
+            db.info.pop(_REQUEST_MEMO, None)
+            db.info.setdefault(_PENDING_INVALIDATIONS, []).append((project_id, user_id))
+
+    def _evict(self, project_id: Optional[int], user_id: Optional[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            self.stats["invalidations"] += 1
+            if project_id is None and user_id is None:
+                self._cache.clear()
+                return
+            for key in [
+                key for key in self._cache
+                if (user_id is None or key[0] == user_id)
+                and (project_id is None or key[1] == project_id)
+            ]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        self._evict(None, None)
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self._cache), "ttl": self.ttl, **self.stats}
+
+
+_resolver: Optional[ProjectAccessResolver] = None
+
+
+def get_project_access_resolver() -> ProjectAccessResolver:
+    """Get the shared project access resolver"""
+    global _resolver
+    if _resolver is None:
+        _resolver = ProjectAccessResolver(
+            ttl=settings.project_access_cache_ttl,
+            max_entries=settings.project_access_cache_size
+        )
+    return _resolver
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_INVALIDATIONS, None)
+    if pending and _resolver is not None:
+        for project_id, user_id in pending:
+            _resolver._evict(project_id, user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS, None)
+    session.info.pop(_REQUEST_MEMO, None)
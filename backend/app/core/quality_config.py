@@ -3,11 +3,11 @@ Configuration management for code quality standards and rules.
 """
 
 import json
-import sqlite3
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from app.models.quality import QualityStandard, SafetyLevel, FixType
+from app.core.sqlite_pool import SQLitePool, get_sqlite_pool
 import uuid
 
 
@@ -53,6 +53,11 @@ class QualityConfigManager:
         self.db_path = db_path
         self._default_configs = self._load_default_configs()
     
+    @property
+    def db(self) -> SQLitePool:
+        """Shared connection pool for the configuration database."""
+        return get_sqlite_pool(self.db_path)
+    
     def _load_default_configs(self) -> Dict[str, Any]:
         """Load default quality configurations."""
         return {
@@ -113,37 +118,42 @@ class QualityConfigManager:
     def get_quality_standard(self, project_id: Optional[str] = None, 
                            standard_type: str = 'quality') -> Dict[str, Any]:
         """Get quality standard configuration for a project."""
-        conn = sqlite3.connect(self.db_path)
+        with self.db.connection() as conn:
+            return self._query_quality_standard(conn, project_id, standard_type)
+    
+    async def get_quality_standard_async(self, project_id: Optional[str] = None,
+                                         standard_type: str = 'quality') -> Dict[str, Any]:
+        """Get quality standard configuration for a project, querying off the event loop."""
+        return await self.db.read(self._query_quality_standard, project_id, standard_type)
+    
+    def _query_quality_standard(self, conn, project_id: Optional[str],
+                                standard_type: str) -> Dict[str, Any]:
         cursor = conn.cursor()
         
-        try:
-            # First try to get project-specific standard
-            if project_id:
-                cursor.execute("""
-                    SELECT configuration FROM quality_standards 
-                    WHERE project_id = ? AND standard_type = ? AND is_active = 1
-                    ORDER BY updated_at DESC LIMIT 1
-                """, (project_id, standard_type))
-                result = cursor.fetchone()
-                if result:
-                    return json.loads(result[0])
-            
-            # Fall back to global standard
+        # First try to get project-specific standard
+        if project_id:
             cursor.execute("""
                 SELECT configuration FROM quality_standards 
-                WHERE project_id IS NULL AND standard_type = ? AND is_active = 1
+                WHERE project_id = ? AND standard_type = ? AND is_active = 1
                 ORDER BY updated_at DESC LIMIT 1
-            """, (standard_type,))
+            """, (project_id, standard_type))
             result = cursor.fetchone()
-            
             if result:
                 return json.loads(result[0])
-            
-            # Fall back to default configuration
-            return self._get_default_config(standard_type)
-            
-        finally:
-            conn.close()
+        
+        # Fall back to global standard
+        cursor.execute("""
+            SELECT configuration FROM quality_standards 
+            WHERE project_id IS NULL AND standard_type = ? AND is_active = 1
+            ORDER BY updated_at DESC LIMIT 1
+        """, (standard_type,))
+        result = cursor.fetchone()
+        
+        if result:
+            return json.loads(result[0])
+        
+        # Fall back to default configuration
+        return self._get_default_config(standard_type)
     
     def _get_default_config(self, standard_type: str) -> Dict[str, Any]:
         """Get default configuration for a standard type."""
@@ -160,36 +170,43 @@ class QualityConfigManager:
     
     def save_quality_standard(self, standard: QualityStandard) -> str:
         """Save a quality standard configuration."""
-        conn = sqlite3.connect(self.db_path)
+        with self.db.transaction() as conn:
+            return self._insert_quality_standard(conn, standard)
+    
+    async def save_quality_standard_async(self, standard: QualityStandard) -> str:
+        """Save a quality standard configuration through the pool's batched writer."""
+        return await self.db.write(self._insert_quality_standard, standard)
+    
+    def _insert_quality_standard(self, conn, standard: QualityStandard) -> str:
         cursor = conn.cursor()
         
-        try:
-            if not standard.id:
-                standard.id = str(uuid.uuid4())
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO quality_standards 
-                (id, project_id, standard_name, standard_type, configuration, is_active, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                standard.id,
-                standard.project_id,
-                standard.standard_name,
-                standard.standard_type,
-                json.dumps(standard.configuration),
-                standard.is_active
-            ))
-            
-            conn.commit()
-            return standard.id
-            
-        finally:
-            conn.close()
+        if not standard.id:
+            standard.id = str(uuid.uuid4())
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO quality_standards 
+            (id, project_id, standard_name, standard_type, configuration, is_active, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            standard.id,
+            standard.project_id,
+            standard.standard_name,
+            standard.standard_type,
+            json.dumps(standard.configuration),
+            standard.is_active
+        ))
+        return standard.id
     
     def get_autofix_config(self, project_id: Optional[str] = None) -> AutoFixConfig:
         """Get auto-fix configuration for a project."""
-        config = self.get_quality_standard(project_id, 'autofix')
-        
+        return self._autofix_config_from(self.get_quality_standard(project_id, 'autofix'))
+    
+    async def get_autofix_config_async(self, project_id: Optional[str] = None) -> AutoFixConfig:
+        """Get auto-fix configuration for a project, querying off the event loop."""
+        return self._autofix_config_from(await self.get_quality_standard_async(project_id, 'autofix'))
+    
+    @staticmethod
+    def _autofix_config_from(config: Dict[str, Any]) -> AutoFixConfig:
         return AutoFixConfig(
             enabled_fix_types=[FixType(ft) for ft in config.get('enabled_fix_types', ['formatting'])],
             safety_level=SafetyLevel(config.get('safety_level', 'conservative')),
@@ -202,8 +219,14 @@ class QualityConfigManager:
     
     def get_quality_thresholds(self, project_id: Optional[str] = None) -> QualityThresholds:
         """Get quality thresholds for a project."""
-        config = self.get_quality_standard(project_id, 'quality')
-        
+        return self._thresholds_from(self.get_quality_standard(project_id, 'quality'))
+    
+    async def get_quality_thresholds_async(self, project_id: Optional[str] = None) -> QualityThresholds:
+        """Get quality thresholds for a project, querying off the event loop."""
+        return self._thresholds_from(await self.get_quality_standard_async(project_id, 'quality'))
+    
+    @staticmethod
+    def _thresholds_from(config: Dict[str, Any]) -> QualityThresholds:
         return QualityThresholds(
             min_coverage=config.get('min_coverage', 80.0),
             max_complexity=config.get('max_complexity', 10),
@@ -230,87 +253,93 @@ class QualityConfigManager:
     
     def list_quality_standards(self, project_id: Optional[str] = None) -> List[QualityStandard]:
         """List all quality standards for a project."""
-        conn = sqlite3.connect(self.db_path)
+        with self.db.connection() as conn:
+            return self._query_quality_standards(conn, project_id)
+    
+    async def list_quality_standards_async(self, project_id: Optional[str] = None) -> List[QualityStandard]:
+        """List all quality standards for a project, querying off the event loop."""
+        return await self.db.read(self._query_quality_standards, project_id)
+    
+    def _query_quality_standards(self, conn, project_id: Optional[str]) -> List[QualityStandard]:
         cursor = conn.cursor()
         
-        try:
-            if project_id:
-                cursor.execute("""
-                    SELECT id, project_id, standard_name, standard_type, configuration, is_active
-                    FROM quality_standards 
-                    WHERE project_id = ? OR project_id IS NULL
-                    ORDER BY project_id, standard_type, updated_at DESC
-                """, (project_id,))
-            else:
-                cursor.execute("""
-                    SELECT id, project_id, standard_name, standard_type, configuration, is_active
-                    FROM quality_standards 
-                    WHERE project_id IS NULL
-                    ORDER BY standard_type, updated_at DESC
-                """)
-            
-            standards = []
-            for row in cursor.fetchall():
-                standards.append(QualityStandard(
-                    id=row[0],
-                    project_id=row[1],
-                    standard_name=row[2],
-                    standard_type=row[3],
-                    configuration=json.loads(row[4]),
-                    is_active=bool(row[5])
-                ))
-            
-            return standards
-            
-        finally:
-            conn.close()
+        if project_id:
+            cursor.execute("""
+                SELECT id, project_id, standard_name, standard_type, configuration, is_active
+                FROM quality_standards 
+                WHERE project_id = ? OR project_id IS NULL
+                ORDER BY project_id, standard_type, updated_at DESC
+            """, (project_id,))
+        else:
+            cursor.execute("""
+                SELECT id, project_id, standard_name, standard_type, configuration, is_active
+                FROM quality_standards 
+                WHERE project_id IS NULL
+                ORDER BY standard_type, updated_at DESC
+            """)
+        
+        standards = []
+        for row in cursor.fetchall():
+            standards.append(QualityStandard(
+                id=row[0],
+                project_id=row[1],
+                standard_name=row[2],
+                standard_type=row[3],
+                configuration=json.loads(row[4]),
+                is_active=bool(row[5])
+            ))
+        
+        return standards
     
     def update_quality_standard(self, standard_id: str, 
                               updates: Dict[str, Any]) -> bool:
         """Update a quality standard configuration."""
-        conn = sqlite3.connect(self.db_path)
+        with self.db.transaction() as conn:
+            return self._apply_standard_update(conn, standard_id, updates)
+    
+    async def update_quality_standard_async(self, standard_id: str,
+                                            updates: Dict[str, Any]) -> bool:
+        """Update a quality standard configuration through the pool's batched writer."""
+        return await self.db.write(self._apply_standard_update, standard_id, updates)
+    
+    def _apply_standard_update(self, conn, standard_id: str, updates: Dict[str, Any]) -> bool:
         cursor = conn.cursor()
         
-        try:
-            # Get current standard
-            cursor.execute("""
-                SELECT configuration FROM quality_standards WHERE id = ?
-            """, (standard_id,))
-            result = cursor.fetchone()
-            
-            if not result:
-                return False
-            
-            current_config = json.loads(result[0])
-            current_config.update(updates)
-            
-            cursor.execute("""
-                UPDATE quality_standards 
-                SET configuration = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (json.dumps(current_config), standard_id))
-            
-            conn.commit()
-            return cursor.rowcount > 0
-            
-        finally:
-            conn.close()
+        # Get current standard
+        cursor.execute("""
+            SELECT configuration FROM quality_standards WHERE id = ?
+        """, (standard_id,))
+        result = cursor.fetchone()
+        
+        if not result:
+            return False
+        
+        current_config = json.loads(result[0])
+        current_config.update(updates)
+        
+        cursor.execute("""
+            UPDATE quality_standards 
+            SET configuration = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (json.dumps(current_config), standard_id))
+        return cursor.rowcount > 0
     
     def delete_quality_standard(self, standard_id: str) -> bool:
         """Delete a quality standard."""
-        conn = sqlite3.connect(self.db_path)
+        with self.db.transaction() as conn:
+            return self._delete_standard(conn, standard_id)
+    
+    async def delete_quality_standard_async(self, standard_id: str) -> bool:
+        """Delete a quality standard through the pool's batched writer."""
+        return await self.db.write(self._delete_standard, standard_id)
+    
+    def _delete_standard(self, conn, standard_id: str) -> bool:
         cursor = conn.cursor()
         
-        try:
-            cursor.execute("""
-                DELETE FROM quality_standards WHERE id = ?
-            """, (standard_id,))
-            
-            conn.commit()
-            return cursor.rowcount > 0
-            
-        finally:
-            conn.close()
+        cursor.execute("""
+            DELETE FROM quality_standards WHERE id = ?
+        """, (standard_id,))
+        return cursor.rowcount > 0
     
     def validate_configuration(self, config: Dict[str, Any], 
                              config_type: str) -> List[str]:
@@ -0,0 +1,342 @@
+"""
+SQL instrumentation for the application engine.
+
+Times every statement through SQLAlchemy cursor events and aggregates the
+timings into latency histograms keyed by normalized SQL. Statements over the
+slow-query threshold go to a slow-query log with their bind parameters
+redacted, and SELECTs repeated within one request are reported as N+1
+patterns. The hot path only updates counters; log records are written from a
+background thread.
+"""
+
+import logging
+import queue
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import event
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+# Statements beyond max_statements share this key, so label cardinality stays bounded
+OTHER_STATEMENTS = "<other>"
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+# Statements run by the current request, by normalized SQL
+_request_queries: ContextVar[Optional[Counter]] = ContextVar("sql_request_queries", default=None)
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(statement: str) -> str:
+    """Statement shape with literals and IN/VALUES lists reduced to one placeholder"""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _PLACEHOLDER_LIST.sub("(?)", normalized)
+
+
+def _redact_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Bind parameters with each value replaced by its type (and length for strings)"""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "first": redact_parameters(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+@dataclass
+class StatementStats:
+    """Latency histogram for one normalized statement"""
+    buckets: List[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+
+class _BackgroundLog:
+    """Writes log records from a worker thread so reporting never blocks a query"""
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[Optional[Tuple[int, str, dict]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def log(self, level: int, message: str, **extra) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sql-metrics-log", daemon=True)
+                    self._thread.start()
+        self._queue.put((level, message, extra))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            level, message, extra = item
+            logger.log(level, message, extra=extra)
+
+    def flush(self) -> None:
+        """Wait for queued records to be written"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+class SQLMetrics:
+    """Statement latency histograms, slow-query log and N+1 findings"""
+
+    def __init__(
+        self,
+        slow_query_threshold: float = 0.2,
+        slow_query_log_size: int = 200,
+        n_plus_one_threshold: int = 10,
+        max_statements: int = 500
+    ):
+        self.slow_query_threshold = slow_query_threshold
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_statements = max_statements
+        self.statements: Dict[str, StatementStats] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_query_log_size)
+        self.slow_query_count = 0
+        self.errors: Counter = Counter()
+        self.n_plus_one: Counter = Counter()  # (route, statement) -> requests where it repeated
+        self._lock = threading.Lock()
+        self._log = _BackgroundLog()
+
+    def record(self, statement: str, parameters: Any, duration: float, executemany: bool = False) -> None:
+        """Account one executed statement"""
+        key = normalize_sql(statement)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                if len(self.statements) >= self.max_statements:
+                    key = OTHER_STATEMENTS
+                stats = self.statements.setdefault(key, StatementStats())
+            stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+            stats.count += 1
+            stats.total += duration
+            if duration > stats.max:
+                stats.max = duration
+
+        request_queries = _request_queries.get()
+        if request_queries is not None:
+            request_queries[key] += 1
+
+        if duration >= self.slow_query_threshold:
+            self._record_slow_query(key, parameters, duration, executemany)
+
+    def _record_slow_query(self, statement: str, parameters: Any, duration: float, executemany: bool) -> None:
+        entry = {
+            "statement": statement,
+            "parameters": redact_parameters(parameters, executemany),
+            "duration_ms": round(duration * 1000, 3),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+            self.slow_query_count += 1
+        self._log.log(logging.WARNING, f"Slow query ({entry['duration_ms']} ms): {statement}", sql=entry)
+
+    def record_error(self, statement: str) -> None:
+        with self._lock:
+            self.errors[normalize_sql(statement)] += 1
+
+    @contextmanager
+    def track_request(self, route: Union[str, Callable[[], str]] = "") -> Iterator[Counter]:
+        """Count the statements run inside the block and report repeated SELECTs on exit.
+
+        The route is read when the block exits, so a callable can be passed to
+        resolve it after routing.
+        """
+        queries: Counter = Counter()
+        token = _request_queries.set(queries)
+        try:
+            yield queries
+        finally:
+            _request_queries.reset(token)
+            self._report_n_plus_one(route() if callable(route) else route, queries)
+
+    def _report_n_plus_one(self, route: str, queries: Counter) -> None:
+        repeated = [
+            (statement, count) for statement, count in queries.items()
+            if count >= self.n_plus_one_threshold and statement.upper().startswith("SELECT")
+        ]
+        if not repeated:
+            return
+        with self._lock:
+            for statement, _ in repeated:
+                self.n_plus_one[(route, statement)] += 1
+        for statement, count in repeated:
+            self._log.log(
+                logging.WARNING,
+                f"Possible N+1 in {route}: statement ran {count} times: {statement}",
+                route=route, count=count
+            )
+
+    def flush(self) -> None:
+        self._log.flush()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements.clear()
+            self.slow_queries.clear()
+            self.slow_query_count = 0
+            self.errors.clear()
+            self.n_plus_one.clear()
+
+    def get_stats(self, top: int = 20) -> Dict[str, Any]:
+        """Statements by total time, the slow-query log and N+1 findings"""
+        with self._lock:
+            statements = sorted(self.statements.items(), key=lambda item: item[1].total, reverse=True)[:top]
+            return {
+                "statements": [
+                    {
+                        "statement": statement,
+                        "count": stats.count,
+                        "total_ms": round(stats.total * 1000, 3),
+                        "mean_ms": round(stats.total / stats.count * 1000, 3),
+                        "max_ms": round(stats.max * 1000, 3)
+                    }
+                    for statement, stats in statements
+                ],
+                "slow_query_threshold_ms": self.slow_query_threshold * 1000,
+                "slow_query_count": self.slow_query_count,
+                "slow_queries": list(self.slow_queries),
+                "n_plus_one": [
+                    {"route": route, "statement": statement, "requests": requests}
+                    for (route, statement), requests in self.n_plus_one.most_common()
+                ],
+                "errors": sum(self.errors.values())
+            }
+
+    def render_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP aitm_sql_query_duration_seconds SQL statement latency by normalized statement",
+            "# TYPE aitm_sql_query_duration_seconds histogram"
+        ]
+        with self._lock:
+            for statement, stats in self.statements.items():
+                label = f'statement="{_escape_label(statement)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'aitm_sql_query_duration_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f"aitm_sql_query_duration_seconds_sum{{{label}}} {stats.total}")
+                lines.append(f"aitm_sql_query_duration_seconds_count{{{label}}} {stats.count}")
+
+            lines += [
+                "# HELP aitm_sql_slow_queries_total Statements slower than the slow-query threshold",
+                "# TYPE aitm_sql_slow_queries_total counter",
+                f"aitm_sql_slow_queries_total {self.slow_query_count}",
+                "# HELP aitm_sql_errors_total Statements that raised a database error",
+                "# TYPE aitm_sql_errors_total counter",
+                f"aitm_sql_errors_total {sum(self.errors.values())}",
+                "# HELP aitm_sql_n_plus_one_total Requests that repeated a SELECT past the N+1 threshold",
+                "# TYPE aitm_sql_n_plus_one_total counter"
+            ]
+            for (route, statement), requests in self.n_plus_one.items():
+                lines.append(
+                    f'aitm_sql_n_plus_one_total{{route="{_escape_label(route)}",'
+                    f'statement="{_escape_label(statement)}"}} {requests}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+_sql_metrics: Optional[SQLMetrics] = None
+
+
+def get_sql_metrics() -> SQLMetrics:
+    """Get the shared SQL metrics"""
+    global _sql_metrics
+    if _sql_metrics is None:
+        _sql_metrics = SQLMetrics(
+            slow_query_threshold=settings.sql_slow_query_threshold,
+            slow_query_log_size=settings.sql_slow_query_log_size,
+            n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+            max_statements=settings.sql_metrics_max_statements
+        )
+    return _sql_metrics
+
+
+def instrument_engine(engine, metrics: Optional[SQLMetrics] = None) -> None:
+    """Time every statement run on an engine (sync or async), into the shared metrics by default"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = metrics or get_sql_metrics()
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["sql_metrics_started"].pop()
+        metrics.record(statement, parameters, duration, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _count_error(exception_context):
+        started = exception_context.connection.info.get("sql_metrics_started") if exception_context.connection else None
+        if started:
+            started.pop()
+        if exception_context.statement:
+            metrics.record_error(exception_context.statement)
+
+
+class SQLMetricsMiddleware:
+    """ASGI middleware that scopes N+1 detection to each HTTP request"""
+
+    def __init__(self, app, metrics: Optional[SQLMetrics] = None):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        def route() -> str:
+            # Routing stores the matched route in the scope
+            matched = scope.get("route")
+            return f"{scope['method']} {getattr(matched, 'path', scope['path'])}"
+
+        with (self.metrics or get_sql_metrics()).track_request(route):
+            await self.app(scope, receive, send)
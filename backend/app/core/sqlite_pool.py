@@ -0,0 +1,273 @@
+"""
+Pooled SQLite access for the quality services.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Pools kept open at once; the least recently used one is closed beyond this
+MAX_OPEN_POOLS = 16
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Threads that run pooled queries, shared by every pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.quality_db_pool_size + 1,
+                thread_name_prefix="sqlite-pool"
+            )
+        return _executor
+
+
+class SQLitePool:
+    """Persistent connections to one SQLite file, used off the event loop.
+
+    Reads check out one of up to `size` reader connections; with WAL they run
+    alongside a write. Writes are queued and applied by a single writer
+    connection: every write queued while a commit is in progress goes into
+    the next transaction, each under its own savepoint so a failing write is
+    rolled back alone. Connections stay open, so sqlite3's per-connection
+    statement cache keeps queries prepared between calls.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.closed = False
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._available = threading.Semaphore(size)
+        self._writer: Optional[sqlite3.Connection] = None
+        self._pending_writes: List[Tuple[Callable, tuple, Future]] = []
+        self._flush_scheduled = False
+        self._identity = self._file_identity()
+        self.stats = {"reads": 0, "writes": 0, "commits": 0}
+
+    def _file_identity(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def is_stale(self) -> bool:
+        """True once the file has been deleted or replaced under the pool."""
+        identity = self._file_identity()
+        return identity is None or (self._identity is not None and identity != self._identity)
+
+    def _open(self, autocommit: bool = False) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # checked out by one thread at a time
+            cached_statements=256,
+            isolation_level=None if autocommit else ""
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self._identity is None:
+            self._identity = self._file_identity()
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a reader connection; uncommitted work is rolled back on return."""
+        self._available.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+                with self._lock:
+                    self._opened += 1
+
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                if self.closed:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+        finally:
+            self._available.release()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Reader connection in a transaction committed on success (for synchronous callers)."""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def _read(self, fn: Callable, args: tuple) -> Any:
+        with self.connection() as conn:
+            self.stats["reads"] += 1
+            return fn(conn, *args)
+
+    async def read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(conn, *args) on a reader connection in the pool's thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), self._read, fn, args)
+
+    async def write(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(conn, *args) in the next batched write transaction."""
+        future: Future = Future()
+        with self._lock:
+            self._pending_writes.append((fn, args, future))
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                _get_executor().submit(self._flush_writes)
+        return await asyncio.wrap_future(future)
+
+    def _flush_writes(self) -> None:
+        """Apply queued writes until none are left, one transaction per batch."""
+        while True:
+            with self._lock:
+                batch, self._pending_writes = self._pending_writes, []
+                if not batch:
+                    self._flush_scheduled = False
+                    closing = self.closed
+                    break
+            self._apply_batch(batch)
+
+        if closing:
+            self._close_writer()
+
+    def _close_writer(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+    def _apply_batch(self, batch: List[Tuple[Callable, tuple, Future]]) -> None:
+        # Skip writes whose caller was cancelled; the rest can no longer be cancelled
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        results = []
+        try:
+            if self._writer is None:
+                self._writer = self._open(autocommit=True)
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+
+            for fn, args, future in batch:
+                conn.execute("SAVEPOINT pooled_write")
+                try:
+                    result = fn(conn, *args)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO pooled_write")
+                    conn.execute("RELEASE pooled_write")
+                    results.append((future, None, e))
+                else:
+                    conn.execute("RELEASE pooled_write")
+                    results.append((future, result, None))
+
+            conn.execute("COMMIT")
+            self.stats["writes"] += len(batch)
+            self.stats["commits"] += 1
+        except Exception as e:
+            try:
+                if self._writer is not None and self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+            except sqlite3.Error:
+                self._close_writer()
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run one write statement; returns the number of rows it changed."""
+        return await self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        rows = list(seq_of_params)
+        return await self.write(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def close(self) -> None:
+        """Close idle connections now, and the rest once they are no longer in use.
+
+        A closed pool still works for anyone holding it, but stops keeping
+        connections open between calls.
+        """
+        with self._lock:
+            self.closed = True
+            flushing = self._flush_scheduled
+        if not flushing:
+            self._close_writer()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> dict:
+        return {"db_path": self.db_path, "size": self.size, "connections_opened": self._opened, **self.stats}
+
+
+_pools: "OrderedDict[str, SQLitePool]" = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path: str) -> SQLitePool:
+    """Get or create the shared pool for a database file."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.is_stale():
+            pool.close()
+            pool = None
+
+        if pool is None:
+            pool = SQLitePool(
+                db_path,
+                size=settings.quality_db_pool_size,
+                timeout=settings.quality_db_busy_timeout
+            )
+            _pools[key] = pool
+        _pools.move_to_end(key)
+
+        while len(_pools) > MAX_OPEN_POOLS:
+            _, evicted = _pools.popitem(last=False)
+            evicted.close()
+
+        return pool
+
+
+def close_sqlite_pools() -> None:
+    """Close every shared pool (on shutdown)."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
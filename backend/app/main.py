@@ -5,19 +5,28 @@ Main FastAPI application entry point
 
 import logging
 import os
+import secrets
 from contextlib import asynccontextmanager
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 
 from app.core.config import get_settings
-from app.core.database import init_db
+from app.core.database import get_db, init_db
+from app.core.sqlite_pool import close_sqlite_pools
+from app.core.sql_metrics import SQLMetricsMiddleware, get_sql_metrics
 from app.core.logging import setup_logging
-from app.core.auth import validate_production_config
+from app.core.auth import get_current_user, validate_production_config
+from app.core.permissions import Permission, permission_service
 from app.api.v1.router import api_router
 from app.services.mitre_service import MitreAttackService
+from app.services.analysis_queue import get_analysis_job_queue
+from app.services.analysis_events import get_analysis_event_bus
 
 # Load environment variables
 load_dotenv()
@@ -51,10 +60,20 @@ async def lifespan(app: FastAPI):
     await mitre_service.initialize()
     logger.info("MITRE ATT&CK data initialized")
     
+    # Start batch analysis job queue
+    if settings.analysis_queue_enabled:
+        await get_analysis_job_queue().start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down AITM application...")
+    
+    if settings.analysis_queue_enabled:
+        await get_analysis_job_queue().stop()
+    
+    await get_analysis_event_bus().close()
+    close_sqlite_pools()
 
 
 # Create FastAPI app
@@ -81,6 +100,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.sql_metrics_enabled:
+    app.add_middleware(SQLMetricsMiddleware)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
@@ -105,6 +127,38 @@ async def health_check():
     }
 
 
+metrics_bearer = HTTPBearer(auto_error=False)
+
+
+async def authorize_metrics_scrape(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_bearer),
+    db: AsyncSession = Depends(get_db)
+) -> None:
+    """
+    Allow the configured scrape token, or a user with VIEW_LOGS.
+    
+    Prometheus cannot renew expiring access tokens, so it scrapes with the
+    static METRICS_SCRAPE_TOKEN instead; users keep the same access as
+    /api/v1/metrics/sql.
+    """
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    
+    scrape_token = settings.metrics_scrape_token
+    if scrape_token and secrets.compare_digest(credentials.credentials.encode(), scrape_token.encode()):
+        return
+    
+    user = await get_current_user(credentials, db)
+    if not permission_service.user_has_permission(user, Permission.VIEW_LOGS):
+        raise HTTPException(status_code=403, detail=f"Permission denied: {Permission.VIEW_LOGS.value} required")
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(authorize_metrics_scrape)])
+async def metrics():
+    """Prometheus metrics; statement texts reveal the schema, so access is restricted"""
+    return PlainTextResponse(get_sql_metrics().render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Global HTTP exception handler"""
@@ -113,6 +113,10 @@ class ProjectShare(Base):
     )
 
 
+# The ProjectShare response schema below reuses the name; import the table by this one
+ProjectShareTable = ProjectShare
+
+
 class ProjectComment(Base):
     """Comments on projects and their components"""
     __tablename__ = "project_comments"
@@ -168,6 +172,9 @@ class ActivityLog(Base):
         Index('ix_activity_logs_team', 'team_id'),
         Index('ix_activity_logs_type', 'activity_type'),
         Index('ix_activity_logs_created', 'created_at'),
+        Index('ix_activity_logs_created_id', 'created_at', 'id'),
+        Index('ix_activity_logs_project_created', 'project_id', 'created_at', 'id'),
+        Index('ix_activity_logs_team_created', 'team_id', 'created_at', 'id'),
     )
 
 
@@ -314,13 +321,15 @@ class ActivityFeedRequest(BaseModel):
     activity_types: Optional[List[ActivityType]] = None
     limit: int = Field(50, ge=1, le=100)
     offset: int = Field(0, ge=0)
+    cursor: Optional[str] = None  # next_cursor of the previous page; replaces offset
 
 
 class ActivityFeedResponse(BaseModel):
     """Activity feed response"""
     activities: List[ActivityLogEntry]
-    total_count: int
+    total_count: Optional[int] = None  # only computed for the first page
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # Forward reference resolution
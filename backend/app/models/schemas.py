@@ -194,6 +194,32 @@ class AnalysisStatusResponse(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
+    stage_timings: Optional[Dict[str, float]] = None
+
+
+class BatchAnalysisRequest(BaseModel):
+    project_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    priority: str = Field(default="normal", pattern="^(low|normal|high)$")
+    provider: Optional[str] = Field(None, pattern="^(openai|google|ollama|litellm)$")
+    config: Dict[str, Any] = {}
+
+
+class BatchAnalysisResponse(BaseModel):
+    batch_id: str
+    queued: int
+    message: str
+
+
+class BatchAnalysisProgress(BaseModel):
+    batch_id: str
+    total: int
+    queued: int
+    running: int
+    completed: int
+    failed: int
+    cancelled: int
+    progress_percentage: float
+    done: bool
 
 
 class AnalysisStartResponse(BaseModel):
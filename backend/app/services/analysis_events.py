@@ -0,0 +1,341 @@
+"""
+Analysis Progress Events
+Pushes analysis state changes to SSE and WebSocket subscribers as they happen,
+in process or through Redis pub/sub when several workers serve the API
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+
+@dataclass
+class AnalysisEvent:
+    """
+    A project's analysis state after one change
+
+    Every event carries the full state, so a client only needs the latest one
+    and a resumed stream can skip events trimmed from history. The exception
+    is ``report_section``, a report section (name and content) streamed while
+    the report is generated; it is a preview, and the complete report is
+    stored with the analysis results.
+    """
+    project_id: int
+    sequence: int
+    status: str  # idle, running, completed, failed
+    phase: Optional[str] = None
+    percentage: float = 0.0
+    message: Optional[str] = None
+    error_message: Optional[str] = None
+    timestamp: Optional[str] = None
+    report_section: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnalysisEvent":
+        return cls(**data)
+
+    def to_sse(self) -> str:
+        """Server-sent event frame; the id lets EventSource resume with Last-Event-ID"""
+        return f"id: {self.sequence}\nevent: progress\ndata: {json.dumps(self.to_dict())}\n\n"
+
+
+class AnalysisSubscription:
+    """Events for one project, registered before any history is read so none are missed"""
+
+    def __init__(self, bus: "AnalysisEventBus", project_id: int, queue: asyncio.Queue):
+        self.bus = bus
+        self.project_id = project_id
+        self.queue = queue
+
+    async def events(self, after: int) -> AsyncIterator[Optional[AnalysisEvent]]:
+        """
+        Events with a sequence above ``after``: retained history first, then
+        live ones, ending after a completed or failed event. None is yielded
+        whenever the bus keepalive interval passes without an event.
+        """
+        last = after
+        for event in await self.bus.history(self.project_id, after):
+            last = event.sequence
+            yield event
+            if event.is_terminal:
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(self.queue.get(), self.bus.keepalive)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            # Already replayed from history
+            if event.sequence <= last:
+                continue
+            last = event.sequence
+            yield event
+            if event.is_terminal:
+                return
+
+
+class AnalysisEventBus:
+    """
+    In-process analysis event bus
+
+    Numbers each project's events, keeps the most recent ones so clients can
+    resume from a sequence, and fans events out to subscribers in this process.
+    """
+
+    def __init__(self, history_size: int = 100, keepalive: Optional[float] = 15.0):
+        self.history_size = history_size
+        self.keepalive = keepalive
+        self._sequences: Dict[int, int] = {}
+        self._history: Dict[int, Deque[AnalysisEvent]] = {}
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self.stats = {"published": 0, "delivered": 0, "publish_errors": 0}
+
+    async def publish(
+        self,
+        project_id: int,
+        status: str,
+        phase: Optional[str] = None,
+        percentage: float = 0.0,
+        message: Optional[str] = None,
+        error_message: Optional[str] = None,
+        report_section: Optional[Dict[str, Any]] = None
+    ) -> Optional[AnalysisEvent]:
+        """Publish a project's new analysis state; errors are logged, never raised to the analysis"""
+        try:
+            event = AnalysisEvent(
+                project_id=project_id,
+                sequence=await self._next_sequence(project_id),
+                status=status,
+                phase=phase,
+                percentage=percentage or 0.0,
+                message=message,
+                error_message=error_message,
+                timestamp=datetime.utcnow().isoformat(),
+                report_section=report_section
+            )
+            await self._send(event)
+        except Exception as e:
+            self.stats["publish_errors"] += 1
+            logger.warning(f"Could not publish analysis event for project {project_id}: {e}")
+            return None
+
+        self.stats["published"] += 1
+        return event
+
+    async def last_sequence(self, project_id: int) -> int:
+        """Sequence of the project's latest event, 0 if there is none"""
+        return self._sequences.get(project_id, 0)
+
+    async def history(self, project_id: int, after: int) -> List[AnalysisEvent]:
+        """Retained events with a sequence above ``after``"""
+        return [event for event in self._history.get(project_id, ()) if event.sequence > after]
+
+    @asynccontextmanager
+    async def subscribe(self, project_id: int) -> AsyncIterator[AnalysisSubscription]:
+        """Receive a project's events for the duration of the block"""
+        await self._listen()
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(project_id, set()).add(queue)
+        try:
+            yield AnalysisSubscription(self, project_id, queue)
+        finally:
+            subscribers = self._subscribers.get(project_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[project_id]
+
+    def subscriber_count(self, project_id: Optional[int] = None) -> int:
+        if project_id is not None:
+            return len(self._subscribers.get(project_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def _next_sequence(self, project_id: int) -> int:
+        self._sequences[project_id] = self._sequences.get(project_id, 0) + 1
+        return self._sequences[project_id]
+
+    async def _send(self, event: AnalysisEvent):
+        history = self._history.setdefault(event.project_id, deque(maxlen=self.history_size))
+        history.append(event)
+        self._deliver(event)
+
+    async def _listen(self):
+        """Start receiving events published elsewhere; nothing to do in process"""
+
+    def _deliver(self, event: AnalysisEvent):
+        """Hand an event to this process's subscribers"""
+        for queue in self._subscribers.get(event.project_id, ()):
+            queue.put_nowait(event)
+            self.stats["delivered"] += 1
+
+    async def close(self):
+        """Release backend resources"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "subscribers": self.subscriber_count(),
+            **self.stats
+        }
+
+
+class RedisAnalysisEventBus(AnalysisEventBus):
+    """
+    Analysis event bus shared by several workers through Redis
+
+    Sequences and history live in Redis so any worker can resume a stream;
+    events reach each worker's subscribers over one pub/sub channel. Each time
+    the channel subscription is confirmed, including after a reconnect,
+    retained history is replayed to local subscribers so nothing published
+    while the listener was not subscribed is missed.
+    """
+
+    CHANNEL = "aitm:analysis_events"
+
+    def __init__(
+        self,
+        redis_url: str,
+        history_size: int = 100,
+        keepalive: Optional[float] = 15.0,
+        history_ttl: int = 86400,
+        subscribe_timeout: float = 5.0,
+        reconnect_delay: float = 1.0
+    ):
+        super().__init__(history_size, keepalive)
+        self.redis_url = redis_url
+        self.history_ttl = history_ttl
+        self.subscribe_timeout = subscribe_timeout
+        self.reconnect_delay = reconnect_delay
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    def _key(self, project_id: int, name: str) -> str:
+        return f"{self.CHANNEL}:{project_id}:{name}"
+
+    async def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url, decode_responses=True, socket_connect_timeout=5)
+        return self._redis
+
+    async def last_sequence(self, project_id: int) -> int:
+        client = await self._get_redis()
+        return int(await client.get(self._key(project_id, "sequence")) or 0)
+
+    async def history(self, project_id: int, after: int) -> List[AnalysisEvent]:
+        client = await self._get_redis()
+        events = [
+            AnalysisEvent.from_dict(json.loads(raw))
+            for raw in await client.lrange(self._key(project_id, "history"), 0, -1)
+        ]
+        return [event for event in events if event.sequence > after]
+
+    async def _next_sequence(self, project_id: int) -> int:
+        client = await self._get_redis()
+        return await client.incr(self._key(project_id, "sequence"))
+
+    async def _send(self, event: AnalysisEvent):
+        client = await self._get_redis()
+        payload = json.dumps(event.to_dict())
+        history_key = self._key(event.project_id, "history")
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.rpush(history_key, payload)
+            pipe.ltrim(history_key, -self.history_size, -1)
+            pipe.expire(history_key, self.history_ttl)
+            pipe.expire(self._key(event.project_id, "sequence"), self.history_ttl)
+            pipe.publish(self.CHANNEL, payload)
+            await pipe.execute()
+
+    async def _listen(self):
+        """Start the listener and wait until Redis confirms the channel subscription,
+        so history read afterwards cannot miss an event published in between"""
+        if self._listener is None or self._listener.done():
+            self._subscribed.clear()
+            self._listener = asyncio.create_task(self._run_listener())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), self.subscribe_timeout)
+        except asyncio.TimeoutError:
+            # Events published meanwhile are replayed once the subscription is confirmed
+            logger.warning("Analysis event subscription not confirmed yet, live events may be delayed")
+
+    async def _run_listener(self):
+        """Relay the channel to local subscribers, reconnecting after errors"""
+        while True:
+            try:
+                client = await self._get_redis()
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in pubsub.listen():
+                        if message["type"] == "subscribe":
+                            self._subscribed.set()
+                            await self._replay_history()
+                        elif message["type"] == "message":
+                            self._deliver(AnalysisEvent.from_dict(json.loads(message["data"])))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._subscribed.clear()
+                logger.warning(f"Analysis event listener error, reconnecting: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _replay_history(self):
+        """Hand retained events to local subscribers; ones they already have are skipped"""
+        for project_id in list(self._subscribers):
+            for event in await self.history(project_id, 0):
+                self._deliver(event)
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+            self._subscribed.clear()
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Global event bus instance
+_analysis_event_bus: Optional[AnalysisEventBus] = None
+
+
+def get_analysis_event_bus() -> AnalysisEventBus:
+    """Get or create the analysis event bus selected in settings"""
+    global _analysis_event_bus
+    if _analysis_event_bus is None:
+        backend = settings.analysis_events_backend.lower()
+        if backend == "redis":
+            _analysis_event_bus = RedisAnalysisEventBus(
+                settings.redis_url, settings.analysis_events_history, settings.analysis_events_keepalive
+            )
+        else:
+            if backend != "memory":
+                logger.warning(f"Unknown analysis events backend '{backend}', using in-process bus")
+            _analysis_event_bus = AnalysisEventBus(
+                settings.analysis_events_history, settings.analysis_events_keepalive
+            )
+    return _analysis_event_bus
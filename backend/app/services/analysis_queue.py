@@ -0,0 +1,405 @@
+"""
+Analysis Job Queue
+Persistent, priority-ordered queue for batch threat modeling analyses with
+global and per-provider concurrency limits
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, select, update, func
+from sqlalchemy.orm import aliased
+
+from app.core.config import get_settings
+from app.core.database import async_session, AnalysisJob, Project
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PRIORITY_LANES: Dict[str, int] = {"low": 0, "normal": 1, "high": 2}
+
+JobRunner = Callable[[int, Dict[str, Any], str], Awaitable[bool]]
+
+
+async def run_orchestrator_analysis(project_id: int, analysis_config: Dict[str, Any], provider: str) -> bool:
+    """Run a project analysis on the given provider and report whether it completed"""
+    from app.services.orchestrator import ThreatModelingOrchestrator
+
+    orchestrator = ThreatModelingOrchestrator()
+    await orchestrator.analyze_project(project_id, analysis_config, provider=provider)
+
+    async with async_session() as db:
+        result = await db.execute(select(Project.status).where(Project.id == project_id))
+        return result.scalar_one_or_none() == "completed"
+
+
+class AnalysisJobQueue:
+    """
+    Database-backed analysis job queue
+
+    Features:
+    - Batch submission of project analyses with priority lanes
+    - Global concurrency limit and optional per-provider limits
+    - Jobs whose worker stopped renewing their lease are re-queued
+    - Aggregate progress per batch
+
+    Every uvicorn worker may run a dispatcher against the same database.
+    Limits count running jobs in the database, checked in the claiming
+    UPDATE, so they hold across workers; each running job is leased to the
+    worker that claimed it, which renews the lease while the job runs.
+    """
+
+    def __init__(
+        self,
+        runner: Optional[JobRunner] = None,
+        session_factory=async_session,
+        max_concurrency: Optional[int] = None,
+        provider_limits: Optional[Dict[str, int]] = None,
+        max_attempts: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None
+    ):
+        self.runner = runner or run_orchestrator_analysis
+        self.session_factory = session_factory
+        self.max_concurrency = max_concurrency or settings.analysis_queue_max_concurrency
+        self.provider_limits = (
+            provider_limits if provider_limits is not None
+            else dict(settings.analysis_queue_provider_limits)
+        )
+        self.max_attempts = max_attempts or settings.analysis_queue_max_attempts
+        self.poll_interval = poll_interval or settings.analysis_queue_poll_interval
+        self.lease_seconds = lease_seconds or settings.analysis_queue_lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._active_tasks: Set[asyncio.Task] = set()
+        self._global_slots = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self):
+        """Recover jobs with expired leases and start dispatching"""
+        if self.is_running:
+            return
+
+        await self._recover_interrupted_jobs()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"Analysis job queue started on {self.worker_id} (max concurrency {self.max_concurrency})")
+
+    async def stop(self):
+        """Stop dispatching and cancel running jobs; they are re-queued for any worker"""
+        for task in (self._dispatcher, self._heartbeat):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._dispatcher = self._heartbeat = None
+
+        for task in list(self._active_tasks):
+            task.cancel()
+        await asyncio.gather(*self._active_tasks, return_exceptions=True)
+        await self._release_claimed_jobs()
+        logger.info("Analysis job queue stopped")
+
+    async def submit_batch(
+        self,
+        project_ids: List[int],
+        analysis_config: Optional[Dict[str, Any]] = None,
+        priority: str = "normal",
+        provider: Optional[str] = None,
+        submitted_by: Optional[str] = None
+    ) -> str:
+        """Queue analyses for a batch of projects and return the batch ID"""
+        if priority not in PRIORITY_LANES:
+            raise ValueError(f"Unknown priority lane: {priority}")
+
+        batch_id = str(uuid.uuid4())
+        configuration = json.dumps(analysis_config or {})
+        provider = provider or (analysis_config or {}).get("llm_provider") or settings.default_llm_provider
+
+        async with self.session_factory() as db:
+            db.add_all([
+                AnalysisJob(
+                    batch_id=batch_id,
+                    project_id=project_id,
+                    status="queued",
+                    priority=PRIORITY_LANES[priority],
+                    provider=provider,
+                    configuration=configuration,
+                    attempts=0,
+                    submitted_by=submitted_by
+                )
+                for project_id in dict.fromkeys(project_ids)
+            ])
+            await db.commit()
+
+        logger.info(f"Queued batch {batch_id} with {len(project_ids)} analyses ({priority} priority)")
+        self._wakeup.set()
+        return batch_id
+
+    async def cancel_batch(self, batch_id: str) -> int:
+        """Cancel queued jobs in a batch; running jobs are left to finish"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.batch_id == batch_id, AnalysisJob.status == "queued")
+                .values(status="cancelled", completed_at=datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def get_batch_progress(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get aggregate job counts and completion percentage for a batch"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(AnalysisJob.status, func.count(AnalysisJob.id))
+                .where(AnalysisJob.batch_id == batch_id)
+                .group_by(AnalysisJob.status)
+            )
+            counts = {status: count for status, count in result.all()}
+
+            if not counts:
+                return None
+
+            submitted_by = (await db.execute(
+                select(AnalysisJob.submitted_by).where(AnalysisJob.batch_id == batch_id).limit(1)
+            )).scalar_one_or_none()
+
+        total = sum(counts.values())
+        finished = counts.get("completed", 0) + counts.get("failed", 0) + counts.get("cancelled", 0)
+        return {
+            "batch_id": batch_id,
+            "submitted_by": submitted_by,
+            "total": total,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "completed": counts.get("completed", 0),
+            "failed": counts.get("failed", 0),
+            "cancelled": counts.get("cancelled", 0),
+            "progress_percentage": round(finished / total * 100, 1),
+            "done": finished == total
+        }
+
+    async def _recover_interrupted_jobs(self):
+        """Re-queue running jobs whose worker stopped renewing the lease"""
+        expired = and_(
+            AnalysisJob.status == "running",
+            or_(
+                AnalysisJob.heartbeat_at.is_(None),
+                AnalysisJob.heartbeat_at < datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+            )
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                update(AnalysisJob)
+                .where(expired, AnalysisJob.attempts >= self.max_attempts)
+                .values(
+                    status="failed",
+                    error_message="Interrupted too many times",
+                    completed_at=datetime.utcnow()
+                )
+            )
+            result = await db.execute(
+                update(AnalysisJob)
+                .where(expired)
+                .values(status="queued", started_at=None, claimed_by=None, heartbeat_at=None)
+            )
+            await db.commit()
+
+        if result.rowcount:
+            logger.info(f"Re-queued {result.rowcount} interrupted analysis jobs")
+            self._wakeup.set()
+
+    async def _release_claimed_jobs(self):
+        """Hand this worker's running jobs back to the queue on shutdown"""
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.status == "running", AnalysisJob.claimed_by == self.worker_id)
+                    .values(status="queued", started_at=None, claimed_by=None, heartbeat_at=None)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to release analysis jobs of {self.worker_id}: {e}")
+
+    async def _heartbeat_loop(self):
+        """Renew this worker's leases and recover jobs whose lease expired elsewhere"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(AnalysisJob)
+                        .where(AnalysisJob.status == "running", AnalysisJob.claimed_by == self.worker_id)
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    await db.commit()
+                await self._recover_interrupted_jobs()
+            except Exception as e:
+                logger.error(f"Analysis job lease renewal failed: {e}")
+
+    async def _dispatch_loop(self):
+        """Claim queued jobs whenever a global and provider slot is free"""
+        while True:
+            await self._global_slots.acquire()
+
+            try:
+                job = await self._claim_next_job()
+            except Exception as e:
+                logger.error(f"Failed to claim analysis job: {e}")
+                job = None
+
+            if job is None:
+                self._global_slots.release()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._run_job(job))
+            self._active_tasks.add(task)
+            task.add_done_callback(self._active_tasks.discard)
+
+    async def _claim_next_job(self) -> Optional[AnalysisJob]:
+        """Atomically move the highest-priority eligible job to running
+
+        Running jobs are counted in the database, across every worker, and the
+        limits are checked again inside the claiming UPDATE so two workers
+        cannot both take the last free slot.
+        """
+        async with self.session_factory() as db:
+            running = dict((await db.execute(
+                select(AnalysisJob.provider, func.count(AnalysisJob.id))
+                .where(AnalysisJob.status == "running")
+                .group_by(AnalysisJob.provider)
+            )).all())
+            if sum(running.values()) >= self.max_concurrency:
+                return None
+            saturated = [
+                provider for provider, limit in self.provider_limits.items()
+                if running.get(provider, 0) >= limit
+            ]
+
+            query = (
+                select(AnalysisJob)
+                .where(AnalysisJob.status == "queued")
+                .order_by(AnalysisJob.priority.desc(), AnalysisJob.id)
+                .limit(1)
+            )
+            if saturated:
+                query = query.where(AnalysisJob.provider.not_in(saturated))
+
+            job = (await db.execute(query)).scalar_one_or_none()
+            if job is None:
+                return None
+            attempt = (job.attempts or 0) + 1
+
+            other = aliased(AnalysisJob)
+            conditions = [
+                AnalysisJob.id == job.id,
+                AnalysisJob.status == "queued",
+                select(func.count(other.id)).where(other.status == "running")
+                .scalar_subquery() < self.max_concurrency
+            ]
+            if job.provider in self.provider_limits:
+                conditions.append(
+                    select(func.count(other.id))
+                    .where(other.status == "running", other.provider == job.provider)
+                    .scalar_subquery() < self.provider_limits[job.provider]
+                )
+
+            now = datetime.utcnow()
+            claimed = await db.execute(
+                update(AnalysisJob)
+                .where(*conditions)
+                .values(
+                    status="running",
+                    started_at=now,
+                    attempts=attempt,
+                    claimed_by=self.worker_id,
+                    heartbeat_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+            if claimed.rowcount != 1:
+                return None
+            job.attempts = attempt
+
+        return job
+
+    async def _run_job(self, job: AnalysisJob):
+        """Run a claimed job and record its outcome"""
+        status = "failed"
+        error_message = None
+
+        try:
+            succeeded = await self.runner(job.project_id, json.loads(job.configuration or "{}"), job.provider)
+            status = "completed" if succeeded else "failed"
+            if not succeeded:
+                error_message = "Analysis did not complete"
+
+        except asyncio.CancelledError:
+            # Queue shutdown; stop() hands the job back to the queue
+            status = None
+            raise
+
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} for project {job.project_id} raised: {e}", exc_info=True)
+            error_message = str(e)
+            if job.attempts < self.max_attempts:
+                status = "queued"
+
+        finally:
+            self._global_slots.release()
+
+            if status is not None:
+                await self._finish_job(job.id, status, error_message)
+            self._wakeup.set()
+
+    async def _finish_job(self, job_id: int, status: str, error_message: Optional[str]):
+        """Persist a job's final (or re-queued) status, unless its lease passed to another worker"""
+        values: Dict[str, Any] = {
+            "status": status, "error_message": error_message, "claimed_by": None, "heartbeat_at": None
+        }
+        if status in ("completed", "failed"):
+            values["completed_at"] = datetime.utcnow()
+
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == job_id, AnalysisJob.claimed_by == self.worker_id)
+                    .values(**values)
+                )
+                await db.commit()
+            if result.rowcount != 1:
+                logger.warning(f"Analysis job {job_id} lease expired before it finished; result discarded")
+        except Exception as e:
+            logger.error(f"Failed to update analysis job {job_id}: {e}")
+
+
+# Global queue instance for singleton pattern
+_analysis_job_queue: Optional[AnalysisJobQueue] = None
+
+
+def get_analysis_job_queue() -> AnalysisJobQueue:
+    """Get the global analysis job queue instance"""
+    global _analysis_job_queue
+    if _analysis_job_queue is None:
+        _analysis_job_queue = AnalysisJobQueue()
+    return _analysis_job_queue
@@ -0,0 +1,142 @@
+"""
+Analysis State
+Writes a project's analysis progress to AnalysisState and publishes each
+change to the progress streams once it is committed
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AnalysisState, Project
+from app.services.analysis_events import get_analysis_event_bus
+
+# Report sections are published between these progress percentages
+REPORT_PROGRESS_START = 85.0
+REPORT_PROGRESS_SPAN = 10.0
+
+
+async def mark_analysis_started(
+    db: AsyncSession,
+    project_id: int,
+    phase: str,
+    message: str,
+    config: Optional[Dict[str, Any]] = None
+):
+    """Create or reset the project's analysis state as running"""
+    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
+    state = result.scalar_one_or_none()
+    now = datetime.utcnow()
+
+    if not state:
+        state = AnalysisState(project_id=project_id)
+        db.add(state)
+
+    state.status = "running"
+    state.current_phase = phase
+    state.progress_percentage = 0.0
+    state.progress_message = message
+    state.started_at = now
+    state.completed_at = None
+    state.error_message = None
+    state.updated_at = now
+    if config is not None:
+        state.configuration = json.dumps(config, default=str)
+
+    # Update project status
+    project_result = await db.execute(select(Project).where(Project.id == project_id))
+    project = project_result.scalar_one_or_none()
+    if project:
+        project.status = "analyzing"
+        project.updated_at = now
+
+    await db.commit()
+    await get_analysis_event_bus().publish(project_id, "running", phase, 0.0, message)
+
+
+async def update_analysis_progress(db: AsyncSession, project_id: int, phase: str, percentage: float, message: str):
+    """Update analysis progress in database"""
+    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
+    state = result.scalar_one_or_none()
+
+    if state:
+        state.current_phase = phase
+        state.progress_percentage = percentage
+        state.progress_message = message
+        state.updated_at = datetime.utcnow()
+        await db.commit()
+        await get_analysis_event_bus().publish(project_id, "running", phase, percentage, message)
+
+
+async def mark_analysis_failed(db: AsyncSession, project_id: int, error_message: str):
+    """Mark analysis as failed"""
+    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
+    state = result.scalar_one_or_none()
+
+    if state:
+        state.status = "failed"
+        state.error_message = error_message
+        state.completed_at = datetime.utcnow()
+        state.updated_at = datetime.utcnow()
+
+    # Update project status
+    project_result = await db.execute(select(Project).where(Project.id == project_id))
+    project = project_result.scalar_one_or_none()
+    if project:
+        project.status = "failed"
+        project.updated_at = datetime.utcnow()
+
+    await db.commit()
+
+    if state:
+        await get_analysis_event_bus().publish(
+            project_id, "failed", state.current_phase, state.progress_percentage,
+            state.progress_message, error_message
+        )
+
+
+async def mark_analysis_completed(db: AsyncSession, project_id: int):
+    """Mark analysis as completed"""
+    result = await db.execute(select(AnalysisState).where(AnalysisState.project_id == project_id))
+    state = result.scalar_one_or_none()
+
+    if state:
+        state.status = "completed"
+        state.current_phase = "completed"
+        state.progress_percentage = 100.0
+        state.progress_message = "Analysis completed successfully"
+        state.completed_at = datetime.utcnow()
+        state.updated_at = datetime.utcnow()
+
+    # Update project status
+    project_result = await db.execute(select(Project).where(Project.id == project_id))
+    project = project_result.scalar_one_or_none()
+    if project:
+        project.status = "completed"
+        project.updated_at = datetime.utcnow()
+
+    await db.commit()
+
+    if state:
+        await get_analysis_event_bus().publish(
+            project_id, "completed", "completed", 100.0, "Analysis completed successfully"
+        )
+
+
+def report_section_publisher(project_id: int, section_count: int) -> Callable[[str, Any], Awaitable[None]]:
+    """Section listener for ReportGenerationAgent that publishes each section to the progress streams"""
+    received: List[str] = []
+
+    async def publish_section(name: str, content: Any):
+        received.append(name)
+        await get_analysis_event_bus().publish(
+            project_id, "running", "report_generation",
+            REPORT_PROGRESS_START + REPORT_PROGRESS_SPAN * len(received) / section_count,
+            f"Report section ready: {name.replace('_', ' ')}",
+            report_section={"name": name, "content": content}
+        )
+
+    return publish_section
@@ -6,6 +6,7 @@ from .base_analyzer import (
     CodeAnalyzer, AnalysisResult, AnalysisContext, AnalysisType,
     PythonASTAnalyzer, FileAnalyzer, MultiLanguageAnalyzer
 )
+from .parsed_file import ParsedFile, NodeTypeVisitor
 from .file_monitor import (
     FileSystemMonitor, FileChangeEvent, FileChangeType,
     RealTimeAnalysisCoordinator
@@ -15,14 +16,19 @@ from .issue_detector import (
     severity_filter, file_pattern_filter, issue_type_filter,
     add_auto_fix_suggestions, normalize_file_paths
 )
+from .rule_engine import CompiledRuleSet, LiteralAutomaton
 from .scanning_framework import (
-    CodeScanningFramework, ScanResult, ScanConfiguration
+    CodeScanningFramework, ScanResult, ScanConfiguration, ExecutorType
 )
 from .auto_fix_engine import (
     AutoFixEngine, FixableIssue, FixApplicationResult, FixStatus,
     CodeFixer, TrailingWhitespaceFixer, MultipleBlankLinesFixer,
     PythonImportSorter, ExternalFormatterFixer
 )
+from .incremental_review import (
+    IncrementalReviewAnalyzer, IncrementalScanResult, FileDiff, parse_unified_diff
+)
+from .clone_index import CloneIndex, CloneMatch, ClonePair, get_clone_index
 from .recommendation_engine import (
     RecommendationEngine, DuplicateCodeDetector, PerformanceAnalyzer,
     SecurityAnalyzer, PatternAnalyzer, RecommendationType,
@@ -37,6 +43,8 @@ __all__ = [
     'PythonASTAnalyzer',
     'FileAnalyzer',
     'MultiLanguageAnalyzer',
+    'ParsedFile',
+    'NodeTypeVisitor',
     'FileSystemMonitor',
     'FileChangeEvent',
     'FileChangeType',
@@ -49,9 +57,16 @@ __all__ = [
     'issue_type_filter',
     'add_auto_fix_suggestions',
     'normalize_file_paths',
+    'CompiledRuleSet',
+    'LiteralAutomaton',
     'CodeScanningFramework',
     'ScanResult',
     'ScanConfiguration',
+    'ExecutorType',
+    'IncrementalReviewAnalyzer',
+    'IncrementalScanResult',
+    'FileDiff',
+    'parse_unified_diff',
     'AutoFixEngine',
     'FixableIssue',
     'FixApplicationResult',
@@ -61,6 +76,10 @@ __all__ = [
     'MultipleBlankLinesFixer',
     'PythonImportSorter',
     'ExternalFormatterFixer',
+    'CloneIndex',
+    'CloneMatch',
+    'ClonePair',
+    'get_clone_index',
     'RecommendationEngine',
     'DuplicateCodeDetector',
     'PerformanceAnalyzer',
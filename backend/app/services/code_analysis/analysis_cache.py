@@ -0,0 +1,311 @@
+"""
+Persistent store of per-file analysis results for incremental rescans.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.models.quality import QualityIssue, IssueType, Severity
+
+settings = get_settings()
+
+# (line, column, issue_type, severity, category, description, suggested_fix, auto_fixable)
+IssueRow = Tuple
+
+
+def issue_to_row(issue: QualityIssue) -> IssueRow:
+    """Reduce an issue to the fields an analyzer sets."""
+    return (issue.line_number, issue.column_number, issue.issue_type.value,
+            issue.severity.value, issue.category, issue.description,
+            issue.suggested_fix, issue.auto_fixable)
+
+
+def issue_from_row(row: IssueRow) -> QualityIssue:
+    """Rebuild an issue from its row; project and file are set when it is added to a result."""
+    (line_number, column_number, issue_type, severity, category,
+     description, suggested_fix, auto_fixable) = row
+    return QualityIssue(
+        line_number=line_number,
+        column_number=column_number,
+        issue_type=IssueType(issue_type),
+        severity=Severity(severity),
+        category=category,
+        description=description,
+        suggested_fix=suggested_fix,
+        auto_fixable=auto_fixable
+    )
+
+
+def config_hash(configuration: Dict[str, Any]) -> str:
+    """Stable short hash of an analyzer configuration."""
+    canonical = json.dumps(configuration, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class AnalysisResultStore:
+    """SQLite store of analysis results, evicting least recently used entries.
+
+    Results are keyed by (file content hash, analyzer name, analyzer version,
+    analyzer config hash), so a result is reused wherever the same content is
+    analyzed with the same rules. A file manifest maps each scanned path to
+    the mtime, size and content hash seen last time, which lets a rescan skip
+    unchanged files without reading them.
+
+    The store keeps one connection open per process. New results are buffered
+    and written in a single transaction once `write_batch_size` of them are
+    pending or when `flush()` is called, which the scanner does once per scan;
+    buffered results are served by `get` straight away. Hits only note their
+    access time, and those touches are written with the next flush. Pickling
+    drops the connection and the buffers, so each worker process opens its
+    own connection and flushes its own results.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 50000, evict_interval: int = 100,
+                 write_batch_size: int = 500):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+        self.write_batch_size = write_batch_size
+        self._writes_since_evict = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+        self._reset_connection_state()
+        self._init_database()
+
+    def _reset_connection_state(self) -> None:
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.RLock()
+        # cache_key -> (row, record) not yet written
+        self._pending: Dict[str, Tuple[tuple, Dict[str, Any]]] = {}
+        # cache_key -> last access time not yet written
+        self._touched: Dict[str, float] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for name in ("_conn", "_conn_pid", "_lock", "_pending", "_touched"):
+            state.pop(name)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._reset_connection_state()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The store's connection, reopened in a forked process; call with the lock held."""
+        if self._conn is None or self._conn_pid != os.getpid():
+            # A connection inherited through fork must not be used, or even closed
+            self._conn = sqlite3.connect(
+                self.db_path,
+                timeout=30.0,
+                check_same_thread=False,  # used under self._lock only
+                cached_statements=256
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _init_database(self) -> None:
+        """Create the store tables if needed."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_results (
+                        cache_key TEXT PRIMARY KEY,
+                        file_hash TEXT NOT NULL,
+                        analyzer_name TEXT NOT NULL,
+                        analyzer_version TEXT NOT NULL,
+                        config_hash TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_analysis_results_last_access ON analysis_results(last_access)"
+                )
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS analysis_file_manifest (
+                        project_id TEXT NOT NULL,
+                        file_path TEXT NOT NULL,
+                        mtime_ns INTEGER NOT NULL,
+                        size INTEGER NOT NULL,
+                        file_hash TEXT NOT NULL,
+                        PRIMARY KEY (project_id, file_path)
+                    )
+                """)
+
+    @staticmethod
+    def make_key(file_hash: str, analyzer_name: str, analyzer_version: str, config: str) -> str:
+        return f"{file_hash}:{analyzer_name}:{analyzer_version}:{config}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Stored result record for a key, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored result records for the keys that are present."""
+        found: Dict[str, Dict[str, Any]] = {}
+        if not keys:
+            return found
+
+        now = time.time()
+        with self._lock:
+            missing = []
+            for key in keys:
+                pending = self._pending.get(key)
+                if pending is not None:
+                    found[key] = pending[1]
+                else:
+                    missing.append(key)
+
+            conn = self._connection()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT cache_key, value FROM analysis_results WHERE cache_key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = json.loads(value)
+                    self._touched[key] = now
+
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, file_hash: str, analyzer_name: str, analyzer_version: str,
+            config: str, record: Dict[str, Any]) -> None:
+        """Buffer a result record; it is written with the next flush."""
+        row = (key, file_hash, analyzer_name, analyzer_version, config,
+               json.dumps(record, default=str), time.time())
+        with self._lock:
+            self._pending[key] = (row, record)
+            self._touched.pop(key, None)
+            if len(self._pending) >= self.write_batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write buffered results and access times in one transaction, evicting now and then."""
+        with self._lock:
+            if not self._pending and not self._touched:
+                return
+
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [row for row, _ in self._pending.values()]
+                )
+                conn.executemany(
+                    "UPDATE analysis_results SET last_access = ? WHERE cache_key = ?",
+                    [(accessed, key) for key, accessed in self._touched.items()]
+                )
+                self._writes_since_evict += len(self._pending)
+                if self._writes_since_evict >= self.evict_interval:
+                    self._writes_since_evict = 0
+                    self._evict(conn)
+
+            self.stats["writes"] += len(self._pending)
+            self._pending.clear()
+            self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute("""
+            DELETE FROM analysis_results WHERE cache_key IN (
+                SELECT cache_key FROM analysis_results
+                ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def evict(self) -> None:
+        """Trim the store to max_entries now."""
+        with self._lock:
+            self.flush()
+            conn = self._connection()
+            with conn:
+                self._evict(conn)
+
+    def load_manifest(self, project_id: str) -> Dict[str, Tuple[int, int, str]]:
+        """Last seen (mtime_ns, size, file_hash) of every scanned file in a project."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT file_path, mtime_ns, size, file_hash FROM analysis_file_manifest WHERE project_id = ?",
+                (project_id,)
+            ).fetchall()
+        return {file_path: (mtime_ns, size, file_hash) for file_path, mtime_ns, size, file_hash in rows}
+
+    def record_files(self, project_id: str, entries: Iterable[Tuple[str, int, int, str]]) -> None:
+        """Remember (file_path, mtime_ns, size, file_hash) for files just analyzed, flushing their results first."""
+        with self._lock:
+            self.flush()
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO analysis_file_manifest VALUES (?, ?, ?, ?, ?)",
+                    [(project_id, *entry) for entry in entries]
+                )
+
+    def clear(self) -> None:
+        """Remove every stored result and manifest entry, buffered ones included."""
+        with self._lock:
+            self._pending.clear()
+            self._touched.clear()
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM analysis_results")
+                conn.execute("DELETE FROM analysis_file_manifest")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count and hit/miss counters of this process."""
+        with self._lock:
+            self.flush()
+            entries = self._connection().execute("SELECT COUNT(*) FROM analysis_results").fetchone()[0]
+        return {"entries": entries, "max_entries": self.max_entries, **self.stats}
+
+    def close(self) -> None:
+        """Flush buffered writes and close the connection."""
+        with self._lock:
+            self.flush()
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+_analysis_result_store: Optional[AnalysisResultStore] = None
+
+
+def get_analysis_result_store() -> Optional[AnalysisResultStore]:
+    """Get or create the global analysis result store; None when disabled."""
+    global _analysis_result_store
+    if not settings.analysis_cache_enabled:
+        return None
+    if _analysis_result_store is None:
+        _analysis_result_store = AnalysisResultStore(
+            db_path=settings.analysis_cache_path,
+            max_entries=settings.analysis_cache_max_entries
+        )
+    return _analysis_result_store
+
+
+@atexit.register
+def _flush_analysis_result_store() -> None:
+    """Write results still buffered in the global store at interpreter exit."""
+    if _analysis_result_store is not None:
+        try:
+            _analysis_result_store.flush()
+        except sqlite3.Error:
+            pass
@@ -5,14 +5,21 @@ Abstract base class for code analyzers with common functionality.
 import ast
 import os
 import hashlib
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Set, Union
 from enum import Enum
 
+from app.core.config import get_settings
 from app.models.quality import QualityIssue, IssueType, Severity
+from .analysis_cache import AnalysisResultStore, config_hash, issue_to_row, issue_from_row
+from .parsed_file import ParsedFile
+
+settings = get_settings()
 
 
 class AnalysisType(str, Enum):
@@ -38,6 +45,7 @@ class AnalysisContext:
     encoding: str = "utf-8"
     analysis_timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _parsed: Optional[ParsedFile] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Initialize computed fields."""
@@ -47,6 +55,24 @@ class AnalysisContext:
         if not self.language:
             self.language = self._detect_language()
     
+    @property
+    def parsed(self) -> ParsedFile:
+        """Parse results shared by every analyzer of this file, built on first use."""
+        if self._parsed is None or self._parsed.content is not self.file_content:
+            self._parsed = ParsedFile(self.file_content, self.file_path)
+        return self._parsed
+    
+    def parsed_for(self, tree: ast.AST) -> ParsedFile:
+        """Parse results for an already parsed tree, reusing the shared ones when it is theirs."""
+        parsed = self.parsed
+        if parsed.tree is tree:
+            return parsed
+        return ParsedFile.from_tree(tree, self.file_content, self.file_path)
+    
+    def discard_parsed(self) -> None:
+        """Drop the parse results once analysis is done, so cached contexts stay small."""
+        self._parsed = None
+    
     def _detect_language(self) -> str:
         """Detect programming language from file extension."""
         ext = Path(self.file_path).suffix.lower()
@@ -129,17 +155,63 @@ class AnalysisResult:
         )
         
         return merged
+    
+    def to_record(self) -> Dict[str, Any]:
+        """JSON-serializable form of the result for the persistent store."""
+        return {
+            'analyzer_name': self.analyzer_name,
+            'analysis_type': self.analysis_type.value,
+            'issues': [issue_to_row(issue) for issue in self.issues],
+            'metrics': self.metrics,
+            'suggestions': self.suggestions,
+            'execution_time': self.execution_time,
+            'line_count': len(self.context.file_content.split('\n'))
+        }
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], context: AnalysisContext) -> 'AnalysisResult':
+        """Rebuild a stored result for the given context."""
+        context.metadata.setdefault('line_count', record.get('line_count'))
+        result = cls(
+            analyzer_name=record['analyzer_name'],
+            analysis_type=AnalysisType(record['analysis_type']),
+            context=context,
+            metrics=record['metrics'],
+            suggestions=record['suggestions'],
+            execution_time=record['execution_time']
+        )
+        for row in record['issues']:
+            result.add_issue(issue_from_row(row))
+        return result
 
 
 class CodeAnalyzer(ABC):
     """Abstract base class for code analyzers."""
     
+    # Bump when an analyzer's checks change so stored results are not reused
+    version = "1"
+    
     def __init__(self, name: str, analysis_type: AnalysisType):
         self.name = name
         self.analysis_type = analysis_type
         self.supported_languages: Set[str] = set()
         self.configuration: Dict[str, Any] = {}
-        self._cache: Dict[str, AnalysisResult] = {}
+        # Bounded LRU of recent results; the persistent store holds the rest.
+        # Scans share one analyzer across worker threads, hence the lock.
+        self._cache: 'OrderedDict[str, AnalysisResult]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.max_cache_entries = settings.analysis_cache_memory_entries
+        self.cache_stats = {'hits': 0, 'misses': 0}
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled for the process executor
+        state = self.__dict__.copy()
+        del state['_cache_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
     
     def configure(self, config: Dict[str, Any]) -> None:
         """Configure the analyzer with settings."""
@@ -162,12 +234,56 @@ class CodeAnalyzer(ABC):
             file_content=""
         )
     
-    def analyze(self, context: AnalysisContext, use_cache: bool = True) -> AnalysisResult:
+    def cache_configuration(self) -> Dict[str, Any]:
+        """Settings that affect results, hashed into the cache key."""
+        return self.configuration
+    
+    def cache_key(self, file_hash: str) -> str:
+        """Key for a file's result under this analyzer's version and configuration."""
+        return AnalysisResultStore.make_key(
+            file_hash, self.name, self.version, config_hash(self.cache_configuration())
+        )
+    
+    def _remember(self, key: str, result: AnalysisResult) -> None:
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+    
+    def _recall(self, key: str) -> Optional[AnalysisResult]:
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.cache_stats['hits'] += 1
+            return result
+    
+    def _count(self, stat: str) -> None:
+        with self._cache_lock:
+            self.cache_stats[stat] += 1
+    
+    def analyze(self, context: AnalysisContext, use_cache: bool = True,
+                result_store: Optional[AnalysisResultStore] = None) -> AnalysisResult:
         """Analyze code and return results."""
-        # Check cache first
-        if use_cache and context.file_hash in self._cache:
-            cached_result = self._cache[context.file_hash]
-            return cached_result
+        # Check cache first: recent results in memory, then the persistent store
+        key = self.cache_key(context.file_hash) if use_cache else None
+        if use_cache:
+            cached_result = self._recall(key)
+            if cached_result is not None:
+                if cached_result.context is not context:
+                    # Same content seen under another context: report it against this one
+                    return AnalysisResult.from_record(cached_result.to_record(), context)
+                return cached_result
+            
+            record = result_store.get(key) if result_store is not None else None
+            if record is not None:
+                cached_result = AnalysisResult.from_record(record, context)
+                self._remember(key, cached_result)
+                self._count('hits')
+                return cached_result
+            
+            self._count('misses')
         
         # Validate input
         if not self.supports_language(context.language):
@@ -188,7 +304,12 @@ class CodeAnalyzer(ABC):
             
             # Cache result
             if use_cache:
-                self._cache[context.file_hash] = result
+                self._remember(key, result)
+                if result_store is not None:
+                    result_store.set(
+                        key, context.file_hash, self.name, self.version,
+                        config_hash(self.cache_configuration()), result.to_record()
+                    )
             
             return result
             
@@ -209,14 +330,17 @@ class CodeAnalyzer(ABC):
     
     def clear_cache(self) -> None:
         """Clear the analysis cache."""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        return {
-            'cache_size': len(self._cache),
-            'cache_keys': list(self._cache.keys())
-        }
+        with self._cache_lock:
+            return {
+                'cache_size': len(self._cache),
+                'max_cache_entries': self.max_cache_entries,
+                **self.cache_stats
+            }
 
 
 class PythonASTAnalyzer(CodeAnalyzer):
@@ -228,9 +352,9 @@ class PythonASTAnalyzer(CodeAnalyzer):
     
     def _parse_ast(self, context: AnalysisContext) -> Optional[ast.AST]:
         """Parse Python code into AST."""
-        try:
-            return ast.parse(context.file_content, filename=context.file_path)
-        except SyntaxError as e:
+        tree = context.parsed.tree
+        e = context.parsed.syntax_error
+        if e is not None:
             # Create a syntax error issue
             issue = QualityIssue(
                 issue_type=IssueType.STYLE,
@@ -248,6 +372,8 @@ class PythonASTAnalyzer(CodeAnalyzer):
             )
             result.add_issue(issue)
             return None
+        
+        return tree
     
     def _analyze_implementation(self, context: AnalysisContext) -> AnalysisResult:
         """Base implementation for Python AST analysis."""
@@ -281,7 +407,7 @@ class FileAnalyzer(CodeAnalyzer):
     
     def _get_file_stats(self, context: AnalysisContext) -> Dict[str, Any]:
         """Get basic file statistics."""
-        lines = context.file_content.split('\n')
+        lines = context.parsed.lines
         return {
             'total_lines': len(lines),
             'non_empty_lines': len([line for line in lines if line.strip()]),
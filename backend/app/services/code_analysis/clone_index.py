@@ -0,0 +1,499 @@
+"""
+Project-wide clone detection over winnowed token fingerprints.
+"""
+
+import hashlib
+import keyword
+import os
+import re
+import sqlite3
+import tokenize
+import zlib
+from collections import defaultdict, deque
+from contextlib import closing
+from dataclasses import dataclass
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+from .parsed_file import ParsedFile
+
+settings = get_settings()
+
+HASH_BASE = 1_000_003
+HASH_MODULUS = (1 << 61) - 1  # Fits SQLite's signed 64-bit INTEGER
+
+DEFAULT_EXCLUDED_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', '.tox'})
+
+# Tokens kept verbatim by the fallback tokenizer used for non-Python files
+COMMON_KEYWORDS = frozenset({
+    'if', 'else', 'for', 'while', 'do', 'return', 'break', 'continue', 'switch', 'case',
+    'try', 'catch', 'finally', 'throw', 'new', 'class', 'function', 'def', 'var', 'let',
+    'const', 'static', 'public', 'private', 'protected', 'import', 'export', 'from', 'async',
+    'await', 'yield', 'null', 'true', 'false', 'this', 'self', 'in', 'of', 'and', 'or', 'not'
+})
+FALLBACK_TOKEN = re.compile(
+    r'[A-Za-z_]\w*|\d[\w.]*|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|[^\s\w]'
+)
+SKIPPED_TOKENS = {
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+    tokenize.ENCODING, tokenize.ENDMARKER, getattr(tokenize, 'FSTRING_MIDDLE', -1),
+    getattr(tokenize, 'FSTRING_END', -1)
+}
+
+
+class Fingerprint(NamedTuple):
+    """Hash of one winnowed k-gram and the lines it spans."""
+    hash: int
+    start_line: int
+    end_line: int
+
+
+@dataclass
+class CloneMatch:
+    """A region of an indexed file that shares fingerprints with a queried block."""
+    file_path: str
+    start_line: int
+    end_line: int
+    similarity: float
+    shared_fingerprints: int
+
+
+@dataclass
+class ClonePair:
+    """Two regions of the project that share fingerprints."""
+    file_a: str
+    start_a: int
+    end_a: int
+    file_b: str
+    start_b: int
+    end_b: int
+    shared_fingerprints: int
+
+
+def normalized_tokens(content: str, language: str = 'python',
+                      parsed: Optional[ParsedFile] = None) -> List[Tuple[str, int]]:
+    """(token, line) pairs with identifiers and literals replaced by placeholders.
+
+    Comments, whitespace and indentation are dropped, so renamed or reformatted
+    copies of a block produce the same stream.
+    """
+    tokens: List[Tuple[str, int]] = []
+    if language == 'python':
+        python_tokens = (parsed or ParsedFile(content)).tokens
+        for token in python_tokens:
+            if token.type in SKIPPED_TOKENS:
+                continue
+            if token.type == tokenize.NAME:
+                text = token.string if keyword.iskeyword(token.string) else '$id'
+            elif token.type == tokenize.NUMBER:
+                text = '$num'
+            elif token.type in (tokenize.STRING, getattr(tokenize, 'FSTRING_START', -1)):
+                text = '$str'
+            else:
+                text = token.string
+            tokens.append((text, token.start[0]))
+        if tokens or not content.strip():
+            return tokens
+
+    # Other languages, and Python that does not tokenize
+    source = parsed or ParsedFile(content)
+    for match in FALLBACK_TOKEN.finditer(content):
+        text = match.group()
+        if text[0].isalpha() or text[0] == '_':
+            text = text if text in COMMON_KEYWORDS else '$id'
+        elif text[0].isdigit():
+            text = '$num'
+        elif text[0] in '"\'':
+            text = '$str'
+        tokens.append((text, source.line_for_offset(match.start())))
+    return tokens
+
+
+def winnow(token_ids: Sequence[int], lines: Sequence[int], kgram_size: int,
+           window_size: int) -> List[Fingerprint]:
+    """Select fingerprints from rolling k-gram hashes by winnowing.
+
+    The minimum hash of every window of window_size consecutive k-grams is
+    kept (the rightmost on ties), so any run of at least
+    kgram_size + window_size - 1 tokens shared by two streams yields at least
+    one shared fingerprint.
+    """
+    count = len(token_ids) - kgram_size + 1
+    if count <= 0:
+        return []
+
+    hashes = []
+    power = pow(HASH_BASE, kgram_size - 1, HASH_MODULUS)
+    value = 0
+    for i, token_id in enumerate(token_ids):
+        if i >= kgram_size:
+            value = (value - token_ids[i - kgram_size] * power) % HASH_MODULUS
+        value = (value * HASH_BASE + token_id) % HASH_MODULUS
+        if i >= kgram_size - 1:
+            hashes.append(value)
+
+    fingerprints = []
+    window: deque = deque()  # Positions with increasing hashes; the front is the window minimum
+    last_selected = -1
+    for position, value in enumerate(hashes):
+        while window and hashes[window[-1]] >= value:
+            window.pop()
+        window.append(position)
+        if window[0] <= position - window_size:
+            window.popleft()
+        if position >= min(window_size, count) - 1 and window[0] != last_selected:
+            last_selected = window[0]
+            fingerprints.append(Fingerprint(
+                hashes[last_selected], lines[last_selected], lines[last_selected + kgram_size - 1]
+            ))
+    return fingerprints
+
+
+def _language_for(file_path: str) -> str:
+    return 'python' if file_path.endswith(('.py', '.pyi')) else 'other'
+
+
+class CloneIndex:
+    """On-disk index of winnowed fingerprints for near-duplicate detection.
+
+    Each file is reduced to a normalized token stream, hashed in k-grams and
+    winnowed to a few fingerprints, which are stored in SQLite keyed by hash.
+    Finding where a block appears is an index lookup per fingerprint, and
+    project-wide clones come from grouping shared hashes, so neither compares
+    files pairwise. A manifest of each file's mtime, size and content hash lets
+    sync_project refresh only files that changed.
+
+    Connections are opened per operation.
+    """
+
+    def __init__(self, db_path: str, kgram_size: int = 20, window_size: int = 10,
+                 max_occurrences: int = 50):
+        self.db_path = db_path
+        self.kgram_size = kgram_size
+        self.window_size = window_size
+        # Hashes shared by more places than this are boilerplate, not clones
+        self.max_occurrences = max_occurrences
+        self._token_ids: Dict[str, int] = {}
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30.0)
+
+    def _init_database(self) -> None:
+        """Create the index tables, dropping fingerprints made with other settings."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        settings_key = f"{self.kgram_size}:{self.window_size}"
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS clone_index_meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS clone_files (
+                    project_id TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    fingerprint_count INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, file_path)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS clone_fingerprints (
+                    project_id TEXT NOT NULL,
+                    hash INTEGER NOT NULL,
+                    file_path TEXT NOT NULL,
+                    start_line INTEGER NOT NULL,
+                    end_line INTEGER NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_clone_fingerprints_hash ON clone_fingerprints(project_id, hash)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_clone_fingerprints_file ON clone_fingerprints(project_id, file_path)"
+            )
+
+            row = conn.execute("SELECT value FROM clone_index_meta WHERE key = 'settings'").fetchone()
+            if row is None or row[0] != settings_key:
+                conn.execute("DELETE FROM clone_fingerprints")
+                conn.execute("DELETE FROM clone_files")
+                conn.execute("INSERT OR REPLACE INTO clone_index_meta VALUES ('settings', ?)", (settings_key,))
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._token_ids.get(token)
+        if token_id is None:
+            # Stable across processes, unlike hash()
+            token_id = self._token_ids[token] = zlib.crc32(token.encode('utf-8')) + 1
+        return token_id
+
+    def fingerprint(self, content: str, language: str = 'python',
+                    parsed: Optional[ParsedFile] = None) -> List[Fingerprint]:
+        """Winnowed fingerprints of a file or block."""
+        tokens = normalized_tokens(content, language, parsed)
+        return winnow(
+            [self._token_id(text) for text, _ in tokens], [line for _, line in tokens],
+            self.kgram_size, self.window_size
+        )
+
+    def _replace_file(self, conn: sqlite3.Connection, project_id: str, file_path: str,
+                      content: str, file_hash: str, mtime_ns: int, size: int) -> None:
+        fingerprints = self.fingerprint(content, _language_for(file_path))
+        conn.execute("DELETE FROM clone_fingerprints WHERE project_id = ? AND file_path = ?",
+                     (project_id, file_path))
+        conn.executemany(
+            "INSERT INTO clone_fingerprints VALUES (?, ?, ?, ?, ?)",
+            [(project_id, fp.hash, file_path, fp.start_line, fp.end_line) for fp in fingerprints]
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO clone_files VALUES (?, ?, ?, ?, ?, ?)",
+            (project_id, file_path, mtime_ns, size, file_hash, len(fingerprints))
+        )
+
+    def update_file(self, project_id: str, file_path: str, content: str,
+                    mtime_ns: int = 0, size: int = 0) -> bool:
+        """Index a file's current content; returns False if it was already indexed."""
+        file_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT file_hash FROM clone_files WHERE project_id = ? AND file_path = ?",
+                (project_id, file_path)
+            ).fetchone()
+            if row is not None and row[0] == file_hash:
+                return False
+            self._replace_file(conn, project_id, file_path, content, file_hash, mtime_ns, size)
+        return True
+
+    def remove_file(self, project_id: str, file_path: str) -> None:
+        """Drop a deleted file from the index."""
+        with closing(self._connect()) as conn, conn:
+            self._remove_files(conn, project_id, [file_path])
+
+    def _remove_files(self, conn: sqlite3.Connection, project_id: str, file_paths: Iterable[str]) -> None:
+        rows = [(project_id, file_path) for file_path in file_paths]
+        conn.executemany("DELETE FROM clone_fingerprints WHERE project_id = ? AND file_path = ?", rows)
+        conn.executemany("DELETE FROM clone_files WHERE project_id = ? AND file_path = ?", rows)
+
+    def sync_project(self, project_id: str, root: str, extensions: Tuple[str, ...] = ('.py',),
+                     excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS) -> Dict[str, int]:
+        """Bring a project's index up to date with the files under root.
+
+        Files whose mtime and size match the manifest are skipped without being
+        read; paths are stored relative to root.
+        """
+        excluded = set(excluded_dirs)
+        stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+
+        with closing(self._connect()) as conn, conn:
+            manifest = {
+                file_path: (mtime_ns, size, file_hash)
+                for file_path, mtime_ns, size, file_hash in conn.execute(
+                    "SELECT file_path, mtime_ns, size, file_hash FROM clone_files WHERE project_id = ?",
+                    (project_id,)
+                )
+            }
+            seen = set()
+
+            for directory, dir_names, file_names in os.walk(root):
+                dir_names[:] = [name for name in dir_names if name not in excluded]
+                for file_name in file_names:
+                    if not file_name.endswith(extensions):
+                        continue
+                    full_path = os.path.join(directory, file_name)
+                    file_path = Path(os.path.relpath(full_path, root)).as_posix()
+                    seen.add(file_path)
+
+                    try:
+                        stat = os.stat(full_path)
+                        known = manifest.get(file_path)
+                        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                            stats['unchanged'] += 1
+                            continue
+
+                        with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                            content = f.read()
+                        file_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+                        if known and known[2] == file_hash:
+                            # Touched but not changed
+                            conn.execute(
+                                "UPDATE clone_files SET mtime_ns = ?, size = ? WHERE project_id = ? AND file_path = ?",
+                                (stat.st_mtime_ns, stat.st_size, project_id, file_path)
+                            )
+                            stats['unchanged'] += 1
+                            continue
+
+                        self._replace_file(conn, project_id, file_path, content, file_hash,
+                                           stat.st_mtime_ns, stat.st_size)
+                        stats['indexed'] += 1
+                    except OSError as e:
+                        print(f"Error indexing {full_path}: {e}")
+
+            removed = [file_path for file_path in manifest if file_path not in seen]
+            self._remove_files(conn, project_id, removed)
+            stats['removed'] = len(removed)
+
+        return stats
+
+    def find_block(self, project_id: str, content: str, language: str = 'python',
+                   exclude_file: Optional[str] = None, min_similarity: float = 0.5) -> List[CloneMatch]:
+        """Regions of the project that share most of a block's fingerprints.
+
+        Each fingerprint is an index lookup, so the cost depends on the size of
+        the block and the number of matches, not on the size of the project.
+        As in find_clones, fingerprints occurring more than max_occurrences
+        times are boilerplate and take no part in matching or similarity.
+        """
+        query = {fp.hash for fp in self.fingerprint(content, language)}
+        if not query:
+            return []
+
+        rows = []
+        hashes = list(query)
+        with closing(self._connect()) as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                query.difference_update(hash_value for (hash_value,) in conn.execute(
+                    f"SELECT hash FROM clone_fingerprints WHERE project_id = ? AND hash IN ({placeholders}) "
+                    f"GROUP BY hash HAVING COUNT(*) > ?",
+                    [project_id, *chunk, self.max_occurrences]
+                ))
+                rows.extend(conn.execute(
+                    f"SELECT f.hash, f.file_path, f.start_line, f.end_line FROM clone_fingerprints f "
+                    f"JOIN (SELECT hash FROM clone_fingerprints WHERE project_id = ? AND hash IN ({placeholders}) "
+                    f"GROUP BY hash HAVING COUNT(*) <= ?) common ON common.hash = f.hash "
+                    f"WHERE f.project_id = ?",
+                    [project_id, *chunk, self.max_occurrences, project_id]
+                ).fetchall())
+        if not query:
+            return []
+
+        by_file: Dict[str, List[Tuple[int, int, int]]] = defaultdict(list)
+        for hash_value, file_path, start_line, end_line in rows:
+            if file_path != exclude_file:
+                by_file[file_path].append((start_line, end_line, hash_value))
+
+        matches = []
+        for file_path, located in by_file.items():
+            for start_line, end_line, shared in self._regions(located):
+                similarity = len(shared) / len(query)
+                if similarity >= min_similarity:
+                    matches.append(CloneMatch(file_path, start_line, end_line,
+                                              round(similarity, 3), len(shared)))
+
+        matches.sort(key=lambda match: (-match.similarity, match.file_path, match.start_line))
+        return matches
+
+    @staticmethod
+    def _regions(located: List[Tuple[int, int, int]]) -> List[Tuple[int, int, set]]:
+        """Merge overlapping or adjacent fingerprint spans into regions."""
+        regions: List[Tuple[int, int, set]] = []
+        for start_line, end_line, hash_value in sorted(located):
+            if regions and start_line <= regions[-1][1] + 1:
+                region_start, region_end, shared = regions[-1]
+                shared.add(hash_value)
+                regions[-1] = (region_start, max(region_end, end_line), shared)
+            else:
+                regions.append((start_line, end_line, {hash_value}))
+        return regions
+
+    def find_clones(self, project_id: str, min_fingerprints: int = 3) -> List[ClonePair]:
+        """Every pair of project regions sharing at least min_fingerprints fingerprints.
+
+        Only hashes that occur more than once are read, so the work grows with
+        the amount of duplicated code rather than with the square of the file count.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT f.hash, f.file_path, f.start_line, f.end_line
+                FROM clone_fingerprints f
+                JOIN (
+                    SELECT hash FROM clone_fingerprints WHERE project_id = ?
+                    GROUP BY hash HAVING COUNT(*) BETWEEN 2 AND ?
+                ) shared ON shared.hash = f.hash
+                WHERE f.project_id = ?
+                ORDER BY f.hash
+            """, (project_id, self.max_occurrences, project_id)).fetchall()
+
+        groups: Dict[int, List[Tuple[str, int, int]]] = defaultdict(list)
+        for hash_value, file_path, start_line, end_line in rows:
+            groups[hash_value].append((file_path, start_line, end_line))
+
+        # (file_a, file_b) -> [(start_a, end_a, start_b, end_b)]
+        pairs: Dict[Tuple[str, str], List[Tuple[int, int, int, int]]] = defaultdict(list)
+        for occurrences in groups.values():
+            for a, b in combinations(sorted(occurrences), 2):
+                pairs[(a[0], b[0])].append((a[1], a[2], b[1], b[2]))
+
+        clones = []
+        for (file_a, file_b), spans in pairs.items():
+            regions: List[ClonePair] = []
+            for start_a, end_a, start_b, end_b in sorted(spans):
+                region = regions[-1] if regions else None
+                # Extend the last region while both sides stay contiguous
+                if (region and start_a <= region.end_a + 1
+                        and region.start_b - 1 <= end_b and start_b <= region.end_b + 1):
+                    region.end_a = max(region.end_a, end_a)
+                    region.start_b = min(region.start_b, start_b)
+                    region.end_b = max(region.end_b, end_b)
+                    region.shared_fingerprints += 1
+                else:
+                    regions.append(ClonePair(file_a, start_a, end_a, file_b, start_b, end_b, 1))
+            clones.extend(region for region in regions if region.shared_fingerprints >= min_fingerprints)
+
+        clones.sort(key=lambda clone: -clone.shared_fingerprints)
+        return clones
+
+    def duplicate_ratio(self, project_id: str) -> float:
+        """Fraction of a project's fingerprints that also occur elsewhere in it."""
+        with closing(self._connect()) as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM clone_fingerprints WHERE project_id = ?", (project_id,)
+            ).fetchone()[0]
+            duplicated = conn.execute("""
+                SELECT COALESCE(SUM(occurrences), 0) FROM (
+                    SELECT COUNT(*) AS occurrences FROM clone_fingerprints WHERE project_id = ?
+                    GROUP BY hash HAVING COUNT(*) > 1
+                )
+            """, (project_id,)).fetchone()[0]
+        return duplicated / total if total else 0.0
+
+    def clear(self, project_id: Optional[str] = None) -> None:
+        """Remove one project's entries, or everything."""
+        with closing(self._connect()) as conn, conn:
+            if project_id is None:
+                conn.execute("DELETE FROM clone_fingerprints")
+                conn.execute("DELETE FROM clone_files")
+            else:
+                conn.execute("DELETE FROM clone_fingerprints WHERE project_id = ?", (project_id,))
+                conn.execute("DELETE FROM clone_files WHERE project_id = ?", (project_id,))
+
+    def get_stats(self, project_id: Optional[str] = None) -> Dict[str, int]:
+        """Indexed file and fingerprint counts."""
+        where, params = ("WHERE project_id = ?", (project_id,)) if project_id else ("", ())
+        with closing(self._connect()) as conn:
+            files = conn.execute(f"SELECT COUNT(*) FROM clone_files {where}", params).fetchone()[0]
+            fingerprints = conn.execute(f"SELECT COUNT(*) FROM clone_fingerprints {where}", params).fetchone()[0]
+        return {'files': files, 'fingerprints': fingerprints}
+
+
+_clone_index: Optional[CloneIndex] = None
+
+
+def get_clone_index() -> Optional[CloneIndex]:
+    """Get or create the global clone index; None when disabled."""
+    global _clone_index
+    if not settings.clone_index_enabled:
+        return None
+    if _clone_index is None:
+        _clone_index = CloneIndex(
+            db_path=settings.clone_index_path,
+            kgram_size=settings.clone_index_kgram_size,
+            window_size=settings.clone_index_window_size
+        )
+    return _clone_index
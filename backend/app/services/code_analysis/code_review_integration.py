@@ -5,6 +5,7 @@ Implements pre-commit hooks, pull request integration, and quality gate enforcem
 
 import os
 import json
+import asyncio
 import subprocess
 import tempfile
 import shutil
@@ -17,11 +18,31 @@ from enum import Enum
 
 from .scanning_framework import CodeScanningFramework, ScanConfiguration, ScanResult
 from .auto_fix_engine import AutoFixEngine, FixApplicationResult
+from .incremental_review import IncrementalReviewAnalyzer
 from ..quality_issue_tracker import QualityIssueTracker
 from app.models.quality import QualityIssue, Severity, IssueStatus
 from app.core.quality_config import QualityConfigManager
 
 
+def _issues_in_working_tree(scan_result: ScanResult) -> List[QualityIssue]:
+    """Issues from files whose working copy holds exactly the analyzed content.
+    
+    Incremental reviews analyze index or branch blobs while fixes are written
+    to the working tree, so a file edited since (or a branch not checked out)
+    would be patched at the wrong lines.
+    """
+    issues = []
+    for result in scan_result.analysis_results:
+        try:
+            with open(result.context.file_path, encoding='utf-8') as f:
+                if f.read() != result.context.file_content:
+                    continue
+        except (OSError, UnicodeDecodeError):
+            continue
+        issues.extend(result.issues)
+    return issues
+
+
 class ReviewStatus(str, Enum):
     """Status of code review checks."""
     PASSED = "passed"
@@ -311,12 +332,15 @@ class PreCommitHookManager:
         self.gate_evaluator = QualityGateEvaluator()
         self.git_manager = GitHookManager(project_path)
     
-    async def run_pre_commit_checks(self, quality_gate: str = "standard") -> PreCommitResult:
+    async def run_pre_commit_checks(self, quality_gate: str = "standard",
+                                    incremental: bool = False) -> PreCommitResult:
         """
         Run comprehensive pre-commit quality checks.
         
         Args:
             quality_gate: Name of quality gate to evaluate
+            incremental: Report only issues introduced by the staged hunks
+                instead of every issue in the changed files
             
         Returns:
             PreCommitResult with check results
@@ -324,8 +348,13 @@ class PreCommitHookManager:
         start_time = datetime.now()
         
         try:
-            # Get changed files
-            changed_files = self.git_manager.get_changed_files()
+            if incremental:
+                analyzer = IncrementalReviewAnalyzer(self.project_path, self.project_id, self.scanner)
+                incremental_result = await analyzer.analyze_staged(self._should_scan_file)
+                changed_files = list(incremental_result.file_diffs)
+            else:
+                # Get changed files
+                changed_files = await asyncio.to_thread(self.git_manager.get_changed_files)
             
             if not changed_files:
                 return PreCommitResult(
@@ -337,20 +366,23 @@ class PreCommitHookManager:
                     messages=["No files to check"]
                 )
             
-            # Configure scan for changed files only
-            config = ScanConfiguration(
-                project_id=self.project_id,
-                project_path=self.project_path,
-                file_patterns=[f for f in changed_files if self._should_scan_file(f)]
-            )
-            
-            # Run quality scan
-            scan_result = await self.scanner.scan_project(config)
+            if incremental:
+                scan_result = incremental_result.scan_result
+            else:
+                # Configure scan for changed files only
+                config = ScanConfiguration(
+                    project_id=self.project_id,
+                    project_path=self.project_path,
+                    file_patterns=[f for f in changed_files if self._should_scan_file(f)]
+                )
+                
+                # Run quality scan
+                scan_result = await self.scanner.scan_project(config)
             
             # Apply auto-fixes if issues found
             fix_result = None
             if scan_result.total_issues > 0:
-                fix_result = await self._apply_auto_fixes(scan_result)
+                fix_result = await self._apply_auto_fixes(scan_result, working_tree_only=incremental)
             
             # Evaluate quality gate
             gate_result, gate_reasons = self.gate_evaluator.evaluate_gate(
@@ -419,15 +451,21 @@ class PreCommitHookManager:
         
         return True
     
-    async def _apply_auto_fixes(self, scan_result: ScanResult) -> Optional[FixApplicationResult]:
-        """Apply auto-fixes to issues found in scan."""
+    async def _apply_auto_fixes(self, scan_result: ScanResult,
+                                working_tree_only: bool = False) -> Optional[FixApplicationResult]:
+        """Apply auto-fixes to issues found in scan.
+        
+        With working_tree_only, only files whose working copy matches the
+        analyzed content are fixed.
+        """
         try:
+            if working_tree_only:
+                issues = await asyncio.to_thread(_issues_in_working_tree, scan_result)
+            else:
+                issues = [issue for result in scan_result.analysis_results for issue in result.issues]
+            
             # Collect all auto-fixable issues
-            fixable_issues = []
-            for result in scan_result.analysis_results:
-                for issue in result.issues:
-                    if issue.auto_fixable:
-                        fixable_issues.append(issue)
+            fixable_issues = [issue for issue in issues if issue.auto_fixable]
             
             if not fixable_issues:
                 return None
@@ -496,7 +534,7 @@ from backend.app.services.code_analysis.code_review_integration import PreCommit
 
 async def main():
     manager = PreCommitHookManager('{self.project_path}', '{self.project_id}')
-    result = await manager.run_pre_commit_checks()
+    result = await manager.run_pre_commit_checks(incremental=True)
     
     print(f'Quality check result: {{result.status.value}}')
     print(f'Issues found: {{result.issues_found}}')
@@ -586,7 +624,8 @@ class PullRequestIntegration:
         self.gate_evaluator = QualityGateEvaluator()
     
     async def analyze_pull_request(self, pr_id: str, base_branch: str, 
-                                 head_branch: str, quality_gate: str = "standard") -> PullRequestAnalysis:
+                                 head_branch: str, quality_gate: str = "standard",
+                                 incremental: bool = False) -> PullRequestAnalysis:
         """
         Analyze a pull request for quality issues and improvements.
         
@@ -595,6 +634,8 @@ class PullRequestIntegration:
             base_branch: Base branch name
             head_branch: Head branch name
             quality_gate: Quality gate to evaluate against
+            incremental: Compare changed hunks against the merge base, so that
+                new_issues holds only introduced issues and fixed_issues is filled
             
         Returns:
             PullRequestAnalysis with comprehensive results
@@ -602,22 +643,33 @@ class PullRequestIntegration:
         analysis_start = datetime.now(timezone.utc)
         
         try:
-            # Get changed files between branches
-            changed_files = self._get_changed_files_between_branches(base_branch, head_branch)
-            
-            # Scan changed files
-            config = ScanConfiguration(
-                project_id=self.project_id,
-                project_path=self.project_path,
-                file_patterns=changed_files
-            )
-            
-            scan_result = await self.scanner.scan_project(config)
+            fixed_issues = []
+            
+            if incremental:
+                analyzer = IncrementalReviewAnalyzer(self.project_path, self.project_id, self.scanner)
+                incremental_result = await analyzer.analyze_branches(base_branch, head_branch)
+                changed_files = list(incremental_result.file_diffs)
+                scan_result = incremental_result.scan_result
+                fixed_issues = incremental_result.fixed_issues
+            else:
+                # Get changed files between branches
+                changed_files = await asyncio.to_thread(
+                    self._get_changed_files_between_branches, base_branch, head_branch
+                )
+                
+                # Scan changed files
+                config = ScanConfiguration(
+                    project_id=self.project_id,
+                    project_path=self.project_path,
+                    file_patterns=changed_files
+                )
+                
+                scan_result = await self.scanner.scan_project(config)
             
             # Apply auto-fixes
             auto_fixes_applied = 0
             if scan_result.total_issues > 0:
-                fix_result = await self._apply_auto_fixes_for_pr(scan_result)
+                fix_result = await self._apply_auto_fixes_for_pr(scan_result, working_tree_only=incremental)
                 if fix_result:
                     auto_fixes_applied = fix_result.fixes_applied
             
@@ -648,7 +700,7 @@ class PullRequestIntegration:
                 overall_status=overall_status,
                 quality_gate_result=gate_result,
                 new_issues=[issue for result in scan_result.analysis_results for issue in result.issues],
-                fixed_issues=[],  # Would need baseline comparison
+                fixed_issues=fixed_issues,  # Only computed in incremental mode
                 quality_score_change=quality_score_change,
                 coverage_change=0.0,  # Would need coverage comparison
                 complexity_change=0.0,  # Would need complexity comparison
@@ -694,15 +746,24 @@ class PullRequestIntegration:
             print(f"Failed to get changed files: {e}")
             return []
     
-    async def _apply_auto_fixes_for_pr(self, scan_result: ScanResult) -> Optional[FixApplicationResult]:
-        """Apply auto-fixes for pull request analysis."""
+    async def _apply_auto_fixes_for_pr(self, scan_result: ScanResult,
+                                       working_tree_only: bool = False) -> Optional[FixApplicationResult]:
+        """Apply auto-fixes for pull request analysis.
+        
+        With working_tree_only, only files whose working copy matches the
+        analyzed content are fixed.
+        """
         # Similar to pre-commit auto-fixes but may be more conservative
         try:
-            fixable_issues = []
-            for result in scan_result.analysis_results:
-                for issue in result.issues:
-                    if issue.auto_fixable and issue.severity not in [Severity.CRITICAL]:
-                        fixable_issues.append(issue)
+            if working_tree_only:
+                issues = await asyncio.to_thread(_issues_in_working_tree, scan_result)
+            else:
+                issues = [issue for result in scan_result.analysis_results for issue in result.issues]
+            
+            fixable_issues = [
+                issue for issue in issues
+                if issue.auto_fixable and issue.severity not in [Severity.CRITICAL]
+            ]
             
             if fixable_issues:
                 return await self.auto_fixer.apply_fixes_to_issues(fixable_issues)
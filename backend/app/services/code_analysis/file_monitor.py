@@ -5,11 +5,12 @@ File system monitoring for real-time code analysis.
 import os
 import time
 import asyncio
+import inspect
 import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Callable, Any
+from typing import Awaitable, Dict, List, Optional, Set, Callable, Any, Union
 from enum import Enum
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileSystemEvent
@@ -45,8 +46,25 @@ class FileChangeEvent:
                 self.file_size = None
 
 
+BatchCallback = Callable[[List[FileChangeEvent]], Union[None, Awaitable[None]]]
+
+
 class FileSystemMonitor:
-    """Monitors file system changes for real-time code analysis."""
+    """Monitors file system changes for real-time code analysis.
+    
+    Watchdog delivers events on its observer thread; they are handed to the
+    event loop with call_soon_threadsafe into a bounded queue. Both the
+    hand-off and the queue hold at most max_queue_size events, and events
+    beyond that are dropped and counted. The loop folds queued events
+    into one pending change per path, so a save storm, a branch switch or a
+    code generator rewriting a tree produces a single batch once the
+    project has been quiet for debounce_delay. A busy tree is still flushed
+    every batch_timeout seconds, and as soon as batch_size paths are pending.
+    
+    Dropped changes are lost, so once drops have stopped for debounce_delay
+    the next batch also reports every watched file as modified, marked with
+    metadata['resync'].
+    """
     
     def __init__(self, project_path: str, project_id: str):
         self.project_path = Path(project_path).resolve()
@@ -81,14 +99,33 @@ class FileSystemMonitor:
         self.change_callbacks: List[Callable[[FileChangeEvent], None]] = []
         self.analysis_callbacks: List[Callable[[str, List[QualityIssue]], None]] = []
         
-        # Event queue for batch processing
-        self.event_queue: asyncio.Queue = asyncio.Queue()
-        self.batch_size = 10
-        self.batch_timeout = 5.0  # seconds
+        self.batch_callbacks: List[BatchCallback] = []
+        
+        # Bounded hand-off from the observer thread, then per-path coalescing
+        self.max_queue_size = 10000
+        self.event_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.batch_size = 1000  # pending paths that force a flush
+        self.batch_timeout = 5.0  # seconds; longest a change waits during a burst
+        self.debounce_delay = 0.5  # seconds of quiet before a batch is flushed
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._process_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, FileChangeEvent] = {}
+        self._first_pending_at: Optional[float] = None
+        self._last_event_at: Optional[float] = None
+        self._dropping = False
+        self._in_transit = 0  # handed off by the observer, not yet queued
+        self._handoff_lock = threading.Lock()
+        self._resync_needed = False
+        self._last_drop_at: Optional[float] = None
         
         # Statistics
         self.stats = {
+            'events_received': 0,
+            'events_dropped': 0,
+            'resyncs': 0,
+            'events_coalesced': 0,
             'events_processed': 0,
+            'batches_processed': 0,
             'files_analyzed': 0,
             'analysis_errors': 0,
             'start_time': None,
@@ -99,6 +136,14 @@ class FileSystemMonitor:
         """Add a callback for file change events."""
         self.change_callbacks.append(callback)
     
+    def add_batch_callback(self, callback: BatchCallback) -> None:
+        """Add a callback that receives each coalesced batch of changes.
+        
+        The callback may be a coroutine function; it is awaited before the
+        next batch is delivered.
+        """
+        self.batch_callbacks.append(callback)
+    
     def add_analysis_callback(self, callback: Callable[[str, List[QualityIssue]], None]) -> None:
         """Add a callback for analysis results."""
         self.analysis_callbacks.append(callback)
@@ -145,12 +190,14 @@ class FileSystemMonitor:
             recursive=True
         )
         
+        # Events arrive on the observer thread and are handed to this loop
+        self._loop = asyncio.get_running_loop()
         self.observer.start()
         self.is_monitoring = True
         self.stats['start_time'] = datetime.now(timezone.utc)
         
         # Start event processing task
-        asyncio.create_task(self._process_events())
+        self._process_task = asyncio.create_task(self._process_events())
     
     def stop_monitoring(self) -> None:
         """Stop monitoring the file system."""
@@ -160,73 +207,246 @@ class FileSystemMonitor:
         self.observer.stop()
         self.observer.join()
         self.is_monitoring = False
+        
+        if self._process_task is not None:
+            self._process_task.cancel()
+            self._process_task = None
     
     async def _process_events(self) -> None:
-        """Process file change events in batches."""
-        batch = []
-        last_batch_time = time.time()
-        
+        """Coalesce queued events and flush them as batches."""
         while self.is_monitoring:
             try:
-                # Wait for events with timeout
-                try:
-                    event = await asyncio.wait_for(
-                        self.event_queue.get(),
-                        timeout=1.0
-                    )
-                    batch.append(event)
-                except asyncio.TimeoutError:
-                    pass
-                
-                current_time = time.time()
+                delay = self._time_until_flush()
+                if delay is None or delay > 0:
+                    try:
+                        event = await asyncio.wait_for(self.event_queue.get(), timeout=delay)
+                        self._coalesce(event)
+                        self._drain_queue()
+                    except asyncio.TimeoutError:
+                        pass
                 
-                # Process batch if it's full or timeout reached
-                if (len(batch) >= self.batch_size or 
-                    (batch and current_time - last_batch_time >= self.batch_timeout)):
-                    
-                    await self._process_event_batch(batch)
-                    batch.clear()
-                    last_batch_time = current_time
+                delay = self._time_until_flush()
+                if delay is not None and delay <= 0:
+                    await self.flush()
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 print(f"Error processing events: {e}")
                 self.stats['analysis_errors'] += 1
     
+    def _time_until_flush(self) -> Optional[float]:
+        """Seconds until pending changes are due; None when nothing is pending."""
+        if not self._pending:
+            if self._resync_needed:
+                return max(0.0, self._last_drop_at + self.debounce_delay - time.monotonic())
+            return None
+        if len(self._pending) >= self.batch_size:
+            return 0.0
+        
+        due = min(self._last_event_at + self.debounce_delay,
+                  self._first_pending_at + self.batch_timeout)
+        return max(0.0, due - time.monotonic())
+    
+    def _drain_queue(self) -> None:
+        """Coalesce everything already queued without waiting."""
+        while not self.event_queue.empty():
+            self._coalesce(self.event_queue.get_nowait())
+    
+    def _coalesce(self, event: FileChangeEvent) -> None:
+        """Fold an event into the pending change for its path.
+        
+        Repeated modifications collapse into one, a file created and deleted
+        before a flush disappears, a delete followed by a create becomes a
+        modification, and renames are followed through chains so a file
+        moved A -> B -> C is reported once as moved from A to C.
+        """
+        now = time.monotonic()
+        if not self._pending:
+            self._first_pending_at = now
+        self._last_event_at = now
+        
+        if event.event_type == FileChangeType.MOVED and event.old_path:
+            self._coalesce_move(event)
+            return
+        
+        previous = self._pending.get(event.file_path)
+        if previous is None:
+            self._pending[event.file_path] = event
+            return
+        
+        self.stats['events_coalesced'] += 1
+        if event.event_type == FileChangeType.DELETED:
+            del self._pending[event.file_path]
+            if previous.event_type == FileChangeType.MOVED:
+                # The moved file is gone, so its original path is what was deleted
+                # (or replaced, if something has been created there since)
+                replaced = previous.old_path in self._pending
+                self._set_pending(FileChangeType.MODIFIED if replaced else FileChangeType.DELETED,
+                                  previous.old_path, previous.is_directory)
+            elif previous.event_type != FileChangeType.CREATED:
+                self._pending[event.file_path] = event
+        elif previous.event_type == FileChangeType.DELETED:
+            self._set_pending(FileChangeType.MODIFIED, event.file_path, event.is_directory)
+        # Otherwise a created, modified or moved change absorbs the newer event
+    
+    def _coalesce_move(self, event: FileChangeEvent) -> None:
+        """Fold a rename into pending changes for its source and destination."""
+        if not event.is_directory and not self.should_monitor_file(event.file_path):
+            # Renamed to something unwatched, e.g. a backup file
+            self._coalesce(FileChangeEvent(
+                event_type=FileChangeType.DELETED,
+                file_path=event.old_path,
+                timestamp=event.timestamp
+            ))
+            return
+        
+        previous = self._pending.pop(event.old_path, None)
+        if previous is not None:
+            self.stats['events_coalesced'] += 1
+        
+        if previous is not None and previous.event_type == FileChangeType.MOVED:
+            origin = previous.old_path
+        elif previous is not None and previous.event_type == FileChangeType.CREATED:
+            origin = None
+        elif not event.is_directory and not self.should_monitor_file(event.old_path):
+            # e.g. an editor's temporary file renamed over the real one
+            origin = None
+        else:
+            origin = event.old_path
+        
+        replaced = self._pending.get(event.file_path)
+        if replaced is not None:
+            self.stats['events_coalesced'] += 1
+        
+        if origin == event.file_path or (origin is None and replaced is not None):
+            self._set_pending(FileChangeType.MODIFIED, event.file_path, event.is_directory)
+        elif origin is None:
+            self._set_pending(FileChangeType.CREATED, event.file_path, event.is_directory)
+        else:
+            self._set_pending(FileChangeType.MOVED, event.file_path, event.is_directory, origin)
+    
+    def _set_pending(self, event_type: FileChangeType, file_path: str, is_directory: bool,
+                     old_path: Optional[str] = None) -> None:
+        self._pending[file_path] = FileChangeEvent(
+            event_type=event_type,
+            file_path=file_path,
+            old_path=old_path,
+            is_directory=is_directory
+        )
+    
+    async def flush(self) -> None:
+        """Deliver all queued and pending changes now."""
+        self._drain_queue()
+        if self._resync_needed and time.monotonic() - self._last_drop_at >= self.debounce_delay:
+            self._resync_needed = False
+            await self._add_resync_events()
+        if not self._pending:
+            return
+        
+        batch = list(self._pending.values())
+        self._pending = {}
+        self._first_pending_at = None
+        await self._process_event_batch(batch)
+    
+    async def _add_resync_events(self) -> None:
+        """Mark every watched file as modified to cover changes that were dropped."""
+        paths = await asyncio.to_thread(self._list_watched_files)
+        for file_path in paths:
+            if file_path not in self._pending:
+                self._coalesce(FileChangeEvent(
+                    event_type=FileChangeType.MODIFIED,
+                    file_path=file_path,
+                    metadata={'resync': True}
+                ))
+        self.stats['resyncs'] += 1
+        print(f"Resyncing {len(paths)} files after dropped events")
+    
+    def _list_watched_files(self) -> List[str]:
+        """Walk the project for files that would be monitored."""
+        paths = []
+        for root, dirs, files in os.walk(self.project_path):
+            dirs[:] = [d for d in dirs if self.should_monitor_directory(os.path.join(root, d))]
+            paths.extend(
+                os.path.join(root, name) for name in files
+                if self.should_monitor_file(os.path.join(root, name))
+            )
+        return paths
+    
     async def _process_event_batch(self, events: List[FileChangeEvent]) -> None:
-        """Process a batch of file change events."""
-        # Group events by file to avoid duplicate processing
-        file_events = {}
-        for event in events:
-            if event.file_path not in file_events:
-                file_events[event.file_path] = []
-            file_events[event.file_path].append(event)
+        """Hand a coalesced batch to the batch and per-event callbacks."""
+        self.stats['events_processed'] += len(events)
+        self.stats['batches_processed'] += 1
+        self.stats['last_event_time'] = max(event.timestamp for event in events)
         
-        # Process each file's events
-        for file_path, file_event_list in file_events.items():
+        for callback in self.batch_callbacks:
             try:
-                # Get the latest event for this file
-                latest_event = max(file_event_list, key=lambda e: e.timestamp)
-                
-                # Notify callbacks
-                for callback in self.change_callbacks:
-                    try:
-                        callback(latest_event)
-                    except Exception as e:
-                        print(f"Error in change callback: {e}")
-                
-                self.stats['events_processed'] += 1
-                self.stats['last_event_time'] = latest_event.timestamp
-                
+                result = callback(events)
+                if inspect.isawaitable(result):
+                    await result
             except Exception as e:
-                print(f"Error processing file events for {file_path}: {e}")
+                print(f"Error in batch callback: {e}")
                 self.stats['analysis_errors'] += 1
+        
+        for event in events:
+            for callback in self.change_callbacks:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in change callback: {e}")
     
     def _queue_event(self, event: FileChangeEvent) -> None:
-        """Queue a file change event for processing."""
+        """Queue a file change event for processing; safe to call from any thread."""
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if loop is None or running is loop:
+            self._enqueue(event)
+            return
+        
+        # Bound what is waiting on the loop, so a stalled loop cannot pile up callbacks
+        with self._handoff_lock:
+            if self._in_transit >= self.max_queue_size:
+                self._record_drop()
+                return
+            self._in_transit += 1
+        
+        try:
+            loop.call_soon_threadsafe(self._receive, event)
+        except RuntimeError:
+            # The loop has been closed under the observer
+            with self._handoff_lock:
+                self._in_transit -= 1
+                self._record_drop()
+    
+    def _receive(self, event: FileChangeEvent) -> None:
+        """Take an event handed off by the observer thread."""
+        with self._handoff_lock:
+            self._in_transit -= 1
+        self._enqueue(event)
+    
+    def _enqueue(self, event: FileChangeEvent) -> None:
+        """Put an event on the bounded queue, counting it as dropped when full."""
         try:
             self.event_queue.put_nowait(event)
         except asyncio.QueueFull:
-            print("Event queue is full, dropping event")
+            self._record_drop()
+            return
+        
+        self._dropping = False
+        self.stats['events_received'] += 1
+    
+    def _record_drop(self) -> None:
+        """Count a dropped event and schedule a resync to recover it."""
+        self.stats['events_dropped'] += 1
+        self._resync_needed = True
+        self._last_drop_at = time.monotonic()
+        if not self._dropping:
+            print("Event queue is full, dropping events")
+            self._dropping = True
     
     def get_monitoring_stats(self) -> Dict[str, Any]:
         """Get monitoring statistics."""
@@ -237,6 +457,9 @@ class FileSystemMonitor:
         
         stats['is_monitoring'] = self.is_monitoring
         stats['queue_size'] = self.event_queue.qsize()
+        stats['events_in_transit'] = self._in_transit
+        stats['resync_pending'] = self._resync_needed
+        stats['pending_changes'] = len(self._pending)
         stats['watched_extensions'] = list(self.watched_extensions)
         stats['ignored_patterns'] = list(self.ignored_patterns)
         
@@ -258,6 +481,13 @@ class FileSystemMonitor:
         
         if 'batch_timeout' in config:
             self.batch_timeout = config['batch_timeout']
+        
+        if 'debounce_delay' in config:
+            self.debounce_delay = config['debounce_delay']
+        
+        if 'max_queue_size' in config and not self.is_monitoring:
+            self.max_queue_size = config['max_queue_size']
+            self.event_queue = asyncio.Queue(maxsize=self.max_queue_size)
 
 
 class CodeAnalysisEventHandler(FileSystemEventHandler):
@@ -347,14 +577,15 @@ class RealTimeAnalysisCoordinator:
         self.analysis_queue: asyncio.Queue = asyncio.Queue()
         self.is_running = False
         
-        # Debouncing to avoid excessive analysis
+        # Quiet period the monitors wait for before handing over a batch
         self.debounce_delay = 2.0  # seconds
-        self.pending_analyses: Dict[str, float] = {}  # file_path -> timestamp
+        self.pending_analyses: Dict[str, float] = {}  # file_path -> time queued
     
     def add_project_monitor(self, project_path: str) -> FileSystemMonitor:
         """Add a file system monitor for a project."""
         monitor = FileSystemMonitor(project_path, self.project_id)
-        monitor.add_change_callback(self._on_file_change)
+        monitor.debounce_delay = self.debounce_delay
+        monitor.add_batch_callback(self._on_file_batch)
         self.monitors[project_path] = monitor
         return monitor
     
@@ -373,27 +604,17 @@ class RealTimeAnalysisCoordinator:
         
         self.is_running = False
     
-    def _on_file_change(self, event: FileChangeEvent) -> None:
-        """Handle file change events."""
-        if event.event_type in [FileChangeType.MODIFIED, FileChangeType.CREATED]:
-            # Schedule analysis with debouncing
-            current_time = time.time()
-            self.pending_analyses[event.file_path] = current_time
-            
-            # Schedule debounced analysis
-            asyncio.create_task(self._debounced_analysis(event.file_path, current_time))
-    
-    async def _debounced_analysis(self, file_path: str, schedule_time: float) -> None:
-        """Perform debounced analysis of a file."""
-        await asyncio.sleep(self.debounce_delay)
-        
-        # Check if this is still the latest schedule for this file
-        if (file_path in self.pending_analyses and 
-            self.pending_analyses[file_path] == schedule_time):
+    def _on_file_batch(self, events: List[FileChangeEvent]) -> None:
+        """Queue each file a batch created, modified or moved, once."""
+        current_time = time.time()
+        for event in events:
+            if event.is_directory or event.event_type == FileChangeType.DELETED:
+                continue
+            if event.file_path in self.pending_analyses:
+                continue  # Still waiting in the queue from an earlier batch
             
-            # Queue for analysis
-            await self.analysis_queue.put(file_path)
-            del self.pending_analyses[file_path]
+            self.pending_analyses[event.file_path] = current_time
+            self.analysis_queue.put_nowait(event.file_path)
     
     async def _process_analysis_queue(self) -> None:
         """Process the analysis queue."""
@@ -403,6 +624,7 @@ class RealTimeAnalysisCoordinator:
                     self.analysis_queue.get(),
                     timeout=1.0
                 )
+                self.pending_analyses.pop(file_path, None)
                 
                 # Trigger analysis (this would integrate with the scanning framework)
                 print(f"Analyzing file: {file_path}")
@@ -0,0 +1,322 @@
+"""
+Hunk-aware incremental analysis for pre-commit hooks and pull requests.
+"""
+
+import ast
+import asyncio
+import re
+import subprocess
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .base_analyzer import AnalysisContext, AnalysisResult
+from .parsed_file import ParsedFile
+from .scanning_framework import CodeScanningFramework, ScanConfiguration, ScanResult
+from app.models.quality import QualityIssue
+
+LineRange = Tuple[int, int]
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+@dataclass
+class FileDiff:
+    """Line ranges a diff touched in one file, on each side."""
+    path: str
+    old_path: Optional[str] = None  # None for added files
+    old_ranges: List[LineRange] = field(default_factory=list)
+    new_ranges: List[LineRange] = field(default_factory=list)
+
+
+@dataclass
+class IncrementalScanResult:
+    """Issues a change introduced and removed, with the scan they were found in."""
+    scan_result: ScanResult
+    file_diffs: Dict[str, FileDiff]
+    introduced_issues: List[QualityIssue] = field(default_factory=list)
+    fixed_issues: List[QualityIssue] = field(default_factory=list)
+
+
+def _hunk_range(start: int, count: int) -> LineRange:
+    # A zero-length side is an insertion/deletion point; keep the line it sits on
+    if count == 0:
+        return (max(start, 1), max(start, 1))
+    return (start, start + count - 1)
+
+
+def parse_unified_diff(diff_text: str) -> Dict[str, FileDiff]:
+    """Changed line ranges per file from `git diff -U0` output, keyed by new path.
+
+    Deleted files are omitted.
+    """
+    diffs: Dict[str, FileDiff] = {}
+    old_path: Optional[str] = None
+    current: Optional[FileDiff] = None
+
+    for line in diff_text.split('\n'):
+        if line.startswith('--- '):
+            source = line[4:].strip()
+            old_path = None if source == '/dev/null' else source[2:]
+            current = None
+        elif line.startswith('+++ '):
+            target = line[4:].strip()
+            current = None
+            if target != '/dev/null':
+                current = FileDiff(path=target[2:], old_path=old_path)
+                diffs[current.path] = current
+        elif current is not None:
+            match = HUNK_HEADER.match(line)
+            if match:
+                old_start, old_count, new_start, new_count = match.groups()
+                old_count = 1 if old_count is None else int(old_count)
+                new_count = 1 if new_count is None else int(new_count)
+                if current.old_path is not None:
+                    current.old_ranges.append(_hunk_range(int(old_start), old_count))
+                current.new_ranges.append(_hunk_range(int(new_start), new_count))
+
+    return diffs
+
+
+def expand_to_scopes(parsed: ParsedFile, ranges: Iterable[LineRange]) -> List[LineRange]:
+    """Widen each range to the innermost function or class around its ends."""
+    scopes = []
+    for node in parsed.nodes_of(*SCOPE_NODES):
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+        scopes.append((start, node.end_lineno))
+
+    def innermost(line: int) -> Optional[LineRange]:
+        containing = [scope for scope in scopes if scope[0] <= line <= scope[1]]
+        return min(containing, key=lambda scope: scope[1] - scope[0]) if containing else None
+
+    expanded = []
+    for start, end in ranges:
+        start_scope, end_scope = innermost(start), innermost(end)
+        expanded.append((
+            min(start, start_scope[0]) if start_scope else start,
+            max(end, end_scope[1]) if end_scope else end
+        ))
+    return merge_ranges(expanded)
+
+
+def merge_ranges(ranges: Iterable[LineRange]) -> List[LineRange]:
+    """Sort ranges and merge overlapping or adjacent ones."""
+    merged: List[LineRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _in_ranges(line_number: Optional[int], ranges: List[LineRange]) -> bool:
+    # File-level issues (no line) count as touched by any change to the file
+    if line_number is None:
+        return True
+    return any(start <= line_number <= end for start, end in ranges)
+
+
+def _fingerprint(issue: QualityIssue, lines: List[str]) -> Tuple[str, str, str]:
+    """Identity of an issue that survives the code around it moving."""
+    text = ""
+    if issue.line_number and 0 < issue.line_number <= len(lines):
+        text = lines[issue.line_number - 1].strip()
+    return (issue.category, issue.description, text)
+
+
+class IncrementalReviewAnalyzer:
+    """Analyze what a diff touched and report only the issues it introduced.
+
+    Files are read straight from git (index, commit or branch), so the working
+    tree is never scanned. Each side of a changed file is analyzed through the
+    scanner with its content-hash result cache, so the base side is normally a
+    cache hit. An issue counts as introduced when it lies in a changed hunk or
+    the function/class enclosing one, and the base file has no issue with the
+    same rule, message and line text; fixed issues are found the same way in
+    reverse.
+    """
+
+    def __init__(self, repo_path: str, project_id: str,
+                 scanner: Optional[CodeScanningFramework] = None):
+        self.repo_path = Path(repo_path)
+        self.project_id = project_id
+        self.scanner = scanner or CodeScanningFramework()
+
+    def _git(self, *args: str, input_text: Optional[str] = None) -> str:
+        result = subprocess.run(
+            ["git", *args], cwd=self.repo_path, capture_output=True,
+            text=True, input=input_text
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def get_file_diffs(self, *diff_args: str) -> Dict[str, FileDiff]:
+        """Changed line ranges for `git diff <diff_args>`."""
+        # --relative keeps paths relative to (and limited to) the project directory
+        output = self._git("diff", "-U0", "--no-color", "--no-ext-diff", "--relative", *diff_args)
+        return parse_unified_diff(output)
+
+    def read_blobs(self, specs: List[str]) -> Dict[str, Optional[str]]:
+        """Contents of `<rev>:./<path>` specs in one git call; None when missing."""
+        if not specs:
+            return {}
+
+        process = subprocess.run(
+            ["git", "cat-file", "--batch"], cwd=self.repo_path, capture_output=True,
+            input="\n".join(specs).encode() + b"\n"
+        )
+        output = process.stdout
+        blobs: Dict[str, Optional[str]] = {}
+        position = 0
+
+        for spec in specs:
+            end = output.index(b"\n", position)
+            header = output[position:end].decode().split()
+            position = end + 1
+            if len(header) != 3 or header[1] != "blob":
+                blobs[spec] = None
+                continue
+            size = int(header[2])
+            blobs[spec] = output[position:position + size].decode("utf-8", errors="ignore")
+            position += size + 1
+
+        return blobs
+
+    async def analyze_staged(self, file_filter: Optional[Callable[[str], bool]] = None
+                             ) -> IncrementalScanResult:
+        """Analyze staged changes against HEAD (the pre-commit case)."""
+        return await asyncio.to_thread(self._analyze_staged, file_filter)
+
+    async def analyze_branches(self, base_branch: str, head_branch: str,
+                               file_filter: Optional[Callable[[str], bool]] = None
+                               ) -> IncrementalScanResult:
+        """Analyze a branch against its merge base with another (the pull request case)."""
+        return await asyncio.to_thread(self._analyze_branches, base_branch, head_branch, file_filter)
+
+    def _analyze_staged(self, file_filter: Optional[Callable[[str], bool]]) -> IncrementalScanResult:
+        # git and the analyzers block, so this runs on a worker thread
+        file_diffs = self.get_file_diffs("--cached")
+        has_head = subprocess.run(
+            ["git", "rev-parse", "--verify", "-q", "HEAD"], cwd=self.repo_path,
+            capture_output=True
+        ).returncode == 0
+        return self._analyze(file_diffs, "HEAD" if has_head else None, "", file_filter)
+
+    def _analyze_branches(self, base_branch: str, head_branch: str,
+                          file_filter: Optional[Callable[[str], bool]]) -> IncrementalScanResult:
+        file_diffs = self.get_file_diffs(f"{base_branch}...{head_branch}")
+        merge_base = self._git("merge-base", base_branch, head_branch).strip()
+        return self._analyze(file_diffs, merge_base, head_branch, file_filter)
+
+    def _analyze(self, file_diffs: Dict[str, FileDiff], base_rev: Optional[str], new_rev: str,
+                 file_filter: Optional[Callable[[str], bool]]) -> IncrementalScanResult:
+        """Analyze both sides of each changed file and keep what the change touched."""
+        scan_result = ScanResult(
+            scan_id=f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            project_id=self.project_id,
+            scan_type="incremental",
+            started_at=datetime.now(timezone.utc)
+        )
+        incremental = IncrementalScanResult(scan_result=scan_result, file_diffs=file_diffs)
+        config = ScanConfiguration(project_id=self.project_id, project_path=str(self.repo_path))
+
+        diffs = [d for d in file_diffs.values() if not file_filter or file_filter(d.path)]
+        specs = [f"{new_rev}:./{d.path}" for d in diffs]
+        if base_rev is not None:
+            specs += [f"{base_rev}:./{d.old_path}" for d in diffs if d.old_path]
+        blobs = self.read_blobs(specs)
+
+        for diff in diffs:
+            new_content = blobs.get(f"{new_rev}:./{diff.path}")
+            if new_content is None:
+                continue
+            base_content = None
+            if base_rev is not None and diff.old_path:
+                base_content = blobs.get(f"{base_rev}:./{diff.old_path}")
+
+            try:
+                introduced, fixed, result = self._analyze_file(diff, new_content, base_content, config)
+            except Exception as e:
+                print(f"Error analyzing changes to {diff.path}: {e}")
+                scan_result.success = False
+                if not scan_result.error_message:
+                    scan_result.error_message = str(e)
+                continue
+
+            scan_result.add_analysis_result(result)
+            incremental.introduced_issues.extend(introduced)
+            incremental.fixed_issues.extend(fixed)
+
+        scan_result.completed_at = datetime.now(timezone.utc)
+        scan_result.metrics = self.scanner._calculate_project_metrics(scan_result)
+        scan_result.execution_time = (scan_result.completed_at - scan_result.started_at).total_seconds()
+        return incremental
+
+    def _side(self, path: str, content: str, ranges: List[LineRange],
+              config: ScanConfiguration) -> Tuple[AnalysisResult, List[str], List[LineRange]]:
+        """Analyze one side of a file; returns the result, its lines and touched scopes."""
+        context = AnalysisContext(
+            project_id=self.project_id,
+            file_path=str(self.repo_path / path),
+            file_content=content
+        )
+        lines = context.parsed.lines
+        scopes = expand_to_scopes(context.parsed, ranges) if context.language == 'python' \
+            else merge_ranges(ranges)
+        return self.scanner._analyze_file_context(context, config), lines, scopes
+
+    def _analyze_file(self, diff: FileDiff, new_content: str, base_content: Optional[str],
+                      config: ScanConfiguration
+                      ) -> Tuple[List[QualityIssue], List[QualityIssue], AnalysisResult]:
+        new_result, new_lines, new_scopes = self._side(diff.path, new_content, diff.new_ranges, config)
+
+        base_issues: List[QualityIssue] = []
+        base_lines: List[str] = []
+        base_scopes: List[LineRange] = []
+        if base_content is not None:
+            base_result, base_lines, base_scopes = self._side(
+                diff.old_path, base_content, diff.old_ranges, config
+            )
+            base_issues = base_result.issues
+
+        before = Counter(_fingerprint(issue, base_lines) for issue in base_issues)
+        after = Counter(_fingerprint(issue, new_lines) for issue in new_result.issues)
+
+        introduced = []
+        for issue in new_result.issues:
+            if not _in_ranges(issue.line_number, new_scopes):
+                continue
+            key = _fingerprint(issue, new_lines)
+            if before[key] > 0:
+                before[key] -= 1  # Already there before the change
+            else:
+                introduced.append(issue)
+
+        fixed = []
+        for issue in base_issues:
+            if not _in_ranges(issue.line_number, base_scopes):
+                continue
+            key = _fingerprint(issue, base_lines)
+            if after[key] > 0:
+                after[key] -= 1
+            else:
+                fixed.append(issue)
+
+        # Report the file with only the issues this change introduced
+        result = AnalysisResult(
+            analyzer_name=new_result.analyzer_name,
+            analysis_type=new_result.analysis_type,
+            context=new_result.context,
+            issues=introduced,
+            metrics=new_result.metrics,
+            suggestions=new_result.suggestions,
+            execution_time=new_result.execution_time,
+            success=new_result.success,
+            error_message=new_result.error_message
+        )
+        return introduced, fixed, result
@@ -5,13 +5,15 @@ Quality issue detection and categorization pipeline.
 import re
 import ast
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Any, Callable, Pattern
+from typing import Dict, List, Optional, Set, Any, Callable, Pattern, Tuple, Type
 from enum import Enum
 
 from .base_analyzer import (
     CodeAnalyzer, AnalysisResult, AnalysisContext, AnalysisType,
     PythonASTAnalyzer, FileAnalyzer
 )
+from .parsed_file import ParsedFile
+from .rule_engine import CompiledRuleSet
 from app.models.quality import QualityIssue, IssueType, Severity
 
 
@@ -22,7 +24,9 @@ class DetectionRule:
                  issue_type: IssueType, severity: Severity,
                  pattern: Optional[str] = None,
                  ast_checker: Optional[Callable] = None,
-                 languages: Optional[Set[str]] = None):
+                 languages: Optional[Set[str]] = None,
+                 node_checker: Optional[Callable] = None,
+                 node_types: Tuple[Type[ast.AST], ...] = ()):
         self.rule_id = rule_id
         self.name = name
         self.description = description
@@ -30,6 +34,9 @@ class DetectionRule:
         self.severity = severity
         self.pattern = re.compile(pattern) if pattern else None
         self.ast_checker = ast_checker
+        # Per-node checkers run in the detector's single shared pass over the tree
+        self.node_checker = node_checker
+        self.node_types = node_types
         self.languages = languages or set()
         self.enabled = True
         self.metadata: Dict[str, Any] = {}
@@ -38,13 +45,13 @@ class DetectionRule:
         """Check if rule applies to the given language."""
         return not self.languages or language in self.languages
     
-    def check_pattern(self, content: str) -> List[Dict[str, Any]]:
+    def check_pattern(self, content: str, lines: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Check pattern-based rule against content."""
         matches = []
         if not self.pattern:
             return matches
         
-        for line_num, line in enumerate(content.split('\n'), 1):
+        for line_num, line in enumerate(lines if lines is not None else content.split('\n'), 1):
             for match in self.pattern.finditer(line):
                 matches.append({
                     'line_number': line_num,
@@ -65,6 +72,14 @@ class DetectionRule:
         except Exception as e:
             print(f"Error in AST checker for rule {self.rule_id}: {e}")
             return []
+    
+    def check_node(self, node: ast.AST, context: AnalysisContext) -> Optional[Dict[str, Any]]:
+        """Check a single AST node of one of the rule's node types."""
+        try:
+            return self.node_checker(node, context)
+        except Exception as e:
+            print(f"Error in node checker for rule {self.rule_id}: {e}")
+            return None
 
 
 class QualityIssueDetector(CodeAnalyzer):
@@ -73,6 +88,8 @@ class QualityIssueDetector(CodeAnalyzer):
     def __init__(self):
         super().__init__("QualityIssueDetector", AnalysisType.STYLE)
         self.rules: Dict[str, DetectionRule] = {}
+        # Compiled pattern rules, keyed by the (rule_id, pattern) pairs they were built from
+        self._rule_sets: Dict[Tuple, CompiledRuleSet] = {}
         self._load_default_rules()
     
     def _load_default_rules(self) -> None:
@@ -142,7 +159,8 @@ class QualityIssueDetector(CodeAnalyzer):
             description="Function or class missing docstring",
             issue_type=IssueType.DOCUMENTATION,
             severity=Severity.MEDIUM,
-            ast_checker=self._check_missing_docstring,
+            node_checker=self._check_missing_docstring,
+            node_types=(ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef),
             languages={'python'}
         ))
         
@@ -153,7 +171,8 @@ class QualityIssueDetector(CodeAnalyzer):
             description="Function has too many arguments",
             issue_type=IssueType.COMPLEXITY,
             severity=Severity.MEDIUM,
-            ast_checker=self._check_too_many_arguments,
+            node_checker=self._check_too_many_arguments,
+            node_types=(ast.FunctionDef, ast.AsyncFunctionDef),
             languages={'python'}
         ))
     
@@ -186,6 +205,29 @@ class QualityIssueDetector(CodeAnalyzer):
             if rule.enabled and rule.matches_language(language)
         ]
     
+    def cache_configuration(self) -> Dict[str, Any]:
+        """Include the rule set, so adding or changing rules invalidates cached results."""
+        return {
+            **self.configuration,
+            'rules': sorted(
+                (rule.rule_id, rule.pattern.pattern if rule.pattern else None,
+                 rule.severity.value, sorted(rule.languages), rule.enabled)
+                for rule in self.rules.values()
+            )
+        }
+    
+    def get_compiled_rules(self, rules: List[DetectionRule]) -> CompiledRuleSet:
+        """Get the compiled rule set for the pattern rules among the given rules."""
+        pattern_rules = [rule for rule in rules if rule.pattern]
+        key = tuple((rule.rule_id, rule.pattern) for rule in pattern_rules)
+        
+        rule_set = self._rule_sets.get(key)
+        if rule_set is None:
+            if len(self._rule_sets) >= 32:
+                self._rule_sets.clear()
+            rule_set = self._rule_sets[key] = CompiledRuleSet(pattern_rules)
+        return rule_set
+    
     def _analyze_implementation(self, context: AnalysisContext) -> AnalysisResult:
         """Detect quality issues in the code."""
         result = AnalysisResult(
@@ -196,13 +238,14 @@ class QualityIssueDetector(CodeAnalyzer):
         
         applicable_rules = self.get_rules_for_language(context.language)
         
-        # Parse AST for Python files
+        # Parse AST for Python files (shared with every other analyzer of this file)
+        parsed = context.parsed
         tree = None
         if context.language == 'python':
-            try:
-                tree = ast.parse(context.file_content, filename=context.file_path)
-            except SyntaxError as e:
+            tree = parsed.tree
+            if tree is None:
                 # Add syntax error as an issue
+                e = parsed.syntax_error
                 issue = QualityIssue(
                     issue_type=IssueType.STYLE,
                     severity=Severity.CRITICAL,
@@ -214,13 +257,18 @@ class QualityIssueDetector(CodeAnalyzer):
                 result.add_issue(issue)
                 return result
         
+        # Run every node rule in one pass over the tree, keeping matches per rule
+        node_matches = self._run_node_rules(applicable_rules, parsed, context) if tree else {}
+        
+        # Run every pattern rule in one scan of the text
+        pattern_matches = self.get_compiled_rules(applicable_rules).scan(parsed)
+        
         # Apply rules
         for rule in applicable_rules:
             try:
                 # Pattern-based checks
                 if rule.pattern:
-                    matches = rule.check_pattern(context.file_content)
-                    for match in matches:
+                    for match in pattern_matches.get(rule.rule_id, []):
                         issue = QualityIssue(
                             issue_type=rule.issue_type,
                             severity=rule.severity,
@@ -233,19 +281,20 @@ class QualityIssueDetector(CodeAnalyzer):
                         result.add_issue(issue)
                 
                 # AST-based checks
+                ast_matches = node_matches.get(rule.rule_id, [])
                 if rule.ast_checker and tree:
-                    ast_matches = rule.check_ast(tree, context)
-                    for match in ast_matches:
-                        issue = QualityIssue(
-                            issue_type=rule.issue_type,
-                            severity=rule.severity,
-                            category=rule.rule_id,
-                            description=rule.description,
-                            line_number=match.get('line_number'),
-                            column_number=match.get('column_number'),
-                            suggested_fix=self._get_suggested_fix(rule, match)
-                        )
-                        result.add_issue(issue)
+                    ast_matches = ast_matches + rule.check_ast(tree, context)
+                for match in ast_matches:
+                    issue = QualityIssue(
+                        issue_type=rule.issue_type,
+                        severity=rule.severity,
+                        category=rule.rule_id,
+                        description=rule.description,
+                        line_number=match.get('line_number'),
+                        column_number=match.get('column_number'),
+                        suggested_fix=self._get_suggested_fix(rule, match)
+                    )
+                    result.add_issue(issue)
                         
             except Exception as e:
                 print(f"Error applying rule {rule.rule_id}: {e}")
@@ -275,56 +324,71 @@ class QualityIssueDetector(CodeAnalyzer):
         
         return fix_suggestions.get(rule.rule_id)
     
-    def _check_missing_docstring(self, tree: ast.AST, context: AnalysisContext) -> List[Dict[str, Any]]:
-        """Check for missing docstrings in functions and classes."""
-        issues = []
+    def _run_node_rules(self, rules: List[DetectionRule], parsed: ParsedFile,
+                        context: AnalysisContext) -> Dict[str, List[Dict[str, Any]]]:
+        """Dispatch all node rules from a single traversal of the parsed file."""
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+        handlers: Dict[Type[ast.AST], List[Callable[[ast.AST], None]]] = {}
         
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                # Skip private methods and special methods
-                if node.name.startswith('_'):
-                    continue
-                
-                # Check if docstring exists
-                has_docstring = (
-                    node.body and
-                    isinstance(node.body[0], ast.Expr) and
-                    isinstance(node.body[0].value, ast.Constant) and
-                    isinstance(node.body[0].value.value, str)
-                )
-                
-                if not has_docstring:
-                    issues.append({
-                        'line_number': node.lineno,
-                        'column_number': node.col_offset,
-                        'node_type': type(node).__name__,
-                        'node_name': node.name
-                    })
-        
-        return issues
-    
-    def _check_too_many_arguments(self, tree: ast.AST, context: AnalysisContext) -> List[Dict[str, Any]]:
-        """Check for functions with too many arguments."""
-        issues = []
+        for rule in rules:
+            if not rule.node_checker:
+                continue
+            rule_matches = matches.setdefault(rule.rule_id, [])
+            
+            def handle(node, rule=rule, rule_matches=rule_matches):
+                match = rule.check_node(node, context)
+                if match:
+                    rule_matches.append(match)
+            
+            for node_type in rule.node_types:
+                handlers.setdefault(node_type, []).append(handle)
+        
+        if handlers:
+            parsed.dispatch(handlers)
+        return matches
+    
+    def _check_missing_docstring(self, node: ast.AST, context: AnalysisContext) -> Optional[Dict[str, Any]]:
+        """Check a function or class for a missing docstring."""
+        # Skip private methods and special methods
+        if node.name.startswith('_'):
+            return None
+        
+        # Check if docstring exists
+        has_docstring = (
+            node.body and
+            isinstance(node.body[0], ast.Expr) and
+            isinstance(node.body[0].value, ast.Constant) and
+            isinstance(node.body[0].value.value, str)
+        )
+        
+        if has_docstring:
+            return None
+        
+        return {
+            'line_number': node.lineno,
+            'column_number': node.col_offset,
+            'node_type': type(node).__name__,
+            'node_name': node.name
+        }
+    
+    def _check_too_many_arguments(self, node: ast.AST, context: AnalysisContext) -> Optional[Dict[str, Any]]:
+        """Check a function for too many arguments."""
         max_args = self.configuration.get('max_arguments', 5)
+        arg_count = len(node.args.args)
         
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                arg_count = len(node.args.args)
-                
-                # Don't count 'self' for methods
-                if arg_count > 0 and node.args.args[0].arg == 'self':
-                    arg_count -= 1
-                
-                if arg_count > max_args:
-                    issues.append({
-                        'line_number': node.lineno,
-                        'column_number': node.col_offset,
-                        'arg_count': arg_count,
-                        'function_name': node.name
-                    })
-        
-        return issues
+        # Don't count 'self' for methods
+        if arg_count > 0 and node.args.args[0].arg == 'self':
+            arg_count -= 1
+        
+        if arg_count <= max_args:
+            return None
+        
+        return {
+            'line_number': node.lineno,
+            'column_number': node.col_offset,
+            'arg_count': arg_count,
+            'function_name': node.name
+        }
 
 
 class IssueDetectionPipeline:
@@ -0,0 +1,171 @@
+"""
+Parse-once artifact shared by all analyzers of a file.
+"""
+
+import ast
+import bisect
+import heapq
+import io
+import tokenize
+from typing import Callable, Dict, Iterable, List, Optional, Type
+
+
+NodeHandler = Callable[[ast.AST], None]
+
+
+class NodeTypeVisitor(ast.NodeVisitor):
+    """Visitor driven by ParsedFile.visit rather than by recursion.
+
+    Each visit_<NodeType> method is called once for every node of that type,
+    in source order, during a single pass shared with other visitors. Children
+    are reached through the node-type index, so generic_visit does nothing.
+    """
+
+    def generic_visit(self, node: ast.AST) -> None:
+        pass
+
+
+class ParsedFile:
+    """Lazily built parse results for one file.
+
+    The AST, line table, token stream and node-type index are each computed
+    on first use and then reused by every analyzer that asks for them.
+    """
+
+    def __init__(self, content: str, file_path: str = "<unknown>"):
+        self.content = content
+        self.file_path = file_path
+        self._tree: Optional[ast.AST] = None
+        self._syntax_error: Optional[SyntaxError] = None
+        self._parsed = False
+        self._lines: Optional[List[str]] = None
+        self._line_offsets: Optional[List[int]] = None
+        self._tokens: Optional[List[tokenize.TokenInfo]] = None
+        self._nodes: Optional[List[ast.AST]] = None
+        self._positions_by_type: Optional[Dict[Type[ast.AST], List[int]]] = None
+
+    @classmethod
+    def from_tree(cls, tree: ast.AST, content: str, file_path: str = "<unknown>") -> "ParsedFile":
+        """Wrap a tree that was parsed elsewhere."""
+        parsed = cls(content, file_path)
+        parsed._tree = tree
+        parsed._parsed = True
+        return parsed
+
+    def _parse(self) -> None:
+        if not self._parsed:
+            self._parsed = True
+            try:
+                self._tree = ast.parse(self.content, filename=self.file_path)
+            except SyntaxError as e:
+                self._syntax_error = e
+
+    @property
+    def tree(self) -> Optional[ast.AST]:
+        """Module AST, or None if the file does not parse."""
+        self._parse()
+        return self._tree
+
+    @property
+    def syntax_error(self) -> Optional[SyntaxError]:
+        """The error raised by ast.parse, if any."""
+        self._parse()
+        return self._syntax_error
+
+    @property
+    def lines(self) -> List[str]:
+        """File content split on newlines."""
+        if self._lines is None:
+            self._lines = self.content.split('\n')
+        return self._lines
+
+    @property
+    def line_offsets(self) -> List[int]:
+        """Character offset at which each line starts."""
+        if self._line_offsets is None:
+            offsets = [0]
+            for line in self.lines[:-1]:
+                offsets.append(offsets[-1] + len(line) + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    def line_for_offset(self, offset: int) -> int:
+        """1-based line number containing a character offset."""
+        return bisect.bisect_right(self.line_offsets, offset)
+
+    def source_segment(self, node: ast.AST) -> Optional[str]:
+        """Source text of a node, like ast.get_source_segment but using the line table."""
+        if getattr(node, 'end_lineno', None) is None or getattr(node, 'end_col_offset', None) is None:
+            return None
+
+        lines = self.lines
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if first == last:
+            return lines[first].encode()[node.col_offset:node.end_col_offset].decode()
+
+        head = lines[first].encode()[node.col_offset:].decode()
+        tail = lines[last].encode()[:node.end_col_offset].decode()
+        return '\n'.join([head, *lines[first + 1:last], tail])
+
+    @property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """Python token stream; empty if the file cannot be tokenized."""
+        if self._tokens is None:
+            try:
+                self._tokens = list(tokenize.generate_tokens(io.StringIO(self.content).readline))
+            except (tokenize.TokenError, SyntaxError):
+                self._tokens = []
+        return self._tokens
+
+    def _build_index(self) -> None:
+        """Flatten the tree in source (pre-)order and index node positions by type."""
+        nodes: List[ast.AST] = []
+        positions: Dict[Type[ast.AST], List[int]] = {}
+
+        if self.tree is not None:
+            stack = [self.tree]
+            while stack:
+                node = stack.pop()
+                positions.setdefault(type(node), []).append(len(nodes))
+                nodes.append(node)
+                stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+        self._nodes = nodes
+        self._positions_by_type = positions
+
+    @property
+    def nodes(self) -> List[ast.AST]:
+        """Every node of the tree in source order."""
+        if self._nodes is None:
+            self._build_index()
+        return self._nodes
+
+    def nodes_of(self, *node_types: Type[ast.AST]) -> List[ast.AST]:
+        """Nodes of the given types in source order, looked up from the index."""
+        return [self.nodes[position] for position in self._positions(node_types)]
+
+    def _positions(self, node_types: Iterable[Type[ast.AST]]) -> Iterable[int]:
+        if self._positions_by_type is None:
+            self._build_index()
+        lists = [self._positions_by_type[t] for t in node_types if t in self._positions_by_type]
+        if len(lists) == 1:
+            return lists[0]
+        return heapq.merge(*lists)
+
+    def dispatch(self, handlers: Dict[Type[ast.AST], List[NodeHandler]]) -> None:
+        """Call the handlers registered for each node type in one source-order pass."""
+        nodes = self.nodes
+        for position in self._positions(handlers.keys()):
+            node = nodes[position]
+            for handler in handlers[type(node)]:
+                handler(node)
+
+    def visit(self, *visitors: ast.NodeVisitor) -> None:
+        """Run visitors' visit_<NodeType> methods together in a single pass."""
+        handlers: Dict[Type[ast.AST], List[NodeHandler]] = {}
+        for visitor in visitors:
+            for name in dir(visitor):
+                node_type = getattr(ast, name[6:], None) if name.startswith('visit_') else None
+                if isinstance(node_type, type) and issubclass(node_type, ast.AST):
+                    handlers.setdefault(node_type, []).append(getattr(visitor, name))
+        self.dispatch(handlers)
@@ -6,6 +6,7 @@ and security vulnerability detection with actionable improvement recommendations
 """
 
 import ast
+import os
 import re
 import hashlib
 from collections import defaultdict, Counter
@@ -13,11 +14,14 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Set, Tuple, Any, Union
 from enum import Enum
+from pathlib import Path
 
 from app.models.quality import QualityIssue, IssueType, Severity
 from app.services.code_analysis.base_analyzer import (
     CodeAnalyzer, AnalysisType, AnalysisContext, AnalysisResult, PythonASTAnalyzer
 )
+from app.services.code_analysis.parsed_file import NodeTypeVisitor
+from app.services.code_analysis.clone_index import CloneIndex
 
 
 class RecommendationType(str, Enum):
@@ -195,11 +199,64 @@ class DuplicateCodeDetector:
         
         return recommendations
     
+    def find_cross_file_duplicates(self, tree: ast.AST, context: AnalysisContext,
+                                   clone_index: CloneIndex, project_root: str,
+                                   min_similarity: Optional[float] = None) -> List[ImprovementRecommendation]:
+        """Find functions and classes that also appear elsewhere in an indexed project.
+        
+        Blocks are looked up by their fingerprints in the project's clone index,
+        which must have been synced with project_root under context.project_id.
+        """
+        recommendations = []
+        relative_path = Path(os.path.relpath(context.file_path, project_root)).as_posix()
+        threshold = self.similarity_threshold if min_similarity is None else min_similarity
+        
+        for block in self._extract_code_blocks(tree, context):
+            if block.pattern_type not in ("function", "class"):
+                continue
+            
+            matches = [
+                match for match in clone_index.find_block(
+                    context.project_id, block.code_snippet, min_similarity=threshold
+                )
+                # Skip the block's own entry in the index
+                if not (match.file_path == relative_path
+                        and match.start_line <= block.end_line and block.start_line <= match.end_line)
+            ]
+            if not matches:
+                continue
+            
+            duplicate = DuplicateCodeBlock(
+                pattern_hash=block.pattern_hash,
+                occurrences=[block] + [
+                    CodePattern(
+                        pattern_type=block.pattern_type,
+                        pattern_hash=block.pattern_hash,
+                        file_path=match.file_path,
+                        start_line=match.start_line,
+                        end_line=match.end_line,
+                        code_snippet="",
+                        metadata={'similarity': match.similarity}
+                    )
+                    for match in matches
+                ],
+                similarity_score=max(match.similarity for match in matches),
+                lines_count=block.end_line - block.start_line + 1
+            )
+            rec = self._create_duplicate_recommendation(duplicate, context)
+            rec.id = f"xdup_{block.pattern_hash[:8]}_{block.start_line}"
+            locations = ", ".join(f"{m.file_path}:{m.start_line}-{m.end_line}" for m in matches[:5])
+            rec.description = f"Similar code also appears in {locations}"
+            rec.tags.append("cross_file")
+            recommendations.append(rec)
+        
+        return recommendations
+    
     def _extract_code_blocks(self, tree: ast.AST, context: AnalysisContext) -> List[CodePattern]:
         """Extract code blocks from AST for duplicate detection."""
         blocks = []
         
-        class BlockExtractor(ast.NodeVisitor):
+        class BlockExtractor(NodeTypeVisitor):
             def __init__(self, detector):
                 self.detector = detector
                 self.blocks = []
@@ -239,10 +296,10 @@ class DuplicateCodeDetector:
                     # Get source segment or fallback to manual extraction
                     code_snippet = None
                     try:
-                        code_snippet = ast.get_source_segment(context.file_content, node)
-                    except (AttributeError, TypeError):
+                        code_snippet = context.parsed.source_segment(node)
+                    except (AttributeError, TypeError, IndexError):
                         # Fallback for older Python versions or when source segment fails
-                        lines = context.file_content.split('\n')
+                        lines = context.parsed.lines
                         start_line = node.lineno - 1
                         end_line = getattr(node, 'end_lineno', node.lineno) - 1
                         if start_line < len(lines) and end_line < len(lines):
@@ -269,7 +326,7 @@ class DuplicateCodeDetector:
                     return None
         
         extractor = BlockExtractor(self)
-        extractor.visit(tree)
+        context.parsed_for(tree).visit(extractor)
         return extractor.blocks
     
     def _normalize_code(self, code: str) -> str:
@@ -477,7 +534,7 @@ class PerformanceAnalyzer:
         """Analyze code for performance issues and optimization opportunities."""
         recommendations = []
         
-        class PerformanceVisitor(ast.NodeVisitor):
+        class PerformanceVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -565,7 +622,7 @@ class PerformanceAnalyzer:
                 )
         
         visitor = PerformanceVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
 
 
@@ -613,7 +670,7 @@ class SecurityAnalyzer:
         """Find potentially dangerous function calls."""
         recommendations = []
         
-        class DangerousCallVisitor(ast.NodeVisitor):
+        class DangerousCallVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -655,7 +712,7 @@ class SecurityAnalyzer:
                 )
         
         visitor = DangerousCallVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
     
     def _find_hardcoded_secrets(self, tree: ast.AST, context: AnalysisContext) -> List[ImprovementRecommendation]:
@@ -668,7 +725,7 @@ class SecurityAnalyzer:
                 for pattern in patterns:
                     matches = re.finditer(pattern, context.file_content, re.IGNORECASE)
                     for match in matches:
-                        line_number = context.file_content[:match.start()].count('\n') + 1
+                        line_number = context.parsed.line_for_offset(match.start())
                         
                         rec = ImprovementRecommendation(
                             id=f"sec_secret_{line_number}",
@@ -694,7 +751,7 @@ class SecurityAnalyzer:
         """Check for missing input validation."""
         recommendations = []
         
-        class InputValidationVisitor(ast.NodeVisitor):
+        class InputValidationVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -733,7 +790,7 @@ class SecurityAnalyzer:
                 )
         
         visitor = InputValidationVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
 
 
@@ -763,7 +820,7 @@ class PatternAnalyzer:
         recommendations = []
         max_lines = 50  # Configurable threshold
         
-        class LongFunctionVisitor(ast.NodeVisitor):
+        class LongFunctionVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -793,14 +850,14 @@ class PatternAnalyzer:
                 )
         
         visitor = LongFunctionVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
     
     def _find_complex_conditions(self, tree: ast.AST, context: AnalysisContext) -> List[ImprovementRecommendation]:
         """Find complex conditional statements."""
         recommendations = []
         
-        class ComplexConditionVisitor(ast.NodeVisitor):
+        class ComplexConditionVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -838,14 +895,14 @@ class PatternAnalyzer:
                 )
         
         visitor = ComplexConditionVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
     
     def _find_code_smells(self, tree: ast.AST, context: AnalysisContext) -> List[ImprovementRecommendation]:
         """Find common code smells."""
         recommendations = []
         
-        class CodeSmellVisitor(ast.NodeVisitor):
+        class CodeSmellVisitor(NodeTypeVisitor):
             def __init__(self, analyzer):
                 self.analyzer = analyzer
                 self.recommendations = []
@@ -898,5 +955,5 @@ class PatternAnalyzer:
                 )
         
         visitor = CodeSmellVisitor(self)
-        visitor.visit(tree)
+        context.parsed_for(tree).visit(visitor)
         return visitor.recommendations
\ No newline at end of file
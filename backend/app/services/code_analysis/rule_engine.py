@@ -0,0 +1,337 @@
+"""
+Compiled multi-pattern engine for line-based detection rules.
+"""
+
+import re
+from bisect import bisect_right
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Pattern, Tuple
+
+from .parsed_file import ParsedFile
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # pragma: no cover
+    import sre_parse
+    import sre_constants
+
+# Below this many literals one C-level str.find per literal beats stepping
+# the pure-Python automaton through every character
+AUTOMATON_MIN_LITERALS = 256
+
+# Longest alternation expanded into exact literals, e.g. (get|set)_(user|role)
+MAX_LITERAL_ALTERNATIVES = 64
+
+# Opcodes that only some Python versions have
+ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+REPEATS = tuple(op for op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                              getattr(sre_constants, 'POSSESSIVE_REPEAT', None)) if op is not None)
+RANGES = tuple(op for op in (sre_constants.RANGE, getattr(sre_constants, 'RANGE_UNI_IGNORE', None))
+               if op is not None)
+SAFE_CATEGORIES = (sre_constants.CATEGORY_DIGIT, sre_constants.CATEGORY_WORD)
+
+# Case-folds text to ASCII lowercase without changing its length, including the
+# four non-ASCII characters that re.IGNORECASE matches against ASCII letters
+CASE_FOLD = str.maketrans({
+    **{chr(c): chr(c + 32) for c in range(ord('A'), ord('Z') + 1)},
+    'İ': 'i', 'ı': 'i', 'ſ': 's', 'K': 'k'
+})
+
+
+def _better(best: Optional[FrozenSet[str]], factor: Optional[FrozenSet[str]]) -> Optional[FrozenSet[str]]:
+    """The more selective of two required-literal sets (longest shortest literal)."""
+    if not factor or any(not literal for literal in factor):
+        return best
+    if best is None or min(map(len, factor)) > min(map(len, best)):
+        return factor
+    return best
+
+
+def _exact_literals(op, av) -> Optional[FrozenSet[str]]:
+    """The finite set of strings a single item matches, if it is one."""
+    if op is sre_constants.LITERAL:
+        return frozenset([chr(av)])
+    if op is sre_constants.IN:
+        if all(item_op is sre_constants.LITERAL for item_op, _ in av):
+            return frozenset(chr(c) for _, c in av)
+        return None
+    if op is sre_constants.SUBPATTERN:
+        return _sequence_literals(av[3])
+    if op is sre_constants.BRANCH:
+        alternatives = [_sequence_literals(branch) for branch in av[1]]
+        if all(alternative is not None for alternative in alternatives):
+            union = frozenset().union(*alternatives)
+            return union if len(union) <= MAX_LITERAL_ALTERNATIVES else None
+    return None
+
+
+def _sequence_literals(items) -> Optional[FrozenSet[str]]:
+    """The finite set of strings a sequence matches, if it is one."""
+    strings = frozenset([''])
+    for op, av in items:
+        literals = _exact_literals(op, av)
+        if literals is None:
+            return None
+        strings = frozenset(s + literal for s in strings for literal in literals)
+        if len(strings) > MAX_LITERAL_ALTERNATIVES:
+            return None
+    return strings
+
+
+def _required_factor(items) -> Optional[FrozenSet[str]]:
+    """A set of literals one of which occurs in every match of the sequence."""
+    best = None
+    chain = frozenset([''])
+
+    for op, av in items:
+        literals = _exact_literals(op, av)
+        if literals is not None:
+            extended = frozenset(s + literal for s in chain for literal in literals)
+            if len(extended) <= MAX_LITERAL_ALTERNATIVES:
+                chain = extended
+                continue
+        # The contiguous literal run ends here
+        best = _better(best, chain)
+        chain = frozenset([''])
+
+        if op is sre_constants.SUBPATTERN:
+            best = _better(best, _required_factor(av[3]))
+        elif ATOMIC_GROUP is not None and op is ATOMIC_GROUP:
+            best = _better(best, _required_factor(av))
+        elif op in REPEATS and av[0] >= 1:
+            best = _better(best, _required_factor(av[2]))
+        elif op is sre_constants.BRANCH:
+            factors = [_required_factor(branch) for branch in av[1]]
+            if all(factors) and len(frozenset().union(*factors)) <= MAX_LITERAL_ALTERNATIVES:
+                best = _better(best, frozenset().union(*factors))
+
+    return _better(best, chain)
+
+
+def required_literals(pattern: Pattern) -> Optional[FrozenSet[str]]:
+    """Literals one of which appears in every match of a pattern, or None if unknown.
+
+    Literals are case-folded, since the prefilter matches case-insensitively.
+    """
+    try:
+        factor = _required_factor(sre_parse.parse(pattern.pattern, pattern.flags))
+    except Exception:
+        return None
+    if factor is None or any(not literal.isascii() for literal in factor):
+        return None
+    return frozenset(literal.translate(CASE_FOLD) for literal in factor)
+
+
+def _set_excludes_newline(items) -> bool:
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            return False
+        if op is sre_constants.LITERAL and av == 10:
+            return False
+        if op in RANGES and av[0] <= 10 <= av[1]:
+            return False
+        if op is sre_constants.CATEGORY and av not in SAFE_CATEGORIES:
+            return False
+        if op not in (sre_constants.LITERAL, sre_constants.CATEGORY) and op not in RANGES:
+            return False
+    return True
+
+
+def _excludes_newline(items, dotall: bool) -> bool:
+    """Whether no part of a sequence can match a newline or depend on string ends."""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if av == 10:
+                return False
+        elif op is sre_constants.ANY:
+            if dotall:
+                return False
+        elif op is sre_constants.IN:
+            if not _set_excludes_newline(av):
+                return False
+        elif op is sre_constants.AT:
+            if av in (sre_constants.AT_BEGINNING_STRING, sre_constants.AT_END_STRING):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            sub_dotall = (dotall or bool(add_flags & sre_constants.SRE_FLAG_DOTALL)) \
+                and not del_flags & sre_constants.SRE_FLAG_DOTALL
+            if not _excludes_newline(sub, sub_dotall):
+                return False
+        elif op is sre_constants.BRANCH:
+            if not all(_excludes_newline(branch, dotall) for branch in av[1]):
+                return False
+        elif op in REPEATS:
+            if not _excludes_newline(av[2], dotall):
+                return False
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if not _excludes_newline(av[1], dotall):
+                return False
+        elif op is not sre_constants.GROUPREF:
+            return False
+    return True
+
+
+def line_local(pattern: Pattern) -> bool:
+    """Whether a pattern finds the same matches in the whole file (in multiline
+    mode) as it does line by line: it never matches a newline or the empty
+    string, and does not anchor on the start or end of the whole string."""
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+        if parsed.getwidth()[0] == 0:
+            return False
+        return _excludes_newline(parsed, bool(parsed.state.flags & sre_constants.SRE_FLAG_DOTALL))
+    except Exception:
+        return False
+
+
+class LiteralAutomaton:
+    """Aho-Corasick automaton finding every occurrence of many literals in one pass."""
+
+    def __init__(self, literals: List[str]):
+        self.literals = literals
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Tuple[int, ...]] = [()]
+
+        for index, literal in enumerate(literals):
+            state = 0
+            for char in literal:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(())
+                state = next_state
+            output[state] += (index,)
+
+        # Resolve failure links breadth-first into a full transition table
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0)
+                output[next_state] += output[fail[next_state]]
+                queue.append(next_state)
+
+        self._delta = delta
+        self._output = output
+
+    def find_all(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start offset, literal index) for every occurrence."""
+        delta, output, literals = self._delta, self._output, self.literals
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if output[state]:
+                for index in output[state]:
+                    yield position - len(literals[index]) + 1, index
+
+
+class CompiledRuleSet:
+    """Pattern rules compiled so each file's text is scanned once, not once per rule.
+
+    Every rule keeps its line-by-line semantics:
+
+    - Rules with required literals are prefiltered together: one pass finds
+      each literal (with an Aho-Corasick automaton once there are enough of
+      them) and maps hits to lines through the line-offset table, so a rule's
+      regex only runs on lines containing one of its literals.
+    - Rules without literals that cannot match across a line run once over the
+      whole file in multiline mode, with offsets mapped back to line and column.
+    - Rules whose every literal contains a newline can never match a line and
+      are dropped; anything else falls back to running on every line.
+    """
+
+    def __init__(self, rules: List[Any]):
+        self.rules = rules
+        self.whole_file: List[Tuple[Any, Pattern]] = []
+        self.per_line: List[Any] = []
+        self.filtered: List[Any] = []
+        rules_by_literal: Dict[str, List[int]] = {}
+
+        for rule in rules:
+            literals = required_literals(rule.pattern)
+            if literals is not None:
+                literals = frozenset(literal for literal in literals if '\n' not in literal)
+                if not literals:
+                    continue  # Needs a newline, which a single line never has
+            if literals:
+                for literal in literals:
+                    rules_by_literal.setdefault(literal, []).append(len(self.filtered))
+                self.filtered.append(rule)
+            elif line_local(rule.pattern):
+                multiline = re.compile(rule.pattern.pattern, rule.pattern.flags | re.MULTILINE)
+                self.whole_file.append((rule, multiline))
+            else:
+                self.per_line.append(rule)
+
+        self.literals = sorted(rules_by_literal)
+        self._rules_for_literal = [rules_by_literal[literal] for literal in self.literals]
+        self._automaton = LiteralAutomaton(self.literals) \
+            if len(self.literals) >= AUTOMATON_MIN_LITERALS else None
+
+    def _literal_hits(self, text: str, line_offsets: List[int]) -> Iterator[Tuple[int, int]]:
+        """Yield (start offset, literal index), at least once per line a literal occurs on."""
+        if self._automaton is not None:
+            yield from self._automaton.find_all(text)
+            return
+
+        line_count = len(line_offsets)
+        for index, literal in enumerate(self.literals):
+            position = text.find(literal)
+            while position != -1:
+                yield position, index
+                # One hit per line is enough; resume at the next line
+                line = bisect_right(line_offsets, position)
+                if line >= line_count:
+                    break
+                position = text.find(literal, line_offsets[line])
+
+    def scan(self, parsed: ParsedFile) -> Dict[str, List[Dict[str, Any]]]:
+        """Matches of every rule in a file, keyed by rule id, in line order."""
+        lines = parsed.lines
+        line_offsets = parsed.line_offsets
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+
+        if self.literals:
+            candidate_lines: List[set] = [set() for _ in self.filtered]
+            folded = parsed.content.translate(CASE_FOLD)
+            for position, index in self._literal_hits(folded, line_offsets):
+                line_num = parsed.line_for_offset(position)
+                for rule_index in self._rules_for_literal[index]:
+                    candidate_lines[rule_index].add(line_num)
+
+            for rule, line_nums in zip(self.filtered, candidate_lines):
+                found = []
+                for line_num in sorted(line_nums):
+                    line = lines[line_num - 1]
+                    for match in rule.pattern.finditer(line):
+                        found.append(self._match(line_num, match.start(), match.group(), line))
+                matches[rule.rule_id] = found
+
+        for rule, pattern in self.whole_file:
+            found = []
+            for match in pattern.finditer(parsed.content):
+                line_num = parsed.line_for_offset(match.start())
+                found.append(self._match(line_num, match.start() - line_offsets[line_num - 1],
+                                         match.group(), lines[line_num - 1]))
+            matches[rule.rule_id] = found
+
+        for rule in self.per_line:
+            matches[rule.rule_id] = rule.check_pattern(parsed.content, lines)
+
+        return matches
+
+    @staticmethod
+    def _match(line_num: int, column: int, matched_text: str, line: str) -> Dict[str, Any]:
+        return {
+            'line_number': line_num,
+            'column_number': column + 1,
+            'matched_text': matched_text,
+            'line_content': line
+        }
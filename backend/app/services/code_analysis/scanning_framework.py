@@ -4,19 +4,30 @@ Main code scanning framework that orchestrates analysis components.
 
 import os
 import asyncio
+import heapq
+import multiprocessing
+import pickle
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any, Callable
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Set, Any, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
+from .analysis_cache import AnalysisResultStore, get_analysis_result_store, issue_to_row, issue_from_row
 from .base_analyzer import CodeAnalyzer, AnalysisResult, AnalysisContext, AnalysisType
-from .file_monitor import FileSystemMonitor, FileChangeEvent, RealTimeAnalysisCoordinator
+from .file_monitor import FileSystemMonitor, FileChangeEvent, FileChangeType, RealTimeAnalysisCoordinator
 from .issue_detector import IssueDetectionPipeline, QualityIssueDetector
 from app.models.quality import QualityIssue, QualityMetrics
 from app.core.quality_config import QualityConfigManager
 
 
+class ExecutorType(str, Enum):
+    """How scan_project runs file analysis."""
+    THREAD = "thread"
+    PROCESS = "process"
+
+
 @dataclass
 class ScanConfiguration:
     """Configuration for code scanning."""
@@ -34,6 +45,10 @@ class ScanConfiguration:
     analysis_types: Set[AnalysisType] = field(default_factory=lambda: {
         AnalysisType.STYLE, AnalysisType.COMPLEXITY, AnalysisType.SECURITY
     })
+    # Analysis is CPU-bound pure Python, so threads share one core; the process
+    # executor spreads size-balanced shards of files over parallel_workers processes
+    executor: ExecutorType = ExecutorType.THREAD
+    shards_per_worker: int = 4
 
 
 @dataclass
@@ -45,6 +60,7 @@ class ScanResult:
     started_at: datetime
     completed_at: Optional[datetime] = None
     files_scanned: int = 0
+    files_unchanged: int = 0  # restored from the result store without re-reading
     files_with_issues: int = 0
     total_issues: int = 0
     issues_by_severity: Dict[str, int] = field(default_factory=dict)
@@ -88,6 +104,7 @@ class ScanResult:
             'started_at': self.started_at.isoformat(),
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
             'files_scanned': self.files_scanned,
+            'files_unchanged': self.files_unchanged,
             'files_with_issues': self.files_with_issues,
             'total_issues': self.total_issues,
             'issues_by_severity': self.issues_by_severity,
@@ -100,8 +117,10 @@ class ScanResult:
 class CodeScanningFramework:
     """Main framework for orchestrating code quality scanning."""
     
-    def __init__(self, config_manager: Optional[QualityConfigManager] = None):
+    def __init__(self, config_manager: Optional[QualityConfigManager] = None,
+                 result_store: Optional[AnalysisResultStore] = None):
         self.config_manager = config_manager or QualityConfigManager()
+        self.result_store = result_store if result_store is not None else get_analysis_result_store()
         self.analyzers: Dict[AnalysisType, List[CodeAnalyzer]] = {}
         self.issue_pipeline = IssueDetectionPipeline()
         self.real_time_coordinator: Optional[RealTimeAnalysisCoordinator] = None
@@ -149,11 +168,16 @@ class CodeScanningFramework:
         self.scan_completed_callbacks.append(callback)
     
     def add_file_analyzed_callback(self, callback: Callable[[AnalysisResult], None]) -> None:
-        """Add callback for file analyzed events."""
+        """Add callback for file analyzed events.
+        
+        Callbacks run on the event loop thread of the scan, whichever executor
+        analyzes the files, and before the scan completed callbacks. They may
+        use asyncio (e.g. create_task) but must not block.
+        """
         self.file_analyzed_callbacks.append(callback)
     
     def add_issue_found_callback(self, callback: Callable[[QualityIssue], None]) -> None:
-        """Add callback for issue found events."""
+        """Add callback for issue found events; same threading as file analyzed callbacks."""
         self.issue_found_callbacks.append(callback)
     
     async def scan_project(self, config: ScanConfiguration) -> ScanResult:
@@ -173,45 +197,25 @@ class CodeScanningFramework:
                 print(f"Error in scan started callback: {e}")
         
         try:
-            # Find files to scan
-            files_to_scan = self._find_files_to_scan(config)
+            # Find files to scan; file and store I/O stays off the event loop
+            loop = asyncio.get_running_loop()
+            files_to_scan = await asyncio.to_thread(self._find_files_to_scan, config)
+            
+            # Files unchanged since the last scan come straight from the result store
+            store = self._result_store_for(config)
+            if store is not None:
+                files_to_scan = await asyncio.to_thread(
+                    self._restore_unchanged_files, files_to_scan, config, scan_result, store, loop
+                )
             
             # Scan files in parallel
-            with ThreadPoolExecutor(max_workers=config.parallel_workers) as executor:
-                # Submit all file analysis tasks
-                future_to_file = {
-                    executor.submit(self._analyze_file_sync, file_path, config): file_path
-                    for file_path in files_to_scan
-                }
-                
-                # Process completed analyses
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        analysis_result = future.result()
-                        if analysis_result:
-                            scan_result.add_analysis_result(analysis_result)
-                            
-                            # Notify file analyzed
-                            for callback in self.file_analyzed_callbacks:
-                                try:
-                                    callback(analysis_result)
-                                except Exception as e:
-                                    print(f"Error in file analyzed callback: {e}")
-                            
-                            # Notify issues found
-                            for issue in analysis_result.issues:
-                                for callback in self.issue_found_callbacks:
-                                    try:
-                                        callback(issue)
-                                    except Exception as e:
-                                        print(f"Error in issue found callback: {e}")
-                                        
-                    except Exception as e:
-                        print(f"Error analyzing file {file_path}: {e}")
-                        scan_result.success = False
-                        if not scan_result.error_message:
-                            scan_result.error_message = str(e)
+            if config.executor == ExecutorType.PROCESS and self._analyzers_picklable():
+                await self._scan_files_in_processes(files_to_scan, config, scan_result)
+            else:
+                await asyncio.to_thread(self._scan_files_in_threads, files_to_scan, config, scan_result, loop)
+            
+            if store is not None:
+                await asyncio.to_thread(self._record_scanned_files, scan_result, config, store)
             
             # Calculate metrics
             scan_result.metrics = self._calculate_project_metrics(scan_result)
@@ -235,6 +239,183 @@ class CodeScanningFramework:
         
         return scan_result
     
+    def _scan_files_in_threads(self, files_to_scan: List[str], config: ScanConfiguration,
+                               scan_result: ScanResult, loop: asyncio.AbstractEventLoop) -> None:
+        """Analyze files on a thread pool; callbacks are dispatched to loop."""
+        with ThreadPoolExecutor(max_workers=config.parallel_workers) as executor:
+            # Submit all file analysis tasks
+            future_to_file = {
+                executor.submit(self._analyze_file_sync, file_path, config): file_path
+                for file_path in files_to_scan
+            }
+            
+            # Process completed analyses
+            for future in as_completed(future_to_file):
+                file_path = future_to_file[future]
+                try:
+                    analysis_result = future.result()
+                    if analysis_result:
+                        self._record_analysis_result(scan_result, analysis_result, loop)
+                except Exception as e:
+                    print(f"Error analyzing file {file_path}: {e}")
+                    scan_result.success = False
+                    if not scan_result.error_message:
+                        scan_result.error_message = str(e)
+    
+    async def _scan_files_in_processes(self, files_to_scan: List[str], config: ScanConfiguration,
+                                       scan_result: ScanResult) -> None:
+        """Analyze size-balanced shards of files on a process pool."""
+        shard_count = max(1, config.parallel_workers * config.shards_per_worker)
+        shards = shard_files_by_size(files_to_scan, shard_count)
+        if not shards:
+            return
+        
+        loop = asyncio.get_running_loop()
+        # Spawn rather than fork: the scanner usually runs inside a threaded server
+        with ProcessPoolExecutor(
+            max_workers=min(config.parallel_workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_scan_worker,
+            initargs=(self.analyzers, self.result_store)
+        ) as executor:
+            futures = {
+                loop.run_in_executor(
+                    executor, _scan_shard, shard, config.project_id,
+                    list(config.analysis_types), config.cache_results
+                ): shard
+                for shard in shards
+            }
+            
+            for future in asyncio.as_completed(futures):
+                try:
+                    compact_results = await future
+                except Exception as e:
+                    print(f"Error analyzing shard: {e}")
+                    scan_result.success = False
+                    if not scan_result.error_message:
+                        scan_result.error_message = str(e)
+                    continue
+                
+                for compact in compact_results:
+                    self._record_analysis_result(
+                        scan_result, expand_analysis_result(compact, config.project_id)
+                    )
+    
+    def _analyzers_picklable(self) -> bool:
+        """Check analyzers can be shipped to worker processes."""
+        try:
+            pickle.dumps(self.analyzers)
+            return True
+        except Exception as e:
+            print(f"Analyzers cannot be sent to worker processes, using threads: {e}")
+            return False
+    
+    def _record_analysis_result(self, scan_result: ScanResult, analysis_result: AnalysisResult,
+                                loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Add a file's result to the scan and notify callbacks.
+        
+        Called off the event loop, pass the scan's loop: callbacks are then
+        scheduled on it instead of running on the worker thread.
+        """
+        scan_result.add_analysis_result(analysis_result)
+        if loop is None:
+            self._notify_analysis_result(analysis_result)
+        else:
+            loop.call_soon_threadsafe(self._notify_analysis_result, analysis_result)
+    
+    def _notify_analysis_result(self, analysis_result: AnalysisResult) -> None:
+        """Run file analyzed and issue found callbacks for one result."""
+        # Notify file analyzed
+        for callback in self.file_analyzed_callbacks:
+            try:
+                callback(analysis_result)
+            except Exception as e:
+                print(f"Error in file analyzed callback: {e}")
+        
+        # Notify issues found
+        for issue in analysis_result.issues:
+            for callback in self.issue_found_callbacks:
+                try:
+                    callback(issue)
+                except Exception as e:
+                    print(f"Error in issue found callback: {e}")
+    
+    def _result_store_for(self, config: ScanConfiguration) -> Optional[AnalysisResultStore]:
+        """The persistent result store, if this scan may use cached results."""
+        return self.result_store if config.cache_results else None
+    
+    def _analyzers_for(self, language: str, config: ScanConfiguration) -> List[CodeAnalyzer]:
+        """Analyzers that will run on a file of the given language."""
+        return [
+            analyzer
+            for analysis_type in config.analysis_types
+            for analyzer in self.get_analyzers(analysis_type)
+            if analyzer.supports_language(language)
+        ]
+    
+    def _restore_unchanged_files(self, files_to_scan: List[str], config: ScanConfiguration,
+                                 scan_result: ScanResult, store: AnalysisResultStore,
+                                 loop: asyncio.AbstractEventLoop) -> List[str]:
+        """Add stored results for files whose mtime and size match the last scan.
+        
+        Returns the files that still need analysis. Restored results carry the
+        content hash and line count but not the file content.
+        """
+        manifest = store.load_manifest(config.project_id)
+        candidates: Dict[str, Tuple[AnalysisContext, List[str]]] = {}
+        
+        for file_path in files_to_scan:
+            entry = manifest.get(file_path)
+            if entry is None:
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            mtime_ns, size, file_hash = entry
+            if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+                continue
+            
+            context = AnalysisContext(
+                project_id=config.project_id,
+                file_path=file_path,
+                file_content="",
+                file_hash=file_hash,
+                metadata={'mtime_ns': mtime_ns, 'size': size}
+            )
+            keys = [a.cache_key(file_hash) for a in self._analyzers_for(context.language, config)]
+            candidates[file_path] = (context, keys)
+        
+        records = store.get_many([key for _, keys in candidates.values() for key in keys])
+        
+        remaining = []
+        for file_path in files_to_scan:
+            candidate = candidates.get(file_path)
+            if candidate is None or not all(key in records for key in candidate[1]):
+                remaining.append(file_path)
+                continue
+            
+            context, keys = candidate
+            results = [AnalysisResult.from_record(records[key], context) for key in keys]
+            self._record_analysis_result(scan_result, self._combine_results(results, context), loop)
+            scan_result.files_unchanged += 1
+        
+        return remaining
+    
+    def _record_scanned_files(self, scan_result: ScanResult, config: ScanConfiguration,
+                              store: AnalysisResultStore) -> None:
+        """Remember the stat and content hash of files analyzed in this scan, writing their results too."""
+        entries = [
+            (result.context.file_path, result.context.metadata['mtime_ns'],
+             result.context.metadata['size'], result.context.file_hash)
+            for result in scan_result.analysis_results
+            if result.success and 'mtime_ns' in result.context.metadata
+        ]
+        if entries:
+            store.record_files(config.project_id, entries)
+        else:
+            store.flush()
+    
     def _find_files_to_scan(self, config: ScanConfiguration) -> List[str]:
         """Find files to scan based on configuration."""
         project_path = Path(config.project_path)
@@ -264,15 +445,17 @@ class CodeScanningFramework:
     def _analyze_file_sync(self, file_path: str, config: ScanConfiguration) -> Optional[AnalysisResult]:
         """Synchronous wrapper for file analysis."""
         try:
-            # Read file content
+            # Read file content, noting the stat it was read at for the file manifest
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                stat = os.fstat(f.fileno())
                 content = f.read()
             
             # Create analysis context
             context = AnalysisContext(
                 project_id=config.project_id,
                 file_path=file_path,
-                file_content=content
+                file_content=content,
+                metadata={'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
             )
             
             # Run analysis
@@ -285,24 +468,30 @@ class CodeScanningFramework:
     def _analyze_file_context(self, context: AnalysisContext, 
                             config: ScanConfiguration) -> AnalysisResult:
         """Analyze a file using the configured analyzers."""
-        combined_result = None
+        results = []
+        store = self._result_store_for(config)
         
         # Run analyzers for each requested analysis type
-        for analysis_type in config.analysis_types:
-            analyzers = self.get_analyzers(analysis_type)
-            
-            for analyzer in analyzers:
-                if analyzer.supports_language(context.language):
-                    try:
-                        result = analyzer.analyze(context, config.cache_results)
-                        
-                        if combined_result is None:
-                            combined_result = result
-                        else:
-                            combined_result = combined_result.merge(result)
-                            
-                    except Exception as e:
-                        print(f"Error running analyzer {analyzer.name}: {e}")
+        for analyzer in self._analyzers_for(context.language, config):
+            try:
+                results.append(analyzer.analyze(context, config.cache_results, store))
+            except Exception as e:
+                print(f"Error running analyzer {analyzer.name}: {e}")
+        
+        # Every analyzer has had its turn at the shared parse results
+        context.discard_parsed()
+        
+        return self._combine_results(results, context)
+    
+    def _combine_results(self, results: List[AnalysisResult],
+                         context: AnalysisContext) -> AnalysisResult:
+        """Merge per-analyzer results for one file."""
+        combined_result = None
+        for result in results:
+            if combined_result is None:
+                combined_result = result
+            else:
+                combined_result = combined_result.merge(result)
         
         # If no analyzers ran, create empty result
         if combined_result is None:
@@ -324,7 +513,8 @@ class CodeScanningFramework:
         if scan_result.files_scanned > 0:
             # Calculate basic metrics
             metrics.lines_of_code = sum(
-                len(result.context.file_content.split('\n'))
+                result.context.metadata.get('line_count')
+                or len(result.context.file_content.split('\n'))
                 for result in scan_result.analysis_results
             )
             
@@ -376,7 +566,10 @@ class CodeScanningFramework:
                 project_path=str(Path(file_path).parent)
             )
             
-            return self._analyze_file_context(context, config)
+            result = self._analyze_file_context(context, config)
+            if self.result_store is not None:
+                self.result_store.flush()
+            return result
             
         except Exception as e:
             # Return error result
@@ -400,31 +593,73 @@ class CodeScanningFramework:
             self.real_time_coordinator = RealTimeAnalysisCoordinator(project_id)
         
         monitor = self.real_time_coordinator.add_project_monitor(project_path)
+        config = ScanConfiguration(project_id=project_id, project_path=project_path)
         
-        # Add callback to trigger analysis on file changes
-        def on_file_change(event: FileChangeEvent):
-            if event.event_type in ['modified', 'created']:
-                asyncio.create_task(self._handle_real_time_analysis(event))
+        # Analyze each coalesced batch of changes in one scan
+        async def on_file_batch(events: List[FileChangeEvent]):
+            await self._handle_real_time_analysis(events, config)
         
-        monitor.add_change_callback(on_file_change)
+        monitor.add_batch_callback(on_file_batch)
         self.real_time_coordinator.start_monitoring()
     
-    async def _handle_real_time_analysis(self, event: FileChangeEvent) -> None:
-        """Handle real-time analysis of changed files."""
+    async def _handle_real_time_analysis(self, events: List[FileChangeEvent],
+                                         config: ScanConfiguration) -> None:
+        """Handle real-time analysis of a batch of changed files."""
+        file_paths = [
+            event.file_path for event in events
+            if not event.is_directory and event.event_type != FileChangeType.DELETED
+        ]
         try:
-            result = await self.scan_file(event.file_path, 
-                                        self.real_time_coordinator.project_id)
-            
-            # Notify callbacks
-            for callback in self.file_analyzed_callbacks:
-                try:
-                    callback(result)
-                except Exception as e:
-                    print(f"Error in real-time analysis callback: {e}")
-                    
+            await self.scan_files(file_paths, config)
         except Exception as e:
             print(f"Error in real-time analysis: {e}")
     
+    async def scan_files(self, file_paths: List[str], config: ScanConfiguration,
+                         scan_type: str = "real_time") -> ScanResult:
+        """Scan a set of files, e.g. one batch of changes from a file monitor.
+        
+        Files whose stat matches the last scan come from the result store, so
+        switching back to a branch that was already scanned is cheap. The scan
+        runs on a worker thread so the event loop stays responsive.
+        """
+        scan_result = ScanResult(
+            scan_id=f"scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            project_id=config.project_id,
+            scan_type=scan_type,
+            started_at=datetime.now(timezone.utc)
+        )
+        
+        await asyncio.to_thread(
+            self._scan_files_sync, file_paths, config, scan_result, asyncio.get_running_loop()
+        )
+        
+        scan_result.metrics = self._calculate_project_metrics(scan_result)
+        scan_result.completed_at = datetime.now(timezone.utc)
+        scan_result.execution_time = (
+            scan_result.completed_at - scan_result.started_at
+        ).total_seconds()
+        return scan_result
+    
+    def _scan_files_sync(self, file_paths: List[str], config: ScanConfiguration,
+                         scan_result: ScanResult, loop: asyncio.AbstractEventLoop) -> None:
+        """Blocking part of scan_files: stat, restore, analyze and record."""
+        files_to_scan = []
+        for file_path in dict.fromkeys(file_paths):
+            try:
+                if os.path.getsize(file_path) <= config.max_file_size:
+                    files_to_scan.append(file_path)
+            except OSError:
+                continue  # Gone again since the change was seen
+        
+        store = self._result_store_for(config)
+        if store is not None:
+            files_to_scan = self._restore_unchanged_files(files_to_scan, config, scan_result, store, loop)
+        
+        self._scan_files_in_threads(files_to_scan, config, scan_result, loop)
+        
+        if store is not None:
+            self._record_scanned_files(scan_result, config, store)
+    
     def disable_real_time_monitoring(self) -> None:
         """Disable real-time monitoring."""
         if self.real_time_coordinator:
@@ -451,4 +686,137 @@ class CodeScanningFramework:
         if self.real_time_coordinator:
             stats['real_time_stats'] = self.real_time_coordinator.get_stats()
         
-        return stats
\ No newline at end of file
+        return stats
+
+# Process executor support. Everything below runs in, or is sent to, worker
+# processes, so it lives at module level where pickle can find it.
+
+class CompactAnalysisResult(NamedTuple):
+    """Picklable per-file result returned by worker processes.
+    
+    File content is not sent back; the line count travels instead so project
+    metrics can still be computed.
+    """
+    file_path: str
+    file_hash: str
+    language: str
+    line_count: int
+    analyzer_name: str
+    analysis_type: str
+    execution_time: float
+    success: bool
+    error_message: Optional[str]
+    metrics: Dict[str, Any]
+    suggestions: List[str]
+    issues: List[Tuple]  # rows from issue_to_row
+    file_stat: Optional[Tuple[int, int]] = None  # (mtime_ns, size) the file was read at
+
+
+def shard_files_by_size(file_paths: List[str], shard_count: int) -> List[List[str]]:
+    """Split files into at most shard_count shards of roughly equal total size.
+    
+    Largest files are placed first, each onto the currently lightest shard, so
+    one huge file does not leave a single worker running long after the rest.
+    """
+    sizes = []
+    for file_path in file_paths:
+        try:
+            sizes.append((os.path.getsize(file_path), file_path))
+        except OSError:
+            sizes.append((0, file_path))
+    sizes.sort(reverse=True)
+    
+    shard_count = min(shard_count, len(sizes))
+    shards: List[List[str]] = [[] for _ in range(shard_count)]
+    heap = [(0, index) for index in range(shard_count)]
+    
+    for size, file_path in sizes:
+        total, index = heapq.heappop(heap)
+        shards[index].append(file_path)
+        heapq.heappush(heap, (total + size, index))
+    
+    return shards
+
+
+def compact_analysis_result(result: AnalysisResult) -> CompactAnalysisResult:
+    """Reduce an analysis result to plain values for transfer between processes."""
+    context = result.context
+    return CompactAnalysisResult(
+        file_path=context.file_path,
+        file_hash=context.file_hash,
+        language=context.language,
+        line_count=len(context.file_content.split('\n')),
+        analyzer_name=result.analyzer_name,
+        analysis_type=result.analysis_type.value,
+        execution_time=result.execution_time,
+        success=result.success,
+        error_message=result.error_message,
+        metrics=result.metrics,
+        suggestions=result.suggestions,
+        issues=[issue_to_row(issue) for issue in result.issues],
+        file_stat=(context.metadata['mtime_ns'], context.metadata['size'])
+        if 'mtime_ns' in context.metadata else None
+    )
+
+
+def expand_analysis_result(compact: CompactAnalysisResult, project_id: str) -> AnalysisResult:
+    """Rebuild an analysis result from its compact form."""
+    context = AnalysisContext(
+        project_id=project_id,
+        file_path=compact.file_path,
+        file_content="",
+        file_hash=compact.file_hash,
+        language=compact.language,
+        metadata={'line_count': compact.line_count}
+    )
+    if compact.file_stat:
+        context.metadata['mtime_ns'], context.metadata['size'] = compact.file_stat
+    result = AnalysisResult(
+        analyzer_name=compact.analyzer_name,
+        analysis_type=AnalysisType(compact.analysis_type),
+        context=context,
+        metrics=compact.metrics,
+        suggestions=compact.suggestions,
+        execution_time=compact.execution_time,
+        success=compact.success,
+        error_message=compact.error_message
+    )
+    
+    for row in compact.issues:
+        result.add_issue(issue_from_row(row))
+    
+    return result
+
+
+_worker_framework: Optional[CodeScanningFramework] = None
+
+
+def _init_scan_worker(analyzers: Dict[AnalysisType, List[CodeAnalyzer]],
+                      result_store: Optional[AnalysisResultStore]) -> None:
+    """Set up the framework a worker process analyzes its shards with."""
+    global _worker_framework
+    _worker_framework = CodeScanningFramework(result_store=result_store)
+    _worker_framework.analyzers = analyzers
+
+
+def _scan_shard(file_paths: List[str], project_id: str,
+                analysis_types: List[AnalysisType], cache_results: bool) -> List[CompactAnalysisResult]:
+    """Analyze one shard of files in a worker process."""
+    config = ScanConfiguration(
+        project_id=project_id,
+        project_path="",
+        analysis_types=set(analysis_types),
+        cache_results=cache_results
+    )
+    
+    compact_results = []
+    for file_path in file_paths:
+        analysis_result = _worker_framework._analyze_file_sync(file_path, config)
+        if analysis_result:
+            compact_results.append(compact_analysis_result(analysis_result))
+    
+    # Results this worker analyzed are written once per shard
+    if cache_results and _worker_framework.result_store is not None:
+        _worker_framework.result_store.flush()
+    
+    return compact_results
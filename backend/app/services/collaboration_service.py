@@ -17,7 +17,7 @@ from app.models.collaboration import (
     # SQLAlchemy models
     Team as TeamSQLModel,
     TeamMembership as TeamMembershipSQLModel, 
-    ProjectShare as ProjectShareSQLModel,
+    ProjectShareTable as ProjectShareSQLModel,
     ProjectComment as ProjectCommentSQLModel,
     ActivityLog as ActivityLogSQLModel,
     # Pydantic models
@@ -29,6 +29,7 @@ from app.models.collaboration import (
 )
 from app.models.user import UserTable
 from app.core.database import Project
+from app.core.project_access import get_project_access_resolver
 
 logger = logging.getLogger(__name__)
 
@@ -180,6 +181,7 @@ class CollaborationService:
         )
         
         db.add(membership)
+        get_project_access_resolver().invalidate(db, user_id=user_id)
         
         # Get user name for activity log
         user_result = await db.execute(
@@ -223,6 +225,7 @@ class CollaborationService:
         
         if result.rowcount == 0:
             return False
+        get_project_access_resolver().invalidate(db, user_id=user_id)
         
         # Get user name for activity log
         user_result = await db.execute(
@@ -274,6 +277,7 @@ class CollaborationService:
         
         db.add(share_table)
         await db.flush()
+        get_project_access_resolver().invalidate(db, project_id=project_id)
         
         # Log activity
         if share_data.shared_with_user_id:
@@ -378,50 +382,22 @@ class CollaborationService:
         user_id: str
     ) -> Optional[ProjectRole]:
         """Get user's access level to a project"""
-        # Check if user is the owner
-        project_result = await db.execute(
-            select(Project).where(Project.id == project_id)
-        )
-        project = project_result.scalar_one_or_none()
-        
-        if not project:
-            return None
-        
-        if project.owner_user_id == user_id:
-            return ProjectRole.OWNER
-        
-        # Check direct shares
-        direct_result = await db.execute(
-            select(ProjectShareSQLModel).where(
-                and_(
-                    ProjectShareSQLModel.project_id == project_id,
-                    ProjectShareSQLModel.shared_with_user_id == user_id
-                )
-            )
-        )
-        direct_share = direct_result.scalar_one_or_none()
-        
-        if direct_share:
-            return ProjectRole(direct_share.role)
-        
-        # Check team shares
-        team_result = await db.execute(
-            select(ProjectShareSQLModel)
-            .join(TeamMembershipSQLModel)
-            .where(
-                and_(
-                    ProjectShareSQLModel.project_id == project_id,
-                    ProjectShareSQLModel.shared_with_team_id == TeamMembershipSQLModel.team_id,
-                    TeamMembershipSQLModel.user_id == user_id
-                )
-            )
-        )
-        team_share = team_result.scalar_one_or_none()
-        
-        if team_share:
-            return ProjectRole(team_share.role)
-        
-        return None
+        access = await get_project_access_resolver().resolve(db, user_id, project_id)
+        return access.role if access else None
+    
+    async def get_user_projects_access(
+        self,
+        db: AsyncSession,
+        project_ids: List[int],
+        user_id: str
+    ) -> Dict[int, ProjectRole]:
+        """Get user's access level to several projects; projects without access are left out"""
+        accesses = await get_project_access_resolver().resolve_many(db, user_id, project_ids)
+        return {
+            project_id: access.role
+            for project_id, access in accesses.items()
+            if access.role is not None
+        }
     
     # Comments System
     
@@ -554,7 +530,12 @@ class CollaborationService:
         db: AsyncSession,
         request: ActivityFeedRequest
     ) -> ActivityFeedResponse:
-        """Get activity feed based on filters"""
+        """Get activity feed based on filters.
+        
+        Pages are ordered newest first on (created_at, id). Passing the previous
+        page's next_cursor continues after its last entry without an offset
+        scan; the total count is only computed for the first page.
+        """
         query = select(ActivityLogSQLModel)
         
         # Apply filters
@@ -571,77 +552,113 @@ class CollaborationService:
         if filters:
             query = query.where(and_(*filters))
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        count_result = await db.execute(count_query)
-        total_count = count_result.scalar()
+        total_count = None
+        if request.cursor is None:
+            # Get total count
+            count_query = select(func.count()).select_from(query.subquery())
+            count_result = await db.execute(count_query)
+            total_count = count_result.scalar()
+        else:
+            query = query.where(await self._activity_after(db, request.cursor))
         
-        # Get paginated results
-        query = query.order_by(desc(ActivityLogSQLModel.created_at))
-        query = query.offset(request.offset).limit(request.limit)
+        # Get one row past the page to know whether there are more
+        query = query.order_by(desc(ActivityLogSQLModel.created_at), desc(ActivityLogSQLModel.id))
+        if request.cursor is None and request.offset:
+            query = query.offset(request.offset)
+        query = query.limit(request.limit + 1)
         
         result = await db.execute(query)
+        rows = result.scalars().all()
+        has_more = len(rows) > request.limit
+        rows = rows[:request.limit]
         
-        activities = []
-        for activity_table in result.scalars().all():
-            activity = await self._build_activity_entry(db, activity_table)
-            activities.append(activity)
-        
-        has_more = request.offset + len(activities) < total_count
+        activities = await self._build_activity_entries(db, rows)
         
         return ActivityFeedResponse(
             activities=activities,
             total_count=total_count,
-            has_more=has_more
+            has_more=has_more,
+            next_cursor=str(rows[-1].id) if has_more else None
         )
     
-    async def _build_activity_entry(
-        self, 
-        db: AsyncSession, 
-        activity_table: ActivityLogSQLModel
-    ) -> ActivityLogEntry:
-        """Build activity entry with additional names"""
-        user_name = None
-        project_name = None
-        team_name = None
-        
-        # Get user name
-        if activity_table.user_id:
-            user_result = await db.execute(
-                select(UserTable).where(UserTable.id == activity_table.user_id)
+    async def _activity_after(self, db: AsyncSession, cursor: str):
+        """Filter for activities ordered after the cursor's entry.
+        
+        The cursor is the id of the last entry on the previous page; its stored
+        created_at is compared as-is, so ties and timestamp formats match.
+        """
+        try:
+            cursor_id = int(cursor)
+        except ValueError:
+            raise ValueError(f"Invalid activity feed cursor: {cursor!r}")
+        
+        result = await db.execute(
+            select(ActivityLogSQLModel.id).where(ActivityLogSQLModel.id == cursor_id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise ValueError(f"Invalid activity feed cursor: {cursor!r}")
+        
+        cursor_created_at = (
+            select(ActivityLogSQLModel.created_at)
+            .where(ActivityLogSQLModel.id == cursor_id)
+            .scalar_subquery()
+        )
+        return or_(
+            ActivityLogSQLModel.created_at < cursor_created_at,
+            and_(
+                ActivityLogSQLModel.created_at == cursor_created_at,
+                ActivityLogSQLModel.id < cursor_id
             )
-            user = user_result.scalar_one_or_none()
-            user_name = user.full_name or user.email if user else None
+        )
+    
+    async def _build_activity_entries(
+        self,
+        db: AsyncSession,
+        activity_tables: List[ActivityLogSQLModel]
+    ) -> List[ActivityLogEntry]:
+        """Build activity entries, resolving names with one query per kind"""
+        user_ids = {a.user_id for a in activity_tables if a.user_id}
+        project_ids = {a.project_id for a in activity_tables if a.project_id}
+        team_ids = {a.team_id for a in activity_tables if a.team_id}
+        
+        user_names = {}
+        if user_ids:
+            result = await db.execute(
+                select(UserTable.id, UserTable.full_name, UserTable.email)
+                .where(UserTable.id.in_(user_ids))
+            )
+            user_names = {row.id: row.full_name or row.email for row in result}
         
-        # Get project name
-        if activity_table.project_id:
-            project_result = await db.execute(
-                select(Project).where(Project.id == activity_table.project_id)
+        project_names = {}
+        if project_ids:
+            result = await db.execute(
+                select(Project.id, Project.name).where(Project.id.in_(project_ids))
             )
-            project = project_result.scalar_one_or_none()
-            project_name = project.name if project else None
+            project_names = dict(result.all())
         
-        # Get team name
-        if activity_table.team_id:
-            team_result = await db.execute(
-                select(TeamSQLModel).where(TeamSQLModel.id == activity_table.team_id)
+        team_names = {}
+        if team_ids:
+            result = await db.execute(
+                select(TeamSQLModel.id, TeamSQLModel.name).where(TeamSQLModel.id.in_(team_ids))
             )
-            team = team_result.scalar_one_or_none()
-            team_name = team.name if team else None
-        
-        return ActivityLogEntry(
-            id=activity_table.id,
-            user_id=activity_table.user_id,
-            project_id=activity_table.project_id,
-            team_id=activity_table.team_id,
-            activity_type=ActivityType(activity_table.activity_type),
-            description=activity_table.description,
-            metadata=activity_table.activity_metadata,
-            created_at=activity_table.created_at,
-            user_name=user_name,
-            project_name=project_name,
-            team_name=team_name
-        )
+            team_names = dict(result.all())
+        
+        return [
+            ActivityLogEntry(
+                id=activity_table.id,
+                user_id=activity_table.user_id,
+                project_id=activity_table.project_id,
+                team_id=activity_table.team_id,
+                activity_type=ActivityType(activity_table.activity_type),
+                description=activity_table.description,
+                metadata=activity_table.activity_metadata,
+                created_at=activity_table.created_at,
+                user_name=user_names.get(activity_table.user_id),
+                project_name=project_names.get(activity_table.project_id),
+                team_name=team_names.get(activity_table.team_id)
+            )
+            for activity_table in activity_tables
+        ]
     
     async def _log_activity(
         self,
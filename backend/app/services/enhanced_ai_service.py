@@ -6,19 +6,26 @@ Provides multi-model intelligence, predictive modeling, and sophisticated analys
 import json
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Any, Union, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import numpy as np
 from enum import Enum
 
 from app.services.llm_service import llm_service
 from app.services.prediction_service import RiskPredictionService
 from app.services.llm_providers.base import LLMMessage
+from app.services.incremental_json import IncrementalJSONParser
+from app.services.enhanced_llm_service import get_enhanced_llm_service
 from app.models.schemas import AgentTask
 
 logger = logging.getLogger(__name__)
 
+NATURAL_LANGUAGE_SYSTEM_PROMPT = (
+    "You are an expert cybersecurity analyst with deep knowledge of threat modeling, "
+    "risk assessment, and security best practices."
+)
+
 
 class ThreatSeverity(Enum):
     LOW = "low"
@@ -913,8 +920,8 @@ Format as detailed threat intelligence report."""
         
         return np.mean(confidence_scores) if confidence_scores else 0.5
 
-    async def query_natural_language(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
-        """Process natural language queries about security analysis"""
+    def _natural_language_prompts(self, query: str, context: Optional[Dict] = None) -> Tuple[str, str]:
+        """System and user prompts for a natural language security query"""
         
         prompt = f"""You are an AI security analyst. Answer this security-related question based on the provided context:
 
@@ -929,10 +936,17 @@ Provide a comprehensive answer including:
 4. Additional context or warnings if applicable
 
 Format your response as JSON with sections for answer, recommendations, and confidence level."""
-
+        
+        return NATURAL_LANGUAGE_SYSTEM_PROMPT, prompt
+    
+    async def query_natural_language(self, query: str, context: Optional[Dict] = None) -> Dict[str, Any]:
+        """Process natural language queries about security analysis"""
+        
+        system_prompt, prompt = self._natural_language_prompts(query, context)
+        
         try:
             messages = [
-                LLMMessage(role="system", content="You are an expert cybersecurity analyst with deep knowledge of threat modeling, risk assessment, and security best practices."),
+                LLMMessage(role="system", content=system_prompt),
                 LLMMessage(role="user", content=prompt)
             ]
             
@@ -962,5 +976,46 @@ Format your response as JSON with sections for answer, recommendations, and conf
                 "fallback": True
             }
 
+    async def stream_natural_language_query(
+        self,
+        query: str,
+        context: Optional[Dict] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream the answer to a natural language query as ``(event, data)`` pairs
+        
+        Events: ``delta`` for each text fragment, ``section`` when a top-level
+        field of the JSON answer is complete, then ``done`` or ``error``.
+        """
+        system_prompt, prompt = self._natural_language_prompts(query, context)
+        parser = IncrementalJSONParser()
+        
+        try:
+            async for chunk in get_enhanced_llm_service().generate_stream(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=1000,
+                temperature=0.4,
+                response_format={"type": "json_object"}
+            ):
+                if chunk.done:
+                    yield "done", {
+                        "result": parser.result(),
+                        "finish_reason": chunk.finish_reason,
+                        "provider": chunk.provider,
+                        "model": chunk.model,
+                        "token_usage": asdict(chunk.token_usage) if chunk.token_usage else None
+                    }
+                    continue
+                
+                yield "delta", {"text": chunk.delta}
+                for key, value in parser.feed(chunk.delta):
+                    yield "section", {"key": key, "value": value}
+                    
+        except Exception as e:
+            logger.error(f"Error streaming natural language query: {e}")
+            yield "error", {"error": "Failed to process query", "query": query}
+
+
 # Global instance
 enhanced_ai_service = EnhancedAIService()
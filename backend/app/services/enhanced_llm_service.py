@@ -3,18 +3,24 @@ Enhanced LLM Integration Service
 Handles integration with various LLM providers for threat modeling analysis
 """
 
+import asyncio
+import dataclasses
 import logging
 import os
-from typing import Dict, Any, Optional, List, Union
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple, Union
 from contextlib import asynccontextmanager
 
 from .llm_providers import (
     OpenAIProvider, AnthropicProvider, BaseLLMProvider,
-    LLMRequest, LLMResponse, LLMMessage, LLMModel,
+    LLMRequest, LLMResponse, LLMStreamChunk, LLMMessage, LLMModel,
     LLMError, RateLimitError, APIError, ModelNotFoundError
 )
+from .llm_load_balancer import ProviderLoadBalancer
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache, request_cache_key
+from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class EnhancedLLMService:
@@ -26,8 +32,21 @@ class EnhancedLLMService:
             "openai": LLMModel.GPT_4O_MINI,
             "anthropic": LLMModel.CLAUDE_3_HAIKU,
         }
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.coalescing_stats = {"leaders": 0, "coalesced": 0}
+        self.load_balancer = ProviderLoadBalancer()
         self._initialize_providers()
     
+    def _limiter_config(self) -> Dict[str, Any]:
+        """Adaptive concurrency settings applied to every provider/model pair"""
+        return {
+            "initial_limit": settings.llm_concurrency_initial,
+            "min_limit": settings.llm_concurrency_min,
+            "max_limit": settings.llm_concurrency_max,
+            "latency_target": settings.llm_latency_target,
+            "latency_reference_tokens": settings.llm_latency_reference_tokens
+        }
+    
     def _initialize_providers(self):
         """Initialize available LLM providers"""
         
@@ -35,7 +54,9 @@ class EnhancedLLMService:
         openai_key = os.getenv("OPENAI_API_KEY")
         if openai_key:
             try:
-                self.providers["openai"] = OpenAIProvider(api_key=openai_key)
+                self.providers["openai"] = OpenAIProvider(
+                    api_key=openai_key, concurrency=self._limiter_config()
+                )
                 logger.info("✅ OpenAI provider initialized")
             except Exception as e:
                 logger.warning(f"❌ Failed to initialize OpenAI provider: {e}")
@@ -44,7 +65,9 @@ class EnhancedLLMService:
         anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         if anthropic_key:
             try:
-                self.providers["anthropic"] = AnthropicProvider(api_key=anthropic_key)
+                self.providers["anthropic"] = AnthropicProvider(
+                    api_key=anthropic_key, concurrency=self._limiter_config()
+                )
                 logger.info("✅ Anthropic provider initialized")
             except Exception as e:
                 logger.warning(f"❌ Failed to initialize Anthropic provider: {e}")
@@ -63,9 +86,79 @@ class EnhancedLLMService:
         system_prompt: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: float = 0.1,
+        use_cache: bool = True,
         **kwargs
     ) -> LLMResponse:
-        """Generate completion using specified or best available provider"""
+        """Generate completion using specified or best available provider
+        
+        Identical requests are served from the LLM response cache unless
+        ``use_cache`` is False.
+        """
+        
+        provider, request = self._build_request(
+            prompt, model, provider, system_prompt, max_tokens, temperature, **kwargs
+        )
+        model = request.model
+        
+        response_cache = get_llm_response_cache()
+        use_cache = response_cache.should_cache(temperature, use_cache)
+        if use_cache:
+            cached = await response_cache.get_response(request, provider)
+            if cached is not None:
+                logger.info(f"♻️ Completion served from cache: {provider}/{model.value}")
+                return cached
+        
+        if not settings.llm_coalesce_requests:
+            return await self._call_provider(provider, request, response_cache if use_cache else None)
+        
+        # Single-flight: identical concurrent requests share one provider call
+        key = request_cache_key(request, provider)
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalescing_stats["coalesced"] += 1
+            logger.info(f"🔗 Joining in-flight completion: {provider}/{model.value}")
+            try:
+                response = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not this caller: take over the call
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    self.coalescing_stats["coalesced"] -= 1
+                    continue
+                raise
+            return dataclasses.replace(response, metadata={**response.metadata, "coalesced": True})
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.coalescing_stats["leaders"] += 1
+        try:
+            response = await self._call_provider(provider, request, response_cache if use_cache else None)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a call nobody joined does not log a stray traceback
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+    
+    def _build_request(
+        self,
+        prompt: str,
+        model: Optional[Union[str, LLMModel]],
+        provider: Optional[str],
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: float,
+        **kwargs
+    ) -> Tuple[str, LLMRequest]:
+        """Resolve provider and model and build the request"""
         
         if not self.providers:
             raise ValueError("No LLM providers available. Please configure API keys.")
@@ -101,12 +194,25 @@ class EnhancedLLMService:
             **kwargs
         )
         
+        return provider, request
+    
+    async def _call_provider(
+        self,
+        provider: str,
+        request: LLMRequest,
+        response_cache: Optional[LLMResponseCache] = None
+    ) -> LLMResponse:
+        """Send a request to a provider, storing the result in the cache if given"""
+        
         try:
             provider_instance = self.providers[provider]
-            logger.info(f"🤖 Generating completion: {provider}/{model.value}")
+            logger.info(f"🤖 Generating completion: {provider}/{request.model.value}")
             
             response = await provider_instance.generate(request)
             
+            if response_cache is not None:
+                await response_cache.set_response(request, provider, response)
+            
             logger.info(
                 f"✅ Completion generated: {response.token_usage.total if response.token_usage else 'unknown'} tokens, "
                 f"${response.token_usage.estimated_cost:.4f} cost, {response.response_time:.2f}s"
@@ -132,6 +238,113 @@ class EnhancedLLMService:
     ) -> LLMResponse:
         """Generate structured completion with JSON schema validation"""
         
+        system_prompt = self._structured_system_prompt(system_prompt, response_schema, kwargs)
+        
+        return await self.generate_completion(
+            prompt=prompt,
+            model=model,
+            provider=provider,
+            system_prompt=system_prompt,
+            **kwargs
+        )
+    
+    async def generate_stream(
+        self,
+        prompt: str,
+        model: Optional[Union[str, LLMModel]] = None,
+        provider: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.1,
+        use_cache: bool = True,
+        **kwargs
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a completion using specified or best available provider
+        
+        A cached response is replayed as a single chunk; a completed stream is
+        stored in the response cache.
+        """
+        
+        provider, request = self._build_request(
+            prompt, model, provider, system_prompt, max_tokens, temperature, **kwargs
+        )
+        
+        response_cache = get_llm_response_cache()
+        use_cache = response_cache.should_cache(temperature, use_cache)
+        if use_cache:
+            cached = await response_cache.get_response(request, provider)
+            if cached is not None:
+                logger.info(f"♻️ Stream served from cache: {provider}/{request.model.value}")
+                yield LLMStreamChunk(delta=cached.content, model=cached.model, provider=cached.provider)
+                yield LLMStreamChunk(
+                    done=True,
+                    finish_reason=cached.finish_reason,
+                    token_usage=cached.token_usage,
+                    model=cached.model,
+                    provider=cached.provider
+                )
+                return
+        
+        logger.info(f"🤖 Streaming completion: {provider}/{request.model.value}")
+        content_parts = []
+        final_chunk = None
+        
+        try:
+            async for chunk in self.providers[provider].generate_stream(request):
+                if chunk.done:
+                    final_chunk = chunk
+                else:
+                    content_parts.append(chunk.delta)
+                yield chunk
+                
+        except (RateLimitError, APIError, ModelNotFoundError) as e:
+            logger.error(f"❌ LLM stream failed: {e}")
+            raise
+        except LLMError:
+            raise
+        except Exception as e:
+            logger.error(f"💥 Unexpected error in LLM stream: {e}", exc_info=True)
+            raise LLMError(f"LLM service error: {str(e)}")
+        
+        if use_cache and final_chunk is not None:
+            await response_cache.set_response(request, provider, LLMResponse(
+                content="".join(content_parts),
+                model=final_chunk.model or request.model.value,
+                finish_reason=final_chunk.finish_reason,
+                token_usage=final_chunk.token_usage,
+                provider=final_chunk.provider
+            ))
+    
+    async def generate_structured_stream(
+        self,
+        prompt: str,
+        response_schema: Dict[str, Any],
+        model: Optional[Union[str, LLMModel]] = None,
+        provider: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a structured completion; feed the deltas to an IncrementalJSONParser"""
+        
+        system_prompt = self._structured_system_prompt(system_prompt, response_schema, kwargs)
+        
+        async for chunk in self.generate_stream(
+            prompt=prompt,
+            model=model,
+            provider=provider,
+            system_prompt=system_prompt,
+            **kwargs
+        ):
+            yield chunk
+    
+    def _structured_system_prompt(
+        self,
+        system_prompt: Optional[str],
+        response_schema: Dict[str, Any],
+        kwargs: Dict[str, Any]
+    ) -> str:
+        """Append the JSON schema instruction and request JSON output where supported"""
+        
         # Add JSON format instruction to system prompt
         schema_instruction = f"""
 You must respond with valid JSON that matches this schema:
@@ -139,22 +352,13 @@ You must respond with valid JSON that matches this schema:
 
 Ensure your response is properly formatted JSON only, no additional text."""
         
-        if system_prompt:
-            system_prompt = system_prompt + "\n\n" + schema_instruction
-        else:
-            system_prompt = schema_instruction
-        
         # Use JSON response format if provider supports it
         if "response_format" not in kwargs:
             kwargs["response_format"] = {"type": "json_object"}
         
-        return await self.generate_completion(
-            prompt=prompt,
-            model=model,
-            provider=provider,
-            system_prompt=system_prompt,
-            **kwargs
-        )
+        if system_prompt:
+            return system_prompt + "\n\n" + schema_instruction
+        return schema_instruction
     
     def _string_to_model(self, model_string: str) -> LLMModel:
         """Convert string model name to LLMModel enum"""
@@ -185,15 +389,22 @@ Ensure your response is properly formatted JSON only, no additional text."""
         return LLMModel.GPT_4O_MINI
     
     def _select_best_provider(self, model: Optional[LLMModel] = None) -> str:
-        """Select the best available provider for the given model"""
+        """Select the provider expected to respond fastest for the given model"""
         if not model:
-            # Return first available provider
-            return list(self.providers.keys())[0]
+            # Each provider would serve its default model
+            models = {
+                name: self.default_models.get(name) or provider._get_supported_models()[0]
+                for name, provider in self.providers.items()
+            }
+            return self.load_balancer.select(self.providers, models)
         
-        # Find provider that supports the model
-        for provider_name, provider in self.providers.items():
-            if provider.is_model_supported(model):
-                return provider_name
+        # Balance across providers that support the model
+        candidates = {
+            name: provider for name, provider in self.providers.items()
+            if provider.is_model_supported(model)
+        }
+        if candidates:
+            return self.load_balancer.select(candidates, {name: model for name in candidates})
         
         # No provider supports this model, return first available
         available_providers = list(self.providers.keys())
@@ -231,8 +442,19 @@ Ensure your response is properly formatted JSON only, no additional text."""
         for name, provider in self.providers.items():
             info["providers"][name] = provider.get_provider_info()
         
+        info["response_cache"] = get_llm_response_cache().get_stats()
+        info["request_coalescing"] = self.get_coalescing_stats()
+        info["load_balancer"] = {"selections": dict(self.load_balancer.selections)}
         return info
     
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """Get single-flight counters: provider calls made and calls that joined one"""
+        return {
+            "enabled": settings.llm_coalesce_requests,
+            "in_flight": len(self._inflight),
+            **self.coalescing_stats
+        }
+    
     @asynccontextmanager
     async def get_provider(self, provider_name: str):
         """Get provider instance as async context manager"""
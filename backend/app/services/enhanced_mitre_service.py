@@ -5,6 +5,7 @@ Provides advanced ATT&CK framework integration for threat modeling
 
 import json
 import logging
+import hashlib
 import os
 import asyncio
 from datetime import datetime
@@ -14,14 +15,19 @@ import aiofiles
 import httpx
 import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.core.database import async_session, MitreAttack
 from app.core.config import get_settings
+from app.services.technique_search import TechniqueSearchIndex
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Snapshot of parsed ATT&CK data; bump the version when the layout changes
+SNAPSHOT_MAGIC = b"AITM-MITRE\x00"
+SNAPSHOT_FORMAT_VERSION = 3
+
 
 class EnhancedMitreService:
     """
@@ -44,9 +50,12 @@ class EnhancedMitreService:
         # Relationship data
         self.technique_to_mitigation: Dict[str, List[str]] = {}
         self.mitigation_to_technique: Dict[str, List[str]] = {}
+        self.subtechnique_to_parent: Dict[str, str] = {}
+        self.technique_to_subtechniques: Dict[str, List[str]] = {}
+        self.technique_used_by: Dict[str, List[str]] = {}
         
         # Index data
-        self.technique_search_index: Dict[str, Set[str]] = {}
+        self.technique_search_index: TechniqueSearchIndex = TechniqueSearchIndex()
         self.tactic_search_index: Dict[str, Set[str]] = {}
         
         # Status
@@ -66,19 +75,36 @@ class EnhancedMitreService:
             # Look for local cached file first
             data_dir = Path("/app/data/mitre")
             data_file = data_dir / "attack_data.json"
+            snapshot_file = data_dir / "attack_data.snapshot"
             
-            if os.path.exists(data_file) and not force_download:
-                await self._load_from_file(data_file)
-            else:
-                # Try loading from database first
-                db_loaded = await self._load_from_database()
-                
-                if not db_loaded or force_download:
-                    # Download fresh data
-                    await self._download_and_parse_data()
+            data_version = None if force_download else await self._current_data_version(data_file)
             
-            # Build search indexes
-            self._build_search_indexes()
+            snapshot_loaded = (
+                data_version is not None
+                and os.path.exists(snapshot_file)
+                and await self._load_from_snapshot(snapshot_file, data_version)
+            )
+            
+            if not snapshot_loaded:
+                if os.path.exists(data_file) and not force_download:
+                    loaded = await self._load_from_file(data_file)
+                else:
+                    # Try loading from database first
+                    loaded = not force_download and await self._load_from_database()
+                    
+                    if not loaded:
+                        # Download fresh data; this rewrites the JSON file
+                        await self._download_and_parse_data()
+                        loaded = True
+                        data_version = await self._current_data_version(data_file)
+                
+                # Build search indexes
+                self._build_search_indexes()
+                
+                # Persist parsed state so other workers can skip parsing
+                if loaded and self.techniques_cache and data_version is not None:
+                    self.data_version = data_version
+                    await self._save_snapshot(snapshot_file, data_version)
             
             self.initialized = True
             self.last_updated = datetime.now()
@@ -106,6 +132,139 @@ class EnhancedMitreService:
             logger.error(f"Failed to load MITRE ATT&CK data from file: {e}")
             return False
     
+    async def _current_data_version(self, data_file: Path) -> Optional[str]:
+        """Version of the source data ``initialize`` would load
+        
+        The JSON file is versioned by its modification time and size, database
+        rows by their count and latest update. Returns None when neither exists.
+        """
+        if os.path.exists(data_file):
+            stat = os.stat(data_file)
+            return f"file:{stat.st_mtime_ns}:{stat.st_size}"
+        
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(func.count(MitreAttack.id), func.max(MitreAttack.updated_at))
+                )
+                count, updated_at = result.one()
+        except Exception as e:
+            logger.warning(f"Failed to read MITRE ATT&CK data version from database: {e}")
+            return None
+        
+        if not count:
+            return None
+        return f"db:{count}:{updated_at.isoformat() if updated_at else ''}"
+    
+    async def _load_from_snapshot(self, snapshot_file: Path, data_version: str) -> bool:
+        """Load pre-parsed MITRE ATT&CK data from a snapshot
+        
+        The snapshot is rejected if its format or ATT&CK version differ from
+        the running service, if it was built from another ``data_version``,
+        or if its payload does not match the checksum in the header.
+        """
+        try:
+            async with aiofiles.open(snapshot_file, 'rb') as f:
+                raw = await f.read()
+            
+            if not raw.startswith(SNAPSHOT_MAGIC):
+                logger.warning(f"Ignoring MITRE ATT&CK snapshot with unknown header: {snapshot_file}")
+                return False
+            
+            header_line, _, payload = raw[len(SNAPSHOT_MAGIC):].partition(b"\n")
+            header = json.loads(header_line)
+            
+            if (header.get('format_version') != SNAPSHOT_FORMAT_VERSION or
+                    header.get('attack_version') != settings.mitre_attack_version or
+                    header.get('data_version') != data_version):
+                logger.info("MITRE ATT&CK snapshot is stale, reparsing source data")
+                return False
+            
+            if hashlib.sha256(payload).hexdigest() != header.get('sha256'):
+                logger.warning(f"Ignoring MITRE ATT&CK snapshot with bad checksum: {snapshot_file}")
+                return False
+            
+            snapshot = json.loads(payload)
+            techniques = snapshot['techniques_cache']
+            
+            self.data_version = data_version
+            self.techniques_cache = techniques
+            # Tactic and platform caches share technique objects with the main cache
+            self.tactics_cache = {
+                tactic: [techniques[technique_id] for technique_id in technique_ids]
+                for tactic, technique_ids in snapshot['tactics_cache'].items()
+            }
+            self.platforms_cache = {
+                platform: [techniques[technique_id] for technique_id in technique_ids]
+                for platform, technique_ids in snapshot['platforms_cache'].items()
+            }
+            self.technique_to_mitigation = snapshot['technique_to_mitigation']
+            self.mitigation_to_technique = snapshot['mitigation_to_technique']
+            self.subtechnique_to_parent = snapshot['subtechnique_to_parent']
+            self.technique_to_subtechniques = snapshot['technique_to_subtechniques']
+            self.technique_used_by = snapshot['technique_used_by']
+            self.technique_search_index = TechniqueSearchIndex.from_dict(snapshot['technique_search_index'])
+            self.tactic_search_index = {
+                word: set(tactics) for word, tactics in snapshot['tactic_search_index'].items()
+            }
+            
+            logger.info(f"Loaded {len(self.techniques_cache)} techniques from snapshot {snapshot_file}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to load MITRE ATT&CK snapshot: {e}")
+            return False
+    
+    async def _save_snapshot(self, snapshot_file: Path, data_version: str) -> bool:
+        """Write parsed MITRE ATT&CK data and indexes to a snapshot
+        
+        The file is the snapshot magic, a one-line JSON header with the
+        versions and a SHA-256 of the payload, then the payload as compact JSON.
+        """
+        try:
+            snapshot = {
+                'techniques_cache': self.techniques_cache,
+                'tactics_cache': {
+                    tactic: [technique['id'] for technique in techniques]
+                    for tactic, techniques in self.tactics_cache.items()
+                },
+                'platforms_cache': {
+                    platform: [technique['id'] for technique in techniques]
+                    for platform, techniques in self.platforms_cache.items()
+                },
+                'technique_to_mitigation': self.technique_to_mitigation,
+                'mitigation_to_technique': self.mitigation_to_technique,
+                'subtechnique_to_parent': self.subtechnique_to_parent,
+                'technique_to_subtechniques': self.technique_to_subtechniques,
+                'technique_used_by': self.technique_used_by,
+                'technique_search_index': self.technique_search_index.to_dict(),
+                'tactic_search_index': {
+                    word: sorted(tactics) for word, tactics in self.tactic_search_index.items()
+                },
+            }
+            payload = json.dumps(snapshot, separators=(',', ':')).encode()
+            header = {
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'attack_version': settings.mitre_attack_version,
+                'data_version': data_version,
+                'sha256': hashlib.sha256(payload).hexdigest(),
+            }
+            content = SNAPSHOT_MAGIC + json.dumps(header).encode() + b"\n" + payload
+            
+            # Write to a temporary file and swap it in so readers never see a partial snapshot
+            os.makedirs(snapshot_file.parent, exist_ok=True)
+            tmp_file = snapshot_file.with_name(f"{snapshot_file.name}.{os.getpid()}.tmp")
+            async with aiofiles.open(tmp_file, 'wb') as f:
+                await f.write(content)
+            os.replace(tmp_file, snapshot_file)
+            
+            logger.info(f"Saved MITRE ATT&CK snapshot to {snapshot_file} ({len(content)} bytes)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to save MITRE ATT&CK snapshot: {e}")
+            return False
+    
     async def _load_from_database(self) -> bool:
         """Load MITRE ATT&CK data from database"""
         try:
@@ -178,7 +337,12 @@ class EnhancedMitreService:
             raise
     
     async def _parse_attack_data(self, data: Dict[str, Any]):
-        """Parse MITRE ATT&CK data"""
+        """Parse MITRE ATT&CK data
+        
+        Objects are visited once to collect techniques, mitigations and
+        relationships alongside a STIX id -> ATT&CK id map, after which every
+        relationship is resolved with dictionary lookups.
+        """
         try:
             # Extract STIX version and bundle info
             self.data_version = data.get('spec_version', 'unknown')
@@ -187,99 +351,125 @@ class EnhancedMitreService:
             self.techniques_cache.clear()
             self.tactics_cache.clear()
             self.platforms_cache.clear()
+            self.technique_to_mitigation.clear()
+            self.mitigation_to_technique.clear()
+            self.subtechnique_to_parent.clear()
+            self.technique_to_subtechniques.clear()
+            self.technique_used_by.clear()
             
             # Process all objects
             objects = data.get('objects', [])
             
-            # First pass: identify techniques
+            stix_id_map: Dict[str, str] = {}
+            relationships: List[Dict[str, Any]] = []
+            
+            # Single pass: index external IDs, techniques and mitigations
             for obj in objects:
-                if obj.get('type') == 'attack-pattern':
+                obj_type = obj.get('type')
+                
+                if obj_type == 'relationship':
+                    relationships.append(obj)
+                    continue
+                
+                external_id = self._get_external_id(obj)
+                if not external_id:
+                    continue
+                
+                stix_id = obj.get('id')
+                if stix_id:
+                    stix_id_map[stix_id] = external_id
+                
+                if obj_type == 'attack-pattern':
                     # This is a technique
-                    technique_id = None
-                    for ref in obj.get('external_references', []):
-                        if ref.get('source_name') == 'mitre-attack':
-                            technique_id = ref.get('external_id')
-                            break
-                    
-                    if technique_id:
-                        # Extract tactics
-                        tactics = []
-                        for phase in obj.get('kill_chain_phases', []):
-                            if phase.get('kill_chain_name') == 'mitre-attack':
-                                tactics.append(phase.get('phase_name'))
-                        
-                        # Store technique
-                        self.techniques_cache[technique_id] = {
-                            'id': technique_id,
-                            'name': obj.get('name', ''),
-                            'description': obj.get('description', ''),
-                            'tactics': tactics,
-                            'platforms': obj.get('x_mitre_platforms', []),
-                            'data_sources': obj.get('x_mitre_data_sources', []),
-                            'mitigations': [],  # Will be populated in second pass
-                            'created': obj.get('created', ''),
-                            'modified': obj.get('modified', '')
-                        }
-                        
-                        # Cache by tactic
-                        for tactic in tactics:
-                            if tactic not in self.tactics_cache:
-                                self.tactics_cache[tactic] = []
-                            self.tactics_cache[tactic].append(self.techniques_cache[technique_id])
-                        
-                        # Cache by platform
-                        for platform in obj.get('x_mitre_platforms', []):
-                            if platform not in self.platforms_cache:
-                                self.platforms_cache[platform] = []
-                            self.platforms_cache[platform].append(self.techniques_cache[technique_id])
-            
-            # Second pass: identify mitigations and relationships
-            for obj in objects:
-                if obj.get('type') == 'course-of-action':
-                    # This is a mitigation
-                    mitigation_id = None
-                    for ref in obj.get('external_references', []):
-                        if ref.get('source_name') == 'mitre-attack':
-                            mitigation_id = ref.get('external_id')
-                            break
-                    
-                    if mitigation_id:
-                        self.mitigation_to_technique[mitigation_id] = []
+                    self._add_technique(external_id, obj)
                 
-                elif obj.get('type') == 'relationship':
-                    # Check for mitigation relationships
-                    if obj.get('relationship_type') == 'mitigates':
-                        source_ref = obj.get('source_ref', '')
-                        target_ref = obj.get('target_ref', '')
-                        
-                        # Find the corresponding IDs
-                        source_id = self._get_id_from_ref(source_ref, objects)
-                        target_id = self._get_id_from_ref(target_ref, objects)
-                        
-                        if source_id and target_id:
-                            # Add mitigation to technique
-                            if target_id in self.techniques_cache:
-                                self.techniques_cache[target_id]['mitigations'].append(source_id)
-                            
-                            # Add technique to mitigation
-                            if source_id in self.mitigation_to_technique:
-                                self.mitigation_to_technique[source_id].append(target_id)
-            
-            logger.info(f"Parsed {len(self.techniques_cache)} techniques from MITRE ATT&CK data")
+                elif obj_type == 'course-of-action':
+                    # This is a mitigation
+                    self.mitigation_to_technique[external_id] = []
+            
+            # Resolve relationships against the id map
+            for relationship in relationships:
+                self._resolve_relationship(relationship, stix_id_map)
+            
+            logger.info(
+                f"Parsed {len(self.techniques_cache)} techniques and "
+                f"{len(relationships)} relationships from MITRE ATT&CK data"
+            )
             
         except Exception as e:
             logger.error(f"Failed to parse MITRE ATT&CK data: {e}")
             raise
     
-    def _get_id_from_ref(self, ref: str, objects: List[Dict[str, Any]]) -> Optional[str]:
-        """Get MITRE ATT&CK ID from STIX reference"""
-        for obj in objects:
-            if obj.get('id') == ref:
-                for ext_ref in obj.get('external_references', []):
-                    if ext_ref.get('source_name') == 'mitre-attack':
-                        return ext_ref.get('external_id')
+    def _get_external_id(self, obj: Dict[str, Any]) -> Optional[str]:
+        """Get MITRE ATT&CK ID from a STIX object's external references"""
+        for ext_ref in obj.get('external_references', []):
+            if ext_ref.get('source_name') == 'mitre-attack':
+                return ext_ref.get('external_id')
         return None
     
+    def _add_technique(self, technique_id: str, obj: Dict[str, Any]):
+        """Store a parsed attack-pattern and cache it by tactic and platform"""
+        # Extract tactics
+        tactics = []
+        for phase in obj.get('kill_chain_phases', []):
+            if phase.get('kill_chain_name') == 'mitre-attack':
+                tactics.append(phase.get('phase_name'))
+        
+        # Store technique
+        technique = {
+            'id': technique_id,
+            'name': obj.get('name', ''),
+            'description': obj.get('description', ''),
+            'tactics': tactics,
+            'platforms': obj.get('x_mitre_platforms', []),
+            'data_sources': obj.get('x_mitre_data_sources', []),
+            'mitigations': [],  # Populated while resolving relationships
+            'created': obj.get('created', ''),
+            'modified': obj.get('modified', '')
+        }
+        self.techniques_cache[technique_id] = technique
+        
+        # Cache by tactic
+        for tactic in tactics:
+            if tactic not in self.tactics_cache:
+                self.tactics_cache[tactic] = []
+            self.tactics_cache[tactic].append(technique)
+        
+        # Cache by platform
+        for platform in technique['platforms']:
+            if platform not in self.platforms_cache:
+                self.platforms_cache[platform] = []
+            self.platforms_cache[platform].append(technique)
+    
+    def _resolve_relationship(self, relationship: Dict[str, Any], stix_id_map: Dict[str, str]):
+        """Resolve a STIX relationship into the relationship caches"""
+        source_id = stix_id_map.get(relationship.get('source_ref', ''))
+        target_id = stix_id_map.get(relationship.get('target_ref', ''))
+        
+        if not source_id or not target_id:
+            return
+        
+        relationship_type = relationship.get('relationship_type')
+        
+        if relationship_type == 'mitigates':
+            # Add mitigation to technique
+            if target_id in self.techniques_cache:
+                self.techniques_cache[target_id]['mitigations'].append(source_id)
+                self.technique_to_mitigation.setdefault(target_id, []).append(source_id)
+            
+            # Add technique to mitigation
+            if source_id in self.mitigation_to_technique:
+                self.mitigation_to_technique[source_id].append(target_id)
+        
+        elif relationship_type == 'subtechnique-of':
+            self.subtechnique_to_parent[source_id] = target_id
+            self.technique_to_subtechniques.setdefault(target_id, []).append(source_id)
+        
+        elif relationship_type == 'uses':
+            # Groups, software and campaigns using a technique
+            if target_id in self.techniques_cache:
+                self.technique_used_by.setdefault(target_id, []).append(source_id)
+    
     async def _store_in_database(self):
         """Store MITRE ATT&CK data in database"""
         try:
@@ -312,22 +502,13 @@ class EnhancedMitreService:
     def _build_search_indexes(self):
         """Build search indexes for fast lookups"""
         # Clear existing indexes
-        self.technique_search_index.clear()
         self.tactic_search_index.clear()
         
-        # Build technique search index
-        for technique_id, technique in self.techniques_cache.items():
-            # Split name and description into words
-            name_words = set(technique['name'].lower().split())
-            desc_words = set(technique['description'].lower().split())
-            
-            # Add to index
-            words = name_words.union(desc_words)
-            for word in words:
-                if len(word) >= 3:  # Only index words of 3+ characters
-                    if word not in self.technique_search_index:
-                        self.technique_search_index[word] = set()
-                    self.technique_search_index[word].add(technique_id)
+        # Build ranked technique search index
+        self.technique_search_index.build(
+            (technique_id, technique['name'], technique['description'])
+            for technique_id, technique in self.techniques_cache.items()
+        )
         
         # Build tactic search index
         for tactic, techniques in self.tactics_cache.items():
@@ -500,40 +681,19 @@ class EnhancedMitreService:
         """Get techniques by platform"""
         return self.platforms_cache.get(platform, [])
     
-    def search_techniques(self, query: str) -> List[Dict[str, Any]]:
-        """Search techniques by keywords"""
-        query = query.lower()
+    def search_techniques(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search techniques by keywords, ranked by BM25 relevance
+        
+        Supports quoted phrase queries and ``*`` prefix queries; pass ``limit``
+        to retrieve only the top-k results.
+        """
         matching_techniques = []
-        seen_ids = set()
         
-        # Direct match in name or description
-        for technique_id, technique in self.techniques_cache.items():
-            if (query in technique['name'].lower() or 
-                query in technique['description'].lower()):
-                
-                # Add relevance score
-                technique_copy = technique.copy()
-                technique_copy['relevance_score'] = self._calculate_relevance_score(
-                    query, technique['name'], technique['description']
-                )
-                matching_techniques.append(technique_copy)
-                seen_ids.add(technique_id)
-        
-        # Word-based matching from index
-        query_words = query.split()
-        for word in query_words:
-            if len(word) >= 3 and word in self.technique_search_index:
-                for technique_id in self.technique_search_index[word]:
-                    if technique_id not in seen_ids:
-                        technique = self.techniques_cache[technique_id].copy()
-                        technique['relevance_score'] = self._calculate_relevance_score(
-                            query, technique['name'], technique['description']
-                        )
-                        matching_techniques.append(technique)
-                        seen_ids.add(technique_id)
-        
-        # Sort by relevance
-        matching_techniques.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+        for technique_id, score in self.technique_search_index.search(query, limit):
+            technique = self.techniques_cache[technique_id].copy()
+            technique['relevance_score'] = round(score, 4)
+            matching_techniques.append(technique)
+        
         return matching_techniques
     
     def get_mitigations_for_technique(self, technique_id: str) -> List[Dict[str, Any]]:
@@ -547,6 +707,14 @@ class EnhancedMitreService:
             for mid in technique.get('mitigations', [])
         ]
     
+    def get_subtechniques(self, technique_id: str) -> List[str]:
+        """Get sub-technique IDs for a parent technique"""
+        return self.technique_to_subtechniques.get(technique_id, [])
+
+    def get_parent_technique(self, technique_id: str) -> Optional[str]:
+        """Get the parent technique ID for a sub-technique"""
+        return self.subtechnique_to_parent.get(technique_id)
+
     def get_all_tactics(self) -> List[str]:
         """Get all tactics"""
         return sorted(list(self.tactics_cache.keys()))
@@ -700,32 +868,6 @@ class EnhancedMitreService:
     # Private Helper Methods
     #
     
-    def _calculate_relevance_score(self, query: str, name: str, description: str) -> float:
-        """Calculate relevance score for search results"""
-        score = 0.0
-        query = query.lower()
-        name = name.lower()
-        description = description.lower()
-        
-        # Name match gets higher score
-        if query in name:
-            score += 2.0
-            if name.startswith(query):
-                score += 1.0
-        
-        # Description match
-        if query in description:
-            score += 1.0
-        
-        # Exact word matches get bonus
-        for word in query.split():
-            if word in name.split():
-                score += 0.5
-            if word in description.split():
-                score += 0.3
-        
-        return score
-    
     def _calculate_component_relevance(
         self, 
         technique: Dict[str, Any],
@@ -0,0 +1,104 @@
+"""
+Incremental JSON Parsing
+Extracts top-level members of a JSON object while it is still being streamed
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class IncrementalJSONParser:
+    """
+    Parse a streamed JSON object one top-level member at a time
+
+    Text is fed in arbitrary pieces. Each call to ``feed`` returns the
+    ``(key, value)`` pairs of top-level members that completed within that
+    piece, so an agent can act on e.g. ``critical_assets`` before the model
+    has finished writing ``entry_points``. Anything before the opening brace
+    (prose, a markdown code fence) is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self._members: Dict[str, Any] = {}
+        self.done = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Add streamed text and return members completed by it"""
+        if self.done:
+            return []
+
+        self._buffer += text
+        completed = []
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+
+            elif self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+
+            elif char == '"':
+                self._in_string = True
+
+            elif char in "{[":
+                self._depth += 1
+
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    member = self._close_member(self._pos)
+                    if member:
+                        completed.append(member)
+                    self.done = True
+                    self._pos += 1
+                    break
+
+            elif char == "," and self._depth == 1:
+                member = self._close_member(self._pos)
+                if member:
+                    completed.append(member)
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return completed
+
+    def _close_member(self, end: int) -> Optional[Tuple[str, Any]]:
+        """Decode the ``"key": value`` text between the member start and ``end``"""
+        text = self._buffer[self._member_start:end].strip()
+        if not text:
+            return None
+
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            return None
+
+        key, value = next(iter(member.items()))
+        self._members[key] = value
+        return key, value
+
+    def result(self) -> Dict[str, Any]:
+        """The complete object, or the members parsed so far if the stream was cut short"""
+        if self.done:
+            start = self._buffer.find("{")
+            try:
+                return json.loads(self._buffer[start:self._pos])
+            except json.JSONDecodeError:
+                pass
+        return dict(self._members)
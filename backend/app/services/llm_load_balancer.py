@@ -0,0 +1,65 @@
+"""
+LLM Provider Load Balancer
+Routes requests across configured providers by observed latency, load and quota
+"""
+
+import logging
+from typing import Dict, Optional
+
+from app.services.llm_providers import BaseLLMProvider, LLMModel
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderLoadBalancer:
+    """
+    Pick the provider expected to serve the next request soonest
+
+    A provider's score is its p50 latency for the model, scaled by how full
+    its adaptive concurrency limit is and by how little request quota it has
+    left. Providers with no latency samples yet score as if they had
+    ``default_latency`` so they receive traffic and get measured. Providers
+    whose quota is exhausted are only used when every candidate is.
+    """
+
+    def __init__(self, default_latency: float = 1.0, min_quota_fraction: float = 0.05):
+        self.default_latency = default_latency
+        self.min_quota_fraction = min_quota_fraction
+        self.selections: Dict[str, int] = {}
+
+    def score(self, provider: BaseLLMProvider, model: LLMModel) -> float:
+        """Lower is better"""
+        limiter = provider.get_limiter(model)
+        latency = limiter.p50_latency
+        if latency is None:
+            latency = self.default_latency
+
+        # Requests queued on the limiter count as load too
+        load = (limiter.in_flight + limiter.waiting + 1) / max(limiter.limit, 1)
+
+        quota = provider.quota_fraction
+        if quota is None:
+            quota = 1.0
+        if quota <= 0:
+            return float("inf")
+
+        return latency * load / max(quota, self.min_quota_fraction)
+
+    def select(
+        self,
+        providers: Dict[str, BaseLLMProvider],
+        models: Dict[str, LLMModel]
+    ) -> Optional[str]:
+        """Choose among ``providers``, scoring each on the model it would serve"""
+        best_name = None
+        best_score = None
+
+        # Ties go to the first provider in configuration order
+        for name, provider in providers.items():
+            score = self.score(provider, models[name])
+            if best_score is None or score < best_score:
+                best_name, best_score = name, score
+
+        if best_name is not None:
+            self.selections[best_name] = self.selections.get(best_name, 0) + 1
+        return best_name
@@ -7,6 +7,7 @@ from .base import (
     BaseLLMProvider, 
     LLMRequest, 
     LLMResponse, 
+    LLMStreamChunk,
     LLMMessage, 
     LLMModel, 
     TokenUsage,
@@ -16,14 +17,17 @@ from .base import (
     ModelNotFoundError
 )
 
+from .adaptive_limiter import AdaptiveConcurrencyLimiter
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
+from .fake_provider import FakeLLMProvider
 
 __all__ = [
     # Base classes and types
     "BaseLLMProvider",
     "LLMRequest", 
     "LLMResponse",
+    "LLMStreamChunk",
     "LLMMessage",
     "LLMModel",
     "TokenUsage",
@@ -34,7 +38,11 @@ __all__ = [
     "APIError",
     "ModelNotFoundError",
     
+    # Concurrency control
+    "AdaptiveConcurrencyLimiter",
+    
     # Provider implementations
     "OpenAIProvider",
     "AnthropicProvider",
+    "FakeLLMProvider",
 ]
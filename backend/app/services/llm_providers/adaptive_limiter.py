@@ -0,0 +1,199 @@
+"""
+Adaptive Concurrency Limiter
+AIMD (additive increase, multiplicative decrease) limit on in-flight LLM requests
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from statistics import median
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTiming:
+    """
+    Latency of one request as the limiter judges it
+
+    Generation time grows with the length of the answer, not with provider
+    load, so a stream is timed to its first chunk and a whole response's
+    time is scaled down to ``reference_tokens`` output tokens.
+    """
+
+    def __init__(self, reference_tokens: int):
+        self.reference_tokens = reference_tokens
+        self.start = time.monotonic()
+        self.first_chunk_after: Optional[float] = None
+        self.output_tokens: Optional[int] = None
+
+    def first_chunk(self):
+        """Record that a streamed response has started arriving"""
+        if self.first_chunk_after is None:
+            self.first_chunk_after = time.monotonic() - self.start
+
+    @property
+    def latency(self) -> float:
+        if self.first_chunk_after is not None:
+            return self.first_chunk_after
+        elapsed = time.monotonic() - self.start
+        if self.output_tokens and self.output_tokens > self.reference_tokens:
+            return elapsed * self.reference_tokens / self.output_tokens
+        return elapsed
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to provider feedback
+
+    While the limit is fully used, it grows by ``increase`` per window of
+    successful requests (one window being ``limit`` completions). It is
+    multiplied by ``decrease_factor`` on a rate limit, or by
+    ``latency_decrease_factor`` when a request is slower than
+    ``latency_target``. At most one decrease is applied per
+    ``decrease_cooldown`` seconds (default: the p50 latency, i.e. one round
+    trip), so a burst of 429s from the same overload halves the limit once
+    rather than collapsing it to the minimum. Latency is time to first chunk
+    for streams and per ``latency_reference_tokens`` of output otherwise
+    (see RequestTiming), so long answers are not mistaken for overload.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_target: Optional[float] = None,
+        latency_decrease_factor: float = 0.9,
+        decrease_cooldown: Optional[float] = None,
+        latency_window: int = 50,
+        latency_reference_tokens: int = 256
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_decrease_factor = latency_decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.latency_reference_tokens = latency_reference_tokens
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = asyncio.Condition()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._last_decrease = 0.0
+
+        self.stats = {"requests": 0, "rate_limited": 0, "slow": 0, "errors": 0, "waited": 0}
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    @property
+    def available(self) -> int:
+        return max(0, self.limit - self._in_flight)
+
+    @property
+    def p50_latency(self) -> Optional[float]:
+        return median(self._latencies) if self._latencies else None
+
+    async def acquire(self):
+        """Wait for a free slot under the current limit"""
+        async with self._condition:
+            if self._in_flight >= self.limit:
+                self.stats["waited"] += 1
+            self._waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+
+    async def release(self, latency: Optional[float] = None, rate_limited: bool = False, error: bool = False):
+        """Free a slot and adjust the limit from the request outcome"""
+        async with self._condition:
+            saturated = self._in_flight >= self.limit or self._waiting > 0
+            self._in_flight -= 1
+            self.stats["requests"] += 1
+
+            if rate_limited:
+                self.stats["rate_limited"] += 1
+                self._decrease(self.decrease_factor, "rate limited")
+            elif error:
+                # Errors say nothing about capacity; leave the limit alone
+                self.stats["errors"] += 1
+            else:
+                if latency is not None:
+                    self._latencies.append(latency)
+
+                if self.latency_target and latency is not None and latency > self.latency_target:
+                    self.stats["slow"] += 1
+                    self._decrease(self.latency_decrease_factor, f"latency {latency:.1f}s")
+                elif saturated:
+                    # Only probe for more capacity when the current limit is the bottleneck
+                    self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+
+            self._condition.notify_all()
+
+    def _decrease(self, factor: float, reason: str):
+        now = time.monotonic()
+        cooldown = self.decrease_cooldown
+        if cooldown is None:
+            cooldown = self.p50_latency or 1.0
+        if now - self._last_decrease < cooldown:
+            return
+
+        self._last_decrease = now
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit * factor)
+        if self.limit != previous:
+            logger.info(f"Concurrency limit for {self.name} lowered {previous} -> {self.limit} ({reason})")
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[RequestTiming]:
+        """Hold a slot for the duration of a request, reporting its outcome on exit
+
+        Callers mark the first streamed chunk or set the response's output
+        tokens on the yielded timing.
+        """
+        from .base import RateLimitError  # base imports this module
+
+        await self.acquire()
+        timing = RequestTiming(self.latency_reference_tokens)
+        try:
+            yield timing
+        except RateLimitError:
+            await self.release(rate_limited=True)
+            raise
+        except BaseException:
+            await self.release(error=True)
+            raise
+        else:
+            await self.release(latency=timing.latency)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current limit, load and latency"""
+        p50 = self.p50_latency
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "p50_latency": round(p50, 3) if p50 is not None else None,
+            **self.stats
+        }
@@ -5,11 +5,11 @@ Supports Claude 3.5 Sonnet, Claude 3 Haiku and other Anthropic models
 
 import json
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 import httpx
 
 from .base import (
-    BaseLLMProvider, LLMRequest, LLMResponse, LLMMessage, LLMModel, 
+    BaseLLMProvider, LLMRequest, LLMResponse, LLMMessage, LLMModel, LLMStreamChunk,
     TokenUsage, APIError, RateLimitError, ModelNotFoundError
 )
 
@@ -21,6 +21,7 @@ class AnthropicProvider(BaseLLMProvider):
     
     BASE_URL = "https://api.anthropic.com/v1"
     API_VERSION = "2023-06-01"
+    RATE_LIMIT_HEADERS = ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-limit")
     
     # Cost per 1K tokens (as of 2024)
     MODEL_COSTS = {
@@ -88,14 +89,11 @@ class AnthropicProvider(BaseLLMProvider):
         
         return system_message, conversation_messages
     
-    async def _make_request(self, request: LLMRequest) -> LLMResponse:
-        """Make request to Anthropic API"""
-        self.validate_request(request)
-        
+    def _build_payload(self, request: LLMRequest) -> Dict[str, Any]:
+        """Build the messages API payload for a request"""
         # Format messages for Anthropic API
         system_message, messages = self._format_messages(request.messages)
         
-        # Build request payload
         payload = {
             "model": request.model.value,
             "messages": messages,
@@ -117,6 +115,31 @@ class AnthropicProvider(BaseLLMProvider):
         if request.stop:
             payload["stop_sequences"] = request.stop if isinstance(request.stop, list) else [request.stop]
         
+        return payload
+    
+    def _check_status(self, response: httpx.Response, request: LLMRequest) -> None:
+        """Record quota headers and raise the matching LLM error for an unsuccessful response"""
+        self._record_rate_limit(response.headers)
+        
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            retry_after = int(retry_after) if retry_after else None
+            raise RateLimitError(retry_after)
+        
+        if response.status_code == 404:
+            raise ModelNotFoundError(f"Model {request.model.value} not found")
+        
+        if response.status_code >= 400:
+            error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+            error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+            raise APIError(f"Anthropic API error: {error_msg}")
+    
+    async def _make_request(self, request: LLMRequest) -> LLMResponse:
+        """Make request to Anthropic API"""
+        self.validate_request(request)
+        
+        payload = self._build_payload(request)
+        
         try:
             response = await self.client.post(
                 f"{self.BASE_URL}/messages",
@@ -125,19 +148,7 @@ class AnthropicProvider(BaseLLMProvider):
                 timeout=60.0
             )
             
-            # Handle different response status codes
-            if response.status_code == 429:
-                retry_after = response.headers.get("retry-after")
-                retry_after = int(retry_after) if retry_after else None
-                raise RateLimitError(retry_after)
-            
-            if response.status_code == 404:
-                raise ModelNotFoundError(f"Model {request.model.value} not found")
-            
-            if response.status_code >= 400:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
-                raise APIError(f"Anthropic API error: {error_msg}")
+            self._check_status(response, request)
             
             response.raise_for_status()
             data = response.json()
@@ -181,6 +192,63 @@ class AnthropicProvider(BaseLLMProvider):
         except KeyError as e:
             raise APIError(f"Unexpected response format from Anthropic: {str(e)}")
     
+    async def _stream_request(self, request: LLMRequest) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a message from the Anthropic API"""
+        self.validate_request(request)
+        
+        payload = self._build_payload(request)
+        payload["stream"] = True
+        
+        finish_reason = None
+        prompt_tokens = 0
+        completion_tokens = 0
+        model = request.model.value
+        
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.BASE_URL}/messages",
+                headers=self.headers,
+                json=payload,
+                timeout=60.0
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                self._check_status(response, request)
+                
+                async for event in self._iter_sse_data(response):
+                    event_type = event.get("type")
+                    
+                    if event_type == "message_start":
+                        message = event.get("message", {})
+                        model = message.get("model", model)
+                        prompt_tokens = message.get("usage", {}).get("input_tokens", 0)
+                    
+                    elif event_type == "content_block_delta":
+                        delta = event.get("delta", {})
+                        if delta.get("type") == "text_delta" and delta.get("text"):
+                            yield LLMStreamChunk(delta=delta["text"], model=model)
+                    
+                    elif event_type == "message_delta":
+                        finish_reason = event.get("delta", {}).get("stop_reason") or finish_reason
+                        completion_tokens = event.get("usage", {}).get("output_tokens", completion_tokens)
+                    
+                    elif event_type == "error":
+                        raise APIError(f"Anthropic API error: {event.get('error', {}).get('message', 'stream error')}")
+                    
+                    elif event_type == "message_stop":
+                        break
+            
+        except httpx.RequestError as e:
+            raise APIError(f"Anthropic request failed: {str(e)}")
+        
+        token_usage = TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens
+        )
+        yield LLMStreamChunk(done=True, finish_reason=finish_reason, token_usage=token_usage, model=model)
+    
     async def __aenter__(self):
         """Async context manager entry"""
         return self
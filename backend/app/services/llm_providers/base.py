@@ -4,12 +4,15 @@ Abstract base class for all LLM providers in AITM system
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Union
+from typing import AsyncIterator, Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
+import json
 import time
 import logging
 from enum import Enum
 
+from .adaptive_limiter import AdaptiveConcurrencyLimiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,6 +86,20 @@ class LLMResponse:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class LLMStreamChunk:
+    """Incremental piece of a streamed completion
+    
+    The final chunk has ``done`` set and carries the finish reason and token usage.
+    """
+    delta: str = ""
+    done: bool = False
+    finish_reason: Optional[str] = None
+    token_usage: Optional[TokenUsage] = None
+    model: Optional[str] = None
+    provider: str = ""
+
+
 class LLMError(Exception):
     """Base exception for LLM provider errors"""
     pass
@@ -108,10 +125,16 @@ class ModelNotFoundError(LLMError):
 class BaseLLMProvider(ABC):
     """Abstract base class for all LLM providers"""
     
+    # Response headers reporting remaining and total request quota, if the provider sends them
+    RATE_LIMIT_HEADERS: Optional[tuple] = None
+    
     def __init__(self, api_key: Optional[str] = None, **kwargs):
         self.api_key = api_key
         self.provider_name = self.__class__.__name__.replace('Provider', '').lower()
         self.config = kwargs
+        self.limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_total: Optional[int] = None
         self._setup_client()
     
     @abstractmethod
@@ -138,6 +161,38 @@ class BaseLLMProvider(ABC):
         """Check if the model is supported by this provider"""
         return model in self._get_supported_models()
     
+    def get_limiter(self, model: LLMModel) -> AdaptiveConcurrencyLimiter:
+        """Adaptive concurrency limiter for a model, configured from the ``concurrency`` option"""
+        limiter = self.limiters.get(model.value)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(
+                name=f"{self.provider_name}/{model.value}",
+                **self.config.get("concurrency", {})
+            )
+            self.limiters[model.value] = limiter
+        return limiter
+    
+    def _record_rate_limit(self, headers) -> None:
+        """Track remaining request quota from response headers"""
+        if not self.RATE_LIMIT_HEADERS:
+            return
+        
+        remaining_header, total_header = self.RATE_LIMIT_HEADERS
+        try:
+            if headers.get(remaining_header) is not None:
+                self.rate_limit_remaining = int(headers[remaining_header])
+            if headers.get(total_header) is not None:
+                self.rate_limit_total = int(headers[total_header])
+        except (TypeError, ValueError):
+            pass
+    
+    @property
+    def quota_fraction(self) -> Optional[float]:
+        """Fraction of the request quota left in the current window, if known"""
+        if self.rate_limit_remaining is None or not self.rate_limit_total:
+            return None
+        return self.rate_limit_remaining / self.rate_limit_total
+    
     async def generate(self, request: LLMRequest) -> LLMResponse:
         """
         Main entry point for generating completions
@@ -180,18 +235,102 @@ class BaseLLMProvider(ABC):
             )
             raise
     
+    async def generate_stream(
+        self,
+        request: LLMRequest,
+        max_retries: int = 3,
+        base_delay: float = 1.0
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a completion as it is generated
+        
+        Yields text deltas followed by a final chunk with usage and cost. Failures
+        before the first chunk are retried with backoff; a failure mid-stream is
+        raised to the caller, since retrying would repeat text already delivered.
+        """
+        if not self.is_model_supported(request.model):
+            raise ModelNotFoundError(f"Model {request.model.value} not supported by {self.provider_name}")
+        
+        start_time = time.time()
+        first_chunk_time = None
+        
+        for attempt in range(max_retries + 1):
+            try:
+                async with self.get_limiter(request.model).slot() as timing:
+                    async for chunk in self._stream_request(request):
+                        if first_chunk_time is None:
+                            first_chunk_time = time.time() - start_time
+                            timing.first_chunk()
+                        
+                        chunk.provider = self.provider_name
+                        if chunk.done and chunk.token_usage:
+                            chunk.token_usage.estimated_cost = self._estimate_cost(request.model, chunk.token_usage)
+                        yield chunk
+                break
+                
+            except (RateLimitError, APIError) as e:
+                if first_chunk_time is not None or attempt == max_retries:
+                    logger.error(
+                        f"LLM stream failed: {self.provider_name}, "
+                        f"model={request.model.value}, "
+                        f"error={str(e)}, "
+                        f"time={time.time() - start_time:.2f}s"
+                    )
+                    raise
+                
+                retry_after = e.retry_after if isinstance(e, RateLimitError) else None
+                delay = retry_after if retry_after else base_delay * (2 ** attempt)
+                logger.warning(
+                    f"Stream request failed, retrying in {delay}s (attempt {attempt + 1}/{max_retries + 1}): {e}"
+                )
+                await self._sleep(delay)
+        
+        logger.info(
+            f"LLM stream completed: {self.provider_name}, "
+            f"model={request.model.value}, "
+            f"first_chunk={first_chunk_time or 0.0:.2f}s, "
+            f"time={time.time() - start_time:.2f}s"
+        )
+    
+    async def _stream_request(self, request: LLMRequest) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Provider-specific streaming request
+        
+        The default implementation makes a regular request and yields the whole
+        completion as one chunk, so every provider supports generate_stream().
+        """
+        response = await self._make_request(request)
+        if response.content:
+            yield LLMStreamChunk(delta=response.content, model=response.model)
+        yield LLMStreamChunk(
+            done=True,
+            finish_reason=response.finish_reason,
+            token_usage=response.token_usage,
+            model=response.model
+        )
+    
     async def _make_request_with_retry(
         self, 
         request: LLMRequest, 
         max_retries: int = 3,
         base_delay: float = 1.0
     ) -> LLMResponse:
-        """Make request with exponential backoff retry logic"""
+        """Make request with exponential backoff retry logic
+        
+        Each attempt holds a slot in the model's adaptive concurrency limiter,
+        which shrinks on rate limits so retries do not pile onto an overloaded provider.
+        The response's output tokens let the limiter discount generation time.
+        """
         last_exception = None
+        limiter = self.get_limiter(request.model)
         
         for attempt in range(max_retries + 1):
             try:
-                return await self._make_request(request)
+                async with limiter.slot() as timing:
+                    response = await self._make_request(request)
+                    if response.token_usage:
+                        timing.output_tokens = response.token_usage.completion_tokens
+                    return response
                 
             except RateLimitError as e:
                 if attempt == max_retries:
@@ -226,6 +365,23 @@ class BaseLLMProvider(ABC):
         import asyncio
         await asyncio.sleep(seconds)
     
+    async def _iter_sse_data(self, response) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the decoded JSON payload of each ``data:`` line in a server-sent event stream"""
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            
+            data = line[5:].strip()
+            if not data:
+                continue
+            if data == "[DONE]":
+                return
+            
+            try:
+                yield json.loads(data)
+            except json.JSONDecodeError as e:
+                raise APIError(f"Invalid JSON in {self.provider_name} stream: {str(e)}")
+    
     def validate_request(self, request: LLMRequest) -> None:
         """Validate the request parameters"""
         if not request.messages:
@@ -245,5 +401,7 @@ class BaseLLMProvider(ABC):
         return {
             "name": self.provider_name,
             "supported_models": [model.value for model in self._get_supported_models()],
-            "config": {k: v for k, v in self.config.items() if k != 'api_key'}
+            "config": {k: v for k, v in self.config.items() if k != 'api_key'},
+            "concurrency": {model: limiter.get_stats() for model, limiter in self.limiters.items()},
+            "rate_limit": {"remaining": self.rate_limit_remaining, "total": self.rate_limit_total}
         }
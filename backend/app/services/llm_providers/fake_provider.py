@@ -0,0 +1,104 @@
+"""
+Fake LLM Provider
+Local stand-in for a hosted provider, simulating latency, server capacity and
+request quota for load testing without API keys or cost
+"""
+
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+from .base import (
+    BaseLLMProvider, LLMRequest, LLMResponse, LLMModel,
+    TokenUsage, RateLimitError
+)
+
+
+class FakeLLMProvider(BaseLLMProvider):
+    """
+    Simulated provider
+
+    - ``latency`` seconds per request, stretched as load approaches ``capacity``
+    - More than ``capacity`` concurrent requests are rejected with a 429
+    - At most ``requests_per_second`` requests are accepted per second window
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = "fake",
+        name: str = "fake",
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        capacity: Optional[int] = None,
+        requests_per_second: Optional[int] = None,
+        models: Optional[List[LLMModel]] = None,
+        **kwargs
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.requests_per_second = requests_per_second
+        self.models = models or list(LLMModel)
+        super().__init__(api_key, **kwargs)
+        self.provider_name = name
+
+    def _setup_client(self) -> None:
+        """Reset simulated server state"""
+        self.active = 0
+        self.peak_active = 0
+        self.served = 0
+        self.rejected = 0
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def _get_supported_models(self) -> List[LLMModel]:
+        return self.models
+
+    def _estimate_cost(self, model: LLMModel, token_usage: TokenUsage) -> float:
+        return 0.0
+
+    def _admit(self) -> None:
+        """Apply the simulated quota and capacity, raising a rate limit when exceeded"""
+        if self.requests_per_second:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+
+            self.rate_limit_total = self.requests_per_second
+            self.rate_limit_remaining = max(0, self.requests_per_second - self._window_count)
+            if self._window_count >= self.requests_per_second:
+                self.rejected += 1
+                raise RateLimitError(retry_after=None)
+            self._window_count += 1
+
+        if self.capacity and self.active >= self.capacity:
+            self.rejected += 1
+            raise RateLimitError(retry_after=None)
+
+    async def _make_request(self, request: LLMRequest) -> LLMResponse:
+        self.validate_request(request)
+        self._admit()
+
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            load = self.active / self.capacity if self.capacity else 0.0
+            delay = self.latency * (1 + load) + random.uniform(0, self.jitter)
+            await asyncio.sleep(delay)
+        finally:
+            self.active -= 1
+
+        self.served += 1
+        prompt_tokens = sum(len(message.content.split()) for message in request.messages)
+        return LLMResponse(
+            content=f"[{self.provider_name}] {request.messages[-1].content[:50]}",
+            model=request.model.value,
+            finish_reason="stop",
+            token_usage=TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=10,
+                total_tokens=prompt_tokens + 10
+            )
+        )
@@ -5,11 +5,11 @@ Supports GPT-4, GPT-4o, and other OpenAI models
 
 import json
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 import httpx
 
 from .base import (
-    BaseLLMProvider, LLMRequest, LLMResponse, LLMMessage, LLMModel, 
+    BaseLLMProvider, LLMRequest, LLMResponse, LLMMessage, LLMModel, LLMStreamChunk,
     TokenUsage, APIError, RateLimitError, ModelNotFoundError
 )
 
@@ -20,6 +20,7 @@ class OpenAIProvider(BaseLLMProvider):
     """OpenAI API provider implementation"""
     
     BASE_URL = "https://api.openai.com/v1"
+    RATE_LIMIT_HEADERS = ("x-ratelimit-remaining-requests", "x-ratelimit-limit-requests")
     
     # Cost per 1K tokens (as of 2024) - Update these regularly
     MODEL_COSTS = {
@@ -79,11 +80,8 @@ class OpenAIProvider(BaseLLMProvider):
             formatted.append(formatted_msg)
         return formatted
     
-    async def _make_request(self, request: LLMRequest) -> LLMResponse:
-        """Make request to OpenAI API"""
-        self.validate_request(request)
-        
-        # Build request payload
+    def _build_payload(self, request: LLMRequest) -> Dict[str, Any]:
+        """Build the chat completions payload for a request"""
         payload = {
             "model": request.model.value,
             "messages": self._format_messages(request.messages),
@@ -105,6 +103,31 @@ class OpenAIProvider(BaseLLMProvider):
         if request.tool_choice:
             payload["tool_choice"] = request.tool_choice
         
+        return payload
+    
+    def _check_status(self, response: httpx.Response, request: LLMRequest) -> None:
+        """Record quota headers and raise the matching LLM error for an unsuccessful response"""
+        self._record_rate_limit(response.headers)
+        
+        if response.status_code == 429:
+            retry_after = response.headers.get("retry-after")
+            retry_after = int(retry_after) if retry_after else None
+            raise RateLimitError(retry_after)
+        
+        if response.status_code == 404:
+            raise ModelNotFoundError(f"Model {request.model.value} not found")
+        
+        if response.status_code >= 400:
+            error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+            error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
+            raise APIError(f"OpenAI API error: {error_msg}")
+    
+    async def _make_request(self, request: LLMRequest) -> LLMResponse:
+        """Make request to OpenAI API"""
+        self.validate_request(request)
+        
+        payload = self._build_payload(request)
+        
         try:
             response = await self.client.post(
                 f"{self.BASE_URL}/chat/completions",
@@ -113,19 +136,7 @@ class OpenAIProvider(BaseLLMProvider):
                 timeout=60.0
             )
             
-            # Handle different response status codes
-            if response.status_code == 429:
-                retry_after = response.headers.get("retry-after")
-                retry_after = int(retry_after) if retry_after else None
-                raise RateLimitError(retry_after)
-            
-            if response.status_code == 404:
-                raise ModelNotFoundError(f"Model {request.model.value} not found")
-            
-            if response.status_code >= 400:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                error_msg = error_data.get("error", {}).get("message", f"HTTP {response.status_code}")
-                raise APIError(f"OpenAI API error: {error_msg}")
+            self._check_status(response, request)
             
             response.raise_for_status()
             data = response.json()
@@ -169,6 +180,53 @@ class OpenAIProvider(BaseLLMProvider):
         except KeyError as e:
             raise APIError(f"Unexpected response format from OpenAI: {str(e)}")
     
+    async def _stream_request(self, request: LLMRequest) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a chat completion from the OpenAI API"""
+        self.validate_request(request)
+        
+        payload = self._build_payload(request)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        
+        finish_reason = None
+        token_usage = None
+        model = request.model.value
+        
+        try:
+            async with self.client.stream(
+                "POST",
+                f"{self.BASE_URL}/chat/completions",
+                headers=self.headers,
+                json=payload,
+                timeout=60.0
+            ) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                self._check_status(response, request)
+                
+                async for data in self._iter_sse_data(response):
+                    model = data.get("model", model)
+                    
+                    # The final usage event has no choices
+                    usage_data = data.get("usage")
+                    if usage_data:
+                        token_usage = TokenUsage(
+                            prompt_tokens=usage_data.get("prompt_tokens", 0),
+                            completion_tokens=usage_data.get("completion_tokens", 0),
+                            total_tokens=usage_data.get("total_tokens", 0)
+                        )
+                    
+                    for choice in data.get("choices", []):
+                        finish_reason = choice.get("finish_reason") or finish_reason
+                        delta = choice.get("delta", {}).get("content")
+                        if delta:
+                            yield LLMStreamChunk(delta=delta, model=model)
+            
+        except httpx.RequestError as e:
+            raise APIError(f"OpenAI request failed: {str(e)}")
+        
+        yield LLMStreamChunk(done=True, finish_reason=finish_reason, token_usage=token_usage, model=model)
+    
     async def __aenter__(self):
         """Async context manager entry"""
         return self
@@ -0,0 +1,350 @@
+"""
+LLM Response Cache
+Content-addressed cache for LLM completions keyed on a canonical hash of the request
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.services.llm_providers.base import LLMRequest, LLMResponse, TokenUsage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bump when the key derivation or stored payload changes
+CACHE_KEY_VERSION = 1
+
+
+def make_cache_key(payload: Dict[str, Any]) -> str:
+    """Hash a JSON-serializable payload into a stable cache key"""
+    canonical = json.dumps(
+        {"v": CACHE_KEY_VERSION, **payload},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def request_cache_key(request: LLMRequest, provider: str) -> str:
+    """Cache key covering every field of an LLMRequest and the provider serving it"""
+    payload = dataclasses.asdict(request)
+    payload["model"] = request.model.value
+    payload["provider"] = provider
+    return make_cache_key(payload)
+
+
+def response_to_dict(response: LLMResponse) -> Dict[str, Any]:
+    """Serialize an LLMResponse for storage"""
+    return dataclasses.asdict(response)
+
+
+def response_from_dict(data: Dict[str, Any]) -> LLMResponse:
+    """Rebuild an LLMResponse from storage"""
+    data = dict(data)
+    if data.get("token_usage"):
+        data["token_usage"] = TokenUsage(**data["token_usage"])
+    return LLMResponse(**data)
+
+
+class ResponseCacheBackend(ABC):
+    """Storage backend for cached responses"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        pass
+
+    def size(self) -> Optional[int]:
+        """Number of stored entries, if cheaply known"""
+        return None
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at and time.time() > expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        expires_at = time.time() + ttl if ttl > 0 else 0.0
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class SQLiteResponseCacheBackend(ResponseCacheBackend):
+    """On-disk cache in a SQLite file, evicting least recently used entries"""
+
+    def __init__(self, db_path: str, max_entries: int = 10000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = asyncio.Lock()
+        self._init_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5.0)
+
+    def _init_database(self):
+        """Create the cache table if needed"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_response_cache(last_access)"
+            )
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at and now > expires_at:
+                conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+                return None
+
+            conn.execute(
+                "UPDATE llm_response_cache SET last_access = ? WHERE cache_key = ?", (now, key)
+            )
+            return json.loads(value)
+
+    def _set(self, key: str, value: Dict[str, Any], ttl: int):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), now + ttl if ttl > 0 else 0.0, now)
+            )
+            conn.execute("""
+                DELETE FROM llm_response_cache WHERE cache_key IN (
+                    SELECT cache_key FROM llm_response_cache
+                    ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def _clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_response_cache")
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def clear(self) -> None:
+        async with self._lock:
+            await asyncio.to_thread(self._clear)
+
+
+class CacheManagerResponseCacheBackend(ResponseCacheBackend):
+    """Shared cache through CacheManager (Redis with in-memory fallback)
+
+    Size-based eviction is left to the Redis maxmemory policy.
+    """
+
+    KEY_PREFIX = "llm_response:"
+
+    def __init__(self, cache_manager=None):
+        if cache_manager is None:
+            from app.core.cache import cache_manager
+        self.cache_manager = cache_manager
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.cache_manager.get(self.KEY_PREFIX + key)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        await self.cache_manager.set(self.KEY_PREFIX + key, value, expire=ttl)
+
+    async def clear(self) -> None:
+        # CacheManager has no prefix scan; entries age out through their TTL
+        logger.info("LLM response cache clear requested; Redis entries expire via TTL")
+
+
+class LLMResponseCache:
+    """
+    Response cache for LLM calls
+
+    Features:
+    - Keys are SHA-256 hashes of the canonical request (prompt, messages, model,
+      sampling parameters and provider)
+    - Pluggable backends: in-process LRU, SQLite file, or CacheManager/Redis
+    - TTL and size-based eviction
+    - Optional bypass for sampled (temperature > 0) requests
+    - Hit/miss counters and the cost saved by hits
+    """
+
+    def __init__(
+        self,
+        backend: ResponseCacheBackend,
+        ttl: int = 86400,
+        bypass_nonzero_temperature: bool = False,
+        enabled: bool = True
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.bypass_nonzero_temperature = bypass_nonzero_temperature
+        self.enabled = enabled
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "errors": 0,
+            "tokens_saved": 0,
+            "cost_saved": 0.0
+        }
+
+    def should_cache(self, temperature: float, use_cache: bool = True) -> bool:
+        """Whether a call with this temperature may be served from or stored in the cache"""
+        if not self.enabled or not use_cache:
+            return False
+        if self.bypass_nonzero_temperature and temperature > 0:
+            self.stats["bypassed"] += 1
+            return False
+        return True
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached payload, counting hits and misses"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"LLM response cache read failed: {e}")
+            self.stats["errors"] += 1
+            return None
+
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a payload under ``key``"""
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.error(f"LLM response cache write failed: {e}")
+            self.stats["errors"] += 1
+
+    def record_saving(self, token_usage: Optional[TokenUsage]):
+        """Count the tokens and cost a cache hit avoided"""
+        if token_usage:
+            self.stats["tokens_saved"] += token_usage.total
+            self.stats["cost_saved"] += token_usage.estimated_cost
+
+    async def get_response(self, request: LLMRequest, provider: str) -> Optional[LLMResponse]:
+        """Return a cached LLMResponse for ``request`` if present"""
+        data = await self.get(request_cache_key(request, provider))
+        if data is None:
+            return None
+
+        response = response_from_dict(data)
+        self.record_saving(response.token_usage)
+        response.response_time = 0.0
+        response.metadata = {**response.metadata, "cache_hit": True}
+        return response
+
+    async def set_response(self, request: LLMRequest, provider: str, response: LLMResponse):
+        """Store the LLMResponse produced for ``request``"""
+        await self.set(request_cache_key(request, provider), response_to_dict(response))
+
+    async def clear(self):
+        """Remove all cached responses"""
+        await self.backend.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            **self.stats,
+            "cost_saved": round(self.stats["cost_saved"], 6),
+            "hit_rate_percent": round(self.stats["hits"] / lookups * 100, 2) if lookups else 0.0
+        }
+
+
+def _create_backend() -> ResponseCacheBackend:
+    """Build the backend selected in settings"""
+    backend = settings.llm_cache_backend.lower()
+    if backend == "sqlite":
+        return SQLiteResponseCacheBackend(settings.llm_cache_sqlite_path, settings.llm_cache_max_entries)
+    if backend == "redis":
+        return CacheManagerResponseCacheBackend()
+    if backend != "memory":
+        logger.warning(f"Unknown LLM cache backend '{backend}', using in-memory cache")
+    return MemoryResponseCacheBackend(settings.llm_cache_max_entries)
+
+
+# Global cache instance
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get or create the global LLM response cache"""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache(
+            backend=_create_backend(),
+            ttl=settings.llm_cache_ttl,
+            bypass_nonzero_temperature=settings.llm_cache_bypass_nonzero_temperature,
+            enabled=settings.llm_cache_enabled
+        )
+    return _llm_response_cache
@@ -2,6 +2,7 @@
 LLM Service with dynamic provider selection
 """
 
+import dataclasses
 import logging
 import os
 import asyncio
@@ -28,6 +29,7 @@ except ImportError:
     litellm = None
 
 from app.core.config import get_settings
+from app.services.llm_providers.base import TokenUsage
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -53,6 +55,11 @@ if settings.langsmith_api_key and settings.langsmith_tracing:
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
     
+    model_name: str = ""
+    
+    # Cost per 1K tokens
+    MODEL_COSTS: Dict[str, float] = {"input": 0.0, "output": 0.0}
+    
     @abstractmethod
     async def generate_response(
         self, 
@@ -66,11 +73,28 @@ class LLMProvider(ABC):
     @abstractmethod
     def is_available(self) -> bool:
         pass
+    
+    def estimate_usage(self, prompt: str, completion: str) -> TokenUsage:
+        """Estimate token usage and cost at roughly four characters per token"""
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(completion or "") // 4
+        return TokenUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            estimated_cost=(
+                prompt_tokens / 1000 * self.MODEL_COSTS["input"]
+                + completion_tokens / 1000 * self.MODEL_COSTS["output"]
+            )
+        )
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT provider"""
     
+    model_name = "gpt-4"
+    MODEL_COSTS = {"input": 0.03, "output": 0.06}
+    
     def __init__(self):
         if settings.openai_api_key:
             openai.api_key = settings.openai_api_key
@@ -94,7 +118,7 @@ class OpenAIProvider(LLMProvider):
         messages.append({"role": "user", "content": prompt})
         
         response = await self.client.chat.completions.create(
-            model="gpt-4",
+            model=self.model_name,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens or 2000
@@ -109,10 +133,13 @@ class OpenAIProvider(LLMProvider):
 class GoogleProvider(LLMProvider):
     """Google Gemini provider"""
     
+    model_name = "gemini-pro"
+    MODEL_COSTS = {"input": 0.0005, "output": 0.0015}
+    
     def __init__(self):
         if settings.google_api_key:
             genai.configure(api_key=settings.google_api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(self.model_name)
         else:
             self.model = None
     
@@ -149,6 +176,8 @@ class GoogleProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """Ollama local model provider"""
     
+    model_name = "llama2"  # Default model, can be configured
+    
     def __init__(self):
         self.client = ollama.AsyncClient(host=settings.ollama_base_url)
     
@@ -167,7 +196,7 @@ class OllamaProvider(LLMProvider):
         
         try:
             response = await self.client.chat(
-                model="llama2",  # Default model, can be configured
+                model=self.model_name,
                 messages=messages,
                 options={
                     "temperature": temperature,
@@ -192,6 +221,9 @@ class OllamaProvider(LLMProvider):
 class LiteLLMProvider(LLMProvider):
     """LiteLLM provider for unified API access"""
     
+    model_name = "gpt-3.5-turbo"  # Can be configured
+    MODEL_COSTS = {"input": 0.0005, "output": 0.0015}
+    
     async def generate_response(
         self, 
         prompt: str, 
@@ -206,7 +238,7 @@ class LiteLLMProvider(LLMProvider):
         messages.append({"role": "user", "content": prompt})
         
         response = await litellm.acompletion(
-            model="gpt-3.5-turbo",  # Can be configured
+            model=self.model_name,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens or 2000
@@ -286,6 +318,10 @@ class LLMService:
             return {
                 "response": response,
                 "provider": provider_name,
+                "model": provider.model_name,
+                "token_usage": dataclasses.asdict(
+                    provider.estimate_usage(f"{system_prompt or ''}{prompt}", response)
+                ),
                 "success": True
             }
             
@@ -309,6 +345,10 @@ class LLMService:
                         return {
                             "response": response,
                             "provider": fallback_provider,
+                            "model": fallback.model_name,
+                            "token_usage": dataclasses.asdict(
+                                fallback.estimate_usage(f"{system_prompt or ''}{prompt}", response)
+                            ),
                             "success": True,
                             "fallback_used": True
                         }
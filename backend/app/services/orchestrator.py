@@ -5,22 +5,55 @@ Threat Modeling Orchestrator using Langgraph for multi-agent workflow
 import json
 import logging
 import uuid
+import time
 import asyncio
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select
 
-from app.core.database import async_session, Project, AttackPath, Recommendation
+from app.core.database import async_session, AttackPath, Recommendation, AnalysisState
 from app.agents.base_agent import SharedContextManager, SystemAnalystAgent
 from app.agents.attack_mapper_agent import AttackMapperAgent, ControlEvaluationAgent
-from app.agents.report_generation_agent import ReportGenerationAgent
+from app.agents.report_generation_agent import REPORT_SECTIONS, ReportGenerationAgent
 from app.models.schemas import AgentTask
+from app.services.analysis_state import (
+    mark_analysis_completed, mark_analysis_failed, mark_analysis_started,
+    report_section_publisher, update_analysis_progress
+)
 from app.services.llm_service import llm_service
 
 logger = logging.getLogger(__name__)
 
+# Per-stage timeouts in seconds; override via analysis_config["stage_timeouts"]
+DEFAULT_STAGE_TIMEOUTS: Dict[str, float] = {
+    "system_analysis": 300.0,
+    "attack_mapping": 300.0,
+    "control_evaluation": 300.0,
+    "recommendations": 180.0,
+    "report_generation": 300.0,
+}
+
+# Progress percentage and message published when each stage starts
+STAGE_PROGRESS: Dict[str, Tuple[float, str]] = {
+    "system_analysis": (10.0, "Analyzing system components..."),
+    "attack_mapping": (40.0, "Mapping attack techniques..."),
+    "control_evaluation": (65.0, "Evaluating security controls..."),
+    "recommendations": (70.0, "Generating security recommendations..."),
+    "report_generation": (85.0, "Generating comprehensive report..."),
+}
+
+
+@dataclass
+class AnalysisStage:
+    """A node in the analysis dependency graph"""
+    name: str
+    run: Callable[[], Awaitable[bool]]
+    depends_on: List[str] = field(default_factory=list)
+    timeout: float = 300.0
+    required: bool = True  # A failed required stage fails the whole analysis
+
 
 class ThreatModelingOrchestrator:
     """
@@ -43,27 +76,41 @@ class ThreatModelingOrchestrator:
             "report_generator": self.report_generator
         }
     
-    async def analyze_project(self, project_id: int, analysis_config: Dict[str, Any]):
+    async def analyze_project(
+        self,
+        project_id: int,
+        analysis_config: Dict[str, Any],
+        provider: Optional[str] = None
+    ):
         """
         Main orchestration method - coordinates the entire threat modeling process
+        
+        The workflow is executed as a dependency graph: stages whose
+        dependencies have finished run concurrently, so end-to-end latency
+        follows the critical path rather than the sum of all stages.
+        
+        Every LLM call prefers ``provider``, falling back to the config's
+        ``llm_provider`` and then the service default.
         """
         logger.info(f"Starting threat modeling analysis for project {project_id}")
+        provider = provider or analysis_config.get("llm_provider")
         
         try:
             # Initialize shared context
             context_manager = SharedContextManager(project_id)
             
-            # Set context for all agents
+            # Set context and provider for all agents
             for agent in self.agents.values():
                 agent.set_context_manager(context_manager)
+                agent.set_preferred_provider(provider)
             
             # Update project status
-            await self._update_project_status(project_id, "analyzing")
+            await self._update_project_status(project_id, "analyzing", config=analysis_config)
             
             # Get system input data
             system_inputs = await self._get_system_inputs(project_id)
             if not system_inputs:
-                await self._update_project_status(project_id, "failed")
+                await self._update_project_status(project_id, "failed", "No system inputs found")
                 logger.error(f"No system inputs found for project {project_id}")
                 return
             
@@ -72,62 +119,89 @@ class ThreatModelingOrchestrator:
                 input_data.content for input_data in system_inputs
             ])
             
-            # Step 1: System Analysis
-            logger.info(f"Step 1: System Analysis for project {project_id}")
+            stages = self._build_analysis_graph(
+                project_id, analysis_config, context_manager, combined_description, provider
+            )
+            succeeded, stage_timings = await self._run_analysis_graph(
+                project_id, stages, on_stage_start=self._update_stage_progress
+            )
+            await self._record_stage_timings(project_id, stage_timings)
+            
+            if not succeeded:
+                await self._update_project_status(project_id, "failed", "A required analysis stage failed")
+                return
+            
+            # Store Results in Database
+            logger.info(f"Storing results for project {project_id}")
+            await self._update_stage_progress(project_id, "finalizing")
+            await self._store_results(project_id, context_manager)
+            
+            # Mark as completed
+            await self._update_project_status(project_id, "completed")
+            logger.info(f"Threat modeling analysis completed for project {project_id}")
+            
+        except Exception as e:
+            logger.error(f"Threat modeling analysis failed for project {project_id}: {str(e)}", exc_info=True)
+            await self._update_project_status(project_id, "failed", f"Analysis workflow failed: {str(e)}")
+    
+    def _build_analysis_graph(
+        self,
+        project_id: int,
+        analysis_config: Dict[str, Any],
+        context_manager: SharedContextManager,
+        system_description: str,
+        provider: Optional[str] = None
+    ) -> List[AnalysisStage]:
+        """Build the stage dependency graph for a project analysis"""
+        timeouts = {**DEFAULT_STAGE_TIMEOUTS, **analysis_config.get("stage_timeouts", {})}
+        
+        async def system_analysis() -> bool:
             analysis_task = AgentTask(
                 task_id=str(uuid.uuid4()),
                 agent_type="system_analyst",
                 task_description="Analyze system description and identify assets, technologies, and entry points",
-                input_data={"system_description": combined_description}
+                input_data={"system_description": system_description}
             )
-            
-            analysis_result = await self.system_analyst.process_task(analysis_task)
-            
-            if analysis_result.status != "success":
-                logger.error(f"System analysis failed for project {project_id}: {analysis_result.errors}")
-                await self._update_project_status(project_id, "failed")
-                return
-            
-            # Step 2: Attack Path Mapping
-            logger.info(f"Step 2: Attack Path Mapping for project {project_id}")
+            result = await self.system_analyst.process_task(analysis_task)
+            if result.status != "success":
+                logger.error(f"System analysis failed for project {project_id}: {result.errors}")
+            return result.status == "success"
+        
+        async def attack_mapping() -> bool:
             mapping_task = AgentTask(
                 task_id=str(uuid.uuid4()),
                 agent_type="attack_mapper",
                 task_description="Map system components to ATT&CK techniques and generate attack paths",
                 input_data={"analysis_depth": analysis_config.get("analysis_depth", "standard")}
             )
-            
-            mapping_result = await self.attack_mapper.process_task(mapping_task)
-            
-            if mapping_result.status != "success":
-                logger.error(f"Attack mapping failed for project {project_id}: {mapping_result.errors}")
-                await self._update_project_status(project_id, "failed")
-                return
-            
-            # Step 3: Control Evaluation (if requested)
-            if analysis_config.get("include_mitigations", True):
-                logger.info(f"Step 3: Control Evaluation for project {project_id}")
-                control_task = AgentTask(
-                    task_id=str(uuid.uuid4()),
-                    agent_type="control_evaluator",
-                    task_description="Evaluate existing controls against identified techniques",
-                    input_data={
-                        "existing_controls": analysis_config.get("existing_controls", []),
-                        "control_documentation": analysis_config.get("control_documentation", "")
-                    }
-                )
-                
-                control_result = await self.control_evaluator.process_task(control_task)
-                
-                if control_result.status != "success":
-                    logger.warning(f"Control evaluation failed for project {project_id}, continuing without it")
-            
-            # Step 4: Generate Recommendations
-            logger.info(f"Step 4: Generate Recommendations for project {project_id}")
-            await self._generate_recommendations(project_id, context_manager)
-            
-            # Step 5: Generate Comprehensive Report
-            logger.info(f"Step 5: Generate Comprehensive Report for project {project_id}")
+            result = await self.attack_mapper.process_task(mapping_task)
+            if result.status != "success":
+                logger.error(f"Attack mapping failed for project {project_id}: {result.errors}")
+            return result.status == "success"
+        
+        async def control_evaluation() -> bool:
+            control_task = AgentTask(
+                task_id=str(uuid.uuid4()),
+                agent_type="control_evaluator",
+                task_description="Evaluate existing controls against identified techniques",
+                input_data={
+                    "existing_controls": analysis_config.get("existing_controls", []),
+                    "control_documentation": analysis_config.get("control_documentation", "")
+                }
+            )
+            result = await self.control_evaluator.process_task(control_task)
+            if result.status != "success":
+                logger.warning(f"Control evaluation failed for project {project_id}, continuing without it")
+            return result.status == "success"
+        
+        async def recommendations() -> bool:
+            await self._generate_recommendations(project_id, context_manager, provider)
+            return True
+        
+        # Report sections reach progress streams as soon as they are generated
+        self.report_generator.set_section_listener(report_section_publisher(project_id, len(REPORT_SECTIONS)))
+        
+        async def report_generation() -> bool:
             report_task = AgentTask(
                 task_id=str(uuid.uuid4()),
                 agent_type="report_generator",
@@ -138,23 +212,115 @@ class ThreatModelingOrchestrator:
                     "report_format": analysis_config.get("report_format", "comprehensive")
                 }
             )
-            
-            report_result = await self.report_generator.process_task(report_task)
-            
-            if report_result.status != "success":
+            result = await self.report_generator.process_task(report_task)
+            if result.status != "success":
                 logger.warning(f"Report generation failed for project {project_id}, continuing without it")
+            return result.status == "success"
+        
+        stages = [
+            AnalysisStage("system_analysis", system_analysis, timeout=timeouts["system_analysis"]),
+            AnalysisStage("attack_mapping", attack_mapping, ["system_analysis"],
+                          timeout=timeouts["attack_mapping"]),
+        ]
+        recommendation_dependencies = ["attack_mapping"]
+        report_dependencies = ["recommendations"]
+        
+        if analysis_config.get("include_mitigations", True):
+            stages.append(AnalysisStage(
+                "control_evaluation", control_evaluation, ["attack_mapping"],
+                timeout=timeouts["control_evaluation"], required=False
+            ))
+            # Recommendations address the control gaps the evaluation finds
+            recommendation_dependencies.append("control_evaluation")
+            report_dependencies.append("control_evaluation")
+        
+        stages.append(AnalysisStage(
+            "recommendations", recommendations, recommendation_dependencies,
+            timeout=timeouts["recommendations"], required=False
+        ))
+        stages.append(AnalysisStage(
+            "report_generation", report_generation, report_dependencies,
+            timeout=timeouts["report_generation"], required=False
+        ))
+        return stages
+    
+    async def _run_analysis_graph(
+        self,
+        project_id: int,
+        stages: List[AnalysisStage],
+        on_stage_start: Optional[Callable[[int, str], Awaitable[None]]] = None
+    ) -> Tuple[bool, Dict[str, float]]:
+        """
+        Run analysis stages concurrently as their dependencies complete
+        
+        ``on_stage_start`` is awaited with the project id and stage name as
+        each stage begins. Returns whether every required stage succeeded,
+        along with the wall-clock duration of each stage that ran (plus the
+        graph total).
+        """
+        stage_timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        graph_start = time.perf_counter()
+        
+        async def run_stage(stage: AnalysisStage) -> bool:
+            dependency_results = await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+            if not all(dependency_results):
+                logger.info(f"Skipping {stage.name} for project {project_id}: a required dependency failed")
+                return not stage.required
             
-            # Step 6: Store Results in Database
-            logger.info(f"Step 6: Storing results for project {project_id}")
-            await self._store_results(project_id, context_manager)
-            
-            # Mark as completed
-            await self._update_project_status(project_id, "completed")
-            logger.info(f"Threat modeling analysis completed for project {project_id}")
+            logger.info(f"Starting {stage.name} for project {project_id}")
+            if on_stage_start:
+                await on_stage_start(project_id, stage.name)
+            start = time.perf_counter()
+            try:
+                succeeded = await asyncio.wait_for(stage.run(), timeout=stage.timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"{stage.name} timed out after {stage.timeout}s for project {project_id}")
+                succeeded = False
+            except Exception as e:
+                logger.error(f"{stage.name} failed for project {project_id}: {e}", exc_info=True)
+                succeeded = False
+            finally:
+                stage_timings[stage.name] = round(time.perf_counter() - start, 3)
             
+            # Optional stages never block their dependents
+            return succeeded or not stage.required
+        
+        # Stages must be listed in dependency order, which also rules out cycles
+        declared = set()
+        for stage in stages:
+            missing = [name for name in stage.depends_on if name not in declared]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on undeclared stages: {missing}")
+            declared.add(stage.name)
+        
+        for stage in stages:
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+        
+        results = await asyncio.gather(*tasks.values())
+        stage_timings["total"] = round(time.perf_counter() - graph_start, 3)
+        
+        logger.info(f"Analysis stage timings for project {project_id}: {stage_timings}")
+        return all(results), stage_timings
+    
+    async def _record_stage_timings(self, project_id: int, stage_timings: Dict[str, float]):
+        """Record per-stage wall-clock timings on the project's analysis state"""
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(AnalysisState).where(AnalysisState.project_id == project_id)
+                )
+                analysis_state = result.scalar_one_or_none()
+                
+                if not analysis_state:
+                    analysis_state = AnalysisState(project_id=project_id)
+                    db.add(analysis_state)
+                
+                analysis_state.stage_timings = json.dumps(stage_timings)
+                await db.commit()
+                
         except Exception as e:
-            logger.error(f"Threat modeling analysis failed for project {project_id}: {str(e)}", exc_info=True)
-            await self._update_project_status(project_id, "failed")
+            logger.error(f"Failed to record stage timings for project {project_id}: {e}")
     
     async def _get_system_inputs(self, project_id: int):
         """Get system inputs for the project"""
@@ -165,17 +331,39 @@ class ThreatModelingOrchestrator:
             )
             return result.scalars().all()
     
-    async def _update_project_status(self, project_id: int, status: str):
-        """Update project status in database"""
+    async def _update_project_status(
+        self,
+        project_id: int,
+        status: str,
+        error_message: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None
+    ):
+        """Update project status and the analysis state progress streams follow"""
         async with async_session() as db:
-            await db.execute(
-                update(Project)
-                .where(Project.id == project_id)
-                .values(status=status, updated_at=datetime.utcnow())
-            )
-            await db.commit()
+            if status == "analyzing":
+                await mark_analysis_started(
+                    db, project_id, "system_analysis", "Initializing threat analysis...", config
+                )
+            elif status == "completed":
+                await mark_analysis_completed(db, project_id)
+            else:
+                await mark_analysis_failed(db, project_id, error_message or "Analysis failed")
+    
+    async def _update_stage_progress(self, project_id: int, phase: str):
+        """Record a stage start on the analysis state; progress is best effort"""
+        percentage, message = STAGE_PROGRESS.get(phase, (95.0, "Storing analysis results..."))
+        try:
+            async with async_session() as db:
+                await update_analysis_progress(db, project_id, phase, percentage, message)
+        except Exception as e:
+            logger.warning(f"Failed to record {phase} progress for project {project_id}: {e}")
     
-    async def _generate_recommendations(self, project_id: int, context_manager: SharedContextManager):
+    async def _generate_recommendations(
+        self,
+        project_id: int,
+        context_manager: SharedContextManager,
+        provider: Optional[str] = None
+    ):
         """Generate security recommendations based on analysis results"""
         context = context_manager.read_context()
         
@@ -220,7 +408,8 @@ Focus on practical, prioritized recommendations that address the most significan
             llm_response = await llm_service.generate_response(
                 prompt=prompt,
                 system_prompt="You are a cybersecurity consultant providing actionable security recommendations.",
-                temperature=0.6
+                temperature=0.6,
+                preferred_provider=provider
             )
             
             if llm_response['success']:
@@ -3,11 +3,11 @@ Quality Issue Tracker with automatic issue lifecycle management.
 Implements priority-based issue categorization and routing with resolution tracking.
 """
 
-import sqlite3
+import asyncio
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any, Tuple
-from dataclasses import dataclass
+from typing import Iterable, List, Optional, Dict, Any, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
 from app.models.quality import (
@@ -15,6 +15,7 @@ from app.models.quality import (
     QualityIssueCreate, QualityIssueUpdate
 )
 from app.core.quality_config import QualityConfigManager
+from app.core.sqlite_pool import SQLitePool, get_sqlite_pool
 
 
 class IssuePriority(str, Enum):
@@ -58,6 +59,174 @@ class IssueResolutionMetrics:
     auto_fix_success_rate: float
 
 
+ROLLUP_TABLE = "quality_issue_daily_rollup"
+ROLLUP_COLUMNS = (
+    "issues", "resolved", "resolution_hours", "resolution_count",
+    "auto_fix_attempts", "auto_fix_successes"
+)
+
+
+def _rollup_values(ref: str) -> List[str]:
+    """
+    What one quality_issues row (NEW, OLD or a table alias) adds to each
+    rollup column. Auto-fix attempts mirror a LEFT JOIN on auto_fix_results:
+    an auto-fixable issue counts once per fix result, or once if it has none.
+    """
+    hours = (
+        f"CASE WHEN {ref}.status = 'resolved' THEN "
+        f"(julianday({ref}.resolved_at) - julianday({ref}.created_at)) * 24 END"
+    )
+    return [
+        "1",
+        f"({ref}.status = 'resolved')",
+        f"COALESCE({hours}, 0)",
+        f"({hours} IS NOT NULL)",
+        f"(CASE WHEN {ref}.auto_fixable = 1 THEN MAX(1, "
+        f"(SELECT COUNT(*) FROM auto_fix_results WHERE issue_id = {ref}.id)) ELSE 0 END)",
+        f"(CASE WHEN {ref}.auto_fixable = 1 THEN "
+        f"(SELECT COUNT(*) FROM auto_fix_results WHERE issue_id = {ref}.id AND success = 1) ELSE 0 END)",
+    ]
+
+
+def _rollup_upsert(ref: str, sign: str) -> str:
+    """Add (sign '+') or remove (sign '-') one issue's share of its rollup row."""
+    values = ", ".join(f"{sign}{value}" for value in _rollup_values(ref))
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_COLUMNS)
+    return f"""
+        INSERT INTO {ROLLUP_TABLE} (project_id, day, severity, issue_type, {", ".join(ROLLUP_COLUMNS)})
+        VALUES ({ref}.project_id, substr({ref}.created_at, 1, 10), {ref}.severity, {ref}.issue_type, {values})
+        ON CONFLICT (project_id, day, severity, issue_type) DO UPDATE SET {updates};
+    """
+
+
+_ROLLUP_ROW_OF_FIXED_ISSUE = """
+    WHERE (project_id, day, severity, issue_type) = (
+        SELECT project_id, substr(created_at, 1, 10), severity, issue_type
+        FROM quality_issues WHERE id = {ref}.issue_id AND auto_fixable = 1
+    )
+"""
+
+# Per-project, per-day totals of the issues created that day, kept current by
+# triggers so resolution metrics read O(days) rows instead of every issue.
+# Days are the created_at date prefix, the same text comparison the metrics
+# window has always used.
+RESOLUTION_ROLLUP_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_quality_issues_project_created ON quality_issues(project_id, created_at, status)",
+    "CREATE INDEX IF NOT EXISTS idx_quality_issues_created ON quality_issues(created_at, status)",
+    "CREATE INDEX IF NOT EXISTS idx_auto_fix_results_issue ON auto_fix_results(issue_id)",
+    f"""
+    CREATE TABLE {ROLLUP_TABLE} (
+        project_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        issue_type TEXT NOT NULL,
+        issues INTEGER NOT NULL DEFAULT 0,
+        resolved INTEGER NOT NULL DEFAULT 0,
+        resolution_hours REAL NOT NULL DEFAULT 0,
+        resolution_count INTEGER NOT NULL DEFAULT 0,
+        auto_fix_attempts INTEGER NOT NULL DEFAULT 0,
+        auto_fix_successes INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (project_id, day, severity, issue_type)
+    ) WITHOUT ROWID
+    """,
+    f"CREATE INDEX idx_{ROLLUP_TABLE}_day ON {ROLLUP_TABLE}(day)",
+    f"""
+    CREATE TRIGGER trg_rollup_issue_insert AFTER INSERT ON quality_issues BEGIN
+        {_rollup_upsert("NEW", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_rollup_issue_update
+    AFTER UPDATE OF id, project_id, created_at, severity, issue_type, status, resolved_at, auto_fixable
+    ON quality_issues BEGIN
+        {_rollup_upsert("OLD", "-")}
+        {_rollup_upsert("NEW", "+")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_rollup_issue_delete AFTER DELETE ON quality_issues BEGIN
+        {_rollup_upsert("OLD", "-")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_rollup_fix_insert AFTER INSERT ON auto_fix_results BEGIN
+        UPDATE {ROLLUP_TABLE} SET
+            auto_fix_attempts = auto_fix_attempts
+                + ((SELECT COUNT(*) FROM auto_fix_results WHERE issue_id = NEW.issue_id) > 1),
+            auto_fix_successes = auto_fix_successes + (NEW.success = 1)
+        {_ROLLUP_ROW_OF_FIXED_ISSUE.format(ref="NEW")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_rollup_fix_delete AFTER DELETE ON auto_fix_results BEGIN
+        UPDATE {ROLLUP_TABLE} SET
+            auto_fix_attempts = auto_fix_attempts
+                - ((SELECT COUNT(*) FROM auto_fix_results WHERE issue_id = OLD.issue_id) > 0),
+            auto_fix_successes = auto_fix_successes - (OLD.success = 1)
+        {_ROLLUP_ROW_OF_FIXED_ISSUE.format(ref="OLD")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_rollup_fix_update AFTER UPDATE OF success ON auto_fix_results BEGIN
+        UPDATE {ROLLUP_TABLE} SET
+            auto_fix_successes = auto_fix_successes + (NEW.success = 1) - (OLD.success = 1)
+        {_ROLLUP_ROW_OF_FIXED_ISSUE.format(ref="NEW")};
+    END
+    """,
+]
+ROLLUP_TRIGGERS = (
+    "trg_rollup_issue_insert", "trg_rollup_issue_update", "trg_rollup_issue_delete",
+    "trg_rollup_fix_insert", "trg_rollup_fix_delete", "trg_rollup_fix_update"
+)
+
+
+def resolution_rollup_present(conn) -> bool:
+    """True if the rollup table and all of its triggers exist."""
+    present = {
+        name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = ? OR type = 'trigger'",
+            (ROLLUP_TABLE,)
+        )
+    }
+    return present.issuperset((ROLLUP_TABLE,) + ROLLUP_TRIGGERS)
+
+
+def ensure_resolution_rollup(conn) -> bool:
+    """
+    Create the resolution rollup, its triggers and the metrics indexes if any
+    are missing, backfilled from the issues already stored. Run inside a
+    write transaction so no issue is written between backfill and triggers.
+    
+    Returns:
+        True if the rollup was (re)built
+    """
+    if resolution_rollup_present(conn):
+        return False
+    
+    for trigger in ROLLUP_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute(f"DROP TABLE IF EXISTS {ROLLUP_TABLE}")
+    for statement in RESOLUTION_ROLLUP_SCHEMA:
+        conn.execute(statement)
+    
+    sums = ", ".join(f"SUM({value})" for value in _rollup_values("qi"))
+    conn.execute(f"""
+        INSERT INTO {ROLLUP_TABLE} (project_id, day, severity, issue_type, {", ".join(ROLLUP_COLUMNS)})
+        SELECT qi.project_id, substr(qi.created_at, 1, 10), qi.severity, qi.issue_type, {sums}
+        FROM quality_issues qi
+        GROUP BY 1, 2, 3, 4
+    """)
+    return True
+
+
+@dataclass
+class BulkIngestionResult:
+    """Outcome of ingesting a batch of issues."""
+    created: List[QualityIssue] = field(default_factory=list)
+    duplicates: int = 0  # already open, or repeated within the batch
+    escalated: int = 0
+
+
 class QualityIssueTracker:
     """
     Comprehensive quality issue tracking and management system.
@@ -70,6 +239,12 @@ class QualityIssueTracker:
         self.config_manager = QualityConfigManager(db_path)
         self.logger = logging.getLogger(__name__)
         self._routing_rules = self._load_default_routing_rules()
+        self._rollup_ready = False
+    
+    @property
+    def db(self) -> SQLitePool:
+        """Shared connection pool for the tracker's database."""
+        return get_sqlite_pool(self.db_path)
     
     def _load_default_routing_rules(self) -> List[IssueRoutingRule]:
         """Load default issue routing rules."""
@@ -126,28 +301,14 @@ class QualityIssueTracker:
             Created QualityIssue with assigned priority and category
         """
         # Create base issue
-        issue = QualityIssue(
-            project_id=issue_data.project_id,
-            file_path=issue_data.file_path,
-            line_number=issue_data.line_number,
-            column_number=issue_data.column_number,
-            issue_type=issue_data.issue_type,
-            severity=issue_data.severity,
-            category=issue_data.category,
-            description=issue_data.description,
-            suggested_fix=issue_data.suggested_fix,
-            auto_fixable=issue_data.auto_fixable
-        )
+        issue = self._issue_from_create(issue_data)
         
         # Apply routing rules for priority and categorization
         priority, category = self._apply_routing_rules(issue)
         
         # Store in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute("""
+            await self.db.execute("""
                 INSERT INTO quality_issues 
                 (id, project_id, file_path, line_number, column_number, issue_type, 
                  severity, category, description, suggested_fix, auto_fixable, status, created_at)
@@ -159,23 +320,138 @@ class QualityIssueTracker:
                 issue.description, issue.suggested_fix, issue.auto_fixable,
                 issue.status.value, issue.created_at.isoformat()
             ))
+        except Exception as e:
+            self.logger.error(f"Failed to create quality issue: {e}")
+            raise
+        
+        # Log issue creation
+        self.logger.info(f"Created quality issue {issue.id} with priority {priority.value}")
+        
+        # Check for immediate escalation
+        await self._check_escalation(issue, priority)
+        
+        return issue
+    
+    async def create_issues_bulk(self, issues: Iterable[Union[QualityIssueCreate, QualityIssue]]
+                                 ) -> BulkIngestionResult:
+        """
+        Create many issues at once, e.g. everything a scan found.
+        
+        Issues already open at the same file, line and category, or repeated
+        within the batch, are skipped. The rest are inserted with one
+        executemany in a single transaction, and escalation is checked once
+        the batch is stored.
+        
+        Args:
+            issues: Issue creation data or issues from an analyzer
             
-            conn.commit()
-            
-            # Log issue creation
-            self.logger.info(f"Created quality issue {issue.id} with priority {priority.value}")
-            
-            # Check for immediate escalation
-            await self._check_escalation(issue, priority)
-            
-            return issue
+        Returns:
+            BulkIngestionResult with the created issues and skip counts
+        """
+        batch = [
+            issue if isinstance(issue, QualityIssue) else self._issue_from_create(issue)
+            for issue in issues
+        ]
+        result = BulkIngestionResult()
+        if not batch:
+            return result
+        
+        routes = self._route_batch(batch)
+        
+        def ingest(conn):
+            # Fingerprints of the open issues in every project the batch touches
+            seen = set()
+            for project_id in {issue.project_id for issue in batch}:
+                rows = conn.execute("""
+                    SELECT file_path, line_number, category FROM quality_issues
+                    WHERE project_id = ? AND status = 'open'
+                """, (project_id,))
+                seen.update(
+                    (project_id, file_path, line_number, (category or '').split('|')[0])
+                    for file_path, line_number, category in rows
+                )
             
+            new_rows = []
+            for index, issue in enumerate(batch):
+                fingerprint = self._issue_fingerprint(issue)
+                if fingerprint in seen:
+                    continue
+                seen.add(fingerprint)
+                
+                priority, category = routes[index]
+                new_rows.append((index, (
+                    issue.id, issue.project_id, issue.file_path, issue.line_number,
+                    issue.column_number, issue.issue_type.value, issue.severity.value,
+                    f"{issue.category}|{priority.value}|{category.value}",  # Extended category
+                    issue.description, issue.suggested_fix, issue.auto_fixable,
+                    issue.status.value, issue.created_at.isoformat()
+                )))
+            
+            conn.executemany("""
+                INSERT INTO quality_issues 
+                (id, project_id, file_path, line_number, column_number, issue_type, 
+                 severity, category, description, suggested_fix, auto_fixable, status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [row for _, row in new_rows])
+            return [index for index, _ in new_rows]
+        
+        try:
+            created_indexes = await self.db.write(ingest)
         except Exception as e:
-            conn.rollback()
-            self.logger.error(f"Failed to create quality issue: {e}")
+            self.logger.error(f"Failed to ingest {len(batch)} quality issues: {e}")
             raise
-        finally:
-            conn.close()
+        
+        result.created = [batch[index] for index in created_indexes]
+        result.duplicates = len(batch) - len(created_indexes)
+        self.logger.info(
+            f"Ingested {len(result.created)} quality issues ({result.duplicates} duplicates skipped)"
+        )
+        
+        # One escalation pass over what was stored
+        for index in created_indexes:
+            priority = routes[index][0]
+            if priority == IssuePriority.URGENT:
+                await self._check_escalation(batch[index], priority)
+                result.escalated += 1
+        
+        return result
+    
+    def _issue_from_create(self, issue_data: QualityIssueCreate) -> QualityIssue:
+        return QualityIssue(
+            project_id=issue_data.project_id,
+            file_path=issue_data.file_path,
+            line_number=issue_data.line_number,
+            column_number=issue_data.column_number,
+            issue_type=issue_data.issue_type,
+            severity=issue_data.severity,
+            category=issue_data.category,
+            description=issue_data.description,
+            suggested_fix=issue_data.suggested_fix,
+            auto_fixable=issue_data.auto_fixable
+        )
+    
+    @staticmethod
+    def _issue_fingerprint(issue: QualityIssue) -> Tuple[str, str, Optional[int], str]:
+        """Identity used to recognise an issue that is already open."""
+        return (issue.project_id, issue.file_path, issue.line_number, issue.category)
+    
+    def _route_batch(self, issues: List[QualityIssue]) -> List[Tuple[IssuePriority, IssueCategory]]:
+        """
+        Apply routing rules to a batch, evaluating each distinct combination
+        of the fields the rules look at only once.
+        """
+        fields = sorted({key for rule in self._routing_rules for key in rule.conditions} | {'severity'})
+        routes: Dict[tuple, Tuple[IssuePriority, IssueCategory]] = {}
+        batch_routes = []
+        
+        for issue in issues:
+            key = tuple(getattr(issue, name, None) for name in fields)
+            route = routes.get(key)
+            if route is None:
+                route = routes[key] = self._apply_routing_rules(issue)
+            batch_routes.append(route)
+        
+        return batch_routes
     
     def _apply_routing_rules(self, issue: QualityIssue) -> Tuple[IssuePriority, IssueCategory]:
         """
@@ -244,72 +520,61 @@ class QualityIssueTracker:
         Returns:
             Updated QualityIssue or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Build update query
+        update_fields = []
+        update_values = []
         
-        try:
-            # Get current issue
-            cursor.execute("SELECT * FROM quality_issues WHERE id = ?", (issue_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            # Build update query
-            update_fields = []
-            update_values = []
-            
-            if updates.status is not None:
-                update_fields.append("status = ?")
-                update_values.append(updates.status.value)
-                
-                # Set resolved_at if status is resolved
-                if updates.status in [IssueStatus.RESOLVED, IssueStatus.WONT_FIX]:
-                    update_fields.append("resolved_at = ?")
-                    update_values.append(datetime.now(timezone.utc).isoformat())
-            
-            if updates.resolved_by is not None:
-                update_fields.append("resolved_by = ?")
-                update_values.append(updates.resolved_by)
-            
-            if updates.resolution_method is not None:
-                update_fields.append("resolution_method = ?")
-                update_values.append(updates.resolution_method)
-            
-            if not update_fields:
-                return self._row_to_issue(row)
-            
-            update_values.append(issue_id)
-            
-            cursor.execute(f"""
+        if updates.status is not None:
+            update_fields.append("status = ?")
+            update_values.append(updates.status.value)
+            
+            # Set resolved_at if status is resolved
+            if updates.status in [IssueStatus.RESOLVED, IssueStatus.WONT_FIX]:
+                update_fields.append("resolved_at = ?")
+                update_values.append(datetime.now(timezone.utc).isoformat())
+        
+        if updates.resolved_by is not None:
+            update_fields.append("resolved_by = ?")
+            update_values.append(updates.resolved_by)
+        
+        if updates.resolution_method is not None:
+            update_fields.append("resolution_method = ?")
+            update_values.append(updates.resolution_method)
+        
+        if not update_fields:
+            return await self.get_issue_by_id(issue_id)
+        
+        update_values.append(issue_id)
+        
+        def apply_update(conn):
+            cursor = conn.execute(f"""
                 UPDATE quality_issues 
                 SET {', '.join(update_fields)}
                 WHERE id = ?
             """, update_values)
             
-            conn.commit()
+            if cursor.rowcount == 0:
+                return None
             
             # Get updated issue
-            cursor.execute("SELECT * FROM quality_issues WHERE id = ?", (issue_id,))
-            updated_row = cursor.fetchone()
-            
-            if updated_row:
-                updated_issue = self._row_to_issue(updated_row)
-                
-                # Log status change
-                if updates.status is not None:
-                    self.logger.info(f"Issue {issue_id} status changed to {updates.status.value}")
-                
-                return updated_issue
-            
-            return None
-            
+            return conn.execute("SELECT * FROM quality_issues WHERE id = ?", (issue_id,)).fetchone()
+        
+        try:
+            updated_row = await self.db.write(apply_update)
         except Exception as e:
-            conn.rollback()
             self.logger.error(f"Failed to update quality issue {issue_id}: {e}")
             raise
-        finally:
-            conn.close()
+        
+        if updated_row:
+            updated_issue = self._row_to_issue(updated_row)
+            
+            # Log status change
+            if updates.status is not None:
+                self.logger.info(f"Issue {issue_id} status changed to {updates.status.value}")
+            
+            return updated_issue
+        
+        return None
     
     async def resolve_issue(self, issue_id: str, resolved_by: str, 
                           resolution_method: str = "manual") -> bool:
@@ -365,63 +630,48 @@ class QualityIssueTracker:
         Returns:
             List of matching QualityIssue objects
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Build query with filters
+        where_conditions = []
+        params = []
         
-        try:
-            # Build query with filters
-            where_conditions = []
-            params = []
-            
-            if project_id:
-                where_conditions.append("project_id = ?")
-                params.append(project_id)
-            
-            if status:
-                where_conditions.append("status = ?")
-                params.append(status.value)
-            
-            if severity:
-                where_conditions.append("severity = ?")
-                params.append(severity.value)
-            
-            if issue_type:
-                where_conditions.append("issue_type = ?")
-                params.append(issue_type.value)
-            
-            where_clause = ""
-            if where_conditions:
-                where_clause = "WHERE " + " AND ".join(where_conditions)
-            
-            params.extend([limit, offset])
-            
-            cursor.execute(f"""
-                SELECT * FROM quality_issues 
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """, params)
-            
-            return [self._row_to_issue(row) for row in cursor.fetchall()]
-            
-        finally:
-            conn.close()
+        if project_id:
+            where_conditions.append("project_id = ?")
+            params.append(project_id)
+        
+        if status:
+            where_conditions.append("status = ?")
+            params.append(status.value)
+        
+        if severity:
+            where_conditions.append("severity = ?")
+            params.append(severity.value)
+        
+        if issue_type:
+            where_conditions.append("issue_type = ?")
+            params.append(issue_type.value)
+        
+        where_clause = ""
+        if where_conditions:
+            where_clause = "WHERE " + " AND ".join(where_conditions)
+        
+        params.extend([limit, offset])
+        
+        rows = await self.db.fetchall(f"""
+            SELECT * FROM quality_issues 
+            {where_clause}
+            ORDER BY created_at DESC
+            LIMIT ? OFFSET ?
+        """, params)
+        
+        return [self._row_to_issue(row) for row in rows]
     
     async def get_issue_by_id(self, issue_id: str) -> Optional[QualityIssue]:
         """Get a specific issue by ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        row = await self.db.fetchone("SELECT * FROM quality_issues WHERE id = ?", (issue_id,))
         
-        try:
-            cursor.execute("SELECT * FROM quality_issues WHERE id = ?", (issue_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                return self._row_to_issue(row)
-            return None
-            
-        finally:
-            conn.close()
+        if row:
+            return self._row_to_issue(row)
+        return None
     
     def _row_to_issue(self, row) -> QualityIssue:
         """Convert database row to QualityIssue object."""
@@ -460,87 +710,85 @@ class QualityIssueTracker:
         Returns:
             IssueResolutionMetrics object
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        if not self._rollup_ready:
+            if (not await self.db.read(resolution_rollup_present)
+                    and await self.db.write(ensure_resolution_rollup)):
+                self.logger.info(f"Built resolution rollup for {self.db_path}")
+            self._rollup_ready = True
+        return await self.db.read(self._query_resolution_metrics, project_id, days)
+    
+    def _query_resolution_metrics(self, conn, project_id: Optional[str],
+                                  days: int) -> IssueResolutionMetrics:
+        """
+        Aggregate resolution metrics in one query: whole days come from the
+        daily rollup, the part of the first day inside the window from the
+        issues themselves.
+        """
+        # Calculate date threshold
+        threshold_date = datetime.now(timezone.utc) - timedelta(days=days)
+        first_full_day = (threshold_date + timedelta(days=1)).date().isoformat()
         
-        try:
-            # Calculate date threshold
-            threshold_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            # Base query conditions
-            where_conditions = ["created_at >= ?"]
-            params = [threshold_date.isoformat()]
-            
-            if project_id:
-                where_conditions.append("project_id = ?")
-                params.append(project_id)
-            
-            where_clause = "WHERE " + " AND ".join(where_conditions)
-            
-            # Get total issues
-            cursor.execute(f"SELECT COUNT(*) FROM quality_issues {where_clause}", params)
-            total_issues = cursor.fetchone()[0]
-            
-            # Get resolved issues
-            resolved_params = params + ['resolved']
-            cursor.execute(f"""
-                SELECT COUNT(*) FROM quality_issues 
-                {where_clause} AND status = ?
-            """, resolved_params)
-            resolved_issues = cursor.fetchone()[0]
-            
-            # Calculate resolution rate
-            resolution_rate = (resolved_issues / total_issues * 100) if total_issues > 0 else 0
-            
-            # Get average resolution time
-            cursor.execute(f"""
-                SELECT AVG(
-                    (julianday(resolved_at) - julianday(created_at)) * 24
-                ) FROM quality_issues 
-                {where_clause} AND status = 'resolved' AND resolved_at IS NOT NULL
-            """, params)
-            avg_resolution_time = cursor.fetchone()[0] or 0
-            
-            # Get issues by severity
-            cursor.execute(f"""
-                SELECT severity, COUNT(*) FROM quality_issues 
-                {where_clause} GROUP BY severity
-            """, params)
-            issues_by_severity = dict(cursor.fetchall())
-            
-            # Get issues by type
-            cursor.execute(f"""
-                SELECT issue_type, COUNT(*) FROM quality_issues 
-                {where_clause} GROUP BY issue_type
-            """, params)
-            issues_by_type = dict(cursor.fetchall())
-            
-            # Calculate auto-fix success rate
-            # Need to modify where_clause to use qi. prefix for quality_issues table
-            qi_where_clause = where_clause.replace("created_at", "qi.created_at").replace("project_id", "qi.project_id")
-            cursor.execute(f"""
-                SELECT 
-                    COUNT(CASE WHEN afr.success = 1 THEN 1 END) as successful,
-                    COUNT(*) as total
-                FROM quality_issues qi
-                LEFT JOIN auto_fix_results afr ON qi.id = afr.issue_id
-                {qi_where_clause} AND qi.auto_fixable = 1
-            """, params)
-            auto_fix_result = cursor.fetchone()
-            auto_fix_success_rate = (auto_fix_result[0] / auto_fix_result[1] * 100) if auto_fix_result[1] > 0 else 0
-            
-            return IssueResolutionMetrics(
-                total_issues=total_issues,
-                resolved_issues=resolved_issues,
-                average_resolution_time=avg_resolution_time,
-                resolution_rate=resolution_rate,
-                issues_by_severity=issues_by_severity,
-                issues_by_type=issues_by_type,
-                auto_fix_success_rate=auto_fix_success_rate
+        rollup_conditions = ["day >= ?"]
+        rollup_params = [first_full_day]
+        scan_conditions = ["qi.created_at >= ?", "qi.created_at < ?"]
+        scan_params = [threshold_date.isoformat(), first_full_day]
+        
+        if project_id:
+            rollup_conditions.append("project_id = ?")
+            rollup_params.append(project_id)
+            scan_conditions.append("qi.project_id = ?")
+            scan_params.append(project_id)
+        
+        columns = ", ".join(ROLLUP_COLUMNS)
+        scan_values = ", ".join(_rollup_values("qi"))
+        sums = ", ".join(f"SUM({column})" for column in ROLLUP_COLUMNS)
+        rows = conn.execute(f"""
+            SELECT severity, issue_type, {sums} FROM (
+                SELECT severity, issue_type, {columns} FROM {ROLLUP_TABLE}
+                WHERE {" AND ".join(rollup_conditions)}
+                UNION ALL
+                SELECT qi.severity, qi.issue_type, {scan_values} FROM quality_issues qi
+                WHERE {" AND ".join(scan_conditions)}
             )
-            
-        finally:
-            conn.close()
+            GROUP BY severity, issue_type
+        """, rollup_params + scan_params).fetchall()
+        
+        totals = dict.fromkeys(ROLLUP_COLUMNS, 0)
+        issues_by_severity: Dict[str, int] = {}
+        issues_by_type: Dict[str, int] = {}
+        for severity, issue_type, *values in rows:
+            for column, value in zip(ROLLUP_COLUMNS, values):
+                totals[column] += value or 0
+            count = values[0] or 0
+            if count:
+                issues_by_severity[severity] = issues_by_severity.get(severity, 0) + count
+                issues_by_type[issue_type] = issues_by_type.get(issue_type, 0) + count
+        
+        total_issues = totals["issues"]
+        resolved_issues = totals["resolved"]
+        
+        # Calculate resolution rate
+        resolution_rate = (resolved_issues / total_issues * 100) if total_issues > 0 else 0
+        
+        avg_resolution_time = (
+            totals["resolution_hours"] / totals["resolution_count"]
+            if totals["resolution_count"] > 0 else 0
+        )
+        
+        auto_fix_success_rate = (
+            totals["auto_fix_successes"] / totals["auto_fix_attempts"] * 100
+            if totals["auto_fix_attempts"] > 0 else 0
+        )
+        
+        return IssueResolutionMetrics(
+            total_issues=total_issues,
+            resolved_issues=resolved_issues,
+            average_resolution_time=avg_resolution_time,
+            resolution_rate=resolution_rate,
+            issues_by_severity=issues_by_severity,
+            issues_by_type=issues_by_type,
+            auto_fix_success_rate=auto_fix_success_rate
+        )
     
     async def escalate_stale_issues(self, hours_threshold: int = 24) -> List[QualityIssue]:
         """
@@ -552,32 +800,25 @@ class QualityIssueTracker:
         Returns:
             List of escalated issues
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        threshold_time = datetime.now(timezone.utc) - timedelta(hours=hours_threshold)
         
-        try:
-            threshold_time = datetime.now(timezone.utc) - timedelta(hours=hours_threshold)
-            
-            cursor.execute("""
-                SELECT * FROM quality_issues 
-                WHERE status = 'open' 
-                AND created_at < ?
-                AND severity IN ('high', 'critical')
-            """, (threshold_time.isoformat(),))
-            
-            stale_issues = [self._row_to_issue(row) for row in cursor.fetchall()]
-            
-            # Log escalations
-            for issue in stale_issues:
-                self.logger.warning(
-                    f"Escalating stale issue {issue.id}: {issue.description} "
-                    f"(open for {hours_threshold}+ hours)"
-                )
-            
-            return stale_issues
-            
-        finally:
-            conn.close()
+        rows = await self.db.fetchall("""
+            SELECT * FROM quality_issues 
+            WHERE status = 'open' 
+            AND created_at < ?
+            AND severity IN ('high', 'critical')
+        """, (threshold_time.isoformat(),))
+        
+        stale_issues = [self._row_to_issue(row) for row in rows]
+        
+        # Log escalations
+        for issue in stale_issues:
+            self.logger.warning(
+                f"Escalating stale issue {issue.id}: {issue.description} "
+                f"(open for {hours_threshold}+ hours)"
+            )
+        
+        return stale_issues
     
     async def bulk_update_issues(self, issue_ids: List[str], 
                                updates: QualityIssueUpdate) -> int:
@@ -594,15 +835,18 @@ class QualityIssueTracker:
         if not issue_ids:
             return 0
         
-        updated_count = 0
+        # Issued together, the updates are committed in one batched transaction
+        results = await asyncio.gather(
+            *(self.update_issue(issue_id, updates) for issue_id in issue_ids),
+            return_exceptions=True
+        )
         
-        for issue_id in issue_ids:
-            try:
-                result = await self.update_issue(issue_id, updates)
-                if result:
-                    updated_count += 1
-            except Exception as e:
-                self.logger.error(f"Failed to update issue {issue_id}: {e}")
+        updated_count = 0
+        for issue_id, result in zip(issue_ids, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to update issue {issue_id}: {result}")
+            elif result:
+                updated_count += 1
         
         return updated_count
     
@@ -616,27 +860,20 @@ class QualityIssueTracker:
         Returns:
             True if successfully deleted
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def delete(conn):
             # Delete related auto-fix results first
-            cursor.execute("DELETE FROM auto_fix_results WHERE issue_id = ?", (issue_id,))
+            conn.execute("DELETE FROM auto_fix_results WHERE issue_id = ?", (issue_id,))
             
             # Delete the issue
-            cursor.execute("DELETE FROM quality_issues WHERE id = ?", (issue_id,))
-            
-            conn.commit()
-            
-            deleted = cursor.rowcount > 0
-            if deleted:
-                self.logger.info(f"Deleted quality issue {issue_id}")
-            
-            return deleted
-            
+            return conn.execute("DELETE FROM quality_issues WHERE id = ?", (issue_id,)).rowcount
+        
+        try:
+            deleted = await self.db.write(delete) > 0
         except Exception as e:
-            conn.rollback()
             self.logger.error(f"Failed to delete quality issue {issue_id}: {e}")
             raise
-        finally:
-            conn.close()
\ No newline at end of file
+        
+        if deleted:
+            self.logger.info(f"Deleted quality issue {issue_id}")
+        
+        return deleted
\ No newline at end of file
@@ -6,7 +6,6 @@ trend analysis, and quality gate enforcement for the AITM platform.
 """
 
 import asyncio
-import sqlite3
 import json
 import os
 import subprocess
@@ -20,6 +19,9 @@ from statistics import mean, median
 
 from app.models.quality import QualityMetrics, QualityTrend, Severity
 from app.core.quality_config import QualityConfigManager, QualityThresholds
+from app.core.sqlite_pool import SQLitePool, get_sqlite_pool
+from app.services.code_analysis.parsed_file import ParsedFile
+from app.services.code_analysis.clone_index import get_clone_index
 
 
 @dataclass
@@ -95,12 +97,16 @@ class QualityMetricsCollector:
         self.config_manager = QualityConfigManager(db_path)
         self._ensure_database_schema()
     
+    @property
+    def db(self) -> SQLitePool:
+        """Shared connection pool for the metrics database."""
+        return get_sqlite_pool(self.db_path)
+    
     def _ensure_database_schema(self):
         """Ensure required database tables exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            
             # Ensure quality_trends table exists
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS quality_trends (
@@ -128,10 +134,6 @@ class QualityMetricsCollector:
                     evaluated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
-            
-            conn.commit()
-        finally:
-            conn.close()
     
     async def collect_comprehensive_metrics(self, project_id: str, 
                                           project_path: str) -> QualityMetrics:
@@ -223,14 +225,20 @@ class QualityMetricsCollector:
         total_imports = 0
         comment_lines = 0
         code_blocks = []
+        # Duplicates come from the on-disk clone index when enabled, so blocks
+        # are only kept in memory for the fallback
+        clone_index = get_clone_index()
         
         for file_path in python_files:
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
+                # Parse once; lines, AST and node index all come from the same artifact
+                parsed = ParsedFile(content, str(file_path))
+                
                 # Count lines
-                lines = content.split('\n')
+                lines = parsed.lines
                 total_lines += len(lines)
                 
                 # Count comment lines
@@ -240,25 +248,21 @@ class QualityMetricsCollector:
                                       line.strip().startswith("'''"))
                 
                 # Parse AST for complexity analysis
-                try:
-                    tree = ast.parse(content)
-                    
-                    # Count functions, classes, and imports
-                    for node in ast.walk(tree):
-                        if isinstance(node, ast.FunctionDef):
-                            total_functions += 1
-                            total_complexity += self._calculate_cyclomatic_complexity(node)
-                        elif isinstance(node, ast.ClassDef):
-                            total_classes += 1
-                        elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                            total_imports += 1
-                    
-                    # Store code blocks for duplicate detection
-                    code_blocks.extend(self._extract_code_blocks(tree))
-                    
-                except SyntaxError:
+                tree = parsed.tree
+                if tree is None:
                     # Skip files with syntax errors
                     continue
+                
+                # Count functions, classes, and imports from the node-type index
+                for node in parsed.nodes_of(ast.FunctionDef):
+                    total_functions += 1
+                    total_complexity += self._calculate_cyclomatic_complexity(node)
+                total_classes += len(parsed.nodes_of(ast.ClassDef))
+                total_imports += len(parsed.nodes_of(ast.Import, ast.ImportFrom))
+                
+                # Store code blocks for duplicate detection
+                if clone_index is None:
+                    code_blocks.extend(self._extract_code_blocks(tree, parsed))
                     
             except Exception as e:
                 print(f"Error analyzing file {file_path}: {e}")
@@ -267,7 +271,10 @@ class QualityMetricsCollector:
         # Calculate metrics
         avg_complexity = total_complexity / max(total_functions, 1)
         comment_ratio = comment_lines / max(total_lines, 1)
-        duplicate_ratio = self._calculate_duplicate_ratio(code_blocks)
+        if clone_index is not None:
+            duplicate_ratio = self._calculate_indexed_duplicate_ratio(clone_index, project_path)
+        else:
+            duplicate_ratio = self._calculate_duplicate_ratio(code_blocks)
         maintainability_index = self._calculate_maintainability_index(
             avg_complexity, total_lines, comment_ratio
         )
@@ -475,11 +482,12 @@ class QualityMetricsCollector:
         
         return complexity
     
-    def _extract_code_blocks(self, tree: ast.AST) -> List[str]:
+    def _extract_code_blocks(self, tree: ast.AST, parsed: Optional[ParsedFile] = None) -> List[str]:
         """Extract code blocks for duplicate detection."""
         blocks = []
         
-        for node in ast.walk(tree):
+        functions = parsed.nodes_of(ast.FunctionDef) if parsed else ast.walk(tree)
+        for node in functions:
             if isinstance(node, ast.FunctionDef):
                 # Convert function to string representation
                 try:
@@ -508,6 +516,16 @@ class QualityMetricsCollector:
         
         return duplicates / len(code_blocks)
     
+    def _calculate_indexed_duplicate_ratio(self, clone_index, project_path: str) -> float:
+        """Calculate duplicate ratio from the clone index, refreshing changed files first."""
+        try:
+            project_key = str(Path(project_path).resolve())
+            clone_index.sync_project(project_key, project_path)
+            return clone_index.duplicate_ratio(project_key)
+        except Exception as e:
+            print(f"Error calculating duplicate ratio: {e}")
+            return 0.0
+    
     def _calculate_maintainability_index(self, complexity: float, 
                                        lines_of_code: int, 
                                        comment_ratio: float) -> float:
@@ -601,30 +619,21 @@ class QualityMetricsCollector:
     
     async def _store_metrics(self, metrics: QualityMetrics):
         """Store metrics in the database."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO quality_metrics 
-                (id, project_id, timestamp, code_coverage, cyclomatic_complexity,
-                 maintainability_index, technical_debt_ratio, test_quality_score,
-                 security_score, performance_score, lines_of_code, 
-                 duplicate_code_ratio, comment_ratio)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                metrics.id, metrics.project_id, metrics.timestamp.isoformat(),
-                metrics.code_coverage, metrics.cyclomatic_complexity,
-                metrics.maintainability_index, metrics.technical_debt_ratio,
-                metrics.test_quality_score, metrics.security_score,
-                metrics.performance_score, metrics.lines_of_code,
-                metrics.duplicate_code_ratio, metrics.comment_ratio
-            ))
-            
-            conn.commit()
-            
-        finally:
-            conn.close()
+        await self.db.execute("""
+            INSERT INTO quality_metrics 
+            (id, project_id, timestamp, code_coverage, cyclomatic_complexity,
+             maintainability_index, technical_debt_ratio, test_quality_score,
+             security_score, performance_score, lines_of_code, 
+             duplicate_code_ratio, comment_ratio)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            metrics.id, metrics.project_id, metrics.timestamp.isoformat(),
+            metrics.code_coverage, metrics.cyclomatic_complexity,
+            metrics.maintainability_index, metrics.technical_debt_ratio,
+            metrics.test_quality_score, metrics.security_score,
+            metrics.performance_score, metrics.lines_of_code,
+            metrics.duplicate_code_ratio, metrics.comment_ratio
+        ))
     
     async def _update_trend_data(self, metrics: QualityMetrics):
         """Update trend data for the metrics."""
@@ -645,128 +654,109 @@ class QualityMetricsCollector:
             ('performance_score', metrics.performance_score, previous_metrics.performance_score)
         ]
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        trend_rows = []
+        for metric_name, current_value, previous_value in metric_comparisons:
+            if current_value is not None and previous_value is not None:
+                # Calculate trend direction and change percentage
+                change_percentage = ((current_value - previous_value) / previous_value * 100) if previous_value != 0 else 0
+                
+                if abs(change_percentage) < 1:  # Less than 1% change
+                    trend_direction = 'stable'
+                elif change_percentage > 0:
+                    trend_direction = 'up'
+                else:
+                    trend_direction = 'down'
+                
+                # Store trend data
+                trend = QualityTrend(
+                    project_id=metrics.project_id,
+                    metric_name=metric_name,
+                    metric_value=current_value,
+                    timestamp=metrics.timestamp,
+                    trend_direction=trend_direction,
+                    change_percentage=change_percentage
+                )
+                
+                trend_rows.append((
+                    trend.id, trend.project_id, trend.metric_name,
+                    trend.metric_value, trend.timestamp.isoformat(),
+                    trend.trend_direction, trend.change_percentage
+                ))
         
-        try:
-            for metric_name, current_value, previous_value in metric_comparisons:
-                if current_value is not None and previous_value is not None:
-                    # Calculate trend direction and change percentage
-                    change_percentage = ((current_value - previous_value) / previous_value * 100) if previous_value != 0 else 0
-                    
-                    if abs(change_percentage) < 1:  # Less than 1% change
-                        trend_direction = 'stable'
-                    elif change_percentage > 0:
-                        trend_direction = 'up'
-                    else:
-                        trend_direction = 'down'
-                    
-                    # Store trend data
-                    trend = QualityTrend(
-                        project_id=metrics.project_id,
-                        metric_name=metric_name,
-                        metric_value=current_value,
-                        timestamp=metrics.timestamp,
-                        trend_direction=trend_direction,
-                        change_percentage=change_percentage
-                    )
-                    
-                    cursor.execute("""
-                        INSERT INTO quality_trends 
-                        (id, project_id, metric_name, metric_value, timestamp, 
-                         trend_direction, change_percentage)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        trend.id, trend.project_id, trend.metric_name,
-                        trend.metric_value, trend.timestamp.isoformat(),
-                        trend.trend_direction, trend.change_percentage
-                    ))
-            
-            conn.commit()
-            
-        finally:
-            conn.close()
+        # All trend rows go in one statement and transaction
+        if trend_rows:
+            await self.db.executemany("""
+                INSERT INTO quality_trends 
+                (id, project_id, metric_name, metric_value, timestamp, 
+                 trend_direction, change_percentage)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, trend_rows)
     
     async def get_previous_metrics(self, project_id: str) -> Optional[QualityMetrics]:
         """Get the most recent previous metrics for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                SELECT * FROM quality_metrics 
-                WHERE project_id = ? 
-                ORDER BY timestamp DESC 
-                LIMIT 1 OFFSET 1
-            """, (project_id,))
-            
-            row = cursor.fetchone()
-            if row:
-                return QualityMetrics.from_dict({
-                    'id': row[0],
-                    'project_id': row[1],
-                    'timestamp': row[2],
-                    'code_coverage': row[3],
-                    'cyclomatic_complexity': row[4],
-                    'maintainability_index': row[5],
-                    'technical_debt_ratio': row[6],
-                    'test_quality_score': row[7],
-                    'security_score': row[8],
-                    'performance_score': row[9],
-                    'lines_of_code': row[10],
-                    'duplicate_code_ratio': row[11],
-                    'comment_ratio': row[12]
-                })
-            
-            return None
-            
-        finally:
-            conn.close()
+        row = await self.db.fetchone("""
+            SELECT * FROM quality_metrics 
+            WHERE project_id = ? 
+            ORDER BY timestamp DESC 
+            LIMIT 1 OFFSET 1
+        """, (project_id,))
+        
+        if row:
+            return QualityMetrics.from_dict({
+                'id': row[0],
+                'project_id': row[1],
+                'timestamp': row[2],
+                'code_coverage': row[3],
+                'cyclomatic_complexity': row[4],
+                'maintainability_index': row[5],
+                'technical_debt_ratio': row[6],
+                'test_quality_score': row[7],
+                'security_score': row[8],
+                'performance_score': row[9],
+                'lines_of_code': row[10],
+                'duplicate_code_ratio': row[11],
+                'comment_ratio': row[12]
+            })
+        
+        return None
     
     async def get_quality_trends(self, project_id: str, 
                                metric_name: Optional[str] = None,
                                days: int = 30) -> List[QualityTrend]:
         """Get quality trends for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        since_date = datetime.now(timezone.utc) - timedelta(days=days)
         
-        try:
-            since_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            if metric_name:
-                cursor.execute("""
-                    SELECT * FROM quality_trends 
-                    WHERE project_id = ? AND metric_name = ? AND timestamp >= ?
-                    ORDER BY timestamp ASC
-                """, (project_id, metric_name, since_date.isoformat()))
-            else:
-                cursor.execute("""
-                    SELECT * FROM quality_trends 
-                    WHERE project_id = ? AND timestamp >= ?
-                    ORDER BY timestamp ASC
-                """, (project_id, since_date.isoformat()))
-            
-            trends = []
-            for row in cursor.fetchall():
-                trends.append(QualityTrend(
-                    id=row[0],
-                    project_id=row[1],
-                    metric_name=row[2],
-                    metric_value=row[3],
-                    timestamp=datetime.fromisoformat(row[4]),
-                    trend_direction=row[5],
-                    change_percentage=row[6]
-                ))
-            
-            return trends
-            
-        finally:
-            conn.close()
+        if metric_name:
+            rows = await self.db.fetchall("""
+                SELECT * FROM quality_trends 
+                WHERE project_id = ? AND metric_name = ? AND timestamp >= ?
+                ORDER BY timestamp ASC
+            """, (project_id, metric_name, since_date.isoformat()))
+        else:
+            rows = await self.db.fetchall("""
+                SELECT * FROM quality_trends 
+                WHERE project_id = ? AND timestamp >= ?
+                ORDER BY timestamp ASC
+            """, (project_id, since_date.isoformat()))
+        
+        trends = []
+        for row in rows:
+            trends.append(QualityTrend(
+                id=row[0],
+                project_id=row[1],
+                metric_name=row[2],
+                metric_value=row[3],
+                timestamp=datetime.fromisoformat(row[4]),
+                trend_direction=row[5],
+                change_percentage=row[6]
+            ))
+        
+        return trends
     
     async def evaluate_quality_gates(self, project_id: str, 
                                    metrics: QualityMetrics) -> QualityGateResult:
         """Evaluate quality gates against current metrics."""
-        thresholds = self.config_manager.get_quality_thresholds(project_id)
+        thresholds = await self.config_manager.get_quality_thresholds_async(project_id)
         
         failed_criteria = []
         warnings = []
@@ -830,64 +820,48 @@ class QualityMetricsCollector:
     
     async def _store_quality_gate_result(self, project_id: str, result: QualityGateResult):
         """Store quality gate evaluation result."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT INTO quality_gates 
-                (id, project_id, gate_name, criteria, passed, score, 
-                 failed_criteria, warnings, evaluated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (
-                f"gate_{project_id}_{datetime.now().timestamp()}",
-                project_id,
-                "Standard Quality Gate",
-                json.dumps(result.details),
-                result.passed,
-                result.score,
-                json.dumps(result.failed_criteria),
-                json.dumps(result.warnings)
-            ))
-            
-            conn.commit()
-            
-        finally:
-            conn.close()
+        await self.db.execute("""
+            INSERT INTO quality_gates 
+            (id, project_id, gate_name, criteria, passed, score, 
+             failed_criteria, warnings, evaluated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            f"gate_{project_id}_{datetime.now().timestamp()}",
+            project_id,
+            "Standard Quality Gate",
+            json.dumps(result.details),
+            result.passed,
+            result.score,
+            json.dumps(result.failed_criteria),
+            json.dumps(result.warnings)
+        ))
     
     async def get_metrics_history(self, project_id: str, days: int = 30) -> List[QualityMetrics]:
         """Get historical quality metrics for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            since_date = datetime.now(timezone.utc) - timedelta(days=days)
-            
-            cursor.execute("""
-                SELECT * FROM quality_metrics 
-                WHERE project_id = ? AND timestamp >= ?
-                ORDER BY timestamp ASC
-            """, (project_id, since_date.isoformat()))
-            
-            metrics_list = []
-            for row in cursor.fetchall():
-                metrics_list.append(QualityMetrics.from_dict({
-                    'id': row[0],
-                    'project_id': row[1],
-                    'timestamp': row[2],
-                    'code_coverage': row[3],
-                    'cyclomatic_complexity': row[4],
-                    'maintainability_index': row[5],
-                    'technical_debt_ratio': row[6],
-                    'test_quality_score': row[7],
-                    'security_score': row[8],
-                    'performance_score': row[9],
-                    'lines_of_code': row[10],
-                    'duplicate_code_ratio': row[11],
-                    'comment_ratio': row[12]
-                }))
-            
-            return metrics_list
-            
-        finally:
-            conn.close()
\ No newline at end of file
+        since_date = datetime.now(timezone.utc) - timedelta(days=days)
+        
+        rows = await self.db.fetchall("""
+            SELECT * FROM quality_metrics 
+            WHERE project_id = ? AND timestamp >= ?
+            ORDER BY timestamp ASC
+        """, (project_id, since_date.isoformat()))
+        
+        metrics_list = []
+        for row in rows:
+            metrics_list.append(QualityMetrics.from_dict({
+                'id': row[0],
+                'project_id': row[1],
+                'timestamp': row[2],
+                'code_coverage': row[3],
+                'cyclomatic_complexity': row[4],
+                'maintainability_index': row[5],
+                'technical_debt_ratio': row[6],
+                'test_quality_score': row[7],
+                'security_score': row[8],
+                'performance_score': row[9],
+                'lines_of_code': row[10],
+                'duplicate_code_ratio': row[11],
+                'comment_ratio': row[12]
+            }))
+        
+        return metrics_list
\ No newline at end of file
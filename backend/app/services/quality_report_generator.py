@@ -7,7 +7,6 @@ projects and teams for the AITM platform.
 """
 
 import asyncio
-import sqlite3
 import json
 import csv
 import io
@@ -23,6 +22,7 @@ from app.models.quality import (
     QualityMetrics, QualityIssue, QualityTrend, AutoFixResult,
     IssueType, Severity, IssueStatus, TestQualityMetrics
 )
+from app.core.sqlite_pool import SQLitePool, get_sqlite_pool
 from app.services.quality_metrics_collector import QualityMetricsCollector
 
 
@@ -129,12 +129,16 @@ class QualityReportGenerator:
         self.metrics_collector = QualityMetricsCollector(db_path)
         self._ensure_database_schema()
     
+    @property
+    def db(self) -> SQLitePool:
+        """Shared connection pool for the reports database."""
+        return get_sqlite_pool(self.db_path)
+    
     def _ensure_database_schema(self):
         """Ensure required database tables exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            
             # Ensure quality_reports table exists
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS quality_reports (
@@ -163,10 +167,6 @@ class QualityReportGenerator:
                     is_active BOOLEAN DEFAULT TRUE
                 )
             """)
-            
-            conn.commit()
-        finally:
-            conn.close()
     
     async def generate_comprehensive_report(self, config: ReportConfiguration) -> Dict[str, Any]:
         """
@@ -1535,10 +1535,9 @@ class QualityReportGenerator:
         
         report_id = str(uuid.uuid4())
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def store(conn):
+            cursor = conn.cursor()
+            
             cursor.execute("""
                 INSERT INTO quality_reports 
                 (id, report_type, format, project_ids, generated_at, report_data)
@@ -1552,20 +1551,17 @@ class QualityReportGenerator:
                 formatted_report if isinstance(formatted_report, str) else formatted_report.decode('utf-8')
             ))
             
-            conn.commit()
             return report_id
-            
-        finally:
-            conn.close()
+        
+        return await self.db.write(store)
     
     # Database helper methods
     
     async def _get_latest_metrics(self, project_id: str) -> Optional[QualityMetrics]:
         """Get latest quality metrics for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def query(conn):
+            cursor = conn.cursor()
+            
             cursor.execute("""
                 SELECT * FROM quality_metrics 
                 WHERE project_id = ? 
@@ -1592,17 +1588,15 @@ class QualityReportGenerator:
                 })
             
             return None
-            
-        finally:
-            conn.close()
+        
+        return await self.db.read(query)
     
     async def _get_project_issues(self, project_id: str, 
                                 date_range: Optional[Tuple[datetime, datetime]]) -> List[QualityIssue]:
         """Get quality issues for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def query(conn):
+            cursor = conn.cursor()
+            
             if date_range:
                 start_date, end_date = date_range
                 cursor.execute("""
@@ -1639,9 +1633,8 @@ class QualityReportGenerator:
                 }))
             
             return issues
-            
-        finally:
-            conn.close()
+        
+        return await self.db.read(query)
     
     async def _get_project_trends(self, project_id: str, 
                                 date_range: Optional[Tuple[datetime, datetime]]) -> List[QualityTrend]:
@@ -1654,10 +1647,9 @@ class QualityReportGenerator:
     async def _get_auto_fix_results(self, project_id: str, 
                                   date_range: Optional[Tuple[datetime, datetime]]) -> List[AutoFixResult]:
         """Get auto-fix results for a project."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def query(conn):
+            cursor = conn.cursor()
+            
             if date_range:
                 start_date, end_date = date_range
                 cursor.execute("""
@@ -1691,9 +1683,8 @@ class QualityReportGenerator:
                 }))
             
             return results
-            
-        finally:
-            conn.close()
+        
+        return await self.db.read(query)
     
     async def _get_test_metrics(self, project_id: str) -> Optional[TestQualityMetrics]:
         """Get test quality metrics for a project."""
@@ -1713,10 +1704,9 @@ class QualityReportGenerator:
                           report_type: Optional[ReportType] = None,
                           limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """List previously generated reports."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def query(conn):
+            cursor = conn.cursor()
+            
             query = "SELECT id, report_type, format, project_ids, generated_at, generated_by, file_size FROM quality_reports"
             params = []
             conditions = []
@@ -1751,16 +1741,14 @@ class QualityReportGenerator:
                 })
             
             return reports
-            
-        finally:
-            conn.close()
+        
+        return await self.db.read(query)
     
     async def get_report(self, report_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific report by ID."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def query(conn):
+            cursor = conn.cursor()
+            
             cursor.execute("""
                 SELECT * FROM quality_reports WHERE id = ?
             """, (report_id,))
@@ -1782,22 +1770,18 @@ class QualityReportGenerator:
                 }
             
             return None
-            
-        finally:
-            conn.close()
+        
+        return await self.db.read(query)
     
     async def delete_report(self, report_id: str) -> bool:
         """Delete a report."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        def delete(conn):
+            cursor = conn.cursor()
+            
             cursor.execute("DELETE FROM quality_reports WHERE id = ?", (report_id,))
-            conn.commit()
             return cursor.rowcount > 0
-            
-        finally:
-            conn.close()
+        
+        return await self.db.write(delete)
     
     async def export_report(self, report_id: str, format: ReportFormat) -> Optional[Union[str, bytes]]:
         """Export a report in specified format."""
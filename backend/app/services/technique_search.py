@@ -0,0 +1,176 @@
+"""
+Technique Search Index
+Ranked full-text search over MITRE ATT&CK techniques using BM25 scoring
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class TechniqueSearchIndex:
+    """
+    Inverted index over technique names and descriptions
+
+    Features:
+    - Positional postings with precomputed term frequencies and document lengths
+    - BM25 scoring with a boost for terms that appear in the technique name
+    - Top-k retrieval with a heap
+    - Prefix queries (``inject*``) and phrase queries (``"valid accounts"``)
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, name_boost: float = 2.0):
+        self.k1 = k1
+        self.b = b
+        self.name_boost = name_boost
+
+        # term -> {doc_id: [positions]}
+        self.postings: Dict[str, Dict[str, List[int]]] = {}
+        # term -> doc_ids whose name contains the term
+        self.name_postings: Dict[str, Set[str]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.avg_doc_length: float = 0.0
+        self.vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def clear(self):
+        """Remove all indexed documents"""
+        self.postings.clear()
+        self.name_postings.clear()
+        self.doc_lengths.clear()
+        self.avg_doc_length = 0.0
+        self.vocabulary = []
+
+    def build(self, documents: Iterable[Tuple[str, str, str]]):
+        """Index ``(doc_id, name, description)`` tuples, replacing existing content"""
+        self.clear()
+
+        for doc_id, name, description in documents:
+            name_terms = tokenize(name)
+            # Name and description share one position space; the gap keeps
+            # phrases from matching across the field boundary
+            terms = name_terms + [''] + tokenize(description)
+
+            for position, term in enumerate(terms):
+                if term:
+                    self.postings.setdefault(term, {}).setdefault(doc_id, []).append(position)
+
+            for term in name_terms:
+                self.name_postings.setdefault(term, set()).add(doc_id)
+
+            self.doc_lengths[doc_id] = len(terms) - 1
+
+        if self.doc_lengths:
+            self.avg_doc_length = sum(self.doc_lengths.values()) / len(self.doc_lengths)
+        self.vocabulary = sorted(self.postings)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the index as plain JSON-serializable containers"""
+        return {
+            'k1': self.k1,
+            'b': self.b,
+            'name_boost': self.name_boost,
+            'postings': self.postings,
+            'name_postings': {term: sorted(doc_ids) for term, doc_ids in self.name_postings.items()},
+            'doc_lengths': self.doc_lengths,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TechniqueSearchIndex':
+        """Rebuild an index from the output of ``to_dict``"""
+        index = cls(k1=data['k1'], b=data['b'], name_boost=data['name_boost'])
+        index.postings = data['postings']
+        index.name_postings = {term: set(doc_ids) for term, doc_ids in data['name_postings'].items()}
+        index.doc_lengths = data['doc_lengths']
+        if index.doc_lengths:
+            index.avg_doc_length = sum(index.doc_lengths.values()) / len(index.doc_lengths)
+        index.vocabulary = sorted(index.postings)
+        return index
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Return ``(doc_id, score)`` pairs ranked by BM25 score
+
+        Quoted phrases must match as consecutive terms. Terms ending in ``*``
+        expand to every indexed term with that prefix, and so do terms that are
+        not in the vocabulary, so partial words still find their completions.
+        """
+        phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+        phrases = [phrase for phrase in phrases if phrase]
+
+        terms: List[str] = []
+        for raw_term in PHRASE_PATTERN.sub(' ', query).lower().split():
+            is_prefix = raw_term.endswith('*')
+            for term in tokenize(raw_term):
+                if is_prefix or term not in self.postings:
+                    terms.extend(self._expand_prefix(term))
+                else:
+                    terms.append(term)
+        for phrase in phrases:
+            terms.extend(phrase)
+
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            self._score_term(term, scores)
+
+        if phrases:
+            scores = {
+                doc_id: score for doc_id, score in scores.items()
+                if all(self._matches_phrase(doc_id, phrase) for phrase in phrases)
+            }
+
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Return indexed terms starting with ``prefix``"""
+        matches = []
+        index = bisect_left(self.vocabulary, prefix)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(prefix):
+            matches.append(self.vocabulary[index])
+            index += 1
+        return matches
+
+    def _score_term(self, term: str, scores: Dict[str, float]):
+        """Accumulate the BM25 contribution of ``term`` into ``scores``"""
+        postings = self.postings.get(term)
+        if not postings:
+            return
+
+        doc_count = len(self.doc_lengths)
+        idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        name_docs = self.name_postings.get(term, ())
+
+        for doc_id, positions in postings.items():
+            tf = len(positions)
+            norm = 1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length
+            score = idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+            if doc_id in name_docs:
+                score += idf * self.name_boost
+            scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+    def _matches_phrase(self, doc_id: str, phrase: List[str]) -> bool:
+        """Check whether ``phrase`` occurs as consecutive terms in a document"""
+        try:
+            starts = set(self.postings[phrase[0]][doc_id])
+            for offset, term in enumerate(phrase[1:], start=1):
+                positions = self.postings[term][doc_id]
+                starts &= {position - offset for position in positions}
+                if not starts:
+                    return False
+        except KeyError:
+            return False
+        return bool(starts)
@@ -15,6 +15,7 @@ import logging
 
 from app.models.user import UserTable, UserCreate, UserUpdate, User, UserInDB
 from app.core.auth import AuthService, validate_password_strength
+from app.core.principal_cache import get_principal_cache
 
 logger = logging.getLogger(__name__)
 
@@ -166,6 +167,8 @@ class UserService:
             
             await db.flush()
             await db.refresh(db_user)
+            # Role, status and profile changes must reach already-issued tokens
+            get_principal_cache().invalidate_user(user_id, db)
             
             logger.info(f"Updated user: {user_id}")
             return db_user.to_pydantic()
@@ -194,6 +197,7 @@ class UserService:
                     detail="User not found"
                 )
             
+            get_principal_cache().invalidate_user(user_id, db)
             logger.info(f"Deactivated user: {user_id}")
             return True
             
@@ -221,6 +225,7 @@ class UserService:
                     detail="User not found"
                 )
             
+            get_principal_cache().invalidate_user(user_id, db)
             logger.info(f"Activated user: {user_id}")
             return True
             
@@ -293,6 +298,7 @@ class UserService:
                 .values(hashed_password=new_hashed_password, updated_at=datetime.now(timezone.utc))
             )
             
+            get_principal_cache().invalidate_user(user_id, db)
             logger.info(f"Password changed for user: {user_id}")
             return True
             
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Authenticated request throughput benchmark.
+
+Serves GET /api/v1/auth/me from a temporary database and drives it with
+concurrent clients holding a handful of access tokens, first with the
+principal cache disabled (every request decodes its token and loads the
+user) and then enabled, reporting requests per second and user queries.
+
+    python auth_benchmark.py --requests 5000 --clients 20 --tokens 5
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.endpoints import auth as auth_endpoints
+from app.core.auth import auth_service
+from app.core.database import Base, get_db
+from app.core.principal_cache import get_principal_cache
+from app.models.user import UserTable
+
+
+async def run_clients(app: FastAPI, tokens, requests: int, clients: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def worker(index: int):
+            for n in range(index, requests, clients):
+                headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+                response = await client.get("/api/v1/auth/me", headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        return time.perf_counter() - start
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(temp_dir) / 'auth.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            session.add(UserTable(id="user-1", email="bench@example.com", hashed_password="x"))
+            await session.commit()
+
+        async def get_benchmark_db():
+            async with session_factory() as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(auth_endpoints.router, prefix="/api/v1/auth")
+        app.dependency_overrides[get_db] = get_benchmark_db
+
+        user_queries = []
+        event.listen(
+            engine.sync_engine, "before_cursor_execute",
+            lambda conn, cursor, statement, *rest: "FROM users" in statement and user_queries.append(1)
+        )
+
+        tokens = [
+            auth_service.create_access_token("user-1", {"session": n}) for n in range(args.tokens)
+        ]
+        cache = get_principal_cache()
+        configured_ttl = cache.ttl
+        print(f"🚀 {args.requests} requests, {args.clients} clients, {args.tokens} tokens")
+        print("=" * 60)
+
+        baseline = None
+        for label, ttl in (("uncached", 0), ("cached", configured_ttl or 60.0)):
+            cache.ttl = ttl
+            cache.clear()
+            user_queries.clear()
+            # Warm up the app and the connection pool
+            await run_clients(app, tokens, args.clients, args.clients)
+            user_queries.clear()
+
+            elapsed = await run_clients(app, tokens, args.requests, args.clients)
+            baseline = baseline or elapsed
+            print(
+                f"  {label:8} {elapsed:7.2f}s {args.requests / elapsed:8.1f} req/s "
+                f"speedup={baseline / elapsed:4.2f}x user_queries={len(user_queries)}"
+            )
+
+        cache.ttl = configured_ttl
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark authenticated requests with and without the principal cache")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Code scan scaling benchmark.
+
+Generates a synthetic Python project and scans it with CodeScanningFramework
+using the thread executor and the process executor at increasing worker
+counts, reporting files per second and speedup over one worker. Thread scans
+stay flat because analysis holds the GIL; process scans should scale close to
+linearly until workers exceed the available cores.
+
+    python code_scan_benchmark.py --files 2000 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.code_analysis import CodeScanningFramework, ScanConfiguration, ExecutorType
+
+
+FUNCTION_TEMPLATE = '''
+def handler_{index}(request, session, user, payload, options, retries=3):
+    password = "secret{index}"
+    total = 0
+    for item in payload:
+        if item and item.get("value"):
+            total += item["value"] * {index}
+    query = "SELECT * FROM table WHERE id = " + str(request.id)
+    return total, query
+'''
+
+
+def generate_project(root: Path, files: int, seed: int) -> None:
+    """Write files of varied size so shard balancing matters"""
+    rng = random.Random(seed)
+    for i in range(files):
+        functions = rng.choice([2, 5, 10, 40])
+        body = "".join(FUNCTION_TEMPLATE.format(index=n) for n in range(functions))
+        package = root / f"pkg{i % 20}"
+        package.mkdir(exist_ok=True)
+        (package / f"module_{i}.py").write_text(f'"""Module {i}."""\n' + body)
+
+
+async def scan(project: Path, executor: ExecutorType, workers: int):
+    framework = CodeScanningFramework()
+    config = ScanConfiguration(
+        project_id="benchmark",
+        project_path=str(project),
+        parallel_workers=workers,
+        executor=executor,
+        cache_results=False
+    )
+    start = time.perf_counter()
+    result = await framework.scan_project(config)
+    return time.perf_counter() - start, result
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        project = Path(temp_dir)
+        generate_project(project, args.files, args.seed)
+        print(f"🚀 {args.files} files, {os.cpu_count()} CPUs")
+        print("=" * 60)
+
+        for executor in (ExecutorType.THREAD, ExecutorType.PROCESS):
+            baseline = None
+            for workers in args.workers:
+                elapsed, result = await scan(project, executor, workers)
+                baseline = baseline or elapsed
+                print(
+                    f"  {executor.value:7} workers={workers:2} {elapsed:7.2f}s "
+                    f"{result.files_scanned / elapsed:8.1f} files/s "
+                    f"speedup={baseline / elapsed:4.2f}x issues={result.total_issues}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thread vs process code scanning")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
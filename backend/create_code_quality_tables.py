@@ -135,6 +135,8 @@ def create_quality_database(db_path: str = "aitm.db"):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_issues_project ON quality_issues(project_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_issues_status ON quality_issues(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_issues_severity ON quality_issues(severity)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_issues_project_created ON quality_issues(project_id, created_at, status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_issues_created ON quality_issues(created_at, status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_metrics_project ON quality_metrics(project_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_metrics_timestamp ON quality_metrics(timestamp)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_auto_fix_results_issue ON auto_fix_results(issue_id)")
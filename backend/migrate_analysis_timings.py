@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database migration script for analysis stage timings.
+
+This script adds the stage_timings column to existing analysis_states tables.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.database import async_session
+from sqlalchemy import text
+
+
+async def migrate_database():
+    """Add stage_timings column to analysis_states"""
+    print("🔄 Migrating database for analysis stage timings...")
+    print("=" * 50)
+
+    try:
+        async with async_session() as db:
+            print("🔍 Checking existing database schema...")
+            result = await db.execute(text("PRAGMA table_info(analysis_states)"))
+            column_names = [col[1] for col in result.fetchall()]
+
+            if 'stage_timings' not in column_names:
+                print("➕ Adding stage_timings column to analysis_states table...")
+                await db.execute(text("ALTER TABLE analysis_states ADD COLUMN stage_timings TEXT"))
+                await db.commit()
+                print("✅ Added stage_timings column to analysis_states table")
+            else:
+                print("   stage_timings column already exists")
+
+        print("\n🎉 Analysis stage timings migration completed!")
+
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_database())
@@ -61,6 +61,21 @@ async def migrate_database():
         await init_db()
         print("✅ Database tables created/updated successfully")
         
+        # create_all skips indexes on tables that already exist
+        print("\n🗂️  Adding activity feed pagination indexes...")
+        async with async_session() as db:
+            await db.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_activity_logs_created_id ON activity_logs (created_at, id)"
+            ))
+            await db.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_activity_logs_project_created ON activity_logs (project_id, created_at, id)"
+            ))
+            await db.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_activity_logs_team_created ON activity_logs (team_id, created_at, id)"
+            ))
+            await db.commit()
+        print("✅ Activity feed indexes in place")
+        
         # Update existing projects that don't have owner_user_id set
         if admin_user:
             print("\n👤 Updating projects without owner...")
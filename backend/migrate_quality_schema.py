@@ -5,10 +5,14 @@ Handles schema updates and data migrations.
 """
 
 import sqlite3
+import sys
 import json
 from datetime import datetime
 from pathlib import Path
 
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
 
 class QualityMigration:
     """Handles database migrations for quality tracking system."""
@@ -20,6 +24,7 @@ class QualityMigration:
             self.migration_002_add_indexes,
             self.migration_003_add_trends_table,
             self.migration_004_add_scan_configuration,
+            self.migration_005_add_resolution_rollup,
         ]
     
     def get_current_version(self) -> int:
@@ -275,6 +280,20 @@ class QualityMigration:
         finally:
             conn.close()
     
+    def migration_005_add_resolution_rollup(self) -> str:
+        """Add metrics indexes and the per-day resolution rollup."""
+        from app.services.quality_issue_tracker import ensure_resolution_rollup
+        
+        conn = sqlite3.connect(self.db_path)
+        
+        try:
+            with conn:
+                ensure_resolution_rollup(conn)
+            return "Added resolution metrics indexes and daily rollup"
+            
+        finally:
+            conn.close()
+    
     def rollback_migration(self, target_version: int):
         """Rollback to a specific migration version (for development)."""
         print(f"Rolling back to version {target_version}")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Detection rule scaling benchmark.
+
+Generates synthetic Python files and runs QualityIssueDetector's pattern rules
+over them with increasing numbers of custom rules, timing the compiled rule
+set against running each rule's check_pattern on its own. Per-rule time grows
+linearly with the rule count; the compiled set should stay close to flat.
+
+    python rule_engine_benchmark.py --files 200 --rules 0 16 64 256 1024
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.code_analysis import DetectionRule, ParsedFile, QualityIssueDetector
+from app.models.quality import IssueType, Severity
+
+
+FUNCTION_TEMPLATE = '''
+def handler_{index}(request, session, user, payload, options, retries=3):
+    password = "secret{index}"
+    total = 0
+    for i in range(len(payload)):
+        if payload[i] and payload[i].get("value"):
+            total += payload[i]["value"] * {index}
+    cursor.execute("SELECT * FROM table WHERE id = %s" % request.id)
+    legacy_call_{index}(total)
+    return total
+'''
+
+
+def generate_files(count: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        "".join(FUNCTION_TEMPLATE.format(index=rng.randrange(5000)) for _ in range(rng.choice([5, 20, 60])))
+        for _ in range(count)
+    ]
+
+
+def custom_rules(count: int):
+    """Banned-call rules of the kind teams add on top of the defaults."""
+    return [
+        DetectionRule(
+            rule_id=f"banned_call_{n}",
+            name=f"Banned call {n}",
+            description=f"legacy_call_{n} is deprecated",
+            issue_type=IssueType.MAINTAINABILITY,
+            severity=Severity.LOW,
+            pattern=rf'\blegacy_call_{n}\s*\('
+        )
+        for n in range(count)
+    ]
+
+
+def time_per_rule(rules, files):
+    start = time.perf_counter()
+    issues = 0
+    for content in files:
+        lines = content.split('\n')
+        for rule in rules:
+            issues += len(rule.check_pattern(content, lines))
+    return time.perf_counter() - start, issues
+
+
+def time_compiled(detector, rules, files):
+    start = time.perf_counter()
+    rule_set = detector.get_compiled_rules(rules)
+    issues = 0
+    for content in files:
+        issues += sum(len(matches) for matches in rule_set.scan(ParsedFile(content)).values())
+    return time.perf_counter() - start, issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pattern rule scaling")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--rules", type=int, nargs="+", default=[0, 16, 64, 256, 1024])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    files = generate_files(args.files, args.seed)
+    size = sum(len(content) for content in files)
+    print(f"🚀 {args.files} files, {size / 1024:.0f} KiB")
+    print("=" * 60)
+
+    for count in args.rules:
+        detector = QualityIssueDetector()
+        for rule in custom_rules(count):
+            detector.add_rule(rule)
+        rules = detector.get_rules_for_language('python')
+
+        per_rule, expected = time_per_rule([rule for rule in rules if rule.pattern], files)
+        compiled, found = time_compiled(detector, rules, files)
+        print(
+            f"  rules={len(rules):5} per-rule {per_rule:7.3f}s compiled {compiled:7.3f}s "
+            f"speedup={per_rule / compiled:6.1f}x matches={found}"
+            + ("" if found == expected else f" MISMATCH (expected {expected})")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from app.services.code_analysis import analysis_cache
+
+
+@pytest.fixture(autouse=True)
+def analysis_result_store(tmp_path, monkeypatch):
+    """Keep the persistent analysis result store out of ./data, one database per test"""
+    monkeypatch.setattr(analysis_cache, "_analysis_result_store", None)
+    monkeypatch.setattr(analysis_cache.settings, "analysis_cache_path", str(tmp_path / "analysis_cache.db"))
+    yield
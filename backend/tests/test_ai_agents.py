@@ -8,10 +8,14 @@ import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 import json
 from datetime import datetime
+from types import SimpleNamespace
 
+from app.agents import base_agent, report_generation_agent
 from app.agents.attack_mapper_agent import AttackMapperAgent, ControlEvaluationAgent
 from app.agents.report_generation_agent import ReportGenerationAgent
 from app.models.schemas import AgentTask
+from app.services.llm_providers.base import LLMModel, TokenUsage
+from app.services.llm_response_cache import LLMResponseCache, MemoryResponseCacheBackend
 
 
 class TestAttackMapperAgent:
@@ -456,6 +460,147 @@ class TestReportGenerationAgent:
                         assert response.output_data['report_summary']['techniques_analyzed'] == 2
                         assert response.confidence_score == 0.88
     
+    @pytest.fixture
+    def report_json(self):
+        """Report completion covering every section"""
+        return json.dumps({
+            'executive_summary': {'overview': 'Moderate risk', 'risk_level': 'medium'},
+            'technical_analysis': {'system_overview': 'Web application'},
+            'control_assessment': {'effectiveness_score': 0.65},
+            'recommendations': {'immediate_actions': []},
+            'metrics': {'techniques_analyzed': 2}
+        })
+    
+    @pytest.fixture
+    def agent_llm(self, monkeypatch):
+        """llm_service resolving every agent call to openai/gpt-4o, with an empty response cache"""
+        provider = SimpleNamespace(
+            model_name='gpt-4o',
+            estimate_usage=lambda prompt, completion: TokenUsage(total_tokens=1)
+        )
+        service = SimpleNamespace(
+            resolved='openai',
+            providers={'openai': provider, 'google': provider}
+        )
+        service.select_provider = lambda preferred=None: preferred or service.resolved
+        monkeypatch.setattr(base_agent, 'llm_service', service)
+        cache = LLMResponseCache(MemoryResponseCacheBackend())
+        monkeypatch.setattr(base_agent, 'get_llm_response_cache', lambda: cache)
+        return service
+    
+    def streaming_service(self, report, received, fail_after=None):
+        """Streaming service serving openai that yields the report in small chunks"""
+        class StreamingService:
+            requests = []
+            
+            def get_available_providers(self):
+                return ['openai']
+            
+            async def generate_stream(self, prompt, model=None, provider=None, **kwargs):
+                self.requests.append((provider, model, kwargs.get('use_cache')))
+                for index, start in enumerate(range(0, len(report), 16)):
+                    if fail_after is not None and index == fail_after:
+                        raise ConnectionError("stream dropped")
+                    yield SimpleNamespace(delta=report[start:start + 16], done=False, provider=provider)
+                    await asyncio.sleep(0)
+                received.append('done')
+                yield SimpleNamespace(
+                    delta='', done=True, provider=provider,
+                    token_usage=TokenUsage(prompt_tokens=900, completion_tokens=300, total_tokens=1200)
+                )
+        
+        return StreamingService()
+    
+    @pytest.mark.asyncio
+    async def test_report_sections_stream_to_listener(self, report_agent, report_json, agent_llm, monkeypatch):
+        """Test that each report section reaches the listener before the stream ends"""
+        received = []
+        service = self.streaming_service(report_json, received)
+        
+        async def on_section(name, content):
+            received.append(name)
+        
+        monkeypatch.setattr(report_generation_agent, 'get_enhanced_llm_service', lambda: service)
+        report_agent.set_section_listener(on_section)
+        
+        with patch.object(report_agent, 'generate_llm_response', new_callable=AsyncMock) as mock_llm:
+            response = await report_agent._generate_report_response("Generate the report")
+        
+        mock_llm.assert_not_called()
+        assert service.requests == [('openai', LLMModel.GPT_4O, False)]
+        assert response['success'] is True
+        assert response['provider'] == 'openai'
+        assert response['model'] == 'gpt-4o'
+        assert response['token_usage']['total_tokens'] == 1200
+        assert json.loads(response['response']) == json.loads(report_json)
+        assert received == [
+            'executive_summary', 'technical_analysis', 'control_assessment',
+            'recommendations', 'metrics', 'done'
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_streamed_report_served_from_agent_cache(self, report_agent, report_json, agent_llm, monkeypatch):
+        """Test that a streamed report is replayed from the agent response cache, sections included"""
+        service = self.streaming_service(report_json, [])
+        monkeypatch.setattr(report_generation_agent, 'get_enhanced_llm_service', lambda: service)
+        first = await report_agent._generate_report_response("Generate the report")
+        
+        received = []
+        
+        async def on_section(name, content):
+            received.append(name)
+        
+        report_agent.set_section_listener(on_section)
+        second = await report_agent._generate_report_response("Generate the report")
+        
+        assert len(service.requests) == 1
+        assert second['cache_hit'] is True
+        assert second['response'] == first['response']
+        assert received == list(report_generation_agent.REPORT_SECTIONS)
+        assert base_agent.get_llm_response_cache().get_stats()['tokens_saved'] == 1200
+    
+    @pytest.mark.asyncio
+    async def test_report_stays_on_resolved_provider(self, report_agent, agent_llm, monkeypatch):
+        """Test that the report is generated in one call when the resolved provider cannot stream"""
+        agent_llm.resolved = 'google'
+        service = MagicMock()
+        service.get_available_providers.return_value = ['openai']
+        monkeypatch.setattr(report_generation_agent, 'get_enhanced_llm_service', lambda: service)
+        
+        with patch.object(report_agent, 'generate_llm_response', new_callable=AsyncMock) as mock_llm:
+            mock_llm.return_value = {'success': True, 'response': '{}'}
+            response = await report_agent._generate_report_response("Generate the report")
+        
+        mock_llm.assert_awaited_once_with("Generate the report", temperature=0.4)
+        service.generate_stream.assert_not_called()
+        assert response['success'] is True
+    
+    @pytest.mark.asyncio
+    async def test_broken_report_stream_falls_back_to_one_call(self, report_agent, report_json, agent_llm, monkeypatch):
+        """Test that a stream failing partway is finished in one call without repeating sections"""
+        received = []
+        service = self.streaming_service(report_json, received, fail_after=8)
+        
+        async def on_section(name, content):
+            received.append(name)
+        
+        monkeypatch.setattr(report_generation_agent, 'get_enhanced_llm_service', lambda: service)
+        report_agent.set_section_listener(on_section)
+        
+        streamed = []
+        
+        async def one_call(prompt, temperature):
+            streamed.extend(received)
+            return {'success': True, 'response': report_json, 'provider': 'openai'}
+        
+        with patch.object(report_agent, 'generate_llm_response', side_effect=one_call) as mock_llm:
+            response = await report_agent._generate_report_response("Generate the report")
+        
+        mock_llm.assert_awaited_once_with("Generate the report", temperature=0.4)
+        assert response['success'] is True
+        assert streamed == ['executive_summary']
+        assert received == list(report_generation_agent.REPORT_SECTIONS)
+    
     @pytest.mark.asyncio
     async def test_process_task_insufficient_data(self, report_agent):
         """Test handling of insufficient analysis data"""
@@ -0,0 +1,530 @@
+"""
+Tests for analysis progress events and the SSE/WebSocket streams
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, WebSocketDisconnect, status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.agents import attack_mapper_agent, report_generation_agent, system_analyst_agent
+from app.agents.base_agent import BaseAgent
+from app.agents.report_generation_agent import REPORT_SECTIONS
+from app.api.endpoints.auth import get_current_active_user
+from app.api.v1.endpoints import projects
+from app.core.auth import auth_service
+from app.core.database import AnalysisState, Base, Project, get_db
+from app.core.principal_cache import get_principal_cache
+from app.core.project_access import get_project_access_resolver
+from app.models.user import User, UserTable
+from app.core import database
+from app.services import analysis_events, orchestrator as orchestrator_module
+from app.services.analysis_events import AnalysisEventBus, RedisAnalysisEventBus
+from app.services.orchestrator import ThreatModelingOrchestrator
+
+OWNER = User(id="user-1", email="one@example.com", role="analyst")
+
+
+@pytest.fixture(autouse=True)
+def bus(monkeypatch):
+    """A fresh in-process bus with a short keepalive, and empty access caches"""
+    bus = AnalysisEventBus(history_size=10, keepalive=0.05)
+    monkeypatch.setattr(analysis_events, "_analysis_event_bus", bus)
+    get_project_access_resolver().clear()
+    get_principal_cache().clear()
+    yield bus
+    get_project_access_resolver().clear()
+    get_principal_cache().clear()
+
+
+def seed(path):
+    """Project 1 owned by user-1 with a running analysis"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([
+            UserTable(id="user-1", email="one@example.com", hashed_password="x", role="analyst"),
+            Project(id=1, name="Project One", owner_user_id="user-1", status="analyzing"),
+        ])
+        session.flush()
+        session.add(AnalysisState(
+            project_id=1, status="running", current_phase="system_analysis",
+            progress_percentage=10.0, progress_message="Starting system analysis..."
+        ))
+        session.commit()
+    engine.dispose()
+
+
+def make_app(session_factory):
+    app = FastAPI()
+    app.include_router(projects.router, prefix="/api/v1/projects")
+
+    async def get_test_db():
+        async with session_factory() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_current_active_user] = lambda: OWNER
+    return app
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    seed(tmp_path / "events.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}")
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def wait_for_subscriber(bus, project_id=1):
+    async def poll():
+        while not bus.subscriber_count(project_id):
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), 5.0)
+
+
+class FakeRedis:
+    """
+    The Redis commands the event bus uses, in memory
+
+    Like a real server, a SUBSCRIBE only takes effect once its confirmation
+    is read, after ``confirm_delay``; messages published before then are lost.
+    """
+
+    def __init__(self, confirm_delay: float = 0.0):
+        self.confirm_delay = confirm_delay
+        self.values = {}
+        self.lists = {}
+        self.channels = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def publish(self, channel, payload):
+        for queue in self.channels.get(channel, ()):
+            queue.put_nowait({"type": "message", "channel": channel, "data": payload})
+
+    def drop_connections(self):
+        for queues in self.channels.values():
+            for queue in queues:
+                queue.put_nowait(ConnectionError("Connection reset by peer"))
+
+    async def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def rpush(self, key, value):
+        self.commands.append(lambda: self.redis.lists.setdefault(key, []).append(value))
+
+    def ltrim(self, key, start, end):
+        self.commands.append(lambda: self.redis.lists.__setitem__(key, self.redis.lists[key][start:]))
+
+    def expire(self, key, seconds):
+        pass
+
+    def publish(self, channel, payload):
+        self.commands.append(lambda: self.redis.publish(channel, payload))
+
+    async def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+        self.requested = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for queues in self.redis.channels.values():
+            queues.discard(self.queue)
+
+    async def subscribe(self, channel):
+        self.requested.append(channel)
+
+    async def listen(self):
+        for channel in self.requested:
+            await asyncio.sleep(self.redis.confirm_delay)
+            self.redis.channels.setdefault(channel, set()).add(self.queue)
+            yield {"type": "subscribe", "channel": channel, "data": 1}
+        while True:
+            message = await self.queue.get()
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+
+async def collect(events):
+    return [event async for event in events if event]
+
+
+def parse_sse(body: str):
+    """(id, data) of each event frame, skipping keepalive comments"""
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), json.loads(fields["data"])))
+    return events
+
+
+class TestAnalysisEventBus:
+    """Sequencing, history and fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_live_events_end_with_terminal_status(self, bus):
+        async with bus.subscribe(1) as subscription:
+            await bus.publish(1, "running", "attack_mapping", 40, "Mapping attack techniques...")
+            await bus.publish(2, "running", "system_analysis", 10)
+            await bus.publish(1, "completed", "completed", 100.0)
+
+            received = [event async for event in subscription.events(0) if event]
+
+        assert [(e.sequence, e.status, e.percentage) for e in received] == [
+            (1, "running", 40), (2, "completed", 100.0)
+        ]
+        assert bus.subscriber_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_replays_history_without_duplicates(self, bus):
+        for percentage in (10, 25, 40):
+            await bus.publish(1, "running", "system_analysis", percentage)
+
+        async with bus.subscribe(1) as subscription:
+            events = subscription.events(after=1)
+            assert (await events.__anext__()).percentage == 25
+            # Published after subscribing, so queued and also in history
+            await bus.publish(1, "failed", "attack_mapping", 40, error_message="Attack mapping failed")
+            rest = [event async for event in events if event]
+
+        assert [e.sequence for e in rest] == [3, 4]
+        assert rest[-1].error_message == "Attack mapping failed"
+
+    @pytest.mark.asyncio
+    async def test_idle_subscription_yields_keepalives(self, bus):
+        async with bus.subscribe(1) as subscription:
+            events = subscription.events(0)
+            assert await events.__anext__() is None
+            await events.aclose()
+
+    @pytest.mark.asyncio
+    async def test_progress_helpers_publish_after_commit(self, bus, session_factory):
+        async with session_factory() as db:
+            await projects.update_analysis_progress(db, 1, "attack_mapping", 40, "Mapping attack techniques...")
+            await projects.mark_analysis_completed(db, 1)
+
+        events = await bus.history(1, 0)
+        assert [(e.status, e.phase, e.percentage) for e in events] == [
+            ("running", "attack_mapping", 40), ("completed", "completed", 100.0)
+        ]
+
+
+class TestRedisAnalysisEventBus:
+    """Redis backend against an in-memory fake"""
+
+    @pytest_asyncio.fixture
+    async def redis_bus(self):
+        bus = RedisAnalysisEventBus("redis://fake", history_size=10, keepalive=None, reconnect_delay=0.05)
+        bus._redis = FakeRedis(confirm_delay=0.05)
+        yield bus
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_subscribe_waits_for_confirmation(self, redis_bus):
+        async with redis_bus.subscribe(1) as subscription:
+            events = subscription.events(0)
+            first = asyncio.create_task(events.__anext__())
+            # History has been read; the event must now arrive live
+            await asyncio.sleep(0.01)
+            await redis_bus.publish(1, "completed", "completed", 100.0)
+            event = await asyncio.wait_for(first, 1.0)
+
+        assert (event.sequence, event.status) == (1, "completed")
+        assert redis_bus.stats["publish_errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_events_missed_while_reconnecting_are_replayed(self, redis_bus):
+        async with redis_bus.subscribe(1) as subscription:
+            events = subscription.events(0)
+            await redis_bus.publish(1, "running", "attack_mapping", 40)
+            assert (await asyncio.wait_for(events.__anext__(), 1.0)).sequence == 1
+
+            redis_bus._redis.drop_connections()
+            await asyncio.sleep(0.01)
+            await redis_bus.publish(1, "completed", "completed", 100.0)
+            rest = await asyncio.wait_for(collect(events), 1.0)
+
+        assert [(e.sequence, e.status) for e in rest] == [(2, "completed")]
+
+
+class TestAnalysisEventStreams:
+    """SSE and WebSocket endpoints"""
+
+    @pytest.mark.asyncio
+    async def test_sse_snapshot_then_live_events(self, bus, session_factory):
+        app = make_app(session_factory)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            request = asyncio.create_task(client.get("/api/v1/projects/1/analysis/events"))
+            await wait_for_subscriber(bus)
+            async with session_factory() as db:
+                await projects.update_analysis_progress(db, 1, "attack_mapping", 40, "Mapping attack techniques...")
+                await projects.mark_analysis_failed(db, 1, "Attack mapping failed")
+            response = await request
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert [(sequence, data["status"], data["percentage"]) for sequence, data in events] == [
+            (0, "running", 10.0), (1, "running", 40), (2, "failed", 40)
+        ]
+        assert events[-1][1]["error_message"] == "Attack mapping failed"
+
+    @pytest.mark.asyncio
+    async def test_sse_resumes_from_last_event_id(self, bus, session_factory):
+        for percentage in (25, 40):
+            await bus.publish(1, "running", "system_analysis", percentage)
+        async with session_factory() as db:
+            await projects.mark_analysis_completed(db, 1)
+
+        app = make_app(session_factory)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/projects/1/analysis/events", headers={"Last-Event-ID": "1"})
+            # A sequence the bus has never issued gets a fresh snapshot instead
+            restarted = await client.get("/api/v1/projects/1/analysis/events?after=99")
+
+        assert [sequence for sequence, _ in parse_sse(response.text)] == [2, 3]
+        assert [(s, data["status"]) for s, data in parse_sse(restarted.text)] == [(3, "completed")]
+
+    @pytest.mark.asyncio
+    async def test_resume_after_terminal_event_closes(self, bus, session_factory):
+        await bus.publish(1, "running", "system_analysis", 25)
+        async with session_factory() as db:
+            await projects.mark_analysis_completed(db, 1)
+
+        app = make_app(session_factory)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # What EventSource sends when it reconnects after the stream ended
+            response = await asyncio.wait_for(
+                client.get("/api/v1/projects/1/analysis/events", headers={"Last-Event-ID": "2"}), 5.0
+            )
+            bus.history_size = 0
+            bus._history.clear()
+            # Without retained history the stored state decides
+            expired = await asyncio.wait_for(client.get("/api/v1/projects/1/analysis/events?after=2"), 5.0)
+
+        assert [(s, data["status"]) for s, data in parse_sse(response.text)] == [(2, "completed")]
+        assert [(s, data["status"]) for s, data in parse_sse(expired.text)] == [(2, "completed")]
+
+    @pytest.mark.asyncio
+    async def test_sse_hides_other_users_projects(self, session_factory):
+        app = make_app(session_factory)
+        app.dependency_overrides[get_current_active_user] = lambda: User(
+            id="user-2", email="two@example.com", role="analyst"
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/v1/projects/1/analysis/events")
+        assert response.status_code == 404
+
+    def test_websocket_requires_token_and_replays_history(self, bus, tmp_path):
+        seed(tmp_path / "ws.db")
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ws.db'}")
+        app = make_app(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+        token = auth_service.create_access_token("user-1")
+        url = "/api/v1/projects/1/analysis/ws?after=0"
+
+        with TestClient(app) as client:
+            client.portal.call(bus.publish, 1, "running", "attack_mapping", 40)
+            client.portal.call(bus.publish, 1, "completed", "completed", 100.0)
+
+            for subprotocols in ([], ["bearer", "invalid"]):
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    with client.websocket_connect(url, subprotocols=subprotocols) as websocket:
+                        websocket.receive_json()
+                assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+            # A token in the query string is not accepted
+            with pytest.raises(WebSocketDisconnect):
+                with client.websocket_connect(f"{url}&token={token}") as websocket:
+                    websocket.receive_json()
+
+            with client.websocket_connect(url, subprotocols=["bearer", token]) as websocket:
+                assert websocket.accepted_subprotocol == "bearer"
+                messages = [websocket.receive_json(), websocket.receive_json()]
+
+            with client.websocket_connect(url, headers={"Authorization": f"Bearer {token}"}) as websocket:
+                assert websocket.accepted_subprotocol is None
+                assert websocket.receive_json()["sequence"] == 1
+
+            # Resuming after the final event gets it again, then the socket closes
+            with client.websocket_connect(
+                "/api/v1/projects/1/analysis/ws?after=2", subprotocols=["bearer", token]
+            ) as websocket:
+                assert websocket.receive_json()["status"] == "completed"
+                with pytest.raises(WebSocketDisconnect):
+                    websocket.receive_json()
+
+            client.portal.call(engine.dispose)
+
+        assert [(m["type"], m["sequence"], m["status"]) for m in messages] == [
+            ("progress", 1, "running"), ("progress", 2, "completed")
+        ]
+
+
+class FakeAgent:
+    """Workflow agent that succeeds at once, optionally after ``release`` is set"""
+
+    agent_type = "fake"
+
+    def __init__(self, release=None):
+        self.release = release
+        self.section_listener = None
+
+    def set_section_listener(self, listener):
+        self.section_listener = listener
+
+    async def process_task(self, task):
+        if self.release is not None:
+            await self.release.wait()
+        # Report agents hand each section to their listener as it is generated
+        if self.section_listener:
+            for name in REPORT_SECTIONS:
+                await self.section_listener(name, {"summary": f"{name} text"})
+        return BaseAgent.create_response(self, task.task_id, "success", {"metrics": {}})
+
+
+async def stream_analysis(bus, session_factory, run):
+    """Open an SSE stream, run the analysis once subscribed, and return the streamed events"""
+    app = make_app(session_factory)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        request = asyncio.create_task(client.get("/api/v1/projects/1/analysis/events"))
+        await wait_for_subscriber(bus)
+        await run()
+        response = await asyncio.wait_for(request, 5.0)
+    return [data for _, data in parse_sse(response.text)]
+
+
+class TestAnalysisRunStreams:
+    """Report sections and the final state reach streams of a real analysis run"""
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_streams_sections_then_completion(self, bus, session_factory, monkeypatch):
+        # The previous analysis finished; a new stream must wait for the next one to start
+        async with session_factory() as db:
+            await projects.mark_analysis_completed(db, 1)
+        started = await bus.last_sequence(1)
+
+        release = asyncio.Event()
+        orchestrator = ThreatModelingOrchestrator()
+        orchestrator.system_analyst = FakeAgent(release)
+        orchestrator.attack_mapper = FakeAgent()
+        orchestrator.control_evaluator = FakeAgent()
+        orchestrator.report_generator = FakeAgent()
+
+        async def system_inputs(project_id):
+            return [SimpleNamespace(content="A web application backed by PostgreSQL")]
+
+        async def noop(*args):
+            return None
+
+        monkeypatch.setattr(orchestrator_module, "async_session", session_factory)
+        monkeypatch.setattr(orchestrator, "_get_system_inputs", system_inputs)
+        monkeypatch.setattr(orchestrator, "_generate_recommendations", noop)
+        monkeypatch.setattr(orchestrator, "_store_results", noop)
+
+        analysis = asyncio.create_task(orchestrator.analyze_project(1, {}))
+
+        async def analysis_started():
+            while await bus.last_sequence(1) == started:
+                await asyncio.sleep(0.005)
+        await asyncio.wait_for(analysis_started(), 5.0)
+
+        async def run():
+            release.set()
+            await analysis
+
+        events = await stream_analysis(bus, session_factory, run)
+
+        assert events[0]["status"] == "running"
+        sections = [event["report_section"]["name"] for event in events if event["report_section"]]
+        assert sections == list(REPORT_SECTIONS)
+        assert all(event["status"] == "running" for event in events[:-1])
+        assert (events[-1]["status"], events[-1]["percentage"]) == ("completed", 100.0)
+
+        async with session_factory() as db:
+            state = await db.get(AnalysisState, 1)
+            assert state.status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_failure_ends_stream(self, bus, session_factory, monkeypatch):
+        orchestrator = ThreatModelingOrchestrator()
+
+        async def no_inputs(project_id):
+            return []
+
+        monkeypatch.setattr(orchestrator_module, "async_session", session_factory)
+        monkeypatch.setattr(orchestrator, "_get_system_inputs", no_inputs)
+
+        events = await stream_analysis(bus, session_factory, lambda: orchestrator.analyze_project(1, {}))
+
+        assert (events[-1]["status"], events[-1]["error_message"]) == ("failed", "No system inputs found")
+
+    @pytest.mark.asyncio
+    async def test_workflow_streams_sections_then_completion(self, bus, session_factory, monkeypatch):
+        async def store_results(*args):
+            return None
+
+        monkeypatch.setattr(database, "async_session", session_factory)
+        monkeypatch.setattr(system_analyst_agent, "SystemAnalystAgent", FakeAgent)
+        monkeypatch.setattr(attack_mapper_agent, "AttackMapperAgent", FakeAgent)
+        monkeypatch.setattr(attack_mapper_agent, "ControlEvaluationAgent", FakeAgent)
+        monkeypatch.setattr(report_generation_agent, "ReportGenerationAgent", FakeAgent)
+        monkeypatch.setattr(projects, "store_analysis_results", store_results)
+
+        events = await stream_analysis(
+            bus, session_factory, lambda: projects.run_analysis_workflow(1, [], {})
+        )
+
+        sections = [event["report_section"]["name"] for event in events if event["report_section"]]
+        assert sections == list(REPORT_SECTIONS)
+        assert events[-1]["status"] == "completed"
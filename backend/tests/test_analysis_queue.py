@@ -0,0 +1,238 @@
+"""
+Tests for the batch analysis job queue
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, AnalysisJob
+from app.services.analysis_queue import AnalysisJobQueue
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Temporary database with the application schema"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'queue.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def wait_for_batch(queue, batch_id, timeout=5.0):
+    """Poll until every job in the batch has finished"""
+    async def poll():
+        while True:
+            progress = await queue.get_batch_progress(batch_id)
+            if progress["done"]:
+                return progress
+            await asyncio.sleep(0.01)
+    return await asyncio.wait_for(poll(), timeout)
+
+
+class TestAnalysisJobQueue:
+    """Test AnalysisJobQueue"""
+
+    @pytest.mark.asyncio
+    async def test_batch_runs_within_concurrency_limits(self, session_factory):
+        """Test global and per-provider limits cap in-flight jobs"""
+        in_flight = {"total": 0, "peak": 0}
+
+        async def runner(project_id, config, provider):
+            in_flight["total"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["total"])
+            await asyncio.sleep(0.02)
+            in_flight["total"] -= 1
+            return project_id != 3
+
+        queue = AnalysisJobQueue(
+            runner=runner, session_factory=session_factory,
+            max_concurrency=4, provider_limits={"openai": 2}, poll_interval=0.05
+        )
+        await queue.start()
+        try:
+            batch_id = await queue.submit_batch(list(range(1, 9)), provider="openai")
+            progress = await wait_for_batch(queue, batch_id)
+        finally:
+            await queue.stop()
+
+        assert progress["total"] == 8
+        assert progress["completed"] == 7
+        assert progress["failed"] == 1
+        assert progress["progress_percentage"] == 100.0
+        assert in_flight["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_priority_lanes(self, session_factory):
+        """Test high priority jobs are claimed before earlier normal ones"""
+        order = []
+
+        async def runner(project_id, config, provider):
+            order.append(project_id)
+            return True
+
+        queue = AnalysisJobQueue(runner=runner, session_factory=session_factory, max_concurrency=1)
+        low = await queue.submit_batch([1, 2], priority="low")
+        high = await queue.submit_batch([3], priority="high")
+
+        await queue.start()
+        try:
+            await wait_for_batch(queue, low)
+            await wait_for_batch(queue, high)
+        finally:
+            await queue.stop()
+
+        assert order == [3, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_jobs_resume(self, session_factory):
+        """Test jobs left running by a previous process are re-queued on start"""
+        queue = AnalysisJobQueue(runner=None, session_factory=session_factory)
+        batch_id = await queue.submit_batch([1])
+        async with session_factory() as db:
+            job = (await db.execute(select(AnalysisJob))).scalar_one()
+            job.status = "running"
+            job.attempts = 1
+            await db.commit()
+
+        async def runner(project_id, config, provider):
+            return True
+
+        queue = AnalysisJobQueue(runner=runner, session_factory=session_factory)
+        await queue.start()
+        try:
+            progress = await wait_for_batch(queue, batch_id)
+        finally:
+            await queue.stop()
+
+        assert progress["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_limits_hold_across_workers(self, session_factory):
+        """Test queues sharing a database share their global and provider limits"""
+        in_flight = {"total": 0, "peak": 0, "openai": 0, "openai_peak": 0}
+        all_slots_taken = asyncio.Event()
+
+        async def runner(project_id, config, provider):
+            in_flight["total"] += 1
+            in_flight[provider] = in_flight.get(provider, 0) + 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["total"])
+            in_flight["openai_peak"] = max(in_flight["openai_peak"], in_flight["openai"])
+            if in_flight["total"] == 3:
+                all_slots_taken.set()
+            # Hold the first jobs until the global limit is reached, then drain
+            await asyncio.wait_for(all_slots_taken.wait(), timeout=5)
+            await asyncio.sleep(0.02)
+            in_flight["total"] -= 1
+            in_flight[provider] -= 1
+            return True
+
+        workers = [
+            AnalysisJobQueue(
+                runner=runner, session_factory=session_factory,
+                max_concurrency=3, provider_limits={"openai": 1}, poll_interval=0.01
+            )
+            for _ in range(3)
+        ]
+        openai = await workers[0].submit_batch(list(range(1, 7)), provider="openai")
+        ollama = await workers[0].submit_batch(list(range(7, 13)), provider="ollama")
+        for worker in workers:
+            await worker.start()
+        try:
+            await wait_for_batch(workers[0], openai)
+            await wait_for_batch(workers[0], ollama)
+        finally:
+            for worker in workers:
+                await worker.stop()
+
+        assert all_slots_taken.is_set()
+        assert in_flight["peak"] <= 3
+        assert in_flight["openai_peak"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_expired_leases_are_recovered(self, session_factory):
+        """Test a starting worker leaves jobs alone while their worker renews the lease"""
+        queue = AnalysisJobQueue(session_factory=session_factory, lease_seconds=30)
+        await queue.submit_batch([1, 2])
+        async with session_factory() as db:
+            live, stale = (await db.execute(select(AnalysisJob).order_by(AnalysisJob.id))).scalars()
+            for job, heartbeat in ((live, datetime.utcnow()), (stale, datetime.utcnow() - timedelta(minutes=5))):
+                job.status = "running"
+                job.attempts = 1
+                job.claimed_by = "other-worker"
+                job.heartbeat_at = heartbeat
+            await db.commit()
+
+        await queue._recover_interrupted_jobs()
+
+        async with session_factory() as db:
+            jobs = (await db.execute(select(AnalysisJob).order_by(AnalysisJob.id))).scalars().all()
+        assert [(job.status, job.claimed_by) for job in jobs] == [("running", "other-worker"), ("queued", None)]
+
+    @pytest.mark.asyncio
+    async def test_runner_errors_are_retried(self, session_factory):
+        """Test exceptions re-queue a job until max attempts is reached"""
+        calls = []
+
+        async def runner(project_id, config, provider):
+            calls.append(project_id)
+            raise RuntimeError("provider unavailable")
+
+        queue = AnalysisJobQueue(
+            runner=runner, session_factory=session_factory, max_attempts=2, poll_interval=0.01
+        )
+        await queue.start()
+        try:
+            progress = await wait_for_batch(queue, await queue.submit_batch([1]))
+        finally:
+            await queue.stop()
+
+        assert calls == [1, 1]
+        assert progress["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_jobs_run_on_their_queued_provider(self, session_factory):
+        """Test each job is handed the provider its batch was queued under"""
+        providers = {}
+
+        async def runner(project_id, config, provider):
+            providers[project_id] = provider
+            return True
+
+        queue = AnalysisJobQueue(runner=runner, session_factory=session_factory)
+        ollama = await queue.submit_batch([1, 2], provider="ollama")
+        from_config = await queue.submit_batch([3], {"llm_provider": "google"})
+
+        await queue.start()
+        try:
+            await wait_for_batch(queue, ollama)
+            await wait_for_batch(queue, from_config)
+        finally:
+            await queue.stop()
+
+        assert providers == {1: "ollama", 2: "ollama", 3: "google"}
+
+    @pytest.mark.asyncio
+    async def test_cancel_batch(self, session_factory):
+        """Test queued jobs can be cancelled before they run"""
+        queue = AnalysisJobQueue(session_factory=session_factory)
+        batch_id = await queue.submit_batch([1, 2, 3], {"analysis_depth": "quick"})
+
+        assert await queue.cancel_batch(batch_id) == 3
+        progress = await queue.get_batch_progress(batch_id)
+        assert progress["cancelled"] == 3
+        assert progress["done"]
+        assert await queue.get_batch_progress("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority_rejected(self, session_factory):
+        """Test submissions must use a known priority lane"""
+        queue = AnalysisJobQueue(session_factory=session_factory)
+        with pytest.raises(ValueError):
+            await queue.submit_batch([1], priority="urgent")
@@ -2,19 +2,37 @@
 Unit tests for code analysis framework.
 """
 
+import ast
+import re
 import pytest
 import tempfile
 import os
 import asyncio
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 
 from app.services.code_analysis import (
     CodeAnalyzer, AnalysisResult, AnalysisContext, AnalysisType,
-    FileSystemMonitor, FileChangeEvent, FileChangeType,
+    FileSystemMonitor, FileChangeEvent, FileChangeType, RealTimeAnalysisCoordinator,
     QualityIssueDetector, IssueDetectionPipeline,
-    CodeScanningFramework, ScanConfiguration, ScanResult
+    CodeScanningFramework, ScanConfiguration, ScanResult, ExecutorType,
+    ParsedFile, NodeTypeVisitor, RecommendationEngine
+)
+from app.services.code_analysis import rule_engine
+from app.services.code_analysis.analysis_cache import AnalysisResultStore
+from app.services.code_analysis.clone_index import CloneIndex, normalized_tokens, winnow
+from app.services.code_analysis.issue_detector import DetectionRule
+from app.services.code_analysis.rule_engine import (
+    CompiledRuleSet, LiteralAutomaton, required_literals, line_local
+)
+from app.services.code_analysis.scanning_framework import (
+    shard_files_by_size, compact_analysis_result, expand_analysis_result
 )
 from app.models.quality import QualityIssue, IssueType, Severity
 
@@ -56,6 +74,84 @@ class TestAnalysisContext:
             assert context.language == expected_language
 
 
+class TestParsedFile:
+    """Test the shared per-file parse artifact."""
+    
+    SOURCE = (
+        "import os\n"
+        "class Service:\n"
+        "    def run(self, a):\n"
+        "        return os.path.join(a)\n"
+        "def helper():\n"
+        "    pass\n"
+    )
+    
+    def test_parsed_once_across_analyzers(self):
+        """Test every analyzer of a context reuses one parse."""
+        context = AnalysisContext(project_id="p", file_path="svc.py", file_content=self.SOURCE)
+        
+        with patch("app.services.code_analysis.parsed_file.ast.parse", wraps=ast.parse) as parse:
+            QualityIssueDetector().analyze(context, use_cache=False)
+            RecommendationEngine().analyze(context, use_cache=False)
+        
+        # Snippet normalisation parses fragments; the file itself is parsed once
+        file_parses = [c for c in parse.call_args_list if c.kwargs.get("filename") == "svc.py"]
+        assert len(file_parses) == 1
+        
+        context.discard_parsed()
+        context.parsed.tree
+        assert context.parsed is context.parsed
+    
+    def test_reparsed_when_content_changes(self):
+        """Test a context whose content is replaced gets fresh parse results."""
+        context = AnalysisContext(project_id="p", file_path="a.py", file_content="x = 1")
+        first = context.parsed
+        
+        context.file_content = "def f():\n    pass"
+        
+        assert context.parsed is not first
+        assert [n.name for n in context.parsed.nodes_of(ast.FunctionDef)] == ["f"]
+    
+    def test_node_index_in_source_order(self):
+        """Test node lookups and dispatch follow source order."""
+        parsed = ParsedFile(self.SOURCE)
+        
+        names = [node.name for node in parsed.nodes_of(ast.ClassDef, ast.FunctionDef)]
+        assert names == ["Service", "run", "helper"]
+        
+        class Collector(NodeTypeVisitor):
+            def __init__(self):
+                self.seen = []
+            
+            def visit_FunctionDef(self, node):
+                self.seen.append(node.name)
+                self.generic_visit(node)
+            
+            def visit_Import(self, node):
+                self.seen.append("import")
+        
+        first, second = Collector(), Collector()
+        parsed.visit(first, second)
+        
+        assert first.seen == second.seen == ["import", "run", "helper"]
+    
+    def test_line_table_and_tokens(self):
+        """Test offsets map to lines and tokens are available."""
+        parsed = ParsedFile(self.SOURCE)
+        
+        assert parsed.line_for_offset(0) == 1
+        assert parsed.line_for_offset(self.SOURCE.index("def helper")) == 5
+        assert any(token.string == "Service" for token in parsed.tokens)
+    
+    def test_syntax_error(self):
+        """Test syntax errors are captured rather than raised."""
+        parsed = ParsedFile("def broken(:\n", "broken.py")
+        
+        assert parsed.tree is None
+        assert parsed.syntax_error.lineno == 1
+        assert parsed.nodes == []
+
+
 class TestAnalysisResult:
     """Test AnalysisResult functionality."""
     
@@ -385,6 +481,102 @@ class MyClass:
         assert len(detector.rules) == initial_rule_count - 1
 
 
+class TestCompiledRuleSet:
+    """Test the compiled multi-pattern rule engine."""
+    
+    CONTENT = (
+        "import os\n"
+        "password = 'hunter22'   \n"
+        "PASSWD = \"secret\"\n"
+        "\n"
+        "\n"
+        "\n"
+        "for i in range(len(items)):\n"
+        "    cursor.execute(\"SELECT * FROM t WHERE id = %s\" % i)  # TODO: fix\n"
+        "    print(self.value, None)\n"
+        "x = '" + "a" * 100 + "'\n"
+        "\u212aelvin = 'ſelect'\n"
+    )
+    
+    def _rules(self):
+        detector = QualityIssueDetector()
+        rules = [rule for rule in detector.rules.values() if rule.pattern]
+        for index, pattern in enumerate([
+            r'(?i)todo|fixme', r'\bprint\(', r'import\s+(os|sys)', r'self\.\w+', r'\d+',
+            r'^\s*#', r'(get|set)_(user|role)', r'a*', r'(?s)for.*:', r'[A-Z]{3,}',
+            r'(?<!\w)None\b', r'(?i)kelvin|select', r'\A#'
+        ]):
+            rules.append(DetectionRule(
+                rule_id=f"custom_{index}", name="Custom", description="Custom rule",
+                issue_type=IssueType.STYLE, severity=Severity.LOW, pattern=pattern
+            ))
+        return rules
+    
+    def test_required_literals(self):
+        """Test literal extraction from rule patterns."""
+        assert required_literals(re.compile(r'for\s+\w+\s+in\s+range\(len\(')) == {"range(len("}
+        assert required_literals(re.compile(r'(?i)(password|passwd|pwd)\s*=')) == {
+            "password", "passwd", "pwd"
+        }
+        assert required_literals(re.compile(r'(get|set)_(user|role)')) == {
+            "get_user", "get_role", "set_user", "set_role"
+        }
+        assert required_literals(re.compile(r'(?i)TODO')) == {"todo"}
+        assert required_literals(re.compile(r'\s+$')) is None
+        assert required_literals(re.compile(r'(a|\d)x')) == {"x"}
+    
+    def test_line_local(self):
+        """Test which patterns can run over the whole file at once."""
+        assert line_local(re.compile(r'^.{89,}$'))
+        assert line_local(re.compile(r'[A-Z]{3,}'))
+        assert not line_local(re.compile(r'\s+$'))
+        assert not line_local(re.compile(r'a*'))
+        assert not line_local(re.compile(r'(?s)a.b'))
+        assert not line_local(re.compile(r'\A#'))
+    
+    def test_literal_automaton(self):
+        """Test the automaton reports overlapping and nested literals."""
+        automaton = LiteralAutomaton(["he", "she", "his", "hers"])
+        
+        found = sorted((start, automaton.literals[index])
+                       for start, index in automaton.find_all("ushers"))
+        
+        assert found == [(1, "she"), (2, "he"), (2, "hers")]
+    
+    @pytest.mark.parametrize("automaton_min_literals", [10 ** 9, 0])
+    def test_scan_matches_per_rule_checks(self, monkeypatch, automaton_min_literals):
+        """Test a compiled scan finds exactly what each rule finds line by line."""
+        monkeypatch.setattr(rule_engine, "AUTOMATON_MIN_LITERALS", automaton_min_literals)
+        rules = self._rules()
+        parsed = ParsedFile(self.CONTENT)
+        
+        matches = CompiledRuleSet(rules).scan(parsed)
+        
+        for rule in rules:
+            assert matches.get(rule.rule_id, []) == rule.check_pattern(self.CONTENT, parsed.lines), rule.rule_id
+        assert matches["custom_11"]
+    
+    def test_custom_rule_detected_and_recompiled(self):
+        """Test added rules are picked up by the compiled set and the result cache."""
+        detector = QualityIssueDetector()
+        context = AnalysisContext(project_id="test", file_path="test.py",
+                                  file_content="legacy_call(1)\n")
+        
+        before = detector.analyze(context)
+        detector.add_rule(DetectionRule(
+            rule_id="legacy_call", name="Legacy call", description="Legacy call",
+            issue_type=IssueType.MAINTAINABILITY, severity=Severity.LOW,
+            pattern=r'\blegacy_call\('
+        ))
+        after = detector.analyze(context)
+        
+        assert not [i for i in before.issues if i.category == "legacy_call"]
+        legacy = [i for i in after.issues if i.category == "legacy_call"]
+        assert len(legacy) == 1
+        assert legacy[0].line_number == 1
+        assert legacy[0].column_number == 1
+
+
 class TestIssueDetectionPipeline:
     """Test IssueDetectionPipeline."""
     
@@ -522,6 +714,217 @@ class TestFileSystemMonitor:
             assert monitor.batch_size == 20
 
 
+class TestFileMonitorPipeline:
+    """Test event coalescing and batch delivery in FileSystemMonitor."""
+    
+    @staticmethod
+    def _event(event_type, path, old_path=None):
+        return FileChangeEvent(event_type=event_type, file_path=path, old_path=old_path)
+    
+    @staticmethod
+    def _batches(monitor):
+        batches = []
+        monitor.add_batch_callback(batches.append)
+        return batches
+    
+    @pytest.mark.asyncio
+    async def test_coalescing_rules(self):
+        """Test repeated, cancelled and replaced changes fold per path."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            batches = self._batches(monitor)
+            
+            for event_type, path in [
+                (FileChangeType.MODIFIED, "a.py"), (FileChangeType.MODIFIED, "a.py"),
+                (FileChangeType.CREATED, "b.py"), (FileChangeType.MODIFIED, "b.py"),
+                (FileChangeType.CREATED, "tmp.py"), (FileChangeType.DELETED, "tmp.py"),
+                (FileChangeType.DELETED, "c.py"), (FileChangeType.CREATED, "c.py"),
+                (FileChangeType.MODIFIED, "d.py"), (FileChangeType.DELETED, "d.py"),
+            ]:
+                monitor._queue_event(self._event(event_type, path))
+            await monitor.flush()
+            
+            assert len(batches) == 1
+            assert {e.file_path: e.event_type for e in batches[0]} == {
+                "a.py": FileChangeType.MODIFIED,
+                "b.py": FileChangeType.CREATED,
+                "c.py": FileChangeType.MODIFIED,
+                "d.py": FileChangeType.DELETED,
+            }
+            assert monitor.stats['events_received'] == 10
+            assert monitor.stats['events_coalesced'] == 5
+            assert monitor.stats['events_processed'] == 4
+    
+    @pytest.mark.asyncio
+    async def test_rename_folding(self):
+        """Test rename chains, renames back and renames of new files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            batches = self._batches(monitor)
+            
+            for event in [
+                self._event(FileChangeType.MOVED, "b.py", "a.py"),
+                self._event(FileChangeType.MOVED, "c.py", "b.py"),
+                self._event(FileChangeType.MOVED, "y.py", "x.py"),
+                self._event(FileChangeType.MOVED, "x.py", "y.py"),
+                self._event(FileChangeType.CREATED, "new.py"),
+                self._event(FileChangeType.MOVED, "moved.py", "new.py"),
+                self._event(FileChangeType.MOVED, "saved.py", "saved.py.tmp"),
+                self._event(FileChangeType.MOVED, "gone.py", "old.py"),
+                self._event(FileChangeType.DELETED, "gone.py"),
+                self._event(FileChangeType.MOVED, "kept.py.bak", "kept.py"),
+            ]:
+                monitor._queue_event(event)
+            await monitor.flush()
+            
+            changes = {e.file_path: (e.event_type, e.old_path) for e in batches[0]}
+            assert changes == {
+                "c.py": (FileChangeType.MOVED, "a.py"),
+                "x.py": (FileChangeType.MODIFIED, None),
+                "moved.py": (FileChangeType.CREATED, None),
+                "saved.py": (FileChangeType.CREATED, None),
+                "old.py": (FileChangeType.DELETED, None),
+                "kept.py": (FileChangeType.DELETED, None),
+            }
+    
+    @pytest.mark.asyncio
+    async def test_burst_from_observer_thread(self):
+        """Test a burst queued from another thread arrives as one batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            monitor.configure({'debounce_delay': 0.05, 'batch_timeout': 5.0})
+            received = []
+            
+            async def on_batch(events):
+                received.append(events)
+            
+            monitor.add_batch_callback(on_batch)
+            
+            # What start_monitoring does, without a real observer
+            monitor._loop = asyncio.get_running_loop()
+            monitor.is_monitoring = True
+            task = asyncio.create_task(monitor._process_events())
+            
+            def burst():
+                for i in range(500):
+                    monitor._queue_event(self._event(FileChangeType.MODIFIED, f"file_{i % 5}.py"))
+            
+            await asyncio.to_thread(burst)
+            for _ in range(100):
+                if received:
+                    break
+                await asyncio.sleep(0.02)
+            
+            monitor.is_monitoring = False
+            task.cancel()
+            
+            assert len(received) == 1
+            assert sorted(e.file_path for e in received[0]) == [f"file_{i}.py" for i in range(5)]
+            assert monitor.stats['events_received'] == 500
+            assert monitor.stats['events_coalesced'] == 495
+            assert monitor.get_monitoring_stats()['pending_changes'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_batch_size_forces_flush(self):
+        """Test reaching batch_size pending paths flushes without waiting."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            monitor.configure({'batch_size': 3, 'debounce_delay': 60.0})
+            batches = self._batches(monitor)
+            
+            for i in range(3):
+                monitor._coalesce(self._event(FileChangeType.CREATED, f"f{i}.py"))
+            
+            assert monitor._time_until_flush() == 0.0
+            await monitor.flush()
+            assert len(batches[0]) == 3
+            assert monitor._time_until_flush() is None
+    
+    def test_bounded_queue_drops(self):
+        """Test events beyond max_queue_size are dropped and counted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            monitor.configure({'max_queue_size': 3})
+            
+            for i in range(5):
+                monitor._queue_event(self._event(FileChangeType.MODIFIED, f"f{i}.py"))
+            
+            stats = monitor.get_monitoring_stats()
+            assert stats['queue_size'] == 3
+            assert stats['events_received'] == 3
+            assert stats['events_dropped'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_observer_handoff_bounded(self):
+        """Test a stalled loop caps events handed off by the observer thread."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            monitor.configure({'max_queue_size': 3})
+            monitor._loop = asyncio.get_running_loop()
+            
+            # Joining the thread blocks the loop, so nothing handed off is taken yet
+            burst = threading.Thread(target=lambda: [
+                monitor._queue_event(self._event(FileChangeType.MODIFIED, f"f{i}.py"))
+                for i in range(10)
+            ])
+            burst.start()
+            burst.join()
+            assert monitor.get_monitoring_stats()['events_in_transit'] == 3
+            assert monitor.stats['events_dropped'] == 7
+            
+            await asyncio.sleep(0)
+            stats = monitor.get_monitoring_stats()
+            assert stats['events_in_transit'] == 0
+            assert stats['queue_size'] == 3
+            assert stats['resync_pending']
+    
+    @pytest.mark.asyncio
+    async def test_resync_after_drops(self):
+        """Test the flush after an overflow reports every watched file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ("a.py", "b.py", "notes.txt", os.path.join("node_modules", "lib.js")):
+                path = Path(temp_dir) / name
+                path.parent.mkdir(exist_ok=True)
+                path.write_text("x = 1\n")
+            monitor = FileSystemMonitor(temp_dir, "test_project")
+            monitor.configure({'max_queue_size': 1, 'debounce_delay': 0.0})
+            batches = self._batches(monitor)
+            
+            deleted = os.path.join(temp_dir, "deleted.py")
+            monitor._queue_event(self._event(FileChangeType.DELETED, deleted))
+            monitor._queue_event(self._event(FileChangeType.MODIFIED, os.path.join(temp_dir, "a.py")))
+            assert monitor._time_until_flush() == 0.0
+            await monitor.flush()
+            
+            changes = {os.path.basename(e.file_path): (e.event_type, e.metadata.get('resync')) for e in batches[0]}
+            assert changes == {
+                "deleted.py": (FileChangeType.DELETED, None),
+                "a.py": (FileChangeType.MODIFIED, True),
+                "b.py": (FileChangeType.MODIFIED, True),
+            }
+            assert monitor.stats['resyncs'] == 1
+            
+            await monitor.flush()
+            assert len(batches) == 1
+    
+    def test_coordinator_queues_batch_once(self):
+        """Test the coordinator queues each changed file once per batch."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            coordinator = RealTimeAnalysisCoordinator("test_project")
+            monitor = coordinator.add_project_monitor(temp_dir)
+            assert monitor.debounce_delay == coordinator.debounce_delay
+            
+            coordinator._on_file_batch([
+                self._event(FileChangeType.MODIFIED, "a.py"),
+                self._event(FileChangeType.DELETED, "b.py"),
+                self._event(FileChangeType.MOVED, "c.py", "old_c.py"),
+            ])
+            coordinator._on_file_batch([self._event(FileChangeType.MODIFIED, "a.py")])
+            
+            assert coordinator.analysis_queue.qsize() == 2
+            assert set(coordinator.pending_analyses) == {"a.py", "c.py"}
+
+
 class TestCodeScanningFramework:
     """Test CodeScanningFramework."""
     
@@ -601,6 +1004,68 @@ class TestCodeScanningFramework:
             assert result.total_issues > 0  # Should find issues
             assert result.metrics is not None
     
+    @pytest.mark.asyncio
+    async def test_process_executor_matches_thread_executor(self):
+        """Test process-pool scans find the same issues as thread scans."""
+        framework = CodeScanningFramework()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(6):
+                (Path(temp_dir) / f"module{i}.py").write_text(
+                    "password = 'hunter22'\n" + "x = " + "a" * (90 + i) + "\n" * i
+                )
+            
+            results = {}
+            for executor in (ExecutorType.THREAD, ExecutorType.PROCESS):
+                config = ScanConfiguration(
+                    project_id="test_project",
+                    project_path=temp_dir,
+                    parallel_workers=2,
+                    executor=executor,
+                    cache_results=False
+                )
+                results[executor] = await framework.scan_project(config)
+            
+            thread_result = results[ExecutorType.THREAD]
+            process_result = results[ExecutorType.PROCESS]
+            
+            assert process_result.success is True
+            assert process_result.files_scanned == thread_result.files_scanned == 6
+            assert process_result.issues_by_type == thread_result.issues_by_type
+            assert process_result.metrics.lines_of_code == thread_result.metrics.lines_of_code
+            assert all(issue.project_id == "test_project" for issue in process_result.get_all_issues())
+    
+    def test_shard_files_by_size(self):
+        """Test shards are balanced by total file size."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for i, size in enumerate([900, 500, 400, 300, 200, 100]):
+                path = Path(temp_dir) / f"file{i}.py"
+                path.write_text("x" * size)
+                paths.append(str(path))
+            
+            shards = shard_files_by_size(paths, 2)
+            
+            assert sorted(p for shard in shards for p in shard) == sorted(paths)
+            totals = sorted(sum(os.path.getsize(p) for p in shard) for shard in shards)
+            assert totals == [1200, 1200]
+            assert len(shard_files_by_size(paths[:1], 8)) == 1
+    
+    def test_compact_result_round_trip(self):
+        """Test compact results rebuild the issues and line count."""
+        context = AnalysisContext(project_id="p", file_path="a.py", file_content="a\nb\nc")
+        result = AnalysisResult(analyzer_name="QualityIssueDetector",
+                                analysis_type=AnalysisType.STYLE, context=context)
+        result.add_issue(QualityIssue(issue_type=IssueType.SECURITY, severity=Severity.HIGH,
+                                      category="hardcoded_password", description="d", line_number=2))
+        
+        restored = expand_analysis_result(compact_analysis_result(result), "p")
+        
+        assert restored.context.metadata['line_count'] == 3
+        assert restored.context.file_hash == context.file_hash
+        issue = restored.issues[0]
+        assert (issue.file_path, issue.line_number, issue.severity) == ("a.py", 2, Severity.HIGH)
+    
     def test_callback_management(self):
         """Test callback management."""
         framework = CodeScanningFramework()
@@ -636,6 +1101,367 @@ class TestCodeScanningFramework:
         assert stats['callback_counts']['scan_completed'] == 1
         assert stats['callback_counts']['file_analyzed'] == 1
         assert stats['callback_counts']['issue_found'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_file_callbacks_run_on_event_loop(self, tmp_path):
+        """Test thread-mode scans dispatch file and issue callbacks on the loop thread."""
+        for i in range(3):
+            (tmp_path / f"module{i}.py").write_text("password = 'hunter2'\n" + "x = 1\n" * 600)
+        framework = CodeScanningFramework()
+        loop_thread = threading.get_ident()
+        calls = []
+        
+        def on_file_analyzed(analysis_result):
+            # Fails off the loop: there is no running loop on a worker thread
+            asyncio.get_running_loop()
+            calls.append(("file", threading.get_ident()))
+        
+        def on_issue_found(issue):
+            calls.append(("issue", threading.get_ident()))
+        
+        def on_scan_completed(scan_result):
+            calls.append(("completed", threading.get_ident()))
+        
+        framework.add_file_analyzed_callback(on_file_analyzed)
+        framework.add_issue_found_callback(on_issue_found)
+        framework.add_scan_completed_callback(on_scan_completed)
+        config = ScanConfiguration(
+            project_id="p", project_path=str(tmp_path), executor=ExecutorType.THREAD, cache_results=False
+        )
+        
+        await framework.scan_project(config)
+        scan_calls = len(calls)
+        await framework.scan_files([str(p) for p in tmp_path.glob("*.py")], config)
+        
+        kinds = [kind for kind, _ in calls]
+        assert kinds.count("file") == 6
+        assert "issue" in kinds
+        assert kinds[scan_calls - 1] == "completed"
+        assert {thread for _, thread in calls} == {loop_thread}
+
+
+class TestAnalysisResultStore:
+    """Test the persistent analysis result store and incremental rescans."""
+    
+    @pytest.mark.asyncio
+    async def test_rescan_skips_unchanged_files(self, tmp_path):
+        """Test a rescan restores unchanged files and re-analyzes only edits."""
+        project = tmp_path / "project"
+        project.mkdir()
+        for i in range(3):
+            (project / f"module{i}.py").write_text("x = " + "a" * 100 + "\n")
+        store = AnalysisResultStore(str(tmp_path / "cache.db"))
+        config = ScanConfiguration(project_id="p", project_path=str(project))
+        
+        first = await CodeScanningFramework(result_store=store).scan_project(config)
+        
+        # A fresh framework has an empty in-memory cache; results come from disk
+        with patch.object(QualityIssueDetector, "_analyze_implementation") as analyze:
+            second = await CodeScanningFramework(result_store=store).scan_project(config)
+        
+        analyze.assert_not_called()
+        assert second.files_unchanged == 3
+        assert second.files_scanned == first.files_scanned == 3
+        assert second.issues_by_type == first.issues_by_type
+        assert second.metrics.lines_of_code == first.metrics.lines_of_code
+        assert {i.file_path for i in second.get_all_issues()} == {i.file_path for i in first.get_all_issues()}
+        
+        (project / "module1.py").write_text("y = 1\n")
+        third = await CodeScanningFramework(result_store=store).scan_project(config)
+        
+        assert third.files_unchanged == 2
+        assert third.total_issues < first.total_issues
+    
+    @pytest.mark.asyncio
+    async def test_scan_files_batch(self, tmp_path):
+        """Test scanning a batch of changed files reuses stored results."""
+        project = tmp_path / "project"
+        project.mkdir()
+        paths = []
+        for i in range(3):
+            path = project / f"module{i}.py"
+            path.write_text("x = " + "a" * 100 + "\n")
+            paths.append(str(path))
+        store = AnalysisResultStore(str(tmp_path / "cache.db"))
+        config = ScanConfiguration(project_id="p", project_path=str(project))
+        framework = CodeScanningFramework(result_store=store)
+        
+        first = await framework.scan_files(paths + [paths[0], str(project / "deleted.py")], config)
+        assert first.scan_type == "real_time"
+        assert first.files_scanned == 3
+        assert first.files_unchanged == 0
+        
+        second = await framework.scan_files(paths, config)
+        assert second.files_unchanged == 3
+        assert second.total_issues == first.total_issues
+    
+    @pytest.mark.asyncio
+    async def test_scan_files_keeps_event_loop_free(self, tmp_path):
+        """Test a slow batch scan does not block other tasks on the loop."""
+        class SlowAnalyzer(MockAnalyzer):
+            def _analyze_implementation(self, context):
+                time.sleep(0.2)
+                return super()._analyze_implementation(context)
+        
+        path = tmp_path / "module.py"
+        path.write_text("x = 1\n")
+        framework = CodeScanningFramework()
+        framework.analyzers = {AnalysisType.STYLE: [SlowAnalyzer()]}
+        config = ScanConfiguration(
+            project_id="p", project_path=str(tmp_path), analysis_types={AnalysisType.STYLE},
+            cache_results=False
+        )
+        
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticking = asyncio.create_task(ticker())
+        result = await framework.scan_files([str(path)], config)
+        ticking.cancel()
+        
+        assert result.files_scanned == 1
+        assert ticks >= 5
+    
+    def test_key_covers_analyzer_config(self, tmp_path):
+        """Test reconfigured analyzers do not reuse stored results."""
+        store = AnalysisResultStore(str(tmp_path / "cache.db"))
+        context = AnalysisContext(project_id="p", file_path="a.py", file_content="def f(a, b, c):\n    pass\n")
+        
+        strict = QualityIssueDetector()
+        strict.configure({'max_arguments': 1})
+        strict.analyze(context, result_store=store)
+        
+        lenient = QualityIssueDetector()
+        result = lenient.analyze(context, result_store=store)
+        
+        assert "too_many_arguments" not in {i.category for i in result.issues}
+        assert store.get_stats()["entries"] == 2
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test the store keeps only the most recently used entries."""
+        store = AnalysisResultStore(
+            str(tmp_path / "cache.db"), max_entries=2, evict_interval=1, write_batch_size=1
+        )
+        record = {"issues": []}
+        
+        store.set("a", "h", "n", "1", "c", record)
+        store.set("b", "h", "n", "1", "c", record)
+        store.get("a")
+        store.set("c", "h", "n", "1", "c", record)
+        
+        assert set(store.get_many(["a", "b", "c"])) == {"a", "c"}
+    
+    def test_writes_are_batched_until_flush(self, tmp_path):
+        """Test results are buffered, served from the buffer and written in one flush."""
+        db_path = str(tmp_path / "cache.db")
+        store = AnalysisResultStore(db_path)
+        record = {"issues": []}
+        
+        def stored_keys():
+            with sqlite3.connect(db_path) as conn:
+                return {key for key, in conn.execute("SELECT cache_key FROM analysis_results")}
+        
+        store.set("a", "h", "n", "1", "c", record)
+        store.set("b", "h", "n", "1", "c", record)
+        
+        assert stored_keys() == set()
+        assert store.get("a") == record
+        
+        store.flush()
+        assert stored_keys() == {"a", "b"}
+        assert store.stats["writes"] == 2
+    
+    def test_hits_defer_last_access(self, tmp_path):
+        """Test a hit does not write until the next flush."""
+        db_path = str(tmp_path / "cache.db")
+        store = AnalysisResultStore(db_path)
+        store.set("a", "h", "n", "1", "c", {"issues": []})
+        store.flush()
+        
+        def last_access():
+            with sqlite3.connect(db_path) as conn:
+                return conn.execute("SELECT last_access FROM analysis_results").fetchone()[0]
+        
+        written = last_access()
+        time.sleep(0.01)
+        assert store.get("a") is not None
+        assert last_access() == written
+        
+        store.flush()
+        assert last_access() > written
+    
+    def test_store_pickles_without_connection(self, tmp_path):
+        """Test a pickled store opens its own connection and starts with empty buffers."""
+        store = AnalysisResultStore(str(tmp_path / "cache.db"))
+        store.set("a", "h", "n", "1", "c", {"issues": []})
+        store.flush()
+        store.set("b", "h", "n", "1", "c", {"issues": []})
+        
+        copy = pickle.loads(pickle.dumps(store))
+        
+        assert set(copy.get_many(["a", "b"])) == {"a"}
+        copy.set("c", "h", "n", "1", "c", {"issues": []})
+        copy.flush()
+        assert set(store.get_many(["a", "b", "c"])) == {"a", "b", "c"}
+    
+    def test_memory_cache_is_bounded(self):
+        """Test the in-process cache evicts its oldest entries."""
+        analyzer = MockAnalyzer()
+        analyzer.max_cache_entries = 2
+        
+        for i in range(5):
+            analyzer.analyze(AnalysisContext(project_id="p", file_path="a.py", file_content=f"x = {i}"))
+        
+        stats = analyzer.get_cache_stats()
+        assert stats['cache_size'] == 2
+        assert stats['misses'] == 5
+        assert 'cache_keys' not in stats
+
+    
+    def test_memory_cache_shared_across_threads(self):
+        """Test concurrent analyses keep the shared LRU consistent."""
+        analyzer = MockAnalyzer()
+        analyzer.max_cache_entries = 8
+        contexts = [
+            AnalysisContext(project_id="p", file_path="a.py", file_content=f"x = {i}")
+            for i in range(32)
+        ]
+        
+        def work(offset):
+            for i in range(200):
+                analyzer.analyze(contexts[(offset + i) % len(contexts)])
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(8)))
+        
+        stats = analyzer.get_cache_stats()
+        assert stats['cache_size'] == 8
+        assert stats['hits'] + stats['misses'] == 8 * 200
+        
+        # The lock is rebuilt when analyzers are shipped to worker processes
+        restored = pickle.loads(pickle.dumps(analyzer))
+        assert restored.get_cache_stats() == stats
+        restored.analyze(contexts[0])
+
+class TestCloneIndex:
+    """Test the cross-file clone index."""
+    
+    FUNCTION = """
+def load_records(path, limit):
+    records = []
+    with open(path) as handle:
+        for line in handle:
+            if line.strip() and not line.startswith("#"):
+                records.append(line.split(","))
+            if len(records) >= limit:
+                break
+    return records
+"""
+    
+    # Same function, renamed and reformatted, with different comments and literals
+    RENAMED = """
+def read_rows(filename, max_rows):  # copied from loader
+    rows = []
+    with open(filename) as f:
+        for row in f:
+            if row.strip() and not row.startswith(";"):
+                rows.append(row.split("|"))
+            if len(rows) >= max_rows:   break
+    return rows
+"""
+    
+    def _project(self, tmp_path):
+        project = tmp_path / "project"
+        (project / "pkg").mkdir(parents=True)
+        (project / "loader.py").write_text("import os\n" + self.FUNCTION)
+        (project / "pkg" / "rows.py").write_text("class Reader:\n    pass\n\n" + self.RENAMED)
+        (project / "other.py").write_text("def unrelated():\n    return {'a': 1}\n")
+        return project
+    
+    def test_normalized_tokens_ignore_names_and_formatting(self):
+        """Test renamed, reformatted copies produce the same token stream."""
+        original = [token for token, _ in normalized_tokens(self.FUNCTION)]
+        renamed = [token for token, _ in normalized_tokens(self.RENAMED)]
+        
+        assert original == renamed
+        assert "def" in original and "$id" in original
+    
+    def test_winnow_guarantee(self):
+        """Test a shared run of k + w - 1 tokens always shares a fingerprint."""
+        shared = list(range(100, 130))
+        a = list(range(1, 40)) + shared
+        b = shared + list(range(500, 520))
+        
+        fingerprints_a = {fp.hash for fp in winnow(a, list(range(len(a))), 20, 10)}
+        fingerprints_b = {fp.hash for fp in winnow(b, list(range(len(b))), 20, 10)}
+        
+        assert fingerprints_a & fingerprints_b
+        assert winnow(list(range(5)), list(range(5)), 20, 10) == []
+    
+    def test_find_block_across_files(self, tmp_path):
+        """Test a block is found in other files despite renaming."""
+        index = CloneIndex(str(tmp_path / "clones.db"))
+        index.sync_project("p", str(self._project(tmp_path)))
+        
+        matches = index.find_block("p", self.FUNCTION, exclude_file="loader.py")
+        
+        assert [m.file_path for m in matches] == ["pkg/rows.py"]
+        assert matches[0].similarity == 1.0
+        # Regions cover the winnowed k-grams, which lie within the copied function
+        assert 5 <= matches[0].start_line < matches[0].end_line <= 12
+    
+    def test_find_block_skips_boilerplate_fingerprints(self, tmp_path):
+        """Test fingerprints over max_occurrences are ignored, as in find_clones."""
+        project = self._project(tmp_path)
+        (project / "copy.py").write_text(self.FUNCTION)
+        
+        # loader.py and copy.py each hold the function once, rows.py a renamed copy
+        index = CloneIndex(str(tmp_path / "clones.db"), max_occurrences=2)
+        index.sync_project("p", str(project))
+        assert index.find_block("p", self.FUNCTION) == []
+        
+        index = CloneIndex(str(tmp_path / "clones.db"), max_occurrences=3)
+        assert len(index.find_block("p", self.FUNCTION)) == 3
+    
+    def test_find_clones_and_ratio(self, tmp_path):
+        """Test project-wide clone pairs and duplicate ratio."""
+        index = CloneIndex(str(tmp_path / "clones.db"))
+        index.sync_project("p", str(self._project(tmp_path)))
+        
+        clones = index.find_clones("p")
+        
+        assert len(clones) == 1
+        assert {clones[0].file_a, clones[0].file_b} == {"loader.py", "pkg/rows.py"}
+        assert 0 < index.duplicate_ratio("p") <= 1
+        assert index.duplicate_ratio("missing") == 0.0
+    
+    def test_sync_is_incremental(self, tmp_path):
+        """Test syncs only re-index changed files and drop deleted ones."""
+        project = self._project(tmp_path)
+        index = CloneIndex(str(tmp_path / "clones.db"))
+        
+        assert index.sync_project("p", str(project)) == {'indexed': 3, 'unchanged': 0, 'removed': 0}
+        assert index.sync_project("p", str(project)) == {'indexed': 0, 'unchanged': 3, 'removed': 0}
+        
+        (project / "pkg" / "rows.py").write_text("x = 1\n")
+        (project / "other.py").unlink()
+        
+        assert index.sync_project("p", str(project)) == {'indexed': 1, 'unchanged': 1, 'removed': 1}
+        assert index.find_clones("p") == []
+        assert index.get_stats("p")['files'] == 2
+    
+    def test_changed_settings_reset_index(self, tmp_path):
+        """Test fingerprints made with other k-gram settings are discarded."""
+        db_path = str(tmp_path / "clones.db")
+        CloneIndex(db_path).sync_project("p", str(self._project(tmp_path)))
+        
+        assert CloneIndex(db_path).get_stats("p")['files'] == 3
+        assert CloneIndex(db_path, kgram_size=10).get_stats("p") == {'files': 0, 'fingerprints': 0}
 
 
 class TestScanConfiguration:
@@ -657,6 +1483,7 @@ class TestScanConfiguration:
         assert config.enable_real_time is True
         assert config.cache_results is True
         assert AnalysisType.STYLE in config.analysis_types
+        assert config.executor == ExecutorType.THREAD
 
 
 class TestScanResult:
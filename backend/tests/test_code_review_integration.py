@@ -23,6 +23,12 @@ from app.services.code_analysis.code_review_integration import (
     ReviewStatus,
     PreCommitResult
 )
+from app.services.code_analysis.incremental_review import (
+    IncrementalReviewAnalyzer,
+    parse_unified_diff,
+    expand_to_scopes
+)
+from app.services.code_analysis.parsed_file import ParsedFile
 from app.services.code_analysis.scanning_framework import ScanResult, ScanConfiguration
 from app.models.quality import QualityIssue, Severity, IssueType, IssueStatus
 
@@ -378,6 +384,7 @@ def   bad_function(  ):
         assert "Running quality checks" in script
         assert mock_manager.project_path in script
         assert mock_manager.project_id in script
+        assert "run_pre_commit_checks(incremental=True)" in script
     
     def test_generate_pre_push_script(self, mock_manager):
         """Test pre-push script generation."""
@@ -388,6 +395,178 @@ def   bad_function(  ):
         assert "strict" in script  # Should use strict quality gate
 
 
+class TestIncrementalReview:
+    """Test hunk-aware incremental analysis of staged changes and branches."""
+    
+    BASE = (
+        'def old(a, b, c, d, e, f, g):\n'
+        '    return a\n'
+        '\n'
+        '\n'
+        'def keep():\n'
+        '    """Doc."""\n'
+        '    return 1\n'
+    )
+    
+    ADDED = (
+        '\n'
+        '\n'
+        'def added(a, b, c, d, e, f, g):\n'
+        '    return a\n'
+    )
+    
+    @pytest.fixture
+    def temp_repo(self):
+        """Create a repository with one committed file that already has issues."""
+        temp_dir = tempfile.mkdtemp()
+        repo_path = Path(temp_dir)
+        
+        subprocess.run(["git", "init", "-b", "main"], cwd=repo_path, check=True)
+        subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo_path, check=True)
+        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_path, check=True)
+        
+        (repo_path / "module.py").write_text(self.BASE)
+        subprocess.run(["git", "add", "module.py"], cwd=repo_path, check=True)
+        subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=repo_path, check=True)
+        
+        yield str(repo_path)
+        shutil.rmtree(temp_dir)
+    
+    def test_parse_unified_diff(self):
+        """Test hunk ranges are read from both sides of a -U0 diff."""
+        diff = (
+            "diff --git a/pkg/mod.py b/pkg/mod.py\n"
+            "--- a/pkg/mod.py\n"
+            "+++ b/pkg/mod.py\n"
+            "@@ -3,2 +3,3 @@ def f():\n"
+            "@@ -10,0 +12 @@\n"
+            "@@ -20 +21,0 @@\n"
+            "diff --git a/new.py b/new.py\n"
+            "--- /dev/null\n"
+            "+++ b/new.py\n"
+            "@@ -0,0 +1,4 @@\n"
+            "diff --git a/gone.py b/gone.py\n"
+            "--- a/gone.py\n"
+            "+++ /dev/null\n"
+            "@@ -1,5 +0,0 @@\n"
+        )
+        
+        diffs = parse_unified_diff(diff)
+        
+        assert set(diffs) == {"pkg/mod.py", "new.py"}
+        assert diffs["pkg/mod.py"].old_ranges == [(3, 4), (10, 10), (20, 20)]
+        assert diffs["pkg/mod.py"].new_ranges == [(3, 5), (12, 12), (21, 21)]
+        assert diffs["new.py"].old_path is None
+        assert diffs["new.py"].old_ranges == []
+        assert diffs["new.py"].new_ranges == [(1, 4)]
+    
+    def test_expand_to_scopes(self):
+        """Test changed lines widen to the innermost enclosing function."""
+        parsed = ParsedFile(
+            "import os\n"
+            "\n"
+            "class A:\n"
+            "    @property\n"
+            "    def x(self):\n"
+            "        return 1\n"
+            "\n"
+            "    def y(self):\n"
+            "        return 2\n"
+        )
+        
+        assert expand_to_scopes(parsed, [(6, 6)]) == [(4, 6)]
+        assert expand_to_scopes(parsed, [(1, 1)]) == [(1, 1)]
+        assert expand_to_scopes(parsed, [(6, 9)]) == [(4, 9)]
+    
+    @pytest.mark.asyncio
+    async def test_staged_reports_only_introduced_issues(self, temp_repo):
+        """Test issues already present outside the staged hunks are not reported."""
+        (Path(temp_repo) / "module.py").write_text(self.BASE + self.ADDED)
+        subprocess.run(["git", "add", "module.py"], cwd=temp_repo, check=True)
+        
+        result = await IncrementalReviewAnalyzer(temp_repo, "test-project").analyze_staged()
+        
+        assert list(result.file_diffs) == ["module.py"]
+        assert result.introduced_issues
+        assert all(issue.line_number == 10 for issue in result.introduced_issues)
+        assert result.fixed_issues == []
+        assert result.scan_result.scan_type == "incremental"
+        assert result.scan_result.total_issues == len(result.introduced_issues)
+    
+    @pytest.mark.asyncio
+    async def test_staged_uses_index_not_working_tree(self, temp_repo):
+        """Test unstaged edits are ignored."""
+        (Path(temp_repo) / "module.py").write_text(self.BASE + self.ADDED)
+        
+        result = await IncrementalReviewAnalyzer(temp_repo, "test-project").analyze_staged()
+        
+        assert result.file_diffs == {}
+        assert result.introduced_issues == []
+    
+    @pytest.mark.asyncio
+    async def test_branches_report_fixed_issues(self, temp_repo):
+        """Test issues removed on the head branch are reported as fixed."""
+        subprocess.run(["git", "checkout", "-b", "feature"], cwd=temp_repo, check=True)
+        (Path(temp_repo) / "module.py").write_text(
+            self.BASE.replace("def old(a, b, c, d, e, f, g):", 'def old(a):\n    """Doc."""')
+        )
+        subprocess.run(["git", "commit", "-am", "Fix old"], cwd=temp_repo, check=True)
+        
+        result = await IncrementalReviewAnalyzer(temp_repo, "test-project").analyze_branches(
+            "main", "feature"
+        )
+        
+        assert result.introduced_issues == []
+        assert {issue.category for issue in result.fixed_issues} >= {"too_many_arguments"}
+    
+    @pytest.mark.asyncio
+    async def test_pre_commit_incremental_mode(self, temp_repo):
+        """Test pre-commit checks report only introduced issues in incremental mode."""
+        (Path(temp_repo) / "module.py").write_text(self.BASE + self.ADDED)
+        subprocess.run(["git", "add", "module.py"], cwd=temp_repo, check=True)
+        
+        manager = PreCommitHookManager(temp_repo, "test-project")
+        manager.auto_fixer = Mock()
+        manager.auto_fixer.apply_fixes_to_issues = AsyncMock(return_value=None)
+        
+        result = await manager.run_pre_commit_checks(incremental=True)
+        
+        assert result.scan_result is not None
+        assert result.scan_result.scan_type == "incremental"
+        assert result.issues_found == len([
+            issue for r in result.scan_result.analysis_results for issue in r.issues
+        ])
+        assert all(
+            issue.line_number == 10
+            for r in result.scan_result.analysis_results for issue in r.issues
+        )
+
+    
+    @pytest.mark.asyncio
+    async def test_incremental_auto_fix_needs_matching_working_tree(self, temp_repo):
+        """Test fixes are only applied where the working copy is what was analyzed."""
+        module = Path(temp_repo) / "module.py"
+        module.write_text(self.BASE + self.ADDED)
+        subprocess.run(["git", "add", "module.py"], cwd=temp_repo, check=True)
+        
+        manager = PreCommitHookManager(temp_repo, "test-project")
+        manager.auto_fixer = Mock()
+        manager.auto_fixer.apply_fixes_to_issues = AsyncMock(return_value=None)
+        
+        scan_result = (await IncrementalReviewAnalyzer(temp_repo, "test-project").analyze_staged()).scan_result
+        issues = [issue for result in scan_result.analysis_results for issue in result.issues]
+        for issue in issues:
+            issue.auto_fixable = True
+        
+        await manager._apply_auto_fixes(scan_result, working_tree_only=True)
+        manager.auto_fixer.apply_fixes_to_issues.assert_awaited_once_with(issues)
+        
+        # An unstaged edit means the analyzed lines no longer match the file
+        module.write_text("import os\n" + self.BASE + self.ADDED)
+        manager.auto_fixer.apply_fixes_to_issues.reset_mock()
+        assert await manager._apply_auto_fixes(scan_result, working_tree_only=True) is None
+        manager.auto_fixer.apply_fixes_to_issues.assert_not_awaited()
+
 class TestPullRequestIntegration:
     """Test pull request integration functionality."""
     
@@ -0,0 +1,216 @@
+"""
+Tests for the collaboration service activity feed and project access
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, Project
+from app.core.project_access import get_project_access_resolver
+from app.models.collaboration import (
+    ActivityFeedRequest, ActivityLog, ActivityType, ProjectRole, ProjectShareCreate,
+    ProjectShareTable, Team, TeamMembership, TeamRole
+)
+from app.models.user import UserTable
+from app.services.collaboration_service import CollaborationService
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """Temporary database with the application schema"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'collab.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_access_cache():
+    """Each test gets its own database, so start from an empty access cache"""
+    get_project_access_resolver().clear()
+    yield
+    get_project_access_resolver().clear()
+
+
+@pytest_asyncio.fixture
+async def db(engine):
+    """Session on a database with 25 activities, several sharing a timestamp"""
+    session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)()
+    session.add_all([
+        UserTable(id="user-1", email="one@example.com", hashed_password="x", full_name="User One"),
+        UserTable(id="user-2", email="two@example.com", hashed_password="x"),
+        Project(id=1, name="Project One", owner_user_id="user-1"),
+        Project(id=2, name="Project Two", owner_user_id="user-2"),
+        Team(id=1, name="Team One", created_by_user_id="user-1"),
+    ])
+    await session.flush()
+
+    # created_at is left to the server default, so most rows tie on the same second
+    session.add_all([
+        ActivityLog(
+            user_id=f"user-{i % 2 + 1}",
+            project_id=i % 2 + 1,
+            team_id=1 if i % 3 == 0 else None,
+            activity_type=ActivityType.PROJECT_UPDATED.value,
+            description=f"Activity {i}"
+        )
+        for i in range(25)
+    ])
+    await session.commit()
+    yield session
+    await session.close()
+
+
+def count_queries(engine):
+    """Collect the SQL statements run on the engine"""
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    return statements
+
+
+class TestActivityFeed:
+    """Batched name resolution and cursor pagination"""
+
+    @pytest.mark.asyncio
+    async def test_names_resolved_in_one_query_per_kind(self, db, engine):
+        statements = count_queries(engine)
+        feed = await CollaborationService().get_activity_feed(db, ActivityFeedRequest(limit=20))
+
+        assert len(feed.activities) == 20
+        assert feed.total_count == 25
+        assert feed.has_more
+        # count, page, users, projects, teams
+        assert len(statements) == 5
+
+        names = {(a.user_name, a.project_name) for a in feed.activities}
+        assert names == {("User One", "Project One"), ("two@example.com", "Project Two")}
+        assert {a.team_name for a in feed.activities if a.team_id} == {"Team One"}
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_cover_feed_once(self, db):
+        service = CollaborationService()
+        seen = []
+        request = ActivityFeedRequest(limit=7)
+        while True:
+            feed = await service.get_activity_feed(db, request)
+            seen.extend(a.id for a in feed.activities)
+            if not feed.has_more:
+                assert feed.next_cursor is None
+                break
+            assert feed.next_cursor == str(feed.activities[-1].id)
+            request = ActivityFeedRequest(limit=7, cursor=feed.next_cursor)
+            assert (await service.get_activity_feed(db, request)).total_count is None
+
+        # Newest first, ties broken by id
+        assert seen == list(range(25, 0, -1))
+
+    @pytest.mark.asyncio
+    async def test_cursor_respects_filters(self, db):
+        service = CollaborationService()
+        first = await service.get_activity_feed(db, ActivityFeedRequest(team_id=1, limit=5))
+        rest = await service.get_activity_feed(
+            db, ActivityFeedRequest(team_id=1, limit=5, cursor=first.next_cursor)
+        )
+
+        assert first.total_count == 9
+        assert [a.id for a in first.activities + rest.activities] == [25, 22, 19, 16, 13, 10, 7, 4, 1]
+        assert not rest.has_more
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, db):
+        service = CollaborationService()
+        for cursor in ("not-a-cursor", "999"):
+            with pytest.raises(ValueError):
+                await service.get_activity_feed(db, ActivityFeedRequest(cursor=cursor))
+
+
+@pytest_asyncio.fixture
+async def shared_projects(engine):
+    """Projects reaching user-1 as owner, by direct share, by team shares, and not at all"""
+    async with sessionmaker(engine, class_=AsyncSession)() as session:
+        session.add_all([
+            Project(id=1, name="Owned", owner_user_id="user-1"),
+            Project(id=2, name="Direct", owner_user_id="user-2"),
+            Project(id=3, name="Team", owner_user_id="user-2"),
+            Project(id=4, name="Private", owner_user_id="user-2"),
+            Team(id=1, name="Team One", created_by_user_id="user-2"),
+            Team(id=2, name="Team Two", created_by_user_id="user-2"),
+        ])
+        await session.flush()
+        session.add_all([
+            TeamMembership(team_id=1, user_id="user-1", invited_by_user_id="user-2"),
+            TeamMembership(team_id=2, user_id="user-1", invited_by_user_id="user-2"),
+            # A direct share wins over a stronger team share
+            ProjectShareTable(project_id=2, shared_with_user_id="user-1", role="editor", shared_by_user_id="user-2"),
+            ProjectShareTable(project_id=2, shared_with_team_id=1, role="admin", shared_by_user_id="user-2"),
+            # Across teams the strongest role wins
+            ProjectShareTable(project_id=3, shared_with_team_id=1, role="viewer", shared_by_user_id="user-2"),
+            ProjectShareTable(project_id=3, shared_with_team_id=2, role="admin", shared_by_user_id="user-2"),
+        ])
+        await session.commit()
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class TestProjectAccess:
+    """Effective project roles from one query, cached and invalidated"""
+
+    @pytest.mark.asyncio
+    async def test_roles_resolved_in_one_query(self, shared_projects, engine):
+        service = CollaborationService()
+        statements = count_queries(engine)
+        async with shared_projects() as session:
+            access = await service.get_user_projects_access(session, [1, 2, 3, 4, 99], "user-1")
+
+        assert access == {1: ProjectRole.OWNER, 2: ProjectRole.EDITOR, 3: ProjectRole.ADMIN}
+        assert len(statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_access_cached_across_requests(self, shared_projects, engine):
+        service = CollaborationService()
+        async with shared_projects() as session:
+            assert await service.get_user_project_access(session, 3, "user-1") == ProjectRole.ADMIN
+            assert await service.get_user_project_access(session, 99, "user-1") is None
+
+        statements = count_queries(engine)
+        async with shared_projects() as session:
+            assert await service.get_user_project_access(session, 3, "user-1") == ProjectRole.ADMIN
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_sharing_and_membership_changes_invalidate(self, shared_projects):
+        service = CollaborationService()
+        async with shared_projects() as session:
+            assert await service.get_user_project_access(session, 4, "user-1") is None
+            assert await service.get_user_project_access(session, 3, "user-1") == ProjectRole.ADMIN
+
+        async with shared_projects() as session:
+            await service.share_project(
+                session, 4, ProjectShareCreate(shared_with_user_id="user-1", role=ProjectRole.VIEWER), "user-2"
+            )
+            # The changing request sees its own share at once
+            assert await service.get_user_project_access(session, 4, "user-1") == ProjectRole.VIEWER
+            await service.remove_team_member(session, 2, "user-1", "user-2")
+            await session.commit()
+
+        async with shared_projects() as session:
+            assert await service.get_user_project_access(session, 4, "user-1") == ProjectRole.VIEWER
+            assert await service.get_user_project_access(session, 3, "user-1") == ProjectRole.VIEWER
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_changes_stay_out_of_shared_cache(self, shared_projects):
+        service = CollaborationService()
+        async with shared_projects() as session:
+            await service.add_team_member(session, 1, "user-3", TeamRole.MEMBER, "user-2")
+            await session.flush()
+            assert await service.get_user_project_access(session, 3, "user-3") == ProjectRole.VIEWER
+            await session.rollback()
+
+        async with shared_projects() as session:
+            assert await service.get_user_project_access(session, 3, "user-3") is None
@@ -0,0 +1,128 @@
+"""
+Tests for the enhanced LLM service's request handling
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.enhanced_llm_service import EnhancedLLMService
+from app.services.llm_providers import LLMResponse, APIError
+from app.services.llm_providers.base import TokenUsage
+from app.services.llm_response_cache import LLMResponseCache, MemoryResponseCacheBackend
+
+
+class GatedProvider:
+    """Provider stub that blocks until released and counts calls"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def generate(self, request):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return LLMResponse(
+            content=f"answer {self.calls}",
+            model=request.model.value,
+            token_usage=TokenUsage(total_tokens=10),
+            provider="fake"
+        )
+
+
+class TestRequestCoalescing:
+    """Test single-flight coalescing of identical concurrent requests"""
+
+    @pytest.fixture
+    def service(self):
+        service = EnhancedLLMService()
+        disabled_cache = LLMResponseCache(MemoryResponseCacheBackend(), enabled=False)
+        with patch("app.services.enhanced_llm_service.get_llm_response_cache", return_value=disabled_cache):
+            yield service
+
+    async def _run_concurrently(self, service, prompts):
+        tasks = [
+            asyncio.create_task(service.generate_completion(prompt, provider="openai"))
+            for prompt in prompts
+        ]
+        await asyncio.sleep(0.01)
+        service.providers["openai"].release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self, service):
+        service.providers = {"openai": GatedProvider()}
+
+        responses = await self._run_concurrently(service, ["same prompt"] * 5)
+
+        assert service.providers["openai"].calls == 1
+        assert {response.content for response in responses} == {"answer 1"}
+        assert sum(1 for response in responses if response.metadata.get("coalesced")) == 4
+
+        stats = service.get_coalescing_stats()
+        assert stats["leaders"] == 1
+        assert stats["coalesced"] == 4
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_different_requests_not_coalesced(self, service):
+        service.providers = {"openai": GatedProvider()}
+
+        await self._run_concurrently(service, ["first prompt", "second prompt"])
+
+        assert service.providers["openai"].calls == 2
+        assert service.get_coalescing_stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_fan_out_and_are_not_remembered(self, service):
+        service.providers = {"openai": GatedProvider(error=APIError("boom"))}
+
+        results = await self._run_concurrently(service, ["same prompt"] * 3)
+
+        assert all(isinstance(result, APIError) for result in results)
+        assert service.providers["openai"].calls == 1
+
+        # A later identical request goes back to the provider
+        service.providers["openai"].error = None
+        response = await service.generate_completion("same prompt", provider="openai")
+        assert response.content == "answer 2"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_follower_does_not_cancel_leader(self, service):
+        service.providers = {"openai": GatedProvider()}
+
+        leader = asyncio.create_task(service.generate_completion("same prompt", provider="openai"))
+        follower = asyncio.create_task(service.generate_completion("same prompt", provider="openai"))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        service.providers["openai"].release.set()
+
+        assert (await leader).content == "answer 1"
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_followers(self, service):
+        service.providers = {"openai": GatedProvider()}
+
+        leader = asyncio.create_task(service.generate_completion("same prompt", provider="openai"))
+        followers = [
+            asyncio.create_task(service.generate_completion("same prompt", provider="openai"))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        service.providers["openai"].release.set()
+
+        responses = await asyncio.gather(*followers)
+        # One follower takes over the call and the other joins it
+        assert [response.content for response in responses] == ["answer 2", "answer 2"]
+        assert service.providers["openai"].calls == 2
+        assert service.get_coalescing_stats()["leaders"] == 2
+        assert service.get_coalescing_stats()["in_flight"] == 0
+        with pytest.raises(asyncio.CancelledError):
+            await leader
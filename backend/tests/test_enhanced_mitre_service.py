@@ -7,6 +7,7 @@ import pytest_asyncio
 import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 import json
+import time
 from pathlib import Path
 
 from app.services.enhanced_mitre_service import EnhancedMitreService, get_enhanced_mitre_service
@@ -117,6 +118,31 @@ class TestEnhancedMitreService:
         results = mitre_service.search_techniques('nonexistentterm12345')
         assert len(results) == 0
     
+    def test_search_techniques_ranking(self, mitre_service):
+        """Test BM25 ranking, top-k, prefix and phrase queries"""
+        # Results are ordered by descending relevance
+        results = mitre_service.search_techniques('process injection')
+        scores = [tech['relevance_score'] for tech in results]
+        assert results[0]['id'] == 'T1055'
+        assert scores == sorted(scores, reverse=True)
+        
+        # Top-k retrieval returns the same head as the full ranking
+        top = mitre_service.search_techniques('adversaries may', limit=3)
+        assert len(top) == 3
+        assert [t['id'] for t in top] == [t['id'] for t in mitre_service.search_techniques('adversaries may')[:3]]
+        
+        # Prefix queries expand to indexed terms
+        results = mitre_service.search_techniques('phish*')
+        assert [tech['id'] for tech in results] == ['T1566']
+        
+        # Phrase queries require consecutive terms
+        results = mitre_service.search_techniques('"remote services"')
+        assert [tech['id'] for tech in results] == ['T1133']
+        assert mitre_service.search_techniques('"services remote"') == []
+        
+        # Cached techniques are not mutated by scoring
+        assert 'relevance_score' not in mitre_service.get_technique('T1055')
+    
     def test_get_mitigations_for_technique(self, mitre_service):
         """Test getting mitigations for techniques"""
         # Test technique with mitigations
@@ -268,28 +294,6 @@ class TestEnhancedMitreService:
             assert first_technique['step'] == 1
             assert 'initial-access' in mitre_service.get_technique(first_technique['technique_id'])['tactics']
     
-    def test_relevance_scoring(self, mitre_service):
-        """Test relevance scoring logic"""
-        # Test exact name match
-        score1 = mitre_service._calculate_relevance_score(
-            'Phishing', 'Phishing', 'Some description about phishing'
-        )
-        
-        # Test partial match
-        score2 = mitre_service._calculate_relevance_score(
-            'phish', 'Phishing', 'Some description about phishing'
-        )
-        
-        # Test description only match
-        score3 = mitre_service._calculate_relevance_score(
-            'description', 'Unrelated Name', 'Some description here'
-        )
-        
-        # Exact name match should have highest score
-        assert score1 > score2
-        assert score2 > score3
-        assert score3 > 0
-    
     def test_component_relevance_scoring(self, mitre_service):
         """Test component relevance scoring"""
         technique = {
@@ -354,5 +358,208 @@ class TestEnhancedMitreService:
             assert 'platforms' in technique
 
 
+def _build_stix_bundle(
+    technique_count: int,
+    mitigation_count: int,
+    group_count: int,
+    uses_per_group: int
+) -> dict:
+    """Build a synthetic STIX bundle shaped like enterprise-attack"""
+    def ext_ref(external_id):
+        return [{'source_name': 'mitre-attack', 'external_id': external_id}]
+
+    objects = []
+    for i in range(technique_count):
+        objects.append({
+            'type': 'attack-pattern',
+            'id': f'attack-pattern--{i}',
+            'name': f'Technique {i}',
+            'description': f'Adversaries may use technique {i}',
+            'kill_chain_phases': [{'kill_chain_name': 'mitre-attack', 'phase_name': 'execution'}],
+            'x_mitre_platforms': ['Linux'],
+            'external_references': ext_ref(f'T{1000 + i}')
+        })
+    for i in range(mitigation_count):
+        objects.append({
+            'type': 'course-of-action',
+            'id': f'course-of-action--{i}',
+            'external_references': ext_ref(f'M{1000 + i}')
+        })
+    for i in range(group_count):
+        objects.append({
+            'type': 'intrusion-set',
+            'id': f'intrusion-set--{i}',
+            'external_references': ext_ref(f'G{1000 + i}')
+        })
+
+    for i in range(technique_count):
+        objects.append({
+            'type': 'relationship',
+            'relationship_type': 'mitigates',
+            'source_ref': f'course-of-action--{i % mitigation_count}',
+            'target_ref': f'attack-pattern--{i}'
+        })
+        if i % 2:
+            objects.append({
+                'type': 'relationship',
+                'relationship_type': 'subtechnique-of',
+                'source_ref': f'attack-pattern--{i}',
+                'target_ref': f'attack-pattern--{i - 1}'
+            })
+    for i in range(group_count):
+        for j in range(uses_per_group):
+            objects.append({
+                'type': 'relationship',
+                'relationship_type': 'uses',
+                'source_ref': f'intrusion-set--{i}',
+                'target_ref': f'attack-pattern--{(i * uses_per_group + j) % technique_count}'
+            })
+
+    return {'spec_version': '2.1', 'objects': objects}
+
+
+class TestStixParsing:
+    """Test STIX bundle parsing"""
+
+    @pytest.mark.asyncio
+    async def test_parse_relationships(self):
+        """Test mitigates, subtechnique-of and uses relationships are resolved"""
+        service = EnhancedMitreService()
+        await service._parse_attack_data(_build_stix_bundle(4, 2, 1, 2))
+
+        assert service.get_technique('T1000')['mitigations'] == ['M1000']
+        assert service.technique_to_mitigation['T1001'] == ['M1001']
+        assert service.mitigation_to_technique['M1000'] == ['T1000', 'T1002']
+
+        assert service.get_parent_technique('T1001') == 'T1000'
+        assert service.get_subtechniques('T1002') == ['T1003']
+        assert service.get_parent_technique('T1000') is None
+
+        assert service.technique_used_by['T1000'] == ['G1000']
+        assert service.technique_used_by['T1001'] == ['G1000']
+
+    @pytest.mark.asyncio
+    async def test_parse_ignores_unresolved_refs(self):
+        """Test relationships pointing at unknown objects are skipped"""
+        bundle = _build_stix_bundle(1, 1, 0, 0)
+        bundle['objects'].append({
+            'type': 'relationship',
+            'relationship_type': 'mitigates',
+            'source_ref': 'course-of-action--missing',
+            'target_ref': 'attack-pattern--0'
+        })
+
+        service = EnhancedMitreService()
+        await service._parse_attack_data(bundle)
+
+        assert service.get_technique('T1000')['mitigations'] == ['M1000']
+
+    @pytest.mark.asyncio
+    async def test_parse_enterprise_scale_benchmark(self):
+        """Benchmark parsing a bundle the size of enterprise-attack"""
+        # Roughly 24k objects / 19k relationships, matching the full bundle
+        bundle = _build_stix_bundle(1400, 300, 150, 100)
+        service = EnhancedMitreService()
+
+        start = time.perf_counter()
+        await service._parse_attack_data(bundle)
+        elapsed = time.perf_counter() - start
+
+        assert service.get_technique_count() == 1400
+        assert elapsed < 1.0
+
+
+class TestSnapshot:
+    """Test binary snapshot persistence"""
+
+    @pytest_asyncio.fixture
+    async def parsed_service(self):
+        """Create a service populated from a small STIX bundle"""
+        service = EnhancedMitreService()
+        await service._parse_attack_data(_build_stix_bundle(4, 2, 1, 2))
+        service._build_search_indexes()
+        return service
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip(self, parsed_service, tmp_path):
+        """Test a saved snapshot restores caches and indexes"""
+        snapshot_file = tmp_path / "attack_data.snapshot"
+
+        assert await parsed_service._save_snapshot(snapshot_file, "file:1:2")
+
+        service = EnhancedMitreService()
+        assert await service._load_from_snapshot(snapshot_file, "file:1:2")
+
+        assert service.data_version == "file:1:2"
+        assert service.techniques_cache == parsed_service.techniques_cache
+        assert service.search_techniques('technique') == parsed_service.search_techniques('technique')
+        assert service.get_subtechniques('T1000') == ['T1001']
+        assert service.mitigation_to_technique == parsed_service.mitigation_to_technique
+        assert service.tactic_search_index == parsed_service.tactic_search_index
+
+        # Tactic and platform caches share technique objects with the main cache
+        technique = service.get_technique('T1000')
+        assert any(t is technique for t in service.get_techniques_by_tactic('execution'))
+
+    @pytest.mark.asyncio
+    async def test_snapshot_stale_when_data_version_changes(self, parsed_service, tmp_path):
+        """Test a snapshot is rejected once the source data version changes"""
+        snapshot_file = tmp_path / "attack_data.snapshot"
+        await parsed_service._save_snapshot(snapshot_file, "db:4:2026-01-01T00:00:00")
+
+        service = EnhancedMitreService()
+        assert not await service._load_from_snapshot(snapshot_file, "db:4:2026-02-01T00:00:00")
+        assert service.get_technique_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_snapshot_rejects_unknown_header(self, tmp_path):
+        """Test files without the snapshot header are ignored"""
+        snapshot_file = tmp_path / "attack_data.snapshot"
+        snapshot_file.write_bytes(b"not a snapshot")
+
+        service = EnhancedMitreService()
+        assert not await service._load_from_snapshot(snapshot_file, "file:1:2")
+
+    @pytest.mark.asyncio
+    async def test_snapshot_rejects_bad_checksum(self, parsed_service, tmp_path):
+        """Test a snapshot whose payload was modified is ignored"""
+        snapshot_file = tmp_path / "attack_data.snapshot"
+        await parsed_service._save_snapshot(snapshot_file, "file:1:2")
+        snapshot_file.write_bytes(snapshot_file.read_bytes().replace(b"T1000", b"T9999"))
+
+        service = EnhancedMitreService()
+        assert not await service._load_from_snapshot(snapshot_file, "file:1:2")
+        assert service.get_technique_count() == 0
+
+    @pytest.mark.asyncio
+    async def test_initialize_skips_snapshot_when_load_fails(self, tmp_path):
+        """Test an unreadable source file does not produce an empty snapshot"""
+        (tmp_path / "attack_data.json").write_text("not json")
+
+        service = EnhancedMitreService()
+        with patch('app.services.enhanced_mitre_service.Path', return_value=tmp_path):
+            await service.initialize()
+
+        assert not (tmp_path / "attack_data.snapshot").exists()
+
+    @pytest.mark.asyncio
+    async def test_initialize_reuses_snapshot(self, tmp_path):
+        """Test a second worker loads the snapshot written by the first"""
+        (tmp_path / "attack_data.json").write_text(json.dumps(_build_stix_bundle(4, 2, 1, 2)))
+
+        first = EnhancedMitreService()
+        with patch('app.services.enhanced_mitre_service.Path', return_value=tmp_path):
+            await first.initialize()
+        assert (tmp_path / "attack_data.snapshot").exists()
+
+        second = EnhancedMitreService()
+        with patch('app.services.enhanced_mitre_service.Path', return_value=tmp_path), \
+                patch.object(second, '_load_from_file', AsyncMock()) as load_from_file:
+            await second.initialize()
+
+        load_from_file.assert_not_called()
+        assert second.techniques_cache == first.techniques_cache
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,160 @@
+"""
+Tests for adaptive LLM concurrency limits and provider load balancing
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.enhanced_llm_service import EnhancedLLMService
+from app.services.llm_load_balancer import ProviderLoadBalancer
+from app.services.llm_providers import (
+    AdaptiveConcurrencyLimiter, FakeLLMProvider, LLMModel, RateLimitError
+)
+from app.services.llm_response_cache import LLMResponseCache, MemoryResponseCacheBackend
+
+
+async def saturate(limiter, count):
+    """Run ``count`` successful requests with the limit fully used"""
+    async def one():
+        async with limiter.slot():
+            await asyncio.sleep(0)
+    await asyncio.gather(*(one() for _ in range(count)))
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD limit adjustment"""
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_only_when_saturated(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=10)
+
+        for _ in range(10):
+            async with limiter.slot():
+                pass
+        assert limiter.limit == 2
+
+        await saturate(limiter, 20)
+        assert limiter.limit > 2
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_halves_once_per_cooldown(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, decrease_cooldown=60.0)
+
+        for _ in range(5):
+            with pytest.raises(RateLimitError):
+                async with limiter.slot():
+                    raise RateLimitError()
+
+        assert limiter.limit == 8
+        assert limiter.stats["rate_limited"] == 5
+
+    @pytest.mark.asyncio
+    async def test_limit_never_below_minimum(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, decrease_cooldown=0.0)
+
+        for _ in range(5):
+            await limiter.acquire()
+            await limiter.release(rate_limited=True)
+
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_response_shrinks_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_target=1.0, decrease_cooldown=0.0)
+
+        await limiter.acquire()
+        await limiter.release(latency=5.0)
+
+        assert limiter.limit == 9
+        assert limiter.stats["slow"] == 1
+
+    @pytest.mark.asyncio
+    async def test_generation_time_not_counted_as_latency(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=10, latency_target=0.05, decrease_cooldown=0.0, latency_reference_tokens=100
+        )
+
+        # A long answer is judged per 100 output tokens
+        async with limiter.slot() as timing:
+            await asyncio.sleep(0.1)
+            timing.output_tokens = 1000
+        # A stream is judged by its first chunk
+        async with limiter.slot() as timing:
+            timing.first_chunk()
+            await asyncio.sleep(0.1)
+        assert limiter.stats["slow"] == 0
+        assert limiter.p50_latency < 0.05
+
+        async with limiter.slot() as timing:
+            await asyncio.sleep(0.1)
+            timing.output_tokens = 50
+        assert limiter.stats["slow"] == 1
+
+    @pytest.mark.asyncio
+    async def test_requests_wait_for_free_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert limiter.waiting == 1
+
+        await limiter.release(latency=0.1)
+        await asyncio.wait_for(waiter, 1.0)
+        assert limiter.in_flight == 1
+
+
+class TestProviderLoadBalancer:
+    """Test provider selection"""
+
+    @pytest.fixture
+    def providers(self):
+        return {"a": FakeLLMProvider(name="a"), "b": FakeLLMProvider(name="b")}
+
+    def record_latency(self, provider, latency, samples=5):
+        limiter = provider.get_limiter(LLMModel.GPT_4O_MINI)
+        limiter._latencies.extend([latency] * samples)
+
+    def test_prefers_lower_p50_latency(self, providers):
+        self.record_latency(providers["a"], 2.0)
+        self.record_latency(providers["b"], 0.5)
+        models = {name: LLMModel.GPT_4O_MINI for name in providers}
+
+        assert ProviderLoadBalancer().select(providers, models) == "b"
+
+    def test_avoids_exhausted_quota(self, providers):
+        self.record_latency(providers["a"], 2.0)
+        self.record_latency(providers["b"], 0.5)
+        providers["b"].rate_limit_remaining = 0
+        providers["b"].rate_limit_total = 100
+        models = {name: LLMModel.GPT_4O_MINI for name in providers}
+
+        assert ProviderLoadBalancer().select(providers, models) == "a"
+
+
+class TestServiceUnderLoad:
+    """Test EnhancedLLMService with fake providers"""
+
+    @pytest.mark.asyncio
+    async def test_sustained_load_without_failures(self):
+        service = EnhancedLLMService()
+        concurrency = {"initial_limit": 2, "max_limit": 16}
+        service.providers = {
+            "fast": FakeLLMProvider(name="fast", latency=0.01, capacity=4, concurrency=concurrency),
+            "slow": FakeLLMProvider(name="slow", latency=0.03, capacity=16, concurrency=concurrency),
+        }
+        disabled_cache = LLMResponseCache(MemoryResponseCacheBackend(), enabled=False)
+
+        async def one(i):
+            return await service.generate_completion(f"Request {i}", model=LLMModel.GPT_4O_MINI)
+
+        with patch("app.services.enhanced_llm_service.get_llm_response_cache", return_value=disabled_cache):
+            responses = await asyncio.wait_for(asyncio.gather(*(one(i) for i in range(120))), 30)
+
+        assert len(responses) == 120
+        assert service.providers["fast"].served > 0
+        assert service.load_balancer.selections.get("slow", 0) > 0
+        info = service.get_provider_info()
+        assert info["providers"]["fast"]["concurrency"]["gpt-4o-mini"]["requests"] >= 120 // 4
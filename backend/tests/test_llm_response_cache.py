@@ -0,0 +1,243 @@
+"""
+Tests for the LLM response cache
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.agents import base_agent
+from app.services.enhanced_llm_service import EnhancedLLMService
+from app.services.llm_service import LLMProvider, LLMService
+from app.services.llm_providers import LLMRequest, LLMResponse, LLMMessage, LLMModel
+from app.services.llm_providers.base import TokenUsage
+from app.services.llm_response_cache import (
+    LLMResponseCache, MemoryResponseCacheBackend, SQLiteResponseCacheBackend,
+    request_cache_key
+)
+
+
+def make_request(prompt="Describe the system", temperature=0.0, **kwargs):
+    return LLMRequest(
+        messages=[LLMMessage(role="user", content=prompt)],
+        model=LLMModel.GPT_4O_MINI,
+        temperature=temperature,
+        **kwargs
+    )
+
+
+class FakeProvider:
+    """Provider stub that counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, request):
+        self.calls += 1
+        return LLMResponse(
+            content=f"answer {self.calls}",
+            model=request.model.value,
+            token_usage=TokenUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15, estimated_cost=0.002),
+            response_time=1.5,
+            provider="fake"
+        )
+
+
+class FakeLegacyProvider(LLMProvider):
+    """Legacy LLMService provider stub that counts calls and can fail"""
+
+    MODEL_COSTS = {"input": 1.0, "output": 1.0}
+
+    def __init__(self, model_name, fail=False):
+        self.model_name = model_name
+        self.fail = fail
+        self.calls = 0
+
+    async def generate_response(self, prompt, system_prompt=None, temperature=0.7, max_tokens=None):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("provider down")
+        return f"{self.model_name} answer {self.calls}"
+
+    def is_available(self) -> bool:
+        return True
+
+
+class EchoAgent(base_agent.BaseAgent):
+    """Minimal agent for exercising generate_llm_response"""
+
+    def __init__(self):
+        super().__init__(agent_type="echo", description="Echoes prompts")
+
+    def get_system_prompt(self) -> str:
+        return "You are a test agent."
+
+    async def process_task(self, task):
+        raise NotImplementedError
+
+
+class TestRequestCacheKey:
+    """Test canonical request hashing"""
+
+    def test_identical_requests_share_key(self):
+        assert request_cache_key(make_request(), "openai") == request_cache_key(make_request(), "openai")
+
+    def test_any_field_changes_key(self):
+        base = request_cache_key(make_request(), "openai")
+
+        assert request_cache_key(make_request(prompt="Other"), "openai") != base
+        assert request_cache_key(make_request(temperature=0.5), "openai") != base
+        assert request_cache_key(make_request(max_tokens=100), "openai") != base
+        assert request_cache_key(make_request(), "anthropic") != base
+
+
+class TestBackends:
+    """Test cache storage backends"""
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryResponseCacheBackend(max_entries=2)
+        await backend.set("a", {"v": 1}, ttl=60)
+        await backend.set("b", {"v": 2}, ttl=60)
+        await backend.get("a")
+        await backend.set("c", {"v": 3}, ttl=60)
+
+        assert await backend.get("a") == {"v": 1}
+        assert await backend.get("b") is None
+        assert backend.size() == 2
+
+    @pytest.mark.asyncio
+    async def test_memory_backend_expires_entries(self):
+        backend = MemoryResponseCacheBackend()
+        await backend.set("a", {"v": 1}, ttl=60)
+
+        with patch("app.services.llm_response_cache.time.time", return_value=10**12):
+            assert await backend.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_persists_and_evicts(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        backend = SQLiteResponseCacheBackend(path, max_entries=2)
+        await backend.set("a", {"v": 1}, ttl=60)
+        await backend.set("b", {"v": 2}, ttl=60)
+        await backend.set("c", {"v": 3}, ttl=60)
+
+        reopened = SQLiteResponseCacheBackend(path, max_entries=2)
+        assert await reopened.get("a") is None
+        assert await reopened.get("c") == {"v": 3}
+
+
+class TestLLMResponseCache:
+    """Test the response cache wrapper and its service integration"""
+
+    @pytest.fixture
+    def cache(self):
+        return LLMResponseCache(MemoryResponseCacheBackend())
+
+    @pytest.fixture
+    def service(self, cache):
+        service = EnhancedLLMService()
+        service.providers = {"openai": FakeProvider()}
+        with patch("app.services.enhanced_llm_service.get_llm_response_cache", return_value=cache):
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_response_round_trip(self, cache):
+        request = make_request()
+        original = await FakeProvider().generate(request)
+        await cache.set_response(request, "openai", original)
+
+        cached = await cache.get_response(request, "openai")
+
+        assert cached.content == original.content
+        assert cached.token_usage == original.token_usage
+        assert cached.metadata["cache_hit"] is True
+
+    @pytest.mark.asyncio
+    async def test_repeat_completion_served_from_cache(self, service, cache):
+        first = await service.generate_completion("Describe the system", provider="openai", temperature=0.0)
+        second = await service.generate_completion("Describe the system", provider="openai", temperature=0.0)
+
+        assert service.providers["openai"].calls == 1
+        assert second.content == first.content
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["tokens_saved"] == 15
+        assert stats["cost_saved"] == pytest.approx(0.002)
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_always_calls_provider(self, service):
+        for _ in range(2):
+            await service.generate_completion("Describe the system", provider="openai", use_cache=False)
+
+        assert service.providers["openai"].calls == 2
+
+    @pytest.mark.asyncio
+    async def test_nonzero_temperature_bypass(self, service, cache):
+        cache.bypass_nonzero_temperature = True
+        for _ in range(2):
+            await service.generate_completion("Describe the system", provider="openai", temperature=0.7)
+        await service.generate_completion("Describe the system", provider="openai", temperature=0.0)
+
+        assert service.providers["openai"].calls == 3
+        assert cache.get_stats()["bypassed"] == 2
+
+
+class TestAgentResponseCache:
+    """Test response caching on the BaseAgent path"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        cache = LLMResponseCache(MemoryResponseCacheBackend())
+        monkeypatch.setattr(base_agent, "get_llm_response_cache", lambda: cache)
+        return cache
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        service = LLMService()
+        service.providers = {
+            "openai": FakeLegacyProvider("gpt-4"),
+            "google": FakeLegacyProvider("gemini-pro")
+        }
+        service.default_provider = "openai"
+        monkeypatch.setattr(base_agent, "llm_service", service)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_served_from_cache(self, service, cache):
+        agent = EchoAgent()
+        first = await agent.generate_llm_response("Describe the system", temperature=0.0)
+        second = await agent.generate_llm_response("Describe the system", temperature=0.0)
+
+        assert service.providers["openai"].calls == 1
+        assert second["response"] == first["response"]
+        assert second["cache_hit"] is True
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["tokens_saved"] == first["token_usage"]["prompt_tokens"] + first["token_usage"]["completion_tokens"]
+        assert stats["cost_saved"] == pytest.approx(first["token_usage"]["estimated_cost"])
+        assert stats["cost_saved"] > 0
+
+    @pytest.mark.asyncio
+    async def test_model_change_misses_cache(self, service, cache):
+        agent = EchoAgent()
+        await agent.generate_llm_response("Describe the system", temperature=0.0)
+
+        service.providers["openai"].model_name = "gpt-4o"
+        response = await agent.generate_llm_response("Describe the system", temperature=0.0)
+
+        assert service.providers["openai"].calls == 2
+        assert "cache_hit" not in response
+
+    @pytest.mark.asyncio
+    async def test_fallback_response_not_replayed_for_primary(self, service, cache):
+        agent = EchoAgent()
+        service.providers["openai"].fail = True
+        fallback = await agent.generate_llm_response("Describe the system", temperature=0.0)
+        assert fallback["provider"] == "google"
+
+        service.providers["openai"].fail = False
+        response = await agent.generate_llm_response("Describe the system", temperature=0.0)
+
+        assert response["provider"] == "openai"
+        assert "cache_hit" not in response
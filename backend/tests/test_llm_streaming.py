@@ -0,0 +1,190 @@
+"""
+Tests for streamed LLM completions and incremental JSON parsing
+"""
+
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.enhanced_ai_service import enhanced_ai_service
+from app.services.enhanced_llm_service import EnhancedLLMService
+from app.services.incremental_json import IncrementalJSONParser
+from app.services.llm_providers import (
+    OpenAIProvider, AnthropicProvider, LLMRequest, LLMMessage, LLMModel, LLMStreamChunk,
+    RateLimitError
+)
+from app.services.llm_response_cache import LLMResponseCache, MemoryResponseCacheBackend
+
+
+def make_request(model=LLMModel.GPT_4O_MINI):
+    return LLMRequest(messages=[LLMMessage(role="user", content="Describe the system")], model=model)
+
+
+def sse_body(events):
+    return "".join(f"data: {json.dumps(event) if isinstance(event, dict) else event}\n\n" for event in events)
+
+
+def mock_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestIncrementalJSONParser:
+    """Test incremental extraction of top-level members"""
+
+    def test_members_emitted_as_they_complete(self):
+        parser = IncrementalJSONParser()
+        document = '```json\n{"assets": [{"name": "db, primary"}], "notes": "a } b", "count": 2}\n```'
+
+        emitted = []
+        for i in range(0, len(document), 3):
+            emitted.extend(parser.feed(document[i:i + 3]))
+
+        assert emitted == [("assets", [{"name": "db, primary"}]), ("notes", "a } b"), ("count", 2)]
+        assert parser.done
+        assert parser.result() == {"assets": [{"name": "db, primary"}], "notes": "a } b", "count": 2}
+
+    def test_member_not_emitted_until_complete(self):
+        parser = IncrementalJSONParser()
+
+        assert parser.feed('{"assets": [1, 2') == []
+        assert parser.feed('], "escaped": "say \\"hi\\""') == [("assets", [1, 2])]
+        assert parser.feed("}") == [("escaped", 'say "hi"')]
+
+    def test_truncated_stream_returns_parsed_members(self):
+        parser = IncrementalJSONParser()
+        parser.feed('{"a": 1, "b": [')
+
+        assert not parser.done
+        assert parser.result() == {"a": 1}
+
+
+class TestProviderStreaming:
+    """Test provider-specific stream decoding"""
+
+    @pytest.mark.asyncio
+    async def test_openai_stream(self):
+        body = sse_body([
+            {"model": "gpt-4o-mini", "choices": [{"delta": {"content": "Hel"}, "finish_reason": None}]},
+            {"model": "gpt-4o-mini", "choices": [{"delta": {"content": "lo"}, "finish_reason": "stop"}]},
+            {"model": "gpt-4o-mini", "choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}},
+            "[DONE]",
+        ])
+        captured = {}
+
+        def handler(request):
+            captured["payload"] = json.loads(request.content)
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+        provider = OpenAIProvider(api_key="test")
+        provider.client = mock_client(handler)
+
+        chunks = await collect(provider.generate_stream(make_request()))
+
+        assert captured["payload"]["stream"] is True
+        assert "".join(chunk.delta for chunk in chunks) == "Hello"
+        final = chunks[-1]
+        assert final.done
+        assert final.finish_reason == "stop"
+        assert final.token_usage.total == 12
+        assert final.token_usage.estimated_cost > 0
+        assert final.provider == "openai"
+
+    @pytest.mark.asyncio
+    async def test_anthropic_stream(self):
+        body = sse_body([
+            {"type": "message_start", "message": {"model": "claude-3-haiku-20240307", "usage": {"input_tokens": 7}}},
+            {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Hi "}},
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "there"}},
+            {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": 3}},
+            {"type": "message_stop"},
+        ])
+        provider = AnthropicProvider(api_key="test")
+        provider.client = mock_client(lambda request: httpx.Response(200, text=body))
+
+        chunks = await collect(provider.generate_stream(make_request(LLMModel.CLAUDE_3_HAIKU)))
+
+        assert "".join(chunk.delta for chunk in chunks) == "Hi there"
+        assert chunks[-1].finish_reason == "end_turn"
+        assert chunks[-1].token_usage.prompt_tokens == 7
+        assert chunks[-1].token_usage.completion_tokens == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_before_first_chunk_is_retried(self):
+        responses = [
+            httpx.Response(429, headers={"retry-after": "1"}),
+            httpx.Response(200, text=sse_body([
+                {"choices": [{"delta": {"content": "ok"}, "finish_reason": "stop"}]}, "[DONE]"
+            ])),
+        ]
+        provider = OpenAIProvider(api_key="test")
+        provider.client = mock_client(lambda request: responses.pop(0))
+
+        with patch.object(provider, "_sleep") as sleep:
+            chunks = await collect(provider.generate_stream(make_request()))
+
+        sleep.assert_awaited_once_with(1)
+        assert chunks[0].delta == "ok"
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_exhausts_retries(self):
+        provider = OpenAIProvider(api_key="test")
+        provider.client = mock_client(lambda request: httpx.Response(429))
+
+        with patch.object(provider, "_sleep"):
+            with pytest.raises(RateLimitError):
+                await collect(provider.generate_stream(make_request(), max_retries=1))
+
+
+class TestServiceStreaming:
+    """Test EnhancedLLMService.generate_stream"""
+
+    @pytest.mark.asyncio
+    async def test_completed_stream_is_cached_and_replayed(self):
+        body = sse_body([
+            {"choices": [{"delta": {"content": '{"answer": '}}]},
+            {"choices": [{"delta": {"content": '"yes"}'}, "finish_reason": "stop"}]},
+            "[DONE]",
+        ])
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, text=body)
+
+        provider = OpenAIProvider(api_key="test")
+        provider.client = mock_client(handler)
+        service = EnhancedLLMService()
+        service.providers = {"openai": provider}
+        cache = LLMResponseCache(MemoryResponseCacheBackend())
+
+        with patch("app.services.enhanced_llm_service.get_llm_response_cache", return_value=cache):
+            first = await collect(service.generate_stream("Is it safe?", provider="openai"))
+            second = await collect(service.generate_stream("Is it safe?", provider="openai"))
+
+        assert len(calls) == 1
+        assert "".join(chunk.delta for chunk in first) == '{"answer": "yes"}'
+        assert "".join(chunk.delta for chunk in second) == '{"answer": "yes"}'
+        assert second[-1].done
+
+    @pytest.mark.asyncio
+    async def test_natural_language_query_events(self):
+        async def fake_stream(**kwargs):
+            yield LLMStreamChunk(delta='{"answer": "Use MFA", ')
+            yield LLMStreamChunk(delta='"confidence": 0.9}')
+            yield LLMStreamChunk(done=True, finish_reason="stop", provider="openai")
+
+        service = EnhancedLLMService()
+        with patch.object(service, "generate_stream", fake_stream), \
+                patch("app.services.enhanced_ai_service.get_enhanced_llm_service", return_value=service):
+            events = [event async for event in enhanced_ai_service.stream_natural_language_query("How to protect logins?")]
+
+        names = [name for name, _ in events]
+        assert names == ["delta", "section", "delta", "section", "done"]
+        assert events[1][1] == {"key": "answer", "value": "Use MFA"}
+        assert events[-1][1]["result"] == {"answer": "Use MFA", "confidence": 0.9}
@@ -0,0 +1,167 @@
+"""
+Tests for the threat modeling orchestrator's stage graph execution
+"""
+
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+
+from app.agents import base_agent
+from app.services import orchestrator as orchestrator_module
+from app.services.llm_response_cache import LLMResponseCache, MemoryResponseCacheBackend
+from app.agents.base_agent import SharedContextManager
+from app.services.orchestrator import ThreatModelingOrchestrator, AnalysisStage
+
+
+def make_stage(name, log, delay=0.0, result=True, **kwargs):
+    """Create a stage that sleeps for ``delay`` and records start/finish order"""
+    async def run():
+        log.append(f"start:{name}")
+        await asyncio.sleep(delay)
+        log.append(f"end:{name}")
+        return result
+    return AnalysisStage(name, run, **kwargs)
+
+
+class TestAnalysisGraph:
+    """Test dependency graph execution"""
+
+    @pytest.fixture
+    def orchestrator(self):
+        return ThreatModelingOrchestrator()
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_run_concurrently(self, orchestrator):
+        """Test sibling stages overlap and dependents wait for both"""
+        log = []
+        stages = [
+            make_stage("root", log),
+            make_stage("left", log, delay=0.2, depends_on=["root"]),
+            make_stage("right", log, delay=0.2, depends_on=["root"]),
+            make_stage("join", log, depends_on=["left", "right"]),
+        ]
+
+        succeeded, timings = await orchestrator._run_analysis_graph(1, stages)
+
+        assert succeeded
+        assert log.index("start:right") < log.index("end:left")
+        assert log[-2:] == ["start:join", "end:join"]
+        assert set(timings) == {"root", "left", "right", "join", "total"}
+        # Total follows the critical path, not the sum of stage durations
+        assert timings["total"] < timings["left"] + timings["right"]
+
+    @pytest.mark.asyncio
+    async def test_required_failure_skips_dependents(self, orchestrator):
+        """Test a failed required stage fails the graph and skips dependents"""
+        log = []
+        stages = [
+            make_stage("root", log, result=False),
+            make_stage("child", log, depends_on=["root"]),
+        ]
+
+        succeeded, timings = await orchestrator._run_analysis_graph(1, stages)
+
+        assert not succeeded
+        assert "start:child" not in log
+        assert "child" not in timings
+
+    @pytest.mark.asyncio
+    async def test_optional_stage_timeout_does_not_block(self, orchestrator):
+        """Test an optional stage that times out lets dependents continue"""
+        log = []
+        stages = [
+            make_stage("slow", log, delay=1.0, timeout=0.05, required=False),
+            make_stage("after", log, depends_on=["slow"]),
+        ]
+
+        succeeded, timings = await orchestrator._run_analysis_graph(1, stages)
+
+        assert succeeded
+        assert "end:slow" not in log
+        assert "end:after" in log
+        assert timings["slow"] < 1.0
+
+    @pytest.mark.asyncio
+    async def test_unknown_dependency_rejected(self, orchestrator):
+        """Test stages must be declared after their dependencies"""
+        with pytest.raises(ValueError):
+            await orchestrator._run_analysis_graph(1, [make_stage("a", [], depends_on=["missing"])])
+
+    def test_analysis_graph_shape(self, orchestrator):
+        """Test recommendations wait for control evaluation only when it is scheduled"""
+        stages = orchestrator._build_analysis_graph(1, {}, None, "system")
+        dependencies = {stage.name: stage.depends_on for stage in stages}
+
+        assert dependencies["control_evaluation"] == ["attack_mapping"]
+        assert dependencies["recommendations"] == ["attack_mapping", "control_evaluation"]
+        assert set(dependencies["report_generation"]) == {"recommendations", "control_evaluation"}
+
+        stages = orchestrator._build_analysis_graph(1, {"include_mitigations": False}, None, "system")
+        dependencies = {stage.name: stage.depends_on for stage in stages}
+        assert "control_evaluation" not in dependencies
+        assert dependencies["recommendations"] == ["attack_mapping"]
+
+    @pytest.mark.asyncio
+    async def test_recommendations_prompt_lists_control_gaps(self, orchestrator, monkeypatch):
+        """Test the control gaps found by control evaluation reach the recommendations prompt"""
+        prompts = []
+
+        async def generate_response(prompt, **kwargs):
+            prompts.append(prompt)
+            return {"response": json.dumps({"recommendations": []}), "success": True}
+
+        monkeypatch.setattr(orchestrator_module.llm_service, "generate_response", generate_response)
+        context_manager = SharedContextManager(1)
+        context_manager.update_context({
+            "attack_paths": [{"name": "Phishing to database", "explanation": "Stolen credentials"}],
+            "control_evaluation_results": [
+                {"priority_gaps": [{"gap_description": "No MFA on administrator accounts"}]}
+            ]
+        })
+
+        await orchestrator._generate_recommendations(1, context_manager)
+
+        assert "IDENTIFIED CONTROL GAPS:\nNo MFA on administrator accounts" in prompts[0]
+
+
+class TestAnalysisProvider:
+    """Test the requested provider reaches every LLM call"""
+
+    @pytest.mark.asyncio
+    async def test_agent_and_recommendation_calls_use_provider(self, monkeypatch):
+        calls = []
+        analysis = json.dumps({
+            "assets": [{"name": "Web app", "type": "application", "criticality": "high", "technologies": []}],
+            "technologies": ["PostgreSQL"],
+            "entry_points": ["HTTPS"],
+            "recommendations": []
+        })
+
+        async def generate_response(prompt, system_prompt=None, temperature=0.7,
+                                    max_tokens=None, preferred_provider=None):
+            calls.append(preferred_provider)
+            return {"response": analysis, "provider": preferred_provider, "success": True}
+
+        async def noop(*args, **kwargs):
+            return None
+
+        async def system_inputs(project_id):
+            return [SimpleNamespace(content="A web application backed by PostgreSQL")]
+
+        disabled_cache = LLMResponseCache(MemoryResponseCacheBackend(), enabled=False)
+        monkeypatch.setattr(base_agent, "get_llm_response_cache", lambda: disabled_cache)
+        monkeypatch.setattr(orchestrator_module.llm_service, "generate_response", generate_response)
+
+        orchestrator = ThreatModelingOrchestrator()
+        monkeypatch.setattr(orchestrator, "_get_system_inputs", system_inputs)
+        for name in ("_update_project_status", "_update_stage_progress",
+                     "_record_stage_timings", "_store_results"):
+            monkeypatch.setattr(orchestrator, name, noop)
+
+        await orchestrator.analyze_project(1, {"llm_provider": "google"}, provider="ollama")
+
+        # System analysis, attack mapping and recommendations; the other agents
+        # stop before calling the LLM without mapped techniques
+        assert len(calls) == 3
+        assert set(calls) == {"ollama"}
@@ -0,0 +1,151 @@
+"""
+Tests for the authenticated principal cache
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.auth import auth_service, get_authenticated_user, get_current_user
+from app.core.database import Base
+from app.core.principal_cache import PrincipalCache, get_principal_cache
+from app.models.user import User, UserTable, UserUpdate
+from app.services.user_service import UserService
+
+
+@pytest_asyncio.fixture
+async def sessions(tmp_path):
+    """Session factory on a temporary database with one active user"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(UserTable(id="user-1", email="one@example.com", hashed_password="x", role="viewer"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_principal_cache():
+    """Each test gets its own database, so start from an empty cache"""
+    get_principal_cache().clear()
+    yield
+    get_principal_cache().clear()
+
+
+def bearer(subject: str = "user-1", **kwargs) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=auth_service.create_access_token(subject, **kwargs)
+    )
+
+
+def count_user_queries(factory):
+    statements = []
+    event.listen(
+        factory.kw["bind"].sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: "FROM users" in statement and statements.append(statement)
+    )
+    return statements
+
+
+class TestPrincipalCache:
+    """Token -> user snapshots, bounded and invalidated"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_skip_decode_and_lookup(self, sessions, monkeypatch):
+        credentials = bearer()
+        async with sessions() as session:
+            assert (await get_current_user(credentials, session)).email == "one@example.com"
+
+        queries = count_user_queries(sessions)
+        monkeypatch.setattr(auth_service, "verify_token", lambda token: pytest.fail("token decoded"))
+        async with sessions() as session:
+            user = await get_current_user(credentials, session)
+            # Callers get their own copy
+            user.role = "admin"
+            assert (await get_current_user(credentials, session)).role == "viewer"
+        assert queries == []
+
+    @pytest.mark.asyncio
+    async def test_invalid_tokens_not_cached(self, sessions):
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-token")
+        async with sessions() as session:
+            for _ in range(2):
+                with pytest.raises(HTTPException) as error:
+                    await get_current_user(credentials, session)
+                assert error.value.status_code == 401
+        assert get_principal_cache().get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_role_change_and_deactivation_invalidate(self, sessions):
+        credentials = bearer()
+        service = UserService(auth_service)
+        async with sessions() as session:
+            await get_current_user(credentials, session)
+
+        async with sessions() as session:
+            await service.update_user(session, "user-1", UserUpdate(email="one@example.com", role="admin"))
+            await session.commit()
+        async with sessions() as session:
+            assert (await get_current_user(credentials, session)).role == "admin"
+
+        async with sessions() as session:
+            await service.delete_user(session, "user-1")
+            await session.commit()
+        async with sessions() as session:
+            with pytest.raises(HTTPException) as error:
+                await get_current_user(credentials, session)
+            assert error.value.detail == "User account is inactive"
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_changes_stay_out_of_cache(self, sessions):
+        credentials = bearer()
+        async with sessions() as session:
+            await UserService(auth_service).delete_user(session, "user-1")
+            # The changing session sees its own change but does not cache it
+            assert not (await get_authenticated_user(credentials, session)).is_active
+            await session.rollback()
+
+        async with sessions() as session:
+            assert (await get_current_user(credentials, session)).is_active
+
+    @pytest.mark.asyncio
+    async def test_entries_never_outlive_token(self, sessions):
+        credentials = bearer(expires_delta=timedelta(seconds=1))
+        async with sessions() as session:
+            await get_current_user(credentials, session)
+            time.sleep(1.1)
+            with pytest.raises(HTTPException) as error:
+                await get_current_user(credentials, session)
+            assert error.value.status_code == 401
+
+    def test_size_bound_evicts_least_recently_used(self):
+        cache = PrincipalCache(ttl=60.0, max_entries=2)
+        user = User(id="user-1", email="one@example.com")
+        expires = time.time() + 600
+        for token in ("a", "b"):
+            cache.put(token, user, expires, cache.generation())
+        assert cache.get("a") is not None
+        cache.put("c", user, expires, cache.generation())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+        cache.invalidate_user("user-1")
+        assert cache.get_stats()["entries"] == 0
+
+    def test_load_racing_an_invalidation_is_not_cached(self):
+        cache = PrincipalCache(ttl=60.0)
+        generation = cache.generation()
+        cache.invalidate_user("user-1")
+        cache.put("a", User(id="user-1", email="one@example.com"), time.time() + 600, generation)
+        assert cache.get("a") is None
@@ -295,6 +295,66 @@ class TestQualityIssueTracker:
         assert metrics.issues_by_type['style'] == 1
         assert metrics.issues_by_type['security'] == 1
     
+    @pytest.mark.asyncio
+    async def test_resolution_metrics_rollup(self, tracker, temp_db):
+        """Test metrics from the daily rollup across backfill and later writes."""
+        now = datetime.now(timezone.utc)
+        conn = sqlite3.connect(temp_db)
+        conn.executemany("""
+            INSERT INTO quality_issues
+            (id, project_id, file_path, issue_type, severity, category,
+             description, auto_fixable, status, created_at, resolved_at)
+            VALUES (?, 'project1', 'file.py', 'style', 'low', 'formatting', 'Issue', ?, ?, ?, ?)
+        """, [
+            # Outside a 30 day window
+            ("old", True, "open", (now - timedelta(days=31)).isoformat(), None),
+            # Resolved in 4 hours, on the first (partial) day of the window
+            ("edge", True, "resolved", (now - timedelta(days=30, hours=-1)).isoformat(),
+             (now - timedelta(days=30, hours=-5)).isoformat()),
+            ("recent", False, "open", (now - timedelta(days=2)).isoformat(), None),
+        ])
+        conn.execute("""
+            INSERT INTO auto_fix_results (id, issue_id, project_id, file_path, fix_type, success)
+            VALUES ('fix1', 'edge', 'project1', 'file.py', 'formatting', 1)
+        """)
+        conn.commit()
+        conn.close()
+        
+        # The rollup is built from the existing issues on first use
+        metrics = await tracker.get_resolution_metrics(project_id="project1", days=30)
+        assert metrics.total_issues == 2
+        assert metrics.resolved_issues == 1
+        assert metrics.average_resolution_time == pytest.approx(4.0)
+        assert metrics.auto_fix_success_rate == 100.0
+        
+        # Later writes are folded in by triggers
+        issue = await tracker.create_issue(QualityIssueCreate(
+            project_id="project1",
+            file_path="file.py",
+            issue_type=IssueType.SECURITY,
+            severity=Severity.HIGH,
+            category="vulnerability",
+            description="New issue",
+            auto_fixable=True
+        ))
+        await tracker.db.execute("""
+            INSERT INTO auto_fix_results (id, issue_id, project_id, file_path, fix_type, success)
+            VALUES ('fix2', ?, 'project1', 'file.py', 'security', 0)
+        """, (issue.id,))
+        await tracker.resolve_issue("recent", "developer1")
+        await tracker.delete_issue("old")
+        
+        metrics = await tracker.get_resolution_metrics(project_id="project1", days=30)
+        assert metrics.total_issues == 3
+        assert metrics.resolved_issues == 2
+        assert metrics.issues_by_severity == {'low': 2, 'high': 1}
+        assert metrics.auto_fix_success_rate == 50.0
+        
+        rollup_total = await tracker.db.fetchone(
+            "SELECT SUM(issues) FROM quality_issue_daily_rollup WHERE project_id = 'project1'"
+        )
+        assert rollup_total == (3,)
+    
     @pytest.mark.asyncio
     async def test_escalate_stale_issues(self, tracker, temp_db):
         """Test escalation of stale issues."""
@@ -369,6 +429,59 @@ class TestQualityIssueTracker:
             assert updated_issue.status == IssueStatus.IN_PROGRESS
             assert updated_issue.resolved_by == "bulk_processor"
     
+    @pytest.mark.asyncio
+    async def test_create_issues_bulk(self, tracker):
+        """Test bulk ingestion with routing, dedupe and deferred escalation."""
+        # An issue already open at file0.py:1 is not ingested again
+        await tracker.create_issue(QualityIssueCreate(
+            project_id="project1",
+            file_path="file0.py",
+            line_number=1,
+            issue_type=IssueType.STYLE,
+            severity=Severity.LOW,
+            category="formatting",
+            description="Existing issue"
+        ))
+        
+        issues_data = [
+            QualityIssueCreate(
+                project_id="project1",
+                file_path=f"file{i % 4}.py",
+                line_number=1,
+                issue_type=IssueType.SECURITY if i == 3 else IssueType.STYLE,
+                severity=Severity.CRITICAL if i == 3 else Severity.LOW,
+                category="formatting",
+                description=f"Scanned issue {i}"
+            )
+            for i in range(8)
+        ]
+        
+        with patch.object(tracker, '_check_escalation', new_callable=AsyncMock) as mock_escalation:
+            result = await tracker.create_issues_bulk(issues_data)
+        
+        assert [issue.file_path for issue in result.created] == ["file1.py", "file2.py", "file3.py"]
+        assert result.duplicates == 5
+        assert result.escalated == 1
+        mock_escalation.assert_awaited_once_with(result.created[2], IssuePriority.URGENT)
+        
+        issues = await tracker.get_issues(project_id="project1")
+        assert len(issues) == 4
+        
+        # Routing matches what create_issue would have stored
+        routed = await tracker.get_issue_by_id(result.created[2].id)
+        assert routed.category == "formatting"
+        row = await tracker.db.fetchone(
+            "SELECT category FROM quality_issues WHERE id = ?", (routed.id,)
+        )
+        assert row[0] == "formatting|urgent|blocking"
+        
+        # Resolved issues no longer block a new one at the same place
+        existing = next(issue for issue in issues if issue.file_path == "file0.py")
+        await tracker.resolve_issue(existing.id, "dev1")
+        result = await tracker.create_issues_bulk([issues_data[0]])
+        assert len(result.created) == 1
+        assert await tracker.create_issues_bulk([]) == type(result)()
+    
     @pytest.mark.asyncio
     async def test_delete_issue(self, tracker, sample_issue_data):
         """Test issue deletion."""
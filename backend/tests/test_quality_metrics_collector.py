@@ -260,6 +260,25 @@ if __name__ == '__main__':
         assert 0 <= code_metrics.duplicate_code_ratio <= 1
         assert 0 <= code_metrics.maintainability_index <= 100
     
+    @pytest.mark.asyncio
+    async def test_clone_index_duplicate_ratio_is_opt_in(self, collector, temp_project_dir, tmp_path, monkeypatch):
+        """Test the fingerprint-based duplicate ratio is only used when the clone index is enabled."""
+        from app.services.code_analysis import clone_index
+        
+        monkeypatch.setattr(clone_index, "_clone_index", None)
+        monkeypatch.setattr(clone_index.settings, "clone_index_path", str(tmp_path / "clones.db"))
+        assert clone_index.get_clone_index() is None
+        with patch.object(collector, '_calculate_indexed_duplicate_ratio') as indexed:
+            await collector._collect_code_metrics(temp_project_dir)
+        indexed.assert_not_called()
+        
+        monkeypatch.setattr(clone_index.settings, "clone_index_enabled", True)
+        code_metrics = await collector._collect_code_metrics(temp_project_dir)
+        
+        project_key = str(Path(temp_project_dir).resolve())
+        assert (tmp_path / "clones.db").exists()
+        assert code_metrics.duplicate_code_ratio == clone_index.get_clone_index().duplicate_ratio(project_key)
+    
     @pytest.mark.asyncio
     async def test_collect_test_metrics(self, collector, temp_project_dir):
         """Test test metrics collection."""
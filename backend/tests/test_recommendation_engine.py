@@ -22,6 +22,7 @@ from app.services.code_analysis.recommendation_engine import (
     DuplicateCodeBlock
 )
 from app.services.code_analysis.base_analyzer import AnalysisContext, AnalysisResult
+from app.services.code_analysis.clone_index import CloneIndex
 from app.models.quality import IssueType, Severity
 
 
@@ -228,6 +229,37 @@ def func2():
         assert duplicate_rec.recommendation_type == RecommendationType.DUPLICATE_REMOVAL
         assert "duplicate" in duplicate_rec.title.lower()
     
+    def test_find_cross_file_duplicates(self, tmp_path):
+        """Test functions copied into other files are reported with their locations."""
+        function = """def total_price(items, tax):
+    subtotal = 0
+    for item in items:
+        if item.quantity > 0:
+            subtotal += item.price * item.quantity
+    return subtotal * (1 + tax)
+"""
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "cart.py").write_text(function)
+        (project / "invoice.py").write_text("import math\n\n" + function.replace("total_price", "invoice_total"))
+        index = CloneIndex(str(tmp_path / "clones.db"))
+        index.sync_project("test_project", str(project))
+        
+        context = AnalysisContext(
+            project_id="test_project",
+            file_path=str(project / "cart.py"),
+            file_content=function,
+            language="python"
+        )
+        recommendations = self.detector.find_cross_file_duplicates(
+            ast.parse(function), context, index, str(project)
+        )
+        
+        assert len(recommendations) == 1
+        assert recommendations[0].recommendation_type == RecommendationType.DUPLICATE_REMOVAL
+        assert "invoice.py:3-8" in recommendations[0].description
+        assert "cross_file" in recommendations[0].tags
+    
     def test_normalize_code(self):
         """Test code normalization for duplicate detection."""
         code1 = """
@@ -0,0 +1,177 @@
+"""
+Tests for SQL instrumentation
+"""
+
+import logging
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import auth
+from app.core.sql_metrics import (
+    OTHER_STATEMENTS, SQLMetrics, SQLMetricsMiddleware, instrument_engine, normalize_sql, redact_parameters
+)
+from app.main import app as main_app
+from app.main import settings as main_settings
+from app.models.user import User
+
+
+@pytest.fixture
+def metrics():
+    metrics = SQLMetrics(slow_query_threshold=10.0, n_plus_one_threshold=5)
+    yield metrics
+    metrics.flush()
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path, metrics):
+    """Instrumented database with a small users table"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    instrument_engine(engine, metrics)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT)"))
+        await conn.execute(
+            text("INSERT INTO users (id, email) VALUES (:id, :email)"),
+            [{"id": i, "email": f"user{i}@example.com"} for i in range(10)]
+        )
+    metrics.reset()
+    yield engine
+    await engine.dispose()
+
+
+class TestNormalization:
+    """Statement keys and parameter redaction"""
+
+    def test_literals_and_lists_collapse(self):
+        assert normalize_sql("SELECT *  FROM users\n WHERE id IN (?, ?, ?) AND name = 'bob' LIMIT 10") == (
+            "SELECT * FROM users WHERE id IN (?) AND name = ? LIMIT ?"
+        )
+        assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?)"
+        # Digits inside identifiers are kept
+        assert normalize_sql("SELECT anon_1.id FROM t1 AS anon_1") == "SELECT anon_1.id FROM t1 AS anon_1"
+
+    def test_parameters_redacted(self):
+        assert redact_parameters(("secret", 42, None)) == ["<str:6>", "<int>", None]
+        assert redact_parameters({"token": b"abc"}) == {"token": "<bytes:3>"}
+        assert redact_parameters([("a",), ("b",)], executemany=True) == {"rows": 2, "first": ["<str:1>"]}
+
+
+class TestSQLMetrics:
+    """Engine hooks, slow-query log and N+1 detection"""
+
+    @pytest.mark.asyncio
+    async def test_statements_timed_by_normalized_sql(self, engine, metrics):
+        async with engine.connect() as conn:
+            for user_id in (1, 2, 3):
+                await conn.execute(text(f"SELECT email FROM users WHERE id = {user_id}"))
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing"))
+
+        stats = metrics.get_stats()
+        assert stats["statements"][0]["statement"] == "SELECT email FROM users WHERE id = ?"
+        assert stats["statements"][0]["count"] == 3
+        assert stats["errors"] == 1
+
+        exposition = metrics.render_prometheus()
+        assert (
+            'aitm_sql_query_duration_seconds_bucket{statement="SELECT email FROM users WHERE id = ?",le="+Inf"} 3'
+            in exposition
+        )
+        assert 'aitm_sql_query_duration_seconds_count{statement="SELECT email FROM users WHERE id = ?"} 3' in exposition
+
+    @pytest.mark.asyncio
+    async def test_slow_queries_logged_with_redacted_parameters(self, engine, metrics, caplog):
+        metrics.slow_query_threshold = 0.0
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": "user1@example.com"})
+
+        with caplog.at_level(logging.WARNING, logger="app.core.sql_metrics"):
+            metrics.flush()
+
+        slow = metrics.get_stats()["slow_queries"]
+        assert slow[-1]["statement"] == "SELECT id FROM users WHERE email = ?"
+        assert slow[-1]["parameters"] == ["<str:17>"]
+        assert "user1@example.com" not in caplog.text
+        assert "Slow query" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_statement_cardinality_bounded(self, engine, metrics):
+        metrics.max_statements = 2
+        async with engine.connect() as conn:
+            for column in ("id", "email", "id, email"):
+                await conn.execute(text(f"SELECT {column} FROM users"))
+
+        assert set(metrics.statements) == {"SELECT id FROM users", "SELECT email FROM users", OTHER_STATEMENTS}
+
+    @pytest.mark.asyncio
+    async def test_repeated_select_in_request_reported(self, engine, metrics):
+        sessions = sessionmaker(engine, class_=AsyncSession)
+        app = FastAPI()
+        app.add_middleware(SQLMetricsMiddleware, metrics=metrics)
+
+        async def get_session():
+            async with sessions() as session:
+                yield session
+
+        @app.get("/users/{count}")
+        async def list_users(count: int, db: AsyncSession = Depends(get_session)):
+            # One lookup per user, the pattern being detected
+            return [
+                (await db.execute(text("SELECT email FROM users WHERE id = :id"), {"id": i})).scalar()
+                for i in range(count)
+            ]
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert len((await client.get("/users/4")).json()) == 4
+            assert metrics.get_stats()["n_plus_one"] == []
+            await client.get("/users/6")
+            await client.get("/users/8")
+
+        assert metrics.get_stats()["n_plus_one"] == [
+            {"route": "GET /users/{count}", "statement": "SELECT email FROM users WHERE id = ?", "requests": 2}
+        ]
+        assert 'aitm_sql_n_plus_one_total{route="GET /users/{count}"' in metrics.render_prometheus()
+
+    @pytest.mark.asyncio
+    async def test_prometheus_endpoint_requires_view_logs(self, monkeypatch):
+        users = {
+            "viewer-token": User(id="user-1", email="one@example.com", role="viewer"),
+            "admin-token": User(id="user-2", email="two@example.com", role="admin"),
+        }
+
+        async def authenticated_user(credentials, db):
+            return users[credentials.credentials]
+
+        monkeypatch.setattr(auth, "get_authenticated_user", authenticated_user)
+        transport = httpx.ASGITransport(app=main_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/metrics")).status_code == 401
+            viewer = await client.get("/metrics", headers={"Authorization": "Bearer viewer-token"})
+            assert viewer.status_code == 403
+
+            response = await client.get("/metrics", headers={"Authorization": "Bearer admin-token"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/plain")
+
+    @pytest.mark.asyncio
+    async def test_prometheus_endpoint_accepts_scrape_token(self, monkeypatch):
+        monkeypatch.setattr(main_settings, "metrics_scrape_token", "scrape-secret")
+        transport = httpx.ASGITransport(app=main_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/plain")
+
+            wrong = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secre"})
+            assert wrong.status_code == 401
+
+            # The scrape token grants /metrics only, not the SQL report
+            sql = await client.get("/api/v1/metrics/sql", headers={"Authorization": "Bearer scrape-secret"})
+            assert sql.status_code == 401
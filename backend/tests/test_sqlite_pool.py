@@ -0,0 +1,144 @@
+"""
+Tests for the pooled SQLite access layer
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from app.core.quality_config import QualityConfigManager
+from app.core.sqlite_pool import SQLitePool, get_sqlite_pool
+from app.models.quality import QualityStandard
+from app.services.quality_issue_tracker import QualityIssueTracker
+
+
+@pytest.fixture
+def pool(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    pool = SQLitePool(db_path, size=2)
+    yield pool
+    pool.close()
+
+
+class TestSQLitePool:
+    """Pooled reads, batched writes and the shared pool registry"""
+
+    @pytest.mark.asyncio
+    async def test_reads_run_off_the_event_loop(self, pool):
+        loop_thread = threading.get_ident()
+        reader_thread = await pool.read(lambda conn: threading.get_ident())
+
+        assert reader_thread != loop_thread
+        assert await pool.fetchone("PRAGMA journal_mode") == ("wal",)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_transactions(self, pool):
+        await asyncio.gather(*(
+            pool.execute("INSERT INTO items (name) VALUES (?)", (f"item{i}",))
+            for i in range(50)
+        ))
+
+        assert await pool.fetchone("SELECT COUNT(*) FROM items") == (50,)
+        assert pool.stats["writes"] == 50
+        assert pool.stats["commits"] < 50
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_rolled_back_alone(self, pool):
+        results = await asyncio.gather(
+            pool.execute("INSERT INTO items (id, name) VALUES (1, 'first')"),
+            pool.execute("INSERT INTO items (id, name) VALUES (1, 'duplicate')"),
+            pool.execute("INSERT INTO items (id, name) VALUES (2, 'second')"),
+            return_exceptions=True
+        )
+
+        assert results[0] == 1 and results[2] == 1
+        assert isinstance(results[1], sqlite3.IntegrityError)
+        assert await pool.fetchall("SELECT name FROM items ORDER BY id") == [("first",), ("second",)]
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, pool):
+        for _ in range(20):
+            await pool.fetchone("SELECT 1")
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('sync')")
+
+        assert pool.get_stats()["connections_opened"] == 1
+        assert await pool.fetchone("SELECT name FROM items") == ("sync",)
+
+    @pytest.mark.asyncio
+    async def test_closed_pool_keeps_working(self, pool):
+        pool.close()
+
+        assert await pool.execute("INSERT INTO items (name) VALUES ('late')") == 1
+        assert await pool.fetchone("SELECT COUNT(*) FROM items") == (1,)
+        assert pool._idle.empty()
+
+    def test_registry_shares_pool_per_file(self, tmp_path):
+        db_path = str(tmp_path / "shared.db")
+        sqlite3.connect(db_path).close()
+
+        pool = get_sqlite_pool(db_path)
+        assert get_sqlite_pool(os.path.join(str(tmp_path), ".", "shared.db")) is pool
+        with pool.connection() as conn:
+            conn.execute("SELECT 1")
+
+        # A file replaced under the pool's open connections gets a fresh pool
+        os.unlink(db_path)
+        sqlite3.connect(db_path).close()
+        assert get_sqlite_pool(db_path) is not pool
+
+    @pytest.mark.asyncio
+    async def test_quality_service_serves_reads_during_writes(self, tmp_path):
+        db_path = str(tmp_path / "quality.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("CREATE TABLE quality_issues (id TEXT PRIMARY KEY, project_id TEXT, status TEXT)")
+        tracker = QualityIssueTracker(db_path)
+
+        def slow_write(conn):
+            conn.execute("INSERT INTO quality_issues VALUES ('a', 'p', 'open')")
+            threading.Event().wait(0.3)
+
+        write = asyncio.create_task(tracker.db.write(slow_write))
+        await asyncio.sleep(0.05)
+
+        # WAL lets the reader see the last commit while the write is in progress
+        assert await asyncio.wait_for(
+            tracker.db.fetchone("SELECT COUNT(*) FROM quality_issues"), timeout=0.2
+        ) == (0,)
+        await write
+        assert await tracker.db.fetchone("SELECT COUNT(*) FROM quality_issues") == (1,)
+
+    @pytest.mark.asyncio
+    async def test_quality_config_async_methods_use_pool(self, tmp_path):
+        db_path = str(tmp_path / "quality.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE quality_standards (
+                    id TEXT PRIMARY KEY, project_id TEXT, standard_name TEXT NOT NULL,
+                    standard_type TEXT NOT NULL, configuration TEXT NOT NULL, is_active BOOLEAN DEFAULT TRUE,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        manager = QualityConfigManager(db_path)
+
+        standard_id = await manager.save_quality_standard_async(QualityStandard(
+            project_id="p", standard_name="Strict", standard_type="quality", configuration={"min_coverage": 95.0}
+        ))
+        assert await manager.update_quality_standard_async(standard_id, {"max_complexity": 5})
+
+        thresholds = await manager.get_quality_thresholds_async("p")
+        assert (thresholds.min_coverage, thresholds.max_complexity) == (95.0, 5)
+        assert (await manager.get_quality_thresholds_async("other")).min_coverage == 80.0
+        assert [standard.id for standard in await manager.list_quality_standards_async("p")] == [standard_id]
+        # The synchronous API sees the same rows
+        assert manager.get_quality_standard("p") == {"min_coverage": 95.0, "max_complexity": 5}
+
+        assert await manager.delete_quality_standard_async(standard_id)
+        assert not await manager.update_quality_standard_async(standard_id, {})
+        stats = manager.db.get_stats()
+        assert stats["reads"] >= 3 and stats["writes"] == 4
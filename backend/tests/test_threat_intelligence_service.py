@@ -3,11 +3,17 @@ Unit tests for ThreatIntelligenceService
 """
 
 import pytest
+import pytest_asyncio
 import asyncio
+import time
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from typing import List
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
+from app.core.database import Base
 from app.services.threat_intelligence.threat_intelligence_service import (
     ThreatIntelligenceService, ProcessingStats, SourceWeight
 )
@@ -504,5 +510,114 @@ class TestThreatIntelligenceService:
         assert mock_db_session.add.call_count == 1
 
 
+
+class TestBulkIngestion:
+    """Test bulk indicator ingestion against a real database"""
+    
+    @pytest_asyncio.fixture
+    async def session_factory(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'threats.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        
+        async with factory() as session:
+            session.add(ThreatFeed(id=1, name="otx", url="https://otx.example", format="JSON"))
+            await session.commit()
+        
+        with patch('app.services.threat_intelligence.threat_intelligence_service.async_session', factory):
+            yield factory
+        await engine.dispose()
+    
+    def make_indicators(self, count, tags=None, start=0):
+        now = datetime.utcnow()
+        return [
+            ThreatIndicator(
+                value=f"10.0.{(start + i) // 256}.{(start + i) % 256}",
+                type=ThreatType.IOC,
+                severity=SeverityLevel.MEDIUM,
+                first_seen=now - timedelta(hours=1),
+                last_seen=now,
+                tags=tags or ["scanner"],
+                source="otx",
+                feed_id=1
+            )
+            for i in range(count)
+        ]
+    
+    async def count_indicators(self, factory):
+        async with factory() as session:
+            return (await session.execute(select(func.count(ThreatIndicator.id)))).scalar()
+    
+    @pytest.mark.asyncio
+    async def test_bulk_inserts_and_merges(self, session_factory):
+        service = ThreatIntelligenceService()
+        service.validator.validate_indicator = Mock(return_value=True)
+        
+        stats = await service.process_threat_indicators(self.make_indicators(50), feed_id=1, bulk=True)
+        assert stats.processed_count == 50
+        assert await self.count_indicators(session_factory) == 50
+        
+        # Re-ingesting overlapping data merges instead of inserting duplicates
+        batch = self.make_indicators(30, tags=["botnet"], start=40)
+        stats = await service.process_threat_indicators(batch, feed_id=1, bulk=True)
+        assert stats.merged_count == 10
+        assert stats.processed_count == 20
+        assert len(stats.batch_throughput) == 1
+        assert await self.count_indicators(session_factory) == 70
+        
+        async with session_factory() as session:
+            merged = (await session.execute(
+                select(ThreatIndicator).where(ThreatIndicator.value == "10.0.0.45")
+            )).scalar_one()
+            assert set(merged.tags) == {"scanner", "botnet"}
+    
+    @pytest.mark.asyncio
+    async def test_bulk_folds_in_batch_duplicates(self, session_factory):
+        service = ThreatIntelligenceService()
+        service.validator.validate_indicator = Mock(return_value=True)
+        
+        batch = self.make_indicators(5) + self.make_indicators(5, tags=["c2"])
+        stats = await service.process_threat_indicators(batch, feed_id=1, bulk=True)
+        
+        assert stats.processed_count == 5
+        assert stats.deduplicated_count == 5
+        assert await self.count_indicators(session_factory) == 5
+    
+    @pytest.mark.asyncio
+    async def test_bulk_confidence_matches_per_row(self, session_factory):
+        """Test in-batch duplicates end with the same confidence in both modes"""
+        service = ThreatIntelligenceService()
+        service.validator.validate_indicator = Mock(return_value=True)
+        
+        bulk_batch = self.make_indicators(3) + self.make_indicators(3, tags=["c2"])
+        per_row_batch = self.make_indicators(3, start=100) + self.make_indicators(3, tags=["c2"], start=100)
+        await service.process_threat_indicators(bulk_batch, feed_id=1, bulk=True)
+        await service.process_threat_indicators(per_row_batch, feed_id=1, bulk=False)
+        
+        async with session_factory() as session:
+            rows = (await session.execute(select(ThreatIndicator))).scalars().all()
+        confidence = {row.value: row.confidence for row in rows}
+        bulk_scores = [confidence[f"10.0.0.{i}"] for i in range(3)]
+        per_row_scores = [confidence[f"10.0.0.{i}"] for i in range(100, 103)]
+        
+        assert bulk_scores == pytest.approx(per_row_scores)
+    
+    @pytest.mark.asyncio
+    async def test_bulk_ingestion_throughput(self, session_factory):
+        """Test 20k indicators ingest in seconds with a handful of round trips per batch"""
+        service = ThreatIntelligenceService()
+        service.validator.validate_indicator = Mock(return_value=True)
+        
+        start = time.perf_counter()
+        stats = await service.process_threat_indicators(self.make_indicators(20000), feed_id=1)
+        elapsed = time.perf_counter() - start
+        
+        assert stats.processed_count == 20000
+        assert len(stats.batch_throughput) == 20
+        assert await self.count_indicators(session_factory) == 20000
+        assert elapsed < 10.0
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file